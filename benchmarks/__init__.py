@@ -0,0 +1 @@
+"""Performance benchmarks for the Counter-Pose MCP Server."""
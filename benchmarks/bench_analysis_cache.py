@@ -0,0 +1,47 @@
+"""Benchmark submit_reasoning for repeated text with and without the analysis cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analysis_cache
+"""
+
+import os
+import time
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+PARAGRAPH = (
+    "We should add JWT security and rate limiting to the backend API, then run an email "
+    "campaign with A/B testing of the landing page before the public launch. "
+)
+SIZES_KB = (1, 16, 256, 1024)
+
+
+def per_call_ms(tool: CounterPoseTool, text: str, calls: int) -> float:
+    tool.submit_reasoning("warmup", text)
+    start = time.perf_counter()
+    for _ in range(calls):
+        tool.submit_reasoning("bench", text)
+    return (time.perf_counter() - start) * 1000 / calls
+
+
+def main() -> None:
+    """Compare repeated submissions of the same text with the cache off and on."""
+    uncached = CounterPoseTool(logger=UsageLogger(log_file=os.devnull), analysis_cache_size=0)
+    cached = CounterPoseTool(logger=UsageLogger(log_file=os.devnull), analysis_cache_size=1024)
+
+    print(f"{'size':>8} {'uncached ms':>12} {'cached ms':>12} {'speedup':>10}")
+    for size_kb in SIZES_KB:
+        text = (PARAGRAPH * (size_kb * 1024 // len(PARAGRAPH) + 1))[: size_kb * 1024]
+        calls = max(5, 2000 // size_kb)
+        miss = per_call_ms(uncached, text, calls)
+        hit = per_call_ms(cached, text, calls)
+        print(f"{size_kb:>6}KB {miss:>12.3f} {hit:>12.3f} {miss / hit:>9.1f}x")
+    print(f"cache stats: {cached.analysis_cache.stats()}")
+    uncached.logger.close()
+    cached.logger.close()
+
+
+if __name__ == "__main__":
+    main()
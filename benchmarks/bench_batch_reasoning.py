@@ -0,0 +1,94 @@
+"""Benchmark submit_reasoning_batch throughput against one submit_reasoning per item.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_reasoning [items]
+
+Both paths are measured twice: calling CounterPoseTool directly, and as MCP tool calls
+through an in-process fastmcp client, where each single call is a full round trip.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from typing import Callable, List
+
+from fastmcp import Client
+
+from src.mcp_server import main as server
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+SAMPLES = [
+    "We should add JWT security and rate limiting to the backend API before launch.",
+    "Our email campaign needs better conversion tracking and A/B testing of subject lines.",
+    "The dashboard layout should use a minimal color palette and clearer typography.",
+    "Launch an MVP to validate the market before investing in the full product roadmap.",
+    "Refactor the database layer for maintainability and add deployment automation.",
+]
+
+
+def make_texts(count: int) -> List[str]:
+    """Return ``count`` distinct reasoning texts cycling through the samples."""
+    return [f"{SAMPLES[i % len(SAMPLES)]} Trace {i}." for i in range(count)]
+
+
+def measure(fn: Callable[[], None], count: int) -> float:
+    """Return items per second for one run of ``fn`` over ``count`` items."""
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+async def mcp_single(client: Client, texts: List[str]) -> None:
+    for text in texts:
+        await client.call_tool("submit_reasoning", {"reasoning": text})
+
+
+async def mcp_batch(client: Client, texts: List[str]) -> None:
+    await client.call_tool("submit_reasoning_batch", {"reasonings": texts})
+
+
+async def measure_mcp(texts: List[str]) -> List[float]:
+    async with Client(server.mcp) as client:
+        await mcp_single(client, texts[:10])
+        rates = []
+        for run in (mcp_single, mcp_batch):
+            start = time.perf_counter()
+            await run(client, texts)
+            rates.append(len(texts) / (time.perf_counter() - start))
+        return rates
+
+
+def main() -> None:
+    """Compare items per second for single and batch submission."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    texts = make_texts(count)
+
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    direct_single = measure(
+        lambda: [tool.submit_reasoning(str(uuid.uuid4()), text) for text in texts], count
+    )
+    direct_batch = measure(
+        lambda: tool.submit_reasoning_batch([(str(uuid.uuid4()), text) for text in texts]),
+        count,
+    )
+    tool.logger.close()
+
+    server.counter_pose.logger = UsageLogger(log_file=os.devnull)
+    mcp_single_rate, mcp_batch_rate = asyncio.run(measure_mcp(texts))
+    server.counter_pose.logger.close()
+
+    print(f"{count} items")
+    print(f"{'path':<10} {'single items/s':>16} {'batch items/s':>16} {'speedup':>10}")
+    for name, single, batch in (
+        ("direct", direct_single, direct_batch),
+        ("mcp", mcp_single_rate, mcp_batch_rate),
+    ):
+        print(f"{name:<10} {single:>16.0f} {batch:>16.0f} {batch / single:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark vectorized batch scoring against the per-text scalar path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch_scoring [texts] [words per text]
+
+The scalar path scans each text once and then counts hits per domain and persona pair
+in Python, as ``analyze`` does on a cache miss. The batch path scans each text the
+same way, then scores every domain and pair for thousands of texts with one matrix
+product. Both the full analysis (domain plus ranked pairs with reasons) and domain
+detection alone are timed; the keyword scan they share is reported on its own.
+"""
+
+import random
+import sys
+import time
+from typing import Callable, List
+
+from src.mcp_server.batch_scorer import BatchScorer
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+FILLER = ["the", "we", "should", "consider", "because", "this", "approach", "with", "data"]
+
+
+def make_texts(tool: CounterPoseTool, count: int, words: int, seed: int = 7) -> List[str]:
+    """Build short texts in which about one word in five is a catalog keyword."""
+    rng = random.Random(seed)
+    keywords = [k for keywords in tool.domain_keywords.values() for k in keywords]
+    for pairs in tool.persona_keywords.values():
+        keywords.extend(k for keywords in pairs.values() for k in keywords)
+    return [
+        " ".join(
+            rng.choice(keywords) if rng.random() < 0.2 else rng.choice(FILLER)
+            for _ in range(rng.randint(words // 2, words * 3 // 2))
+        )
+        for _ in range(count)
+    ]
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def scalar_analyze(tool: CounterPoseTool, texts: List[str]) -> None:
+    for text in texts:
+        match = tool.match_keywords(text)
+        domain = tool._domain_from_match(match)
+        tool._rank_pairs_from_match(domain, match)
+
+
+def scalar_domains(tool: CounterPoseTool, texts: List[str]) -> None:
+    for text in texts:
+        tool._domain_from_match(tool.match_keywords(text))
+
+
+def main() -> None:
+    """Print texts per second for both paths at growing batch sizes."""
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    tool = CounterPoseTool()
+    tool.warm_up()
+    start = time.perf_counter()
+    scorer = BatchScorer(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        matcher=tool.matcher.matcher,
+        default_domain=tool.default_domain,
+    )
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(
+        f"{len(scorer.columns)} keywords x {len(scorer.domains)} domains / "
+        f"{len(scorer.pairs)} pairs, compiled in {compile_ms:.1f}ms; ~{words} words per text"
+    )
+    print(
+        f"{'texts':>7} {'scan/s':>9} {'scalar/s':>9} {'batch/s':>9} {'speedup':>8} "
+        f"{'domains scalar/s':>17} {'batch/s':>9} {'speedup':>8}"
+    )
+    count = 1000
+    while count <= largest:
+        texts = make_texts(tool, count, words)
+        scan = timed(lambda texts=texts: [tool.matcher.matcher.find(text) for text in texts])
+        scalar = timed(lambda texts=texts: scalar_analyze(tool, texts))
+        batch = timed(lambda texts=texts: scorer.analyze(texts))
+        scalar_d = timed(lambda texts=texts: scalar_domains(tool, texts))
+        batch_d = timed(lambda texts=texts: scorer.determine_domains(texts))
+        print(
+            f"{count:>7} {count / scan:>9.0f} {count / scalar:>9.0f} {count / batch:>9.0f} "
+            f"{scalar / batch:>7.2f}x {count / scalar_d:>17.0f} {count / batch_d:>9.0f} "
+            f"{scalar_d / batch_d:>7.2f}x"
+        )
+        count *= 5 if str(count).startswith("1") else 2
+
+
+if __name__ == "__main__":
+    main()
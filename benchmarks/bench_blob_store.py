@@ -0,0 +1,71 @@
+"""Measure resident memory and latency with large critiques kept in the blob store.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_blob_store [sessions] [critique_kb]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+
+
+def run(blob_threshold: int, sessions: int, critique_kb: int) -> Dict[str, float]:
+    """Run full sessions and return retained bytes and per-call latencies."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    tool.blob_threshold = blob_threshold
+    body = "Consider the failure modes of this plan. " * (critique_kb * 1024 // 41)
+    for i in range(sessions):
+        tool.submit_reasoning(f"s{i}", "JWT security for the API")
+        tool.get_persona_guidance(f"s{i}", PAIR)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i in range(sessions):
+        # Fresh strings per session, as if each arrived in its own request
+        tool.submit_critique(f"s{i}", PAIR[0], f"{i}:{body}", PAIR[1], f"{i}:{body}")
+    submit = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(sessions):
+        tool.get_session_history(f"s{i}")
+    history = time.perf_counter() - start
+
+    file_bytes = tool.blob_store.stats()["file_bytes"]
+    tool.blob_store.close()
+    tool.logger.close()
+    return {
+        "retained MB": retained / 1024 / 1024,
+        "blob file MB": file_bytes / 1024 / 1024,
+        "submit ms": submit * 1000 / sessions,
+        "history ms": history * 1000 / sessions,
+    }
+
+
+def main() -> None:
+    """Compare keeping critiques in memory with storing them as blobs."""
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    critique_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rows = {
+        "in memory": run(0, sessions, critique_kb),
+        "blob store": run(16 * 1024, sessions, critique_kb),
+    }
+    columns = ["retained MB", "blob file MB", "submit ms", "history ms"]
+    print(f"{sessions} sessions x 2 critiques of {critique_kb} KB")
+    print(f"{'':<12}" + "".join(f"{c:>15}" for c in columns))
+    for name, row in rows.items():
+        print(f"{name:<12}" + "".join(f"{row[c]:>15.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark loading a catalog file from its cached index against compiling it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_catalog_load [largest scale] [loads per measurement]
+
+The built-in catalog is exported to TOML and replicated ``scale`` times under new domain
+names and keywords. For each size this reports parsing and compiling the file, loading
+its cached index, and loading it plus the first match, which compiles the keyword regex
+(compiled patterns cannot be stored in the index). Speedup compares the last two.
+"""
+
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from src.mcp_server.catalog import catalog_data, load_catalog, write_catalog_file
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+
+def scaled(data: Dict[str, Any], scale: int) -> Dict[str, Any]:
+    """Return ``scale`` copies of the catalog with distinct domains and keywords."""
+    if scale == 1:
+        return data
+    domains = {}
+    for copy in range(scale):
+        for domain, entry in data["domains"].items():
+            domains[f"{domain}_{copy}"] = {
+                "keywords": [f"{keyword}{copy}" for keyword in entry["keywords"]],
+                "pairs": [
+                    {
+                        "personas": pair["personas"],
+                        "keywords": [f"{keyword}{copy}" for keyword in pair["keywords"]],
+                    }
+                    for pair in entry["pairs"]
+                ],
+            }
+    return {"domains": domains, "personas": data["personas"]}
+
+
+def median_ms(fn: Callable[[], object], runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        # Each load in a new process compiles its regex; don't reuse this process's
+        re.purge()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    """Print compile and cached-load times for growing catalog sizes."""
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    tool = CounterPoseTool()
+    data = catalog_data(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        tool.persona_icons,
+        tool.persona_guidance,
+    )
+    print(
+        f"{'scale':>6} {'keywords':>9} {'file KB':>8} {'compile ms':>11} {'cached ms':>10} "
+        f"{'1st match':>10} {'index KB':>9} {'speedup':>8}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        scale = 1
+        while scale <= largest:
+            path = os.path.join(directory, f"catalog-{scale}.toml")
+            cache_dir = os.path.join(directory, f"cache-{scale}")
+            write_catalog_file(path, scaled(data, scale))
+            compile_runs = max(1, runs // scale)
+            compiled = median_ms(lambda path=path: load_catalog(path, cache_dir=""), compile_runs)
+            catalog = load_catalog(path, cache_dir)
+            cached = median_ms(lambda path=path, cache=cache_dir: load_catalog(path, cache), runs)
+            first_match = median_ms(
+                lambda path=path, cache=cache_dir: load_catalog(path, cache).matcher.match("api"),
+                runs,
+            )
+            index = sum(entry.stat().st_size for entry in os.scandir(cache_dir))
+            print(
+                f"{scale:>6} {len(catalog.matcher.matcher.keywords):>9} "
+                f"{os.path.getsize(path) / 1024:>8.0f} {compiled:>11.1f} {cached:>10.1f} "
+                f"{first_match:>10.1f} {index / 1024:>9.0f} {compiled / first_match:>7.1f}x"
+            )
+            scale *= 10
+
+
+if __name__ == "__main__":
+    main()
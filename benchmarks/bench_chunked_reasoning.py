@@ -0,0 +1,73 @@
+"""Benchmark chunked reasoning upload against submitting the whole text at once.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chunked_reasoning [size_mb] [chunk_kb]
+
+Reports the total time to append every chunk, the latency of the finalize call, and
+the latency of a single submit_reasoning call over the same text.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+PARAGRAPH = (
+    "The service logs show retries from the backend API under load. Deployment automation "
+    "should roll back failed releases, and the database needs an index for slow queries. "
+)
+
+
+def make_chunks(size_mb: float, chunk_kb: int) -> List[str]:
+    """Return roughly ``size_mb`` of reasoning split into ``chunk_kb`` chunks."""
+    text = PARAGRAPH * int(size_mb * 1024 * 1024 / len(PARAGRAPH) + 1)
+    size = chunk_kb * 1024
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+def run_chunked(tool: CounterPoseTool, chunks: List[str], early_stop: bool) -> Dict[str, float]:
+    session_id = f"chunked-{early_stop}"
+    start = time.perf_counter()
+    for chunk in chunks:
+        tool.append_reasoning(session_id, chunk, early_stop)
+    appended = time.perf_counter()
+    tool.finalize_reasoning(session_id)
+    finished = time.perf_counter()
+    return {
+        "append total ms": (appended - start) * 1000,
+        "per append ms": (appended - start) * 1000 / len(chunks),
+        "finalize ms": (finished - appended) * 1000,
+    }
+
+
+def main() -> None:
+    """Compare chunked uploads, with and without early stop, to one large call."""
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    chunk_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    chunks = make_chunks(size_mb, chunk_kb)
+    text = "".join(chunks)
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+
+    start = time.perf_counter()
+    tool.submit_reasoning("whole", text)
+    single_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(text) / 1024 / 1024:.1f} MB in {len(chunks)} chunks of {chunk_kb} KB")
+    print(f"{'mode':<22} {'append total ms':>16} {'per append ms':>14} {'finalize ms':>12}")
+    for early_stop in (False, True):
+        row = run_chunked(tool, chunks, early_stop)
+        name = "chunked, early stop" if early_stop else "chunked"
+        print(
+            f"{name:<22} {row['append total ms']:>16.1f} {row['per append ms']:>14.2f} "
+            f"{row['finalize ms']:>12.3f}"
+        )
+    print(f"{'single submit_reasoning':<22} {single_ms:>16.1f}")
+    tool.logger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Microbenchmark get_persona_guidance latency and allocations per call.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_critique_guidance
+"""
+
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from src.mcp_server.catalog import DEFAULT_PERSONA_GUIDANCE
+from src.mcp_server.counter_pose_tool import PERSONA_GUIDANCE, CounterPoseTool
+
+CALLS = 20_000
+PAIR = ["Developer", "Security Expert"]
+
+
+def rebuilt_critique_format(tool: CounterPoseTool, persona: str) -> str:
+    """The previous approach: rebuild the guidance table and re-render on every call."""
+    icon = tool.get_persona_icon(persona)
+    table = {name: text for name, text in PERSONA_GUIDANCE.items()}
+    guidance = table.get(persona.lower(), DEFAULT_PERSONA_GUIDANCE)
+    return f"""
+            As {persona}, critique the reasoning from your specific perspective.
+
+            {guidance}
+
+            Identify:
+            1. Key claims that need examination
+            2. Potential blind spots or unconsidered factors
+            3. Logical contradictions or tensions
+            4. Alternative approaches worth considering
+
+            Format your critique as:
+
+            {icon} {persona.upper()}'s CRITIQUE:
+            <Your critique here>
+
+            END CRITIQUE
+            """
+
+
+def rebuilt_format(tool: CounterPoseTool) -> Dict[str, str]:
+    return {
+        "persona1_guidance": rebuilt_critique_format(tool, PAIR[0]),
+        "persona2_guidance": rebuilt_critique_format(tool, PAIR[1]),
+    }
+
+
+def cached_format(tool: CounterPoseTool) -> Dict[str, str]:
+    return tool._get_guidance_format(PAIR[0], PAIR[1])
+
+
+def measure(fn: Callable[[], Dict[str, str]]) -> Dict[str, float]:
+    """Return microseconds and allocated bytes per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    results = [fn() for _ in range(1000)]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+    return {"us": elapsed / CALLS * 1e6, "bytes": allocated / 1000}
+
+
+def main() -> None:
+    """Compare guidance rendering and full get_persona_guidance calls."""
+    tool = CounterPoseTool()
+    tool.logger.log_file = os.devnull
+    tool.submit_reasoning("bench", "JWT security review")
+
+    rows = {
+        "format: rebuilt per call": measure(lambda: rebuilt_format(tool)),
+        "format: cached per pair": measure(lambda: cached_format(tool)),
+        "get_persona_guidance": measure(lambda: tool.get_persona_guidance("bench", PAIR)),
+    }
+    print(f"{'':<28} {'us/call':>10} {'retained bytes/call':>20}")
+    for name, row in rows.items():
+        print(f"{name:<28} {row['us']:>10.2f} {row['bytes']:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Accuracy and latency of the keyword and character n-gram detection engines.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_detection_engines [catalog scale]
+
+Accuracy is measured on hand-labeled reasoning snippets that are not part of either
+engine's catalog or seed corpus, overall and for the snippets without any literal
+keyword hit. Latency is the uncached analysis time per text as the text grows, then as
+the catalog grows: every domain and persona pair receives ``scale`` times as many
+synthetic keywords (default 1, 10, and 100 times).
+"""
+
+import random
+import string
+import sys
+import time
+from typing import Callable, Dict, List
+
+from src.mcp_server.counter_pose_tool import PERSONA_GUIDANCE, CounterPoseTool
+from src.mcp_server.histogram import Histogram
+from src.mcp_server.ngram_classifier import NgramClassifier
+
+SIZES = [100, 1024, 10 * 1024, 100 * 1024, 1024 * 1024]
+PARAGRAPH = "We should add JWT security and rate limiting to the backend API before launch. "
+
+# Hand-labeled reasoning snippets, none of them taken from the catalog
+LABELED = {
+    "software_development": [
+        "We should refactor the authentication service and add unit tests before the next deploy.",
+        "The database queries are slow, so we need an index and some caching in the backend.",
+        "Let's containerize the service with Docker and run it on Kubernetes.",
+        "The pull request breaks the build because of a null pointer in the parser.",
+        "Our microservices talk over REST; moving to gRPC could reduce latency.",
+        "I think the memory leak comes from the event listeners never being removed.",
+        "We can store passwords with bcrypt and rotate the encryption keys yearly.",
+        "Rewrite the script in TypeScript so the compiler catches type errors.",
+        "The CI pipeline should run the linter and the integration tests on every commit.",
+        "Handle concurrency with a thread pool and a queue to avoid race conditions.",
+        "Add pagination to the endpoint so clients don't download every row.",
+        "We should migrate the monolith to smaller services with their own schemas.",
+    ],
+    "digital_marketing": [
+        "We should run a newsletter campaign to re-engage subscribers who went quiet.",
+        "Influencers on Instagram could help us reach younger audiences.",
+        "Our ads cost too much per click; let's tighten the targeting and bidding.",
+        "Improve search rankings by writing blog posts around the phrases people type.",
+        "The funnel loses most visitors on the signup page, so test a shorter form.",
+        "A viral TikTok challenge would build buzz before the holiday season.",
+        "Track return on ad spend per channel and move budget to the best performers.",
+        "Retarget visitors who abandoned their carts with a discount email.",
+        "Partner with podcasts in our niche to promote the brand.",
+        "Post three times a week and reply to every comment to grow the community.",
+        "Write case studies for enterprise buyers and share them on LinkedIn.",
+        "Use a referral program that rewards customers for inviting friends.",
+    ],
+    "visual_design": [
+        "The logo needs a bolder typeface and a simpler color palette.",
+        "Increase the whitespace between sections so the page feels less cluttered.",
+        "The icons should share the same stroke width and corner radius.",
+        "Use a grid layout and align the cards to a consistent baseline.",
+        "The contrast between the gray text and the background is too low to read.",
+        "Create a style guide covering fonts, colors, and illustration style.",
+        "The hero image should be a photograph rather than an illustration.",
+        "Make the buttons larger and give them a clear hover state.",
+        "Pick a serif font for headings and a sans-serif for body text.",
+        "The mockups in Figma should show the mobile and desktop versions.",
+        "A warmer palette with orange accents would match the brand mood.",
+        "The poster's visual hierarchy should lead the eye from the title to the date.",
+    ],
+    "product_strategy": [
+        "We should interview customers to find out which problem hurts most.",
+        "Prioritize the roadmap by impact and effort for the next quarter.",
+        "Charge a monthly subscription with a free tier to drive adoption.",
+        "Competitors already offer this, so what makes ours different?",
+        "Ship a minimal version first and learn from real usage.",
+        "Define success metrics like retention and weekly active users.",
+        "Enter the European market after we win the first hundred customers.",
+        "Align the stakeholders on the vision before we commit engineering time.",
+        "Drop the feature nobody uses and focus on the core workflow.",
+        "Survey the users about willingness to pay before setting prices.",
+        "Our go-to-market plan should target small businesses first.",
+        "Run a beta with ten design partners and iterate every two weeks.",
+    ],
+}
+
+
+def keyword_engine(tool: CounterPoseTool) -> Callable[[str], str]:
+    def detect(text: str) -> str:
+        match = tool.match_keywords(text)
+        domain = tool._domain_from_match(match)
+        tool._rank_pairs_from_match(domain, match)
+        return domain
+
+    return detect
+
+
+def ngram_engine(classifier: NgramClassifier) -> Callable[[str], str]:
+    return lambda text: classifier.analyze(text)[0]
+
+
+def accuracy(tool: CounterPoseTool, classifier: NgramClassifier) -> None:
+    engines = {"keyword": keyword_engine(tool), "ngram": ngram_engine(classifier)}
+    unmatched = {
+        text
+        for texts in LABELED.values()
+        for text in texts
+        if not any(tool.match_keywords(text).domain_counts.values())
+    }
+    total = sum(len(texts) for texts in LABELED.values())
+    print(f"Accuracy on {total} labeled snippets ({len(unmatched)} without a keyword hit)")
+    print(
+        f"{'engine':<9} {'overall':>8} {'no hit':>8} " + " ".join(f"{d[:11]:>11}" for d in LABELED)
+    )
+    for name, detect in engines.items():
+        correct: Dict[str, int] = {}
+        unmatched_correct = 0
+        for domain, texts in LABELED.items():
+            for text in texts:
+                hit = detect(text) == domain
+                correct[domain] = correct.get(domain, 0) + hit
+                unmatched_correct += hit and text in unmatched
+        overall = sum(correct.values()) / total
+        print(
+            f"{name:<9} {overall:>7.0%} {unmatched_correct / max(1, len(unmatched)):>7.0%} "
+            + " ".join(f"{correct[d] / len(LABELED[d]):>10.0%}" for d in LABELED)
+        )
+
+
+def latency_us(detect: Callable[[str], str], text: str, repeat: int) -> Histogram:
+    histogram = Histogram()
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        detect(text)
+        histogram.record((time.perf_counter_ns() - start) // 1000)
+    return histogram
+
+
+def scaled_catalog(tool: CounterPoseTool, scale: int) -> CounterPoseTool:
+    """Return a tool whose domains and pairs have ``scale`` times as many keywords."""
+    rng = random.Random(scale)
+
+    def synthetic(count: int) -> List[str]:
+        return ["".join(rng.choices(string.ascii_lowercase, k=9)) for _ in range(count)]
+
+    scaled = CounterPoseTool()
+    scaled.set_catalog(
+        {d: list(k) + synthetic(len(k) * (scale - 1)) for d, k in tool.domain_keywords.items()},
+        tool.persona_pairs,
+        {
+            domain: {pair: list(k) + synthetic(len(k) * (scale - 1)) for pair, k in pairs.items()}
+            for domain, pairs in tool.persona_keywords.items()
+        },
+    )
+    return scaled
+
+
+def main() -> None:
+    """Print accuracy by engine, then latency by text size and by catalog size."""
+    scales = [int(sys.argv[1])] if len(sys.argv) > 1 else [1, 10, 100]
+    tool = CounterPoseTool()
+    start = time.perf_counter()
+    classifier = NgramClassifier(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        PERSONA_GUIDANCE,
+        tool.default_domain,
+    )
+    print(f"n-gram classifier built in {(time.perf_counter() - start) * 1000:.1f}ms\n")
+    accuracy(tool, classifier)
+
+    print(f"\n{'text size':>10} {'keyword p50':>12} {'p99':>8} {'ngram p50':>10} {'p99':>8}")
+    keyword, ngram = keyword_engine(tool), ngram_engine(classifier)
+    for size in SIZES:
+        text = (PARAGRAPH * (size // len(PARAGRAPH) + 1))[:size]
+        repeat = max(5, min(200, 2_000_000 // size))
+        k, n = latency_us(keyword, text, repeat), latency_us(ngram, text, repeat)
+        print(
+            f"{size / 1024:>8.1f}KB {k.percentile(50):>10}us {k.percentile(99):>6}us "
+            f"{n.percentile(50):>8}us {n.percentile(99):>6}us"
+        )
+
+    text = (PARAGRAPH * 13)[:1024]
+    print(f"\n{'catalog':>8} {'keywords':>9} {'keyword p50':>12} {'ngram p50':>10} {'build':>9}")
+    for scale in scales:
+        scaled = scaled_catalog(tool, scale)
+        start = time.perf_counter()
+        scaled_classifier = NgramClassifier(
+            scaled.domain_keywords,
+            scaled.persona_pairs,
+            scaled.persona_keywords,
+            PERSONA_GUIDANCE,
+            scaled.default_domain,
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+        scaled.warm_up()
+        k = latency_us(keyword_engine(scaled), text, 200)
+        n = latency_us(ngram_engine(scaled_classifier), text, 200)
+        print(
+            f"{scale:>7}x {len(scaled.matcher.matcher.keywords):>9} {k.percentile(50):>10}us "
+            f"{n.percentile(50):>8}us {build_ms:>7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
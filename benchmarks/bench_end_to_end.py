@@ -0,0 +1,315 @@
+"""End-to-end latency benchmark driving the MCP tools through an in-process client.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_end_to_end                    # full sweep
+    python -m benchmarks.bench_end_to_end --quick            # small sweep for a smoke run
+    python -m benchmarks.bench_end_to_end --sizes 1KB,1MB --concurrency 1,64
+    python -m benchmarks.bench_end_to_end --compare benchmarks/results/<previous>.json
+
+Each flow calls submit_reasoning, get_persona_guidance, and submit_critique through
+``fastmcp.Client(mcp)``. At each concurrency level the flows advance in lockstep, one
+tool at a time, so latency, throughput, and peak RSS can be attributed to each tool.
+Cells whose reasoning would exceed ``--max-inflight-mb`` in flight at once are
+skipped. Results are written as JSON for comparison between runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keep benchmark traffic out of the real usage log
+os.environ.setdefault("COUNTER_POSE_USAGE_LOG", os.devnull)
+
+import fastmcp  # noqa: E402
+from fastmcp import Client  # noqa: E402
+
+from src.mcp_server.histogram import Histogram  # noqa: E402
+from src.mcp_server.main import mcp  # noqa: E402
+
+TOOLS = ("submit_reasoning", "get_persona_guidance", "submit_critique")
+PERSONAS = ["Developer", "Security Expert"]
+PERCENTILES = (50, 95, 99)
+DEFAULT_SIZES = "1KB,16KB,256KB,1MB,10MB"
+DEFAULT_CONCURRENCY = "1,8,64,512"
+PARAGRAPH = (
+    "We should add JWT security and rate limiting to the backend API, then run an email "
+    "campaign with A/B testing of the landing page before the public launch. "
+)
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as ``512``, ``16KB``, or ``10MB`` into bytes."""
+    text = text.strip().upper()
+    for suffix, factor in (("KB", 1024), ("MB", 1024 * 1024), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * factor)
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    if size >= 1024 * 1024 and size % (1024 * 1024) == 0:
+        return f"{size // (1024 * 1024)}MB"
+    if size >= 1024 and size % 1024 == 0:
+        return f"{size // 1024}KB"
+    return f"{size}B"
+
+
+def make_text(size: int) -> str:
+    return (PARAGRAPH * (size // len(PARAGRAPH) + 1))[:size]
+
+
+class RssSampler:
+    """Background thread tracking the peak resident set size since the last reset."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def current(self) -> int:
+        """Return the current RSS in bytes, or the lifetime peak where unavailable."""
+        try:
+            with open("/proc/self/statm") as handle:
+                return int(handle.read().split()[1]) * self._page_size
+        except OSError:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def reset(self) -> None:
+        self.peak = self.current()
+
+    def start(self) -> None:
+        self.reset()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+
+async def timed_call(
+    client: Client, tool: str, arguments: Dict[str, Any], latencies: Histogram
+) -> Tuple[bool, Dict[str, Any]]:
+    """Call a tool, record its latency in microseconds, and return (ok, result)."""
+    start = time.perf_counter()
+    try:
+        content = await client.call_tool(tool, arguments)
+        result = json.loads(content[0].text)
+        ok = "error" not in result
+    except Exception as error:  # noqa: BLE001 - any failure counts as an error call
+        result, ok = {"error": str(error)}, False
+    latencies.record(int((time.perf_counter() - start) * 1e6))
+    return ok, result
+
+
+async def run_cell(
+    client: Client,
+    sampler: RssSampler,
+    size: int,
+    concurrency: int,
+    flows: int,
+    critique: str,
+) -> Dict[str, Any]:
+    """Run ``flows`` complete flows, ``concurrency`` at a time, and summarize each tool."""
+    reasoning = make_text(size)
+    stats = {
+        tool: {"latency": Histogram(), "errors": 0, "seconds": 0.0, "peak_rss": 0} for tool in TOOLS
+    }
+    flow_latency = Histogram()
+    completed = 0
+    while completed < flows:
+        wave = min(concurrency, flows - completed)
+        ids = [f"bench-{size}-{concurrency}-{completed + i}" for i in range(wave)]
+        calls = {
+            "submit_reasoning": lambda sid: {"reasoning": reasoning, "session_id": sid},
+            "get_persona_guidance": lambda sid: {"session_id": sid, "persona_pair": PERSONAS},
+            "submit_critique": lambda sid: {
+                "session_id": sid,
+                "persona1_name": PERSONAS[0],
+                "persona1_critique": critique,
+                "persona2_name": PERSONAS[1],
+                "persona2_critique": critique,
+            },
+        }
+        wave_start = time.perf_counter()
+        for tool in TOOLS:
+            tool_stats = stats[tool]
+            sampler.reset()
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(timed_call(client, tool, calls[tool](sid), tool_stats["latency"]) for sid in ids)
+            )
+            tool_stats["seconds"] += time.perf_counter() - start
+            tool_stats["peak_rss"] = max(tool_stats["peak_rss"], sampler.peak, sampler.current())
+            tool_stats["errors"] += sum(1 for ok, _ in outcomes if not ok)
+        flow_us = int((time.perf_counter() - wave_start) * 1e6)
+        flow_latency.record(flow_us, wave)
+        completed += wave
+
+    tools = {}
+    for tool, tool_stats in stats.items():
+        tools[tool] = summarize(tool_stats["latency"], tool_stats["seconds"])
+        tools[tool]["errors"] = tool_stats["errors"]
+        tools[tool]["peak_rss_mb"] = round(tool_stats["peak_rss"] / 1024 / 1024, 1)
+    total_seconds = sum(tool_stats["seconds"] for tool_stats in stats.values())
+    return {
+        "size_bytes": size,
+        "size": format_size(size),
+        "concurrency": concurrency,
+        "flows": flows,
+        "tools": tools,
+        "flow": summarize(flow_latency, total_seconds),
+    }
+
+
+def summarize(latencies: Histogram, seconds: float) -> Dict[str, Any]:
+    """Return latency percentiles in milliseconds and calls per second."""
+    summary: Dict[str, Any] = {"count": latencies.count}
+    for percent in PERCENTILES:
+        summary[f"p{percent}_ms"] = round(latencies.percentile(percent) / 1000, 3)
+    summary["mean_ms"] = round(latencies.mean() / 1000, 3)
+    summary["max_ms"] = round(latencies.max / 1000, 3)
+    summary["throughput_per_s"] = round(latencies.count / seconds, 1) if seconds else 0.0
+    return summary
+
+
+async def run_sweep(args: argparse.Namespace) -> Dict[str, Any]:
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    critique = make_text(parse_size(args.critique_size))
+    max_inflight = args.max_inflight_mb * 1024 * 1024
+    sampler = RssSampler()
+    sampler.start()
+    results: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, Any]] = []
+    try:
+        async with Client(mcp) as client:
+            # Warm up imports, caches, and the client session before measuring
+            await timed_call(client, "submit_reasoning", {"reasoning": "warmup"}, Histogram())
+            for size in sizes:
+                for concurrency in levels:
+                    if size * concurrency > max_inflight:
+                        skipped.append({"size": format_size(size), "concurrency": concurrency})
+                        continue
+                    flows = max(concurrency, args.min_flows)
+                    cell = await run_cell(client, sampler, size, concurrency, flows, critique)
+                    results.append(cell)
+                    print_cell(cell)
+    finally:
+        sampler.stop()
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fastmcp": fastmcp.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "critique_size": args.critique_size,
+            "min_flows": args.min_flows,
+            "max_inflight_mb": args.max_inflight_mb,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def print_cell(cell: Dict[str, Any]) -> None:
+    for tool, row in cell["tools"].items():
+        print(
+            f"{cell['size']:>6} c={cell['concurrency']:<4} {tool:<22} "
+            f"p50 {row['p50_ms']:>9.2f}ms  p95 {row['p95_ms']:>9.2f}ms  "
+            f"p99 {row['p99_ms']:>9.2f}ms  {row['throughput_per_s']:>8.1f}/s  "
+            f"rss {row['peak_rss_mb']:>7.1f}MB  errors {row['errors']}"
+        )
+
+
+def compare(current: Dict[str, Any], previous_path: str) -> None:
+    """Print p50/p99 and throughput changes against a previous results file."""
+    with open(previous_path) as handle:
+        previous = json.load(handle)
+    before = {
+        (cell["size_bytes"], cell["concurrency"], tool): row
+        for cell in previous["results"]
+        for tool, row in cell["tools"].items()
+    }
+    print(f"\nChange vs {previous_path} ({previous['timestamp']}):")
+    for cell in current["results"]:
+        for tool, row in cell["tools"].items():
+            old = before.get((cell["size_bytes"], cell["concurrency"], tool))
+            if old is None:
+                continue
+            changes = [
+                f"{key} {change(old[key], row[key]):>+7.1%}"
+                for key in ("p50_ms", "p99_ms", "throughput_per_s")
+            ]
+            print(f"{cell['size']:>6} c={cell['concurrency']:<4} {tool:<22} " + "  ".join(changes))
+
+
+def change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Reasoning sizes to sweep")
+    parser.add_argument(
+        "--concurrency", default=DEFAULT_CONCURRENCY, help="Concurrent flows to sweep"
+    )
+    parser.add_argument("--critique-size", default="4KB", help="Size of each critique")
+    parser.add_argument(
+        "--min-flows", type=int, default=32, help="Minimum flows per cell (at least concurrency)"
+    )
+    parser.add_argument(
+        "--max-inflight-mb",
+        type=int,
+        default=1024,
+        help="Skip cells whose concurrent reasoning exceeds this many MB",
+    )
+    parser.add_argument("--quick", action="store_true", help="Sweep 1KB-1MB at 1-64 flows")
+    parser.add_argument("--output", default=None, help="Results JSON path")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare with")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the sweep, print a table, and write the results JSON."""
+    args = build_parser().parse_args(argv)
+    if args.quick:
+        args.sizes, args.concurrency, args.min_flows = "1KB,64KB,1MB", "1,8,64", 16
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"end_to_end-{datetime.now():%Y%m%dT%H%M%S}.json"
+    )
+
+    report = asyncio.run(run_sweep(args))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    if report["skipped"]:
+        cells = ", ".join(f"{cell['size']}@{cell['concurrency']}" for cell in report["skipped"])
+        print(f"Skipped (over --max-inflight-mb): {cells}")
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
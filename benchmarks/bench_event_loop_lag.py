@@ -0,0 +1,93 @@
+"""Event loop responsiveness under mixed large and small traffic.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_event_loop_lag [large size in MB] [seconds]
+
+Through an in-process MCP client, one task submits large reasoning texts back to
+back while small-request clients keep submitting short ones. The run is repeated
+with large inputs handled inline on the event loop and offloaded to the worker pool.
+It reports small-request latency and the event loop lag seen by the lag monitor.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Dict
+
+os.environ.setdefault("COUNTER_POSE_USAGE_LOG", os.devnull)
+
+from fastmcp import Client  # noqa: E402
+
+from src.mcp_server import main as server  # noqa: E402
+from src.mcp_server.concurrency import LoopLagMonitor  # noqa: E402
+from src.mcp_server.histogram import Histogram  # noqa: E402
+
+SMALL_CLIENTS = 4
+SMALL_TEXT = "Add rate limiting to the public API"
+LARGE_UNIT = "We plan a JWT security review of the backend API and its database. "
+
+
+async def run(threshold: int, large_text: str, seconds: float) -> Dict[str, float]:
+    server.offloader.threshold = threshold
+    # A fresh monitor per run; the server reads it through get_loop_lag
+    server._loop_lag = LoopLagMonitor(interval=0.005)
+    small_latency = Histogram()
+    large_calls = 0
+    deadline = time.perf_counter() + seconds
+
+    async with Client(server.mcp) as client:
+
+        async def large_sender() -> None:
+            nonlocal large_calls
+            while time.perf_counter() < deadline:
+                await client.call_tool("submit_reasoning", {"reasoning": large_text})
+                large_calls += 1
+
+        async def small_sender() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.call_tool("submit_reasoning", {"reasoning": SMALL_TEXT})
+                small_latency.record(int((time.perf_counter() - start) * 1e6))
+
+        await asyncio.gather(large_sender(), *(small_sender() for _ in range(SMALL_CLIENTS)))
+        server.loop_lag.stop()
+
+    lag = server.loop_lag.lag_us
+    return {
+        "small_calls": small_latency.count,
+        "small_p50": small_latency.percentile(50) / 1000,
+        "small_p99": small_latency.percentile(99) / 1000,
+        "lag_p99": lag.percentile(99) / 1000,
+        "lag_max": lag.max / 1000,
+        "large_calls": large_calls,
+    }
+
+
+def main() -> None:
+    """Compare inline and offloaded handling of large inputs."""
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    size = int(size_mb * 1024 * 1024)
+    # Vary the text per run so the analysis cache does not answer large calls
+    base = LARGE_UNIT * (size // len(LARGE_UNIT) + 1)
+
+    print(f"{size_mb:g}MB large inputs, {SMALL_CLIENTS} small clients, {seconds:g}s per mode")
+    print(
+        f"{'mode':<10} {'small calls':>11} {'small p50':>10} {'small p99':>10} "
+        f"{'lag p99':>9} {'lag max':>9} {'large calls':>11}"
+    )
+    server.counter_pose.analysis_cache.capacity = 0
+    for mode, threshold in (("inline", sys.maxsize), ("offload", 64 * 1024)):
+        row = asyncio.run(run(threshold, base[:size], seconds))
+        print(
+            f"{mode:<10} {row['small_calls']:>11} {row['small_p50']:>8.1f}ms "
+            f"{row['small_p99']:>8.1f}ms {row['lag_p99']:>7.1f}ms {row['lag_max']:>7.1f}ms "
+            f"{row['large_calls']:>11}"
+        )
+    server.offloader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark domain detection and pair ranking as reasoning size grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_keyword_matching
+"""
+
+import random
+import time
+from typing import Callable
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+SIZES_KB = [1, 10, 100, 500, 1000]
+
+
+def per_keyword_scan(tool: CounterPoseTool, text: str) -> None:
+    """The original approach: lowercase and rescan the text once per keyword."""
+    matches = {domain: 0 for domain in tool.domain_keywords}
+    for domain, keywords in tool.domain_keywords.items():
+        for keyword in keywords:
+            if keyword.lower() in text.lower():
+                matches[domain] += 1
+    domain = max(matches.items(), key=lambda x: x[1])[0]
+    for keywords in tool.persona_keywords.get(domain, {}).values():
+        [k for k in keywords if k.lower() in text.lower()]
+
+
+def single_pass_scan(tool: CounterPoseTool, text: str) -> None:
+    """The compiled matcher: one scan feeds both detection and ranking."""
+    match = tool.match_keywords(text)
+    domain = tool._domain_from_match(match)
+    tool._rank_pairs_from_match(domain, match)
+
+
+def make_text(size_kb: int, seed: int = 7, unicode: bool = False) -> str:
+    """Build prose-like text that mixes catalog keywords with filler words.
+
+    With ``unicode`` set, filler includes non-ASCII punctuation, which makes every
+    ``str.lower()`` call take the slow Unicode path as real agent output often does.
+    """
+    rng = random.Random(seed)
+    tool = CounterPoseTool()
+    keywords = [k for keywords in tool.domain_keywords.values() for k in keywords]
+    filler = ["the", "we", "should", "consider", "because", "this", "approach", "with", "data"]
+    if unicode:
+        filler.append("—")
+    words = []
+    size = 0
+    while size < size_kb * 1024:
+        word = rng.choice(keywords) if rng.random() < 0.05 else rng.choice(filler)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def best_of(fn: Callable[[], None], repeat: int = 5) -> float:
+    """Return the fastest of several timed runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark and print a scaling table."""
+    tool = CounterPoseTool()
+    for unicode in (False, True):
+        print(f"\n{'Unicode' if unicode else 'ASCII'} text")
+        print(
+            f"{'size':>8} {'per-keyword ms':>15} {'single-pass ms':>15} {'speedup':>8} {'us/KB':>8}"
+        )
+        for size_kb in SIZES_KB:
+            text = make_text(size_kb, unicode=unicode)
+            old = best_of(lambda text=text: per_keyword_scan(tool, text), repeat=3)
+            new = best_of(lambda text=text: single_pass_scan(tool, text), repeat=3)
+            print(
+                f"{size_kb:>6}KB {old * 1000:>15.2f} {new * 1000:>15.2f} "
+                f"{old / new:>7.1f}x {new * 1e6 / size_kb:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
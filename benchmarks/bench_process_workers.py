@@ -0,0 +1,134 @@
+"""Session flow throughput as worker processes are added.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_process_workers [max workers] [seconds per run] [reasoning KB]
+
+The server's own start_workers() compiles the catalog and forks the workers, and
+submit_reasoning -> get_persona_guidance -> submit_critique flows are sent straight to
+the worker pool, leaving out MCP protocol handling in the server process. Each reasoning
+text is unique, so every flow runs the keyword scan. Both routing modes are measured:
+``session`` with the in-memory store and ``shared`` with one SQLite database. After each
+run, the workers' proportional (PSS) and shared memory shows how much of the preloaded
+server they still share copy-on-write. Throughput can only grow up to the number of
+CPUs; the "in-process" row is the server without workers.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+# Keep benchmark traffic out of the real usage log
+os.environ.setdefault("COUNTER_POSE_USAGE_LOG", os.devnull)
+
+from src.mcp_server import main as server  # noqa: E402
+
+PAIR = ["Developer", "Security Expert"]
+PARAGRAPH = (
+    "We should add JWT security and rate limiting to the backend API, then run an email "
+    "campaign with A/B testing of the landing page before the public launch. "
+)
+FLOWS_PER_WORKER = 8
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Return a process's RSS, PSS, and shared memory in KB (Linux only)."""
+    fields = {"Rss": 0, "Pss": 0, "Shared_Clean": 0, "Shared_Dirty": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    fields[name] = int(value.split()[0])
+    except OSError:
+        pass
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+    }
+
+
+async def drive(
+    call: Callable[..., Awaitable[Dict]], concurrency: int, seconds: float, text: str
+) -> int:
+    """Run flows from ``concurrency`` clients for ``seconds`` and return completed flows."""
+    deadline = time.perf_counter() + seconds
+    completed = 0
+
+    async def client(index: int) -> None:
+        nonlocal completed
+        flow = 0
+        while time.perf_counter() < deadline:
+            session_id = f"{index}-{flow}"
+            await call("submit_reasoning", session_id, f"{session_id} {text}")
+            await call("get_persona_guidance", session_id, PAIR)
+            await call("submit_critique", session_id, PAIR[0], "a", PAIR[1], "b")
+            completed += 1
+            flow += 1
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return completed
+
+
+async def in_process(method: str, session_id: str, *args: object) -> Dict:
+    return getattr(server.counter_pose, method)(session_id, *args)
+
+
+def run_workers(count: int, routing: str, seconds: float, text: str) -> Dict[str, float]:
+    server.config.process_workers = count
+    server.config.process_routing = routing
+    pool = server.start_workers()
+    try:
+        flows = asyncio.run(drive(pool.call, FLOWS_PER_WORKER * count, seconds, text))
+        memory = [memory_kb(worker["pid"]) for worker in pool.stats()["workers"]]
+    finally:
+        server.workers = None
+        pool.close()
+    return {
+        "flows_per_second": flows / seconds,
+        "pss_kb": sum(m["pss"] for m in memory) / count,
+        "shared_kb": sum(m["shared"] for m in memory) / count,
+    }
+
+
+def main() -> None:
+    """Print flows per second and worker memory by worker count for both routing modes."""
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    size_kb = float(sys.argv[3]) if len(sys.argv) > 3 else 16.0
+    text = (PARAGRAPH * int(size_kb * 1024 // len(PARAGRAPH) + 1))[: int(size_kb * 1024)]
+    counts: List[int] = []
+    count = 1
+    while count <= max_workers:
+        counts.append(count)
+        count *= 2
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+
+    print(f"{os.cpu_count()} CPUs, {size_kb:g}KB reasoning, {seconds:g}s per run")
+    server.counter_pose.warm_up()
+    baseline = asyncio.run(drive(in_process, 1, seconds, text)) / seconds
+    print(
+        f"{'routing':<8} {'workers':>10} {'flows/s':>9} {'scaling':>8} {'PSS/worker':>11} "
+        f"{'shared/worker':>14}"
+    )
+    print(f"{'-':<8} {'in-process':>10} {baseline:>9.0f} {1.0:>7.2f}x")
+    with tempfile.TemporaryDirectory() as tmp:
+        for routing, backend in (("session", "memory"), ("shared", "sqlite")):
+            server.config.session_backend = backend
+            server.config.session_db_path = os.path.join(tmp, "sessions.db")
+            for count in counts:
+                row = run_workers(count, routing, seconds, text)
+                print(
+                    f"{routing:<8} {count:>10} {row['flows_per_second']:>9.0f} "
+                    f"{row['flows_per_second'] / baseline:>7.2f}x "
+                    f"{row['pss_kb'] / 1024:>9.1f}MB {row['shared_kb'] / 1024:>12.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Session flow throughput as the number of threads grows, with and without sharding.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_session_concurrency [flows per thread]
+
+Each thread runs complete submit_reasoning -> get_persona_guidance -> submit_critique
+flows on its own sessions against a single-shard store and a 16-shard store. With
+the GIL, threads can only show lock overhead. On a free-threaded build such as
+CPython 3.13t, throughput should grow with the thread count.
+"""
+
+import os
+import sys
+import threading
+import time
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.session_store import ShardedSessionStore
+from src.mcp_server.usage_log import UsageLogger
+
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+PAIR = ("Developer", "Security Expert")
+
+
+def run(shards: int, threads: int, flows: int) -> float:
+    """Return flows per second for ``threads`` threads sharing one tool."""
+    store = ShardedSessionStore(shards=shards, max_sessions=10_000_000, background_expiry=False)
+    tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+    tool.warm_up()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        for i in range(flows):
+            session_id = f"{index}-{i}"
+            tool.submit_reasoning(session_id, "JWT security for the backend API")
+            tool.get_persona_guidance(session_id, list(PAIR))
+            tool.submit_critique(session_id, PAIR[0], "critique", PAIR[1], "critique")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    tool.logger.close()
+    return threads * flows / elapsed
+
+
+def main() -> None:
+    """Print flows per second by thread count for 1 and 16 shards."""
+    flows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, "
+        f"{os.cpu_count()} CPUs, {flows} flows per thread"
+    )
+    print(f"{'threads':>7} {'1 shard':>12} {'16 shards':>12} {'scaling':>8}")
+    baseline = None
+    for threads in THREAD_COUNTS:
+        single = run(1, threads, flows)
+        sharded = run(16, threads, flows)
+        baseline = baseline or sharded
+        print(f"{threads:>7} {single:>10.0f}/s {sharded:>10.0f}/s {sharded / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
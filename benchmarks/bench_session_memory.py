@@ -0,0 +1,96 @@
+"""Measure resident bytes per session for the legacy and compact representations.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_session_memory [sessions]
+
+Sessions go through the full flow (reasoning, persona selection, two critiques) with
+short critiques, so the numbers show per-session overhead rather than content size.
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from src.mcp_server.counter_pose_tool import CounterPoseSession
+from src.mcp_server.session_model import Step, now_us
+
+PERSONAS = ["Developer", "Security Expert"]
+CRITIQUES = ["Looks fine", "Rotate the keys"]
+
+
+class LegacySession:
+    """The previous representation: a __dict__ per instance and dict steps."""
+
+    def __init__(self, session_id: str, domain: str) -> None:
+        self.session_id = session_id
+        self.domain = domain
+        self.personas = []
+        self.current_persona_index = -1
+        self.steps = []
+        self.started_at = datetime.now().isoformat()
+        self.domain_keywords = {}
+        self.available_personas = {}
+        self.confidence = None
+        self.changes_needed = None
+        self.blind_spots = []
+        self.contradictions = []
+
+
+def build_legacy(session_id: str, with_steps: bool) -> LegacySession:
+    session = LegacySession(session_id, "software_development")
+    session.personas = list(PERSONAS)
+    if with_steps:
+        timestamp = datetime.now().isoformat()
+        session.steps.extend(
+            {"type": "critique", "persona": persona, "content": content, "timestamp": timestamp}
+            for persona, content in zip(PERSONAS, CRITIQUES)
+        )
+    return session
+
+
+def build_compact(session_id: str, with_steps: bool) -> CounterPoseSession:
+    session = CounterPoseSession(session_id, "software_development")
+    session.personas = list(PERSONAS)
+    if with_steps:
+        timestamp = now_us()
+        session.steps.extend(
+            Step("critique", persona, content, timestamp)
+            for persona, content in zip(PERSONAS, CRITIQUES)
+        )
+    return session
+
+
+def bytes_per_session(build: Callable[[str, bool], object], count: int, with_steps: bool) -> float:
+    """Return traced bytes retained per session, excluding the session ID strings."""
+    ids = [f"session-{i:08d}" for i in range(count)]
+    build(ids[0], with_steps)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions: Dict[str, object] = {}
+    for session_id in ids:
+        sessions[session_id] = build(session_id, with_steps)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return retained / count
+
+
+def main() -> None:
+    """Print bytes per session before and after the compact representation."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows: List = []
+    for label, with_steps in (("header only", False), ("with 2 critiques", True)):
+        legacy = bytes_per_session(build_legacy, count, with_steps)
+        compact = bytes_per_session(build_compact, count, with_steps)
+        rows.append((label, legacy, compact))
+
+    print(f"{count} sessions (store dict entry included, session ID strings excluded)")
+    print(f"{'':<18} {'legacy B/session':>17} {'compact B/session':>18} {'saved':>8}")
+    for label, legacy, compact in rows:
+        print(f"{label:<18} {legacy:>17.0f} {compact:>18.0f} {1 - compact / legacy:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
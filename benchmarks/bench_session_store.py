@@ -0,0 +1,77 @@
+"""Benchmark per-call latency of the in-memory and SQLite session stores.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_session_store
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.session_store import InMemorySessionStore, SessionStore
+from src.mcp_server.sqlite_store import SqliteSessionStore
+
+SESSIONS = 2000
+REASONING = "We need JWT auth with encryption and a security review. " * 20
+CRITIQUE = "The token lifetime is too long and refresh handling is missing. " * 50
+
+
+def run_flow(tool: CounterPoseTool, timings: Dict[str, List[float]]) -> None:
+    """Drive one complete three-step session and record each call's latency."""
+    session_id = str(uuid.uuid4())
+    calls: Dict[str, Callable[[], dict]] = {
+        "submit_reasoning": lambda: tool.submit_reasoning(session_id, REASONING),
+        "get_persona_guidance": lambda: tool.get_persona_guidance(
+            session_id, ["Developer", "Security Expert"]
+        ),
+        "submit_critique": lambda: tool.submit_critique(
+            session_id, "Developer", CRITIQUE, "Security Expert", CRITIQUE
+        ),
+    }
+    for name, call in calls.items():
+        start = time.perf_counter()
+        call()
+        timings[name].append(time.perf_counter() - start)
+
+
+def measure(store: SessionStore) -> Dict[str, List[float]]:
+    """Run SESSIONS flows against a store."""
+    tool = CounterPoseTool(sessions=store)
+    tool.logger.log_file = os.devnull
+    timings: Dict[str, List[float]] = {
+        "submit_reasoning": [],
+        "get_persona_guidance": [],
+        "submit_critique": [],
+    }
+    for _ in range(SESSIONS):
+        run_flow(tool, timings)
+    return timings
+
+
+def report(name: str, timings: Dict[str, List[float]]) -> None:
+    """Print median and p99 latency per call."""
+    print(f"\n{name}")
+    print(f"{'call':<22} {'p50 us':>10} {'p99 us':>10}")
+    for call, samples in timings.items():
+        samples = sorted(samples)
+        p50 = statistics.median(samples)
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(f"{call:<22} {p50 * 1e6:>10.1f} {p99 * 1e6:>10.1f}")
+
+
+def main() -> None:
+    """Compare the two backends."""
+    report("memory", measure(InMemorySessionStore(background_expiry=False)))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteSessionStore(os.path.join(tmp, "sessions.db"))
+        report("sqlite (WAL)", measure(store))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Cold-start benchmark: time from process spawn to the first answered tool call.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [runs]
+
+Each run spawns ``python -m src.mcp_server.main`` with a stdio transport, as an editor
+would, and speaks raw JSON-RPC so the measurement does not include client-side
+imports. It reports when the ``initialize`` response and the first
+``submit_reasoning`` result arrive, measured from just before the spawn. It also
+times ``counter-pose version``, which should not import the server stack.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import IO, Any, Dict, List, Tuple
+
+PROTOCOL_VERSION = "2024-11-05"
+
+
+def send(stream: IO[bytes], message: Dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def receive(stream: IO[bytes], request_id: int) -> Dict[str, Any]:
+    """Read messages until the response to ``request_id`` arrives."""
+    while True:
+        line = stream.readline()
+        if not line:
+            raise RuntimeError("Server exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def server_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["COUNTER_POSE_USAGE_LOG"] = os.devnull
+    env["COUNTER_POSE_SESSION_BACKEND"] = "memory"
+    return env
+
+
+def time_first_call() -> Tuple[float, float]:
+    """Spawn the server and return seconds until initialize and the first tool result."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.mcp_server.main"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=server_env(),
+    )
+    try:
+        send(
+            process.stdin,
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench_startup", "version": "0"},
+                },
+            },
+        )
+        receive(process.stdout, 1)
+        initialized = time.perf_counter() - start
+        send(process.stdin, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send(
+            process.stdin,
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "tools/call",
+                "params": {
+                    "name": "submit_reasoning",
+                    "arguments": {"reasoning": "Add JWT security to the backend API"},
+                },
+            },
+        )
+        response = receive(process.stdout, 2)
+        first_call = time.perf_counter() - start
+        if "error" in response or response["result"].get("isError"):
+            raise RuntimeError(f"Tool call failed: {response}")
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return initialized, first_call
+
+
+def time_cli_version() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.mcp_server.cli", "version"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=server_env(),
+    )
+    return time.perf_counter() - start
+
+
+def summarize(label: str, samples: List[float]) -> None:
+    millis = sorted(sample * 1000 for sample in samples)
+    print(f"{label:<28} {min(millis):>9.1f} {statistics.median(millis):>9.1f} {max(millis):>9.1f}")
+
+
+def main() -> None:
+    """Spawn the server repeatedly and print spawn-to-response percentiles."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # One untimed run so every measured run sees warm bytecode and file caches
+    time_first_call()
+    initialize, first_call = zip(*(time_first_call() for _ in range(runs)))
+    versions = [time_cli_version() for _ in range(runs)]
+
+    print(f"Cold start over {runs} runs (ms)")
+    print(f"{'milestone':<28} {'min':>9} {'median':>9} {'max':>9}")
+    summarize("initialize response", list(initialize))
+    summarize("first submit_reasoning", list(first_call))
+    summarize("counter-pose version", versions)
+
+
+if __name__ == "__main__":
+    main()
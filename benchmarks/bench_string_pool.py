@@ -0,0 +1,68 @@
+"""Measure memory saved by deduplicating retried critiques across sessions.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_string_pool [sessions] [duplicate_percent]
+
+Each critique arrives as a fresh string, as it would from a request. The given
+percentage of sessions resubmit a critique that an earlier session already sent.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+BODY = "Token refresh must be rotated and revoked on logout. " * 100
+
+
+def run(pooled: bool, sessions: int, duplicate_percent: int) -> Dict[str, float]:
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    tool.blob_threshold = 0
+    if not pooled:
+        tool._store_content = lambda session_id, content: content
+    for i in range(sessions):
+        tool.submit_reasoning(f"s{i}", "JWT security")
+        tool.get_persona_guidance(f"s{i}", PAIR)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i in range(sessions):
+        source = i % 100 if i % 100 < duplicate_percent else i
+        first = "".join([f"run {source}: ", BODY])
+        second = "".join([f"run {source} (security): ", BODY])
+        tool.submit_critique(f"s{i}", PAIR[0], first, PAIR[1], second)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stats = tool.dedup_stats()
+    tool.logger.close()
+    return {
+        "retained MB": retained / 1024 / 1024,
+        "submit us": elapsed * 1e6 / sessions,
+        "dedup ratio": stats.get("dedup_ratio", 1.0) if pooled else 1.0,
+        "saved MB": stats.get("bytes_saved", 0) / 1024 / 1024 if pooled else 0.0,
+    }
+
+
+def main() -> None:
+    """Compare critique memory with and without the string pool."""
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    duplicate_percent = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rows = {"no pool": run(False, sessions, duplicate_percent)}
+    rows["string pool"] = run(True, sessions, duplicate_percent)
+    columns = ["retained MB", "submit us", "dedup ratio", "saved MB"]
+    print(f"{sessions} sessions, {duplicate_percent}% resubmitting an earlier critique")
+    print(f"{'':<12}" + "".join(f"{c:>14}" for c in columns))
+    for name, row in rows.items():
+        print(f"{name:<12}" + "".join(f"{row[c]:>14.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure CounterPoseTool construction time and memory retained per instance.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tool_construction [instances]
+
+Reports the median time to construct a tool, to construct one and answer its first
+submit_reasoning (which needs the compiled keyword matcher), and the traced bytes each
+live instance retains after that first call. Instances share the built-in catalog, so
+only the first one in the process builds and compiles it.
+"""
+
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+TEXT = "We should add JWT authentication and encrypt the database for privacy"
+
+
+def construct() -> CounterPoseTool:
+    return CounterPoseTool()
+
+
+def construct_and_call() -> CounterPoseTool:
+    tool = CounterPoseTool()
+    tool.submit_reasoning("s", TEXT)
+    return tool
+
+
+def median_us(build: Callable[[], CounterPoseTool], count: int) -> float:
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        build()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1_000_000
+
+
+def bytes_per_instance(count: int) -> float:
+    """Return traced bytes retained per live tool that has answered one call."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tools: List[CounterPoseTool] = [construct_and_call() for _ in range(count)]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del tools
+    return retained / count
+
+
+def main() -> None:
+    """Print construction time and per-instance memory."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    start = time.perf_counter()
+    construct_and_call()
+    first_us = (time.perf_counter() - start) * 1_000_000
+    print(f"Median of {count} instances")
+    print(f"First instance and call: {first_us:9.0f} us")
+    print(f"Construct:               {median_us(construct, count):9.0f} us")
+    print(f"Construct + first call:  {median_us(construct_and_call, count):9.0f} us")
+    print(f"Retained per instance:   {bytes_per_instance(count) / 1024:9.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
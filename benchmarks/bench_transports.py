@@ -0,0 +1,199 @@
+"""Per-call overhead and shared-server load for the stdio and Streamable HTTP transports.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transports [clients] [calls per client]
+
+Both transports are driven with the MCP Python client against real server processes:
+one ``counter-pose serve --transport http`` server shared by every client, and one
+stdio server spawned per client, as editors do. Sequential calls from a single client
+give per-call latency; subtracting the time the handler itself takes (measured in
+process) gives the transport's overhead. Then every client calls at once, and the
+table reports aggregate throughput and the total resident memory of the server
+processes involved.
+"""
+
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from src.mcp_server.histogram import Histogram
+
+REASONING = "We should add JWT security and rate limiting to the backend API. " * 16
+TOOLS = (
+    ("get_session_history", {"session_id": "bench"}),
+    ("submit_reasoning", {"reasoning": REASONING, "session_id": "bench"}),
+)
+
+
+def server_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["COUNTER_POSE_USAGE_LOG"] = os.devnull
+    env["COUNTER_POSE_SESSION_BACKEND"] = "memory"
+    return env
+
+
+def rss_kb(pid: int) -> int:
+    """Return a process's resident set size in KB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def child_pids() -> List[int]:
+    """Return the IDs of this process's direct children (Linux only)."""
+    pids = []
+    for name in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as handle:
+                # The command name may contain spaces, so split after its closing paren
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == os.getpid():
+            pids.append(int(name))
+    return pids
+
+
+@contextlib.asynccontextmanager
+async def stdio_session() -> AsyncIterator[ClientSession]:
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "src.mcp_server.main"], env=server_env()
+    )
+    async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def http_session(url: str) -> AsyncIterator[ClientSession]:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+async def sequential(
+    session: ClientSession, tool: str, arguments: Dict[str, Any], calls: int
+) -> Histogram:
+    histogram = Histogram()
+    for _ in range(calls):
+        start = time.perf_counter_ns()
+        await session.call_tool(tool, arguments)
+        histogram.record((time.perf_counter_ns() - start) // 1000)
+    return histogram
+
+
+async def handler_us(tool: str, arguments: Dict[str, Any], calls: int) -> float:
+    """Mean microseconds the tool handler takes in process, without any transport."""
+    os.environ["COUNTER_POSE_USAGE_LOG"] = os.devnull
+    from src.mcp_server import main as server
+
+    handler = getattr(server, tool)
+    server.counter_pose.warm_up()
+    await server.submit_reasoning(reasoning=REASONING, session_id="bench")
+    start = time.perf_counter()
+    for _ in range(calls):
+        await handler(**arguments)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def load(
+    open_session: Callable[[], AsyncContextManager[ClientSession]],
+    clients: int,
+    calls: int,
+    http_pid: int,
+) -> Dict[str, float]:
+    """Run ``calls`` calls from each of ``clients`` concurrent sessions.
+
+    Server memory is the shared HTTP server's, plus that of any stdio servers spawned.
+    """
+    async with contextlib.AsyncExitStack() as stack:
+        sessions = [await stack.enter_async_context(open_session()) for _ in range(clients)]
+        for session in sessions:
+            await session.call_tool(*TOOLS[1])
+        start = time.perf_counter()
+        await asyncio.gather(*(sequential(session, *TOOLS[0], calls) for session in sessions))
+        elapsed = time.perf_counter() - start
+        stdio_servers = [pid for pid in child_pids() if pid != http_pid]
+        memory = sum(rss_kb(pid) for pid in stdio_servers) or rss_kb(http_pid)
+    return {"calls_per_second": clients * calls / elapsed, "server_rss_mb": memory / 1024}
+
+
+def start_http_server() -> "tuple[subprocess.Popen, str]":
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.mcp_server.cli", "serve", "--transport", "http",
+         "--port", str(port), "--max-concurrent-requests", "0"],
+        env=server_env(),
+        stderr=subprocess.DEVNULL,
+    )  # fmt: skip
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), 0.1):
+            return process, f"http://127.0.0.1:{port}/mcp"
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("HTTP server did not start")
+
+
+async def compare(url: str, http_pid: int, clients: int, calls: int) -> None:
+    print(f"{'tool':<22} {'transport':<9} {'p50':>8} {'p99':>8} {'mean':>8} {'overhead':>9}")
+    for tool, arguments in TOOLS:
+        baseline = await handler_us(tool, arguments, calls)
+        for name, opener in (("stdio", stdio_session), ("http", lambda: http_session(url))):
+            async with opener() as session:
+                await session.call_tool(*TOOLS[1])
+                await sequential(session, tool, arguments, 10)  # warm up
+                histogram = await sequential(session, tool, arguments, calls)
+            print(
+                f"{tool:<22} {name:<9} {histogram.percentile(50) / 1000:>6.2f}ms "
+                f"{histogram.percentile(99) / 1000:>6.2f}ms {histogram.mean() / 1000:>6.2f}ms "
+                f"{(histogram.mean() - baseline) / 1000:>7.2f}ms"
+            )
+        print(f"{tool:<22} {'handler':<9} {'':>8} {'':>8} {baseline / 1000:>6.2f}ms")
+
+    print(f"\n{clients} concurrent clients, {calls} get_session_history calls each")
+    print(f"{'transport':<28} {'calls/s':>9} {'server RSS':>11}")
+    rows = (
+        (f"stdio ({clients} servers)", stdio_session),
+        ("http (1 shared server)", lambda: http_session(url)),
+    )
+    for name, opener in rows:
+        row = await load(opener, clients, calls, http_pid)
+        print(f"{name:<28} {row['calls_per_second']:>9.0f} {row['server_rss_mb']:>9.1f}MB")
+
+
+def main() -> None:
+    """Print per-call latency by transport, then throughput and memory under load."""
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    process, url = start_http_server()
+    try:
+        asyncio.run(compare(url, process.pid, clients, calls))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
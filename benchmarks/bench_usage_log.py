@@ -0,0 +1,50 @@
+"""Benchmark the cost of UsageLogger.log_usage on the request path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_usage_log
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from src.mcp_server.usage_log import UsageLogger
+
+CALLS = 50_000
+
+
+def open_append_close(log_file: str) -> None:
+    """The original logger: one open/write/close round trip per line."""
+    timestamp = datetime.now().isoformat()
+    with open(log_file, "a") as f:
+        f.write(f"{timestamp},session,software_development,system,init,100\n")
+
+
+def main() -> None:
+    """Compare per-call latency of the synchronous and buffered loggers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path = os.path.join(tmp, "sync.log")
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            open_append_close(sync_path)
+        sync_elapsed = time.perf_counter() - start
+
+        logger = UsageLogger(log_file=os.path.join(tmp, "buffered.log"), queue_size=CALLS)
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            logger.log_usage("session", "software_development", "system", "init", 100)
+        buffered_elapsed = time.perf_counter() - start
+        peak_depth = logger.stats()["queue_depth"]
+        logger.close()
+
+        print(f"{'logger':<12} {'us/call':>10}")
+        print(f"{'sync':<12} {sync_elapsed / CALLS * 1e6:>10.2f}")
+        print(f"{'buffered':<12} {buffered_elapsed / CALLS * 1e6:>10.2f}")
+        print(f"\nqueue depth after burst: {peak_depth}")
+        print(f"final stats: {logger.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark `counter-pose usage-report` throughput on a generated usage log.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_usage_report [size_mb]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.mcp_server.usage_log import compress_segment
+from src.mcp_server.usage_report import build_report
+
+SEGMENT_MB = 64
+DOMAINS = ["software_development", "digital_marketing", "visual_design", "product_strategy"]
+PERSONAS = ["system", "Developer", "Security Expert", "SEO Specialist", "MVP Champion"]
+STEPS = ["init", "get_persona_guidance", "critique"]
+
+
+def write_segment(path: str, size_mb: int, rng: random.Random) -> None:
+    """Write roughly ``size_mb`` of realistic usage lines."""
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        while written < target:
+            chunk = "".join(
+                f"2026-10-16T12:00:00.{i:06d},{rng.getrandbits(64):016x},"
+                f"{rng.choice(DOMAINS)},{rng.choice(PERSONAS)},{rng.choice(STEPS)},"
+                f"{rng.randint(10, 100_000)}\n"
+                for i in range(10_000)
+            )
+            f.write(chunk)
+            written += len(chunk)
+
+
+def main() -> None:
+    """Generate rotated segments plus an active file and time the report."""
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "usage.log")
+        segments = max(1, size_mb // SEGMENT_MB)
+        for index in range(segments - 1):
+            rotated = f"{log_file}.20261016T{index:012d}"
+            write_segment(rotated, SEGMENT_MB, rng)
+            compress_segment(rotated)
+        write_segment(log_file, SEGMENT_MB, rng)
+
+        for jobs in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            report = build_report(log_file, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            print(
+                f"jobs={jobs:<3} {report.lines:>12,} lines  {elapsed:>7.2f}s  "
+                f"{segments * SEGMENT_MB / elapsed:>7.1f} MB/s (uncompressed)"
+            )
+
+
+if __name__ == "__main__":
+    main()
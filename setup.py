@@ -11,11 +11,14 @@ setup(
         "pydantic>=1.8.2",
         "jsonrpcserver>=5.0.0",
         "websockets>=10.0",
+        "fastmcp>=2.2,<2.3",
     ],
+    extras_require={"batch": ["numpy>=1.20"]},
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
             "counter-pose-server=mcp_server.main:main",
+            "counter-pose=mcp_server.cli:main",
         ],
     },
 )
@@ -0,0 +1,102 @@
+"""Memoization of domain detection and persona pair ranking by content hash."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DIGEST_BYTES = 16
+
+# Detected domain and ranked persona pairs as (pair, score, reason) tuples
+Analysis = Tuple[str, List[Tuple[Tuple[str, str], float, str]]]
+
+
+def catalog_version(*parts: object) -> str:
+    """Return a short digest identifying a keyword/persona catalog.
+
+    ``parts`` must be JSON-serializable; any change to them, including the order of
+    persona pairs used for tie-breaking, yields a different version.
+    """
+    encoded = json.dumps(parts, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=DIGEST_BYTES).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize reasoning for cache lookups.
+
+    Keyword matching is case-insensitive substring presence, so lowercasing is the
+    only normalization that can never change the result. Whitespace is significant
+    because multi-word keywords match a single space.
+    """
+    return text.lower()
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache keyed by a blake2b digest of normalized text.
+
+    Each digest also covers the catalog version, so results computed under another
+    catalog are never returned. Entries of a catalog no longer in use are not dropped
+    eagerly: calls still running on the previous catalog during a reload can keep
+    using theirs, and the rest age out through LRU eviction.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[bytes, Analysis] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, normalized: str, version: str, engine: str = "keyword") -> bytes:
+        """Return the digest for already-normalized text under a catalog version.
+
+        Analyses by different detection engines are cached under different keys.
+        """
+        digest = hashlib.blake2b(version.encode("ascii"), digest_size=DIGEST_BYTES)
+        digest.update(engine.encode("ascii") + b"\0")
+        digest.update(normalized.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Analysis]:
+        """Return the cached value for ``key``, or None, counting a hit or miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Analysis) -> None:
+        """Store a value, evicting the least recently used entries beyond capacity."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
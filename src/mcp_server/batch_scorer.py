@@ -0,0 +1,162 @@
+"""Vectorized domain detection and persona pair ranking for large batches of texts.
+
+Requires NumPy (``pip install counter-pose-mcp[batch]``); the server itself does not.
+"""
+
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analysis_cache import Analysis
+from .keyword_matcher import KeywordMatcher
+
+# Texts scored per matrix product; bounds the dense presence matrix to a few MB
+BATCH_CHUNK_TEXTS = 2048
+
+
+class BatchScores:
+    """Keyword hits for a batch of texts against every domain and persona pair.
+
+    ``domain_scores`` has one row per text and one column per domain, in catalog
+    order; ``pair_scores`` has one column per persona pair, grouped by domain.
+    """
+
+    def __init__(
+        self, found: List[FrozenSet[str]], domain_scores: np.ndarray, pair_scores: np.ndarray
+    ) -> None:
+        self.found = found
+        self.domain_scores = domain_scores
+        self.pair_scores = pair_scores
+
+
+class BatchScorer:
+    """Scores many texts at once with keyword incidence matrices.
+
+    The catalog is compiled into a keyword x domain and a keyword x persona pair
+    matrix, each entry counting how often a keyword is listed for that domain or pair.
+    Multiplying a texts x keywords presence matrix by them gives every domain and
+    pair score for a whole chunk of texts in one product. Results, including the
+    ``default_domain`` fallback (the first domain unless given) and ties broken by
+    catalog order, are identical to ``CounterPoseTool.determine_domain`` and
+    ``_rank_persona_pairs``.
+    """
+
+    def __init__(
+        self,
+        domain_keywords: Mapping[str, Sequence[str]],
+        persona_pairs: Mapping[str, Sequence[Tuple[str, str]]],
+        persona_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+        matcher: Optional[KeywordMatcher] = None,
+        chunk_size: int = BATCH_CHUNK_TEXTS,
+        default_domain: Optional[str] = None,
+    ) -> None:
+        self.domains: Tuple[str, ...] = tuple(domain_keywords)
+        self.default_domain = default_domain or next(iter(self.domains), None)
+        self.chunk_size = chunk_size
+        lists: List[Sequence[str]] = list(domain_keywords.values())
+        for pairs in persona_keywords.values():
+            lists.extend(pairs.values())
+        vocabulary = sorted({k.lower() for keywords in lists for k in keywords})
+        if matcher is None:
+            matcher = KeywordMatcher(vocabulary)
+        self.matcher = matcher
+        self.columns: Dict[str, int] = {keyword: i for i, keyword in enumerate(vocabulary)}
+
+        # float32 products go through BLAS and are exact for counts below 2**24
+        self.domain_incidence = np.zeros((len(vocabulary), len(self.domains)), np.float32)
+        for column, keywords in enumerate(domain_keywords.values()):
+            for keyword in keywords:
+                self.domain_incidence[self.columns[keyword.lower()], column] += 1
+
+        self.pairs: List[Tuple[str, str]] = []
+        self._pair_lowered: List[Tuple[str, Sequence[str], Tuple[str, ...]]] = []
+        # Columns of each domain's pairs in tie-breaking order, as sorted by the scalar path
+        self._ranked_columns: Dict[str, np.ndarray] = {}
+        for domain, pairs in persona_keywords.items():
+            order = list(persona_pairs.get(domain, ()))
+            start = len(self.pairs)
+            for pair_key, keywords in pairs.items():
+                self.pairs.append((domain, pair_key))
+                self._pair_lowered.append((pair_key, keywords, tuple(k.lower() for k in keywords)))
+            columns = list(range(start, len(self.pairs)))
+            self._ranked_columns[domain] = np.array(
+                sorted(columns, key=lambda c: order.index(tuple(self.pairs[c][1].split(",")))),
+                dtype=np.intp,
+            )
+        self.pair_incidence = np.zeros((len(vocabulary), len(self.pairs)), np.float32)
+        for column, (_, _, lowered) in enumerate(self._pair_lowered):
+            for keyword in lowered:
+                self.pair_incidence[self.columns[keyword], column] += 1
+
+    def presence(self, found: Sequence[FrozenSet[str]]) -> np.ndarray:
+        """Return the texts x keywords 0/1 matrix for per-text sets of found keywords."""
+        rows: List[int] = []
+        columns: List[int] = []
+        index = self.columns
+        for row, keywords in enumerate(found):
+            hits = [index[k] for k in keywords if k in index]
+            rows.extend([row] * len(hits))
+            columns.extend(hits)
+        matrix = np.zeros((len(found), len(index)), np.float32)
+        matrix[rows, columns] = 1
+        return matrix
+
+    def score(self, texts: Sequence[str]) -> BatchScores:
+        """Scan each text once, then score every domain and pair per chunk of texts."""
+        find = self.matcher.find
+        found = [find(text) for text in texts]
+        domain_scores = np.zeros((len(texts), len(self.domains)), np.int64)
+        pair_scores = np.zeros((len(texts), len(self.pairs)), np.int64)
+        for start in range(0, len(texts), self.chunk_size):
+            end = start + self.chunk_size
+            present = self.presence(found[start:end])
+            domain_scores[start:end] = present @ self.domain_incidence
+            pair_scores[start:end] = present @ self.pair_incidence
+        return BatchScores(found, domain_scores, pair_scores)
+
+    def determine_domains(self, texts: Sequence[str]) -> List[str]:
+        """Return the detected domain of each text."""
+        return self._domains(self.score(texts))
+
+    def _domains(self, scores: BatchScores) -> List[str]:
+        if not self.domains:
+            raise ValueError("the catalog has no domains")
+        # argmax returns the first maximum, as max() does over the catalog order
+        best = scores.domain_scores.argmax(axis=1)
+        matched = scores.domain_scores.max(axis=1) > 0
+        return [
+            self.domains[column] if hit else self.default_domain
+            for column, hit in zip(best.tolist(), matched.tolist())
+        ]
+
+    def analyze(self, texts: Sequence[str]) -> List[Analysis]:
+        """Return the domain and ranked persona pairs of each text, as ``analyze`` does."""
+        scores = self.score(texts)
+        domains = self._domains(scores)
+        analyses: List[Analysis] = [(domain, []) for domain in domains]
+        by_domain: Dict[str, List[int]] = {}
+        for row, domain in enumerate(domains):
+            by_domain.setdefault(domain, []).append(row)
+        for domain, rows in by_domain.items():
+            columns = self._ranked_columns.get(domain)
+            if columns is None or not len(columns):
+                continue
+            ranked = scores.pair_scores[np.ix_(rows, columns)]
+            # A stable sort on descending score keeps tied pairs in catalog order
+            order = np.argsort(-ranked, axis=1, kind="stable")
+            for row, row_order, row_scores in zip(rows, order.tolist(), ranked.tolist()):
+                found = scores.found[row]
+                ranking = analyses[row][1]
+                for position in row_order:
+                    pair_key, keywords, lowered = self._pair_lowered[columns[position]]
+                    score = row_scores[position]
+                    matched = (
+                        [k for k, low in zip(keywords, lowered) if low in found] if score else []
+                    )
+                    reason = (
+                        f"Matched keywords: {', '.join(matched)}"
+                        if matched
+                        else "General domain fit"
+                    )
+                    ranking.append((tuple(pair_key.split(",")), score, reason))
+        return analyses
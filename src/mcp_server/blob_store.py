@@ -0,0 +1,173 @@
+"""Memory-mapped storage for large step contents, reusing the space of freed blobs."""
+
+import bisect
+import itertools
+import mmap
+import os
+import tempfile
+import threading
+from typing import IO, Any, Dict, List, Optional
+
+
+class BlobRef:
+    """Location of one UTF-8 encoded text in a blob store."""
+
+    __slots__ = ("store", "offset", "length", "serial")
+
+    def __init__(self, store: "BlobStore", offset: int, length: int, serial: int) -> None:
+        self.store = store
+        self.offset = offset
+        self.length = length
+        self.serial = serial
+
+    def read(self) -> str:
+        """Decode the referenced text from the store."""
+        return self.store.read(self.offset, self.length, self.serial)
+
+    def free(self) -> None:
+        """Return the blob's space to the store; the reference must not be read again."""
+        self.store.free(self)
+
+
+class BlobStore:
+    """File of text blobs, read back through a memory map.
+
+    The file is an anonymous temporary file in ``directory`` (the system temporary
+    directory by default), created on the first write and removed when the store is
+    closed or the process exits. Freed blobs leave gaps that later blobs fill, first
+    fit, and the file is truncated when the blobs at its end are freed. Each blob gets
+    a serial number, so a stale reference to reused space fails rather than reading
+    another blob's text.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or None
+        self.blobs = 0
+        self.reads = 0
+        self._file: Optional[IO[bytes]] = None
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+        # Free extents as sorted, non-adjacent [offset, length] pairs
+        self._free: List[List[int]] = []
+        self._free_bytes = 0
+        self._serials: Dict[int, int] = {}
+        self._next_serial = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> BlobRef:
+        """Store ``text`` and return a reference to it."""
+        data = text.encode("utf-8", "surrogatepass")
+        with self._lock:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(
+                    prefix="counter_pose_blobs_", dir=self.directory, buffering=0
+                )
+            offset = self._allocate(len(data))
+            os.pwrite(self._file.fileno(), data, offset)
+            serial = next(self._next_serial)
+            if data:
+                self._serials[offset] = serial
+            self.blobs += 1
+        return BlobRef(self, offset, len(data), serial)
+
+    def read(self, offset: int, length: int, serial: Optional[int] = None) -> str:
+        """Return the text stored at ``offset``.
+
+        With ``serial``, raises ``ValueError`` if that blob has been freed.
+        """
+        if length == 0:
+            return ""
+        with self._lock:
+            if serial is not None and self._serials.get(offset) != serial:
+                raise ValueError("Blob was freed")
+            if offset + length > self._mapped:
+                self._remap()
+            data = self._map[offset : offset + length]
+            self.reads += 1
+        return data.decode("utf-8", "surrogatepass")
+
+    def free(self, ref: BlobRef) -> None:
+        """Release the space held by ``ref`` for reuse; freeing twice is a no-op."""
+        with self._lock:
+            if ref.length == 0:
+                self.blobs -= 1
+                return
+            if self._serials.get(ref.offset) != ref.serial:
+                return
+            del self._serials[ref.offset]
+            self.blobs -= 1
+            self._free_bytes += ref.length
+            start, end = ref.offset, ref.offset + ref.length
+            index = bisect.bisect_left(self._free, [start, 0])
+            if index < len(self._free) and self._free[index][0] == end:
+                end += self._free.pop(index)[1]
+            if index > 0 and sum(self._free[index - 1]) == start:
+                index -= 1
+                start = self._free.pop(index)[0]
+            if end == self._size:
+                # Give the tail back to the file system instead of keeping a gap
+                self._free_bytes -= end - start
+                self._truncate(start)
+            else:
+                self._free.insert(index, [start, end - start])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return blob counts and the size of the backing file and its free space."""
+        return {
+            "blobs": self.blobs,
+            "file_bytes": self._size,
+            "free_bytes": self._free_bytes,
+            "reads": self.reads,
+        }
+
+    def close(self) -> None:
+        """Unmap and delete the backing file."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._mapped = 0
+            self._size = 0
+            self._free = []
+            self._free_bytes = 0
+            self._serials.clear()
+
+    def _allocate(self, length: int) -> int:
+        """Return the offset of the first free extent that fits, or of the file's end."""
+        if length:
+            for index, extent in enumerate(self._free):
+                if extent[1] >= length:
+                    offset = extent[0]
+                    if extent[1] == length:
+                        del self._free[index]
+                    else:
+                        extent[0] += length
+                        extent[1] -= length
+                    self._free_bytes -= length
+                    return offset
+        offset = self._size
+        self._size += length
+        return offset
+
+    def _truncate(self, size: int) -> None:
+        """Shrink the file to ``size`` bytes, unmapping it first."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._mapped = 0
+        self._size = size
+        if self._file is not None:
+            os.ftruncate(self._file.fileno(), size)
+
+    def _remap(self) -> None:
+        """Map the whole file, which has grown since it was last mapped."""
+        if self._file is None:
+            raise ValueError("Blob store is closed")
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+        self._mapped = self._size
@@ -0,0 +1,605 @@
+"""Persona catalogs loaded from TOML or JSON files and compiled to a cached index.
+
+A catalog file lists domains with their keywords and persona pairs, and optionally an
+icon and critique guidance per persona::
+
+    [domains.data_engineering]
+    keywords = ["pipeline", "etl", "warehouse"]
+
+    [[domains.data_engineering.pairs]]
+    personas = ["Data Engineer", "Analyst"]
+    keywords = ["schema", "latency"]
+
+    [personas."Data Engineer"]
+    icon = "🛠️"
+    guidance = "Focus on data quality, lineage, and pipeline reliability"
+
+Pairs are ranked in file order when their scores tie. Text that matches no domain is
+assigned ``default_domain``, a top-level key naming one of the domains, which defaults
+to the first domain listed. The compiled ``Catalog`` holds the keyword matcher and every
+persona's rendered critique instructions. Its contents and the matcher's tables are
+written as JSON to a cache directory under a digest of the file's bytes, so later
+startups skip parsing, validation, and trie building for an unchanged file. The cache
+holds plain data only, and entries not owned by the current user or writable by others
+are ignored.
+
+Catalog contents are frozen (``FrozenDict`` and tuples), so one catalog can be shared by
+any number of tools; ``Catalog.with_overrides`` derives a variant that copies only the
+mappings it changes.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .analysis_cache import catalog_version
+from .keyword_matcher import CatalogMatcher, KeywordMatcher
+
+if TYPE_CHECKING:
+    from .batch_scorer import BatchScorer
+    from .ngram_classifier import NgramClassifier
+
+DEFAULT_PERSONA_ICON = "👤"
+DEFAULT_PERSONA_GUIDANCE = "Consider the perspective's unique expertise"
+
+# Bump when the cached layout of Catalog or KeywordMatcher changes
+INDEX_FORMAT = 5
+
+_DOMAIN_FIELDS = {"keywords", "pairs"}
+_PAIR_FIELDS = {"personas", "keywords"}
+_PERSONA_FIELDS = {"icon", "guidance"}
+
+
+def render_critique_format(persona: str, icon: str, guidance: str) -> str:
+    """Render the critique instructions for one persona."""
+    return f"""
+            As {persona}, critique the reasoning from your specific perspective.
+
+            {guidance}
+
+            Identify:
+            1. Key claims that need examination
+            2. Potential blind spots or unconsidered factors
+            3. Logical contradictions or tensions
+            4. Alternative approaches worth considering
+
+            Format your critique as:
+
+            {icon} {persona.upper()}'s CRITIQUE:
+            <Your critique here>
+
+            END CRITIQUE
+            """
+
+
+class FrozenDict(dict):
+    """A dict that cannot be changed after construction.
+
+    Unlike ``MappingProxyType`` it pickles and serializes to JSON like a plain dict, and
+    lookups run at dict speed.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args: object, **kwargs: object) -> NoReturn:
+        raise TypeError("catalog mappings are read-only; use Catalog.with_overrides")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[Any, Any]]]:
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+
+def freeze(value: Any) -> Any:  # noqa: ANN401 - returns the frozen form of any value
+    """Return ``value`` with mappings made ``FrozenDict`` and lists made tuples, recursively.
+
+    Frozen values are returned as they are, so catalogs built from other catalogs share
+    them by reference.
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        items = tuple(freeze(item) for item in value)
+        if isinstance(value, tuple) and all(new is old for new, old in zip(items, value)):
+            return value
+        return items
+    return value
+
+
+def _overlay(base: Mapping[str, Any], changes: Optional[Mapping[str, Any]]) -> Mapping[str, Any]:
+    if not changes:
+        return base
+    merged = dict(base)
+    merged.update(changes)
+    return freeze(merged)
+
+
+class Catalog:
+    """A persona catalog and the indexes derived from it. Its contents are frozen.
+
+    ``persona_icons`` and ``persona_guidance`` are keyed by lowercased persona name, and
+    ``critique_formats`` by the persona names used in pairs. ``default_domain`` is
+    detected for text that matches no domain; it defaults to the first domain. The
+    keyword matcher, the n-gram classifier, and the batch scorer are built on first use,
+    once, and belong to this catalog, so a tool that swaps in another catalog never mixes
+    their results.
+    Mappings and lists passed in are frozen on construction, copying them unless they
+    are already frozen. ``version`` covers every entry, icons and guidance included.
+    """
+
+    def __init__(
+        self,
+        domain_keywords: Dict[str, List[str]],
+        persona_pairs: Dict[str, List[Tuple[str, str]]],
+        persona_keywords: Dict[str, Dict[str, List[str]]],
+        persona_icons: Mapping[str, str],
+        persona_guidance: Mapping[str, str],
+        source: str = "",
+        matcher: Optional[CatalogMatcher] = None,
+        default_domain: Optional[str] = None,
+    ) -> None:
+        if default_domain is None:
+            default_domain = next(iter(domain_keywords), None)
+        elif default_domain not in domain_keywords:
+            raise ValueError(f"default_domain {default_domain!r} is not one of the domains")
+        self.default_domain = default_domain
+        self.domain_keywords: Mapping[str, Tuple[str, ...]] = freeze(domain_keywords)
+        self.persona_pairs: Mapping[str, Tuple[Tuple[str, str], ...]] = freeze(persona_pairs)
+        self.persona_keywords: Mapping[str, Mapping[str, Tuple[str, ...]]] = freeze(
+            persona_keywords
+        )
+        self.persona_icons: Mapping[str, str] = freeze(persona_icons)
+        self.persona_guidance: Mapping[str, str] = freeze(persona_guidance)
+        for domain, pair_keywords in self.persona_keywords.items():
+            pairs = self.persona_pairs.get(domain, ())
+            for pair_key in pair_keywords:
+                if tuple(pair_key.split(",")) not in pairs:
+                    raise ValueError(
+                        f"persona_keywords[{domain!r}] names pair {pair_key!r}, "
+                        f"which is not in persona_pairs[{domain!r}]"
+                    )
+        self.source = source
+        self.version = catalog_version(
+            self.domain_keywords,
+            self.persona_pairs,
+            self.persona_keywords,
+            self.persona_icons,
+            self.persona_guidance,
+            default_domain,
+        )
+        critique_formats: Dict[str, str] = {}
+        for pairs in self.persona_pairs.values():
+            for persona in (name for pair in pairs for name in pair):
+                if persona not in critique_formats:
+                    critique_formats[persona] = render_critique_format(
+                        persona,
+                        self.persona_icons.get(persona.lower(), DEFAULT_PERSONA_ICON),
+                        self.persona_guidance.get(persona.lower(), DEFAULT_PERSONA_GUIDANCE),
+                    )
+        self.critique_formats: Mapping[str, str] = FrozenDict(critique_formats)
+        self._matcher = matcher
+        self._ngram_classifier: Optional[NgramClassifier] = None
+        self._batch_scorer: Optional[BatchScorer] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled copies keep the matcher; the NumPy indexes are rebuilt when needed
+        state = self.__dict__.copy()
+        state.update(_ngram_classifier=None, _batch_scorer=None, _lock=None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def matcher(self) -> CatalogMatcher:
+        """The compiled keyword matcher."""
+        matcher = self._matcher
+        return matcher if matcher is not None else self._compile_matcher()
+
+    def _compile_matcher(self) -> CatalogMatcher:
+        with self._lock:
+            if self._matcher is None:
+                self._matcher = CatalogMatcher(self.domain_keywords, self.persona_keywords)
+            return self._matcher
+
+    @property
+    def ngram_classifier(self) -> "NgramClassifier":
+        """The character n-gram classifier (needs NumPy)."""
+        classifier = self._ngram_classifier
+        return classifier if classifier is not None else self._compile_ngram_classifier()
+
+    def _compile_ngram_classifier(self) -> "NgramClassifier":
+        from .ngram_classifier import NgramClassifier
+
+        with self._lock:
+            if self._ngram_classifier is None:
+                self._ngram_classifier = NgramClassifier(
+                    self.domain_keywords,
+                    self.persona_pairs,
+                    self.persona_keywords,
+                    self.persona_guidance,
+                    default_domain=self.default_domain,
+                )
+            return self._ngram_classifier
+
+    @property
+    def batch_scorer(self) -> "BatchScorer":
+        """The vectorized batch scorer (needs NumPy)."""
+        scorer = self._batch_scorer
+        return scorer if scorer is not None else self._compile_batch_scorer()
+
+    def _compile_batch_scorer(self) -> "BatchScorer":
+        from .batch_scorer import BatchScorer
+
+        keyword_matcher = self.matcher.matcher
+        with self._lock:
+            if self._batch_scorer is None:
+                self._batch_scorer = BatchScorer(
+                    self.domain_keywords,
+                    self.persona_pairs,
+                    self.persona_keywords,
+                    matcher=keyword_matcher,
+                    default_domain=self.default_domain,
+                )
+            return self._batch_scorer
+
+    def prepare(self, ngram: bool = False) -> None:
+        """Build what the first call would otherwise wait for, ahead of that call.
+
+        That is the matcher and its regex, and the n-gram classifier if ``ngram`` is set.
+        """
+        self._compile_matcher().matcher.compile()
+        if ngram:
+            self._compile_ngram_classifier()
+
+    def with_overrides(
+        self,
+        domain_keywords: Optional[Mapping[str, Sequence[str]]] = None,
+        persona_pairs: Optional[Mapping[str, Sequence[Tuple[str, str]]]] = None,
+        persona_keywords: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None,
+        persona_icons: Optional[Mapping[str, str]] = None,
+        persona_guidance: Optional[Mapping[str, str]] = None,
+    ) -> "Catalog":
+        """Return a catalog with some entries replaced, leaving this one unchanged.
+
+        Each argument maps domains (or persona names, for icons and guidance) to their
+        new value; entries not named are kept. Only the mappings given are copied, and
+        every unchanged entry is shared with this catalog. The keyword matcher is shared
+        too when no keywords or persona pairs change.
+        """
+        if persona_icons:
+            persona_icons = {name.lower(): icon for name, icon in persona_icons.items()}
+        if persona_guidance:
+            persona_guidance = {name.lower(): text for name, text in persona_guidance.items()}
+        keywords_changed = bool(domain_keywords or persona_pairs or persona_keywords)
+        return Catalog(
+            _overlay(self.domain_keywords, domain_keywords),
+            _overlay(self.persona_pairs, persona_pairs),
+            _overlay(self.persona_keywords, persona_keywords),
+            _overlay(self.persona_icons, persona_icons),
+            _overlay(self.persona_guidance, persona_guidance),
+            self.source,
+            matcher=None if keywords_changed else self._matcher,
+            default_domain=self.default_domain,
+        )
+
+    def critique_format(self, persona: str) -> str:
+        """Return the critique instructions for a persona, rendering unlisted ones."""
+        formatted = self.critique_formats.get(persona)
+        if formatted is None:
+            formatted = render_critique_format(
+                persona,
+                self.persona_icons.get(persona.lower(), DEFAULT_PERSONA_ICON),
+                self.persona_guidance.get(persona.lower(), DEFAULT_PERSONA_GUIDANCE),
+            )
+        return formatted
+
+
+def _check_fields(where: str, value: object, allowed: set) -> Mapping[str, Any]:
+    if not isinstance(value, Mapping):
+        raise ValueError(f"{where} must be a table")
+    unknown = sorted(set(value) - allowed)
+    if unknown:
+        raise ValueError(f"{where} has unknown fields: {', '.join(unknown)}")
+    return value
+
+
+def _strings(where: str, value: object) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{where} must be a list of strings")
+    return list(value)
+
+
+def parse_catalog(data: Mapping[str, Any], source: str = "") -> Catalog:
+    """Validate catalog data read from a file and compile it."""
+    _check_fields("catalog", data, {"domains", "personas", "default_domain"})
+    domains = data.get("domains")
+    if not isinstance(domains, Mapping) or not domains:
+        raise ValueError("catalog must define at least one domain under 'domains'")
+    default_domain = data.get("default_domain")
+    if default_domain is not None and (
+        not isinstance(default_domain, str) or default_domain not in domains
+    ):
+        raise ValueError(f"default_domain must name one of the domains, got {default_domain!r}")
+
+    domain_keywords: Dict[str, List[str]] = {}
+    persona_pairs: Dict[str, List[Tuple[str, str]]] = {}
+    persona_keywords: Dict[str, Dict[str, List[str]]] = {}
+    for domain, entry in domains.items():
+        where = f"domains.{domain}"
+        entry = _check_fields(where, entry, _DOMAIN_FIELDS)
+        domain_keywords[domain] = _strings(f"{where}.keywords", entry.get("keywords", []))
+        pairs = entry.get("pairs", [])
+        if not isinstance(pairs, list):
+            raise ValueError(f"{where}.pairs must be a list of tables")
+        persona_pairs[domain] = []
+        persona_keywords[domain] = {}
+        for index, pair_entry in enumerate(pairs):
+            pair_where = f"{where}.pairs[{index}]"
+            pair_entry = _check_fields(pair_where, pair_entry, _PAIR_FIELDS)
+            personas = _strings(f"{pair_where}.personas", pair_entry.get("personas"))
+            if len(personas) != 2 or not all(name.strip() for name in personas):
+                raise ValueError(f"{pair_where}.personas must name exactly 2 personas")
+            if any("," in name for name in personas):
+                raise ValueError(f"{pair_where}.personas must not contain commas")
+            pair_key = ",".join(personas)
+            if pair_key in persona_keywords[domain]:
+                raise ValueError(f"{pair_where} repeats the pair {personas}")
+            persona_pairs[domain].append((personas[0], personas[1]))
+            persona_keywords[domain][pair_key] = _strings(
+                f"{pair_where}.keywords", pair_entry.get("keywords", [])
+            )
+
+    persona_icons: Dict[str, str] = {}
+    persona_guidance: Dict[str, str] = {}
+    personas = data.get("personas", {})
+    if not isinstance(personas, Mapping):
+        raise ValueError("personas must be a table")
+    for persona, entry in personas.items():
+        where = f"personas.{persona}"
+        entry = _check_fields(where, entry, _PERSONA_FIELDS)
+        for field, target in (("icon", persona_icons), ("guidance", persona_guidance)):
+            if field in entry:
+                if not isinstance(entry[field], str):
+                    raise ValueError(f"{where}.{field} must be a string")
+                target[persona.lower()] = entry[field]
+
+    catalog = Catalog(
+        domain_keywords,
+        persona_pairs,
+        persona_keywords,
+        persona_icons,
+        persona_guidance,
+        source,
+        default_domain=default_domain,
+    )
+    # The cached index includes the matcher's tables; only its regex is compiled on use
+    catalog._compile_matcher()
+    return catalog
+
+
+def read_catalog_file(path: str, content: Optional[bytes] = None) -> Dict[str, Any]:
+    """Parse a ``.toml`` or ``.json`` catalog file into plain data."""
+    if content is None:
+        with open(path, "rb") as handle:
+            content = handle.read()
+    if path.endswith(".toml"):
+        try:
+            import tomllib  # type: ignore[import-not-found]
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib  # type: ignore[no-redef]
+            except ImportError:
+                raise ValueError(
+                    f"Reading {path} needs Python 3.11+ or the tomli package; "
+                    "use a .json catalog otherwise"
+                ) from None
+        return tomllib.loads(content.decode("utf-8"))
+    if path.endswith(".json"):
+        return json.loads(content.decode("utf-8"))
+    raise ValueError(f"Catalog files must end in .toml or .json, got {path}")
+
+
+def default_cache_dir() -> str:
+    """Return the per-user directory for compiled catalogs."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "counter-pose", "catalogs")
+
+
+def cache_path(content: bytes, cache_dir: str) -> str:
+    """Return where the index compiled from ``content`` is cached."""
+    digest = hashlib.blake2b(content, digest_size=16)
+    digest.update(f"\0{INDEX_FORMAT}\0{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    return os.path.join(cache_dir, f"catalog-{digest.hexdigest()}.json")
+
+
+def _cache_data(catalog: Catalog) -> Dict[str, Any]:
+    return {
+        "domain_keywords": catalog.domain_keywords,
+        "persona_pairs": catalog.persona_pairs,
+        "persona_keywords": catalog.persona_keywords,
+        "persona_icons": catalog.persona_icons,
+        "persona_guidance": catalog.persona_guidance,
+        "default_domain": catalog.default_domain,
+        "source": catalog.source,
+        "matcher": catalog.matcher.matcher.to_data(),
+    }
+
+
+def _catalog_from_cache(data: Mapping[str, Any]) -> Catalog:
+    domain_keywords = freeze(data["domain_keywords"])
+    persona_keywords = freeze(data["persona_keywords"])
+    matcher = KeywordMatcher.from_data(data["matcher"])
+    return Catalog(
+        domain_keywords,
+        data["persona_pairs"],
+        persona_keywords,
+        data["persona_icons"],
+        data["persona_guidance"],
+        data["source"],
+        matcher=CatalogMatcher(domain_keywords, persona_keywords, matcher),
+        default_domain=data["default_domain"],
+    )
+
+
+def _read_trusted(path: str) -> Optional[bytes]:
+    """Return the contents of ``path`` if it belongs to this user and only it can write it.
+
+    The file is checked through the open descriptor, so it cannot be swapped between
+    the check and the read.
+    """
+    try:
+        handle = open(path, "rb")
+    except OSError:
+        return None
+    with handle:
+        info = os.fstat(handle.fileno())
+        getuid = getattr(os, "geteuid", None)
+        if getuid is not None and info.st_uid != getuid():
+            return None
+        if not stat.S_ISREG(info.st_mode) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return None
+        return handle.read()
+
+
+def load_catalog(path: str, cache_dir: Optional[str] = None) -> Catalog:
+    """Load a catalog file, reusing the index compiled for identical content.
+
+    ``cache_dir`` defaults to ``default_cache_dir()``; an empty string disables the
+    cache. A missing, unreadable, stale, or untrusted cache entry is rebuilt from the
+    file and replaced.
+    """
+    with open(path, "rb") as handle:
+        content = handle.read()
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    cached = cache_path(content, cache_dir) if cache_dir else ""
+    if cached:
+        entry = _read_trusted(cached)
+        if entry is not None:
+            try:
+                return _catalog_from_cache(json.loads(entry.decode("utf-8")))
+            except Exception:  # noqa: BLE001 - any unusable cache entry is rebuilt
+                pass
+
+    catalog = parse_catalog(read_catalog_file(path, content), source=path)
+    if cached:
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as output:
+                json.dump(_cache_data(catalog), output, ensure_ascii=False)
+            os.replace(temporary, cached)
+        except OSError:
+            pass  # A read-only cache only costs the next startup a recompile
+    return catalog
+
+
+def catalog_data(
+    domain_keywords: Mapping[str, Sequence[str]],
+    persona_pairs: Mapping[str, Sequence[Tuple[str, str]]],
+    persona_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+    persona_icons: Mapping[str, str],
+    persona_guidance: Mapping[str, str],
+    default_domain: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return catalog contents in the file layout read by ``parse_catalog``."""
+    domains: Dict[str, Any] = {}
+    names: Dict[str, str] = {}
+    for domain, keywords in domain_keywords.items():
+        pairs = []
+        for pair in persona_pairs.get(domain, ()):
+            pair_key = ",".join(pair)
+            pairs.append(
+                {
+                    "personas": list(pair),
+                    "keywords": list(persona_keywords.get(domain, {}).get(pair_key, [])),
+                }
+            )
+            for persona in pair:
+                names.setdefault(persona.lower(), persona)
+        domains[domain] = {"keywords": list(keywords), "pairs": pairs}
+    personas: Dict[str, Dict[str, str]] = {}
+    for lowered in list(persona_icons) + list(persona_guidance):
+        entry = personas.setdefault(names.get(lowered, lowered), {})
+        if lowered in persona_icons:
+            entry["icon"] = persona_icons[lowered]
+        if lowered in persona_guidance:
+            entry["guidance"] = persona_guidance[lowered]
+    data: Dict[str, Any] = {"domains": domains, "personas": personas}
+    if default_domain is not None:
+        data["default_domain"] = default_domain
+    return data
+
+
+def _toml_string(value: str) -> str:
+    # JSON string escapes are valid TOML basic string escapes
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _toml_key(key: str) -> str:
+    bare = key and all(char.isalnum() or char in "_-" for char in key) and key.isascii()
+    return key if bare else _toml_string(key)
+
+
+def _toml_list(values: Sequence[str]) -> str:
+    return "[" + ", ".join(_toml_string(value) for value in values) + "]"
+
+
+def format_toml(data: Mapping[str, Any]) -> str:
+    """Render catalog data from ``catalog_data`` as a TOML document."""
+    lines: List[str] = []
+    if "default_domain" in data:
+        # Top-level keys must come before the first table
+        lines.append(f"default_domain = {_toml_string(data['default_domain'])}")
+        lines.append("")
+    for domain, entry in data["domains"].items():
+        lines.append(f"[domains.{_toml_key(domain)}]")
+        lines.append(f"keywords = {_toml_list(entry['keywords'])}")
+        lines.append("")
+        for pair in entry["pairs"]:
+            lines.append(f"[[domains.{_toml_key(domain)}.pairs]]")
+            lines.append(f"personas = {_toml_list(pair['personas'])}")
+            lines.append(f"keywords = {_toml_list(pair['keywords'])}")
+            lines.append("")
+    for persona, entry in data.get("personas", {}).items():
+        lines.append(f"[personas.{_toml_key(persona)}]")
+        for field, value in entry.items():
+            lines.append(f"{field} = {_toml_string(value)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_catalog_file(path: str, data: Mapping[str, Any]) -> None:
+    """Write catalog data to a ``.toml`` or ``.json`` file."""
+    if path.endswith(".toml"):
+        text = format_toml(data)
+    elif path.endswith(".json"):
+        text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"Catalog files must end in .toml or .json, got {path}")
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
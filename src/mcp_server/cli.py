@@ -1,20 +1,346 @@
 """Command-line interface for the Counter-Pose MCP Server."""
 
+import argparse
+import json
+import os
+import subprocess
 import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
-import fastmcp
+from .config import ServerConfig
+
+# The phases of server startup and a first tool call, timed in a fresh interpreter
+PROFILE_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import {package}.main as server
+imported = time.perf_counter()
+tool = server.get_counter_pose()
+created = time.perf_counter()
+server.get_server()
+registered = time.perf_counter()
+tool.warm_up()
+warmed = time.perf_counter()
+tool.submit_reasoning("startup-profile", "JWT security for the backend API")
+called = time.perf_counter()
+print(json.dumps({{
+    "import server": imported - start,
+    "create tool": created - imported,
+    "build MCP server": registered - created,
+    "compile catalog": warmed - registered,
+    "first submit_reasoning": called - warmed,
+}}))
+"""
+PROFILE_TOP = 15
+
+
+def fastmcp_version() -> str:
+    """Return the installed FastMCP version without importing it."""
+    try:
+        from importlib.metadata import version as package_version
+
+        return package_version("fastmcp")
+    except Exception:  # noqa: BLE001 - metadata is missing in some vendored installs
+        import fastmcp
+
+        return fastmcp.__version__
 
 
 def version() -> None:
     """Print version information and exit."""
     print("Counter-Pose MCP Server v0.1.0")
     print("An implementation of the RPT (Reasoning-through-Perspective-Transition) technique")
-    print(f"FastMCP v{fastmcp.__version__}")
+    print(f"FastMCP v{fastmcp_version()}")
+    sys.exit(0)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parse ``-X importtime`` output into ``(module, depth, self_us, cumulative_us)``."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        modules.append((stripped, depth, int(fields[0]), int(fields[1])))
+    return modules
+
+
+def startup_profile() -> None:
+    """Print where server startup time goes, measured in a fresh interpreter, and exit."""
+    env = dict(os.environ)
+    # Profile without touching the real usage log or session database
+    env["COUNTER_POSE_USAGE_LOG"] = os.devnull
+    env["COUNTER_POSE_SESSION_BACKEND"] = "memory"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT.format(package=__package__)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode)
+    phases: Dict[str, float] = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    print("Startup phases:")
+    for phase, seconds in phases.items():
+        print(f"  {phase:<28} {seconds * 1000:>9.1f} ms")
+    print(f"  {'total':<28} {sum(phases.values()) * 1000:>9.1f} ms")
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, _, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    print(f"\nImport time by top-level package (top {PROFILE_TOP}):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:PROFILE_TOP]:
+        print(f"  {package:<28} {self_us / 1000:>9.1f} ms")
+
+    print(f"\nSlowest modules by self time (top {PROFILE_TOP}):")
+    slowest = sorted(modules, key=lambda module: -module[2])[:PROFILE_TOP]
+    for name, _, self_us, cumulative_us in slowest:
+        print(f"  {name:<48} {self_us / 1000:>9.1f} ms  (cumulative {cumulative_us / 1000:.1f} ms)")
+    sys.exit(0)
+
+
+def usage_report(log_file: str, as_json: bool = False, jobs: Optional[int] = None) -> None:
+    """Print per-domain, per-persona, and per-step usage counts and exit."""
+    from .usage_report import build_report, format_report
+
+    report = build_report(log_file, jobs=jobs)
+    if as_json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(format_report(report))
+    sys.exit(0)
+
+
+def trace_export(trace_file: str, output: str) -> None:
+    """Convert the trace file and its rotated segments to a Chrome trace and exit."""
+    from .tracing import chrome_trace, read_spans
+
+    trace = chrome_trace(read_spans(trace_file))
+    with open(output, "w") as handle:
+        json.dump(trace, handle)
+    print(f"Wrote {len(trace['traceEvents'])} spans to {output}")
     sys.exit(0)
 
 
-def main() -> None:
+def score(input_file: str, output: Optional[str] = None) -> None:
+    """Score every line of ``input_file`` as one text, write JSON lines, and exit."""
+    from .counter_pose_tool import CounterPoseTool
+
+    if input_file == "-":
+        texts = sys.stdin.read().splitlines()
+    else:
+        with open(input_file, encoding="utf-8") as handle:
+            texts = handle.read().splitlines()
+    tool = CounterPoseTool()
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        for domain, ranked_pairs in tool.analyze_many(texts):
+            pairs = [{"personas": list(pair), "score": score} for pair, score, _ in ranked_pairs]
+            out.write(json.dumps({"domain": domain, "pairs": pairs}) + "\n")
+    finally:
+        if output:
+            out.close()
+    if output:
+        print(f"Scored {len(texts)} texts to {output}")
+    sys.exit(0)
+
+
+def catalog_export(output: str) -> None:
+    """Write the catalog in use as a TOML or JSON catalog file, and exit."""
+    from .catalog import catalog_data, write_catalog_file
+    from .counter_pose_tool import CounterPoseTool
+
+    tool = CounterPoseTool()
+    data = catalog_data(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        tool.persona_icons,
+        tool.persona_guidance,
+        tool.default_domain,
+    )
+    write_catalog_file(output, data)
+    print(f"Wrote {len(data['domains'])} domains and {len(data['personas'])} personas to {output}")
+    sys.exit(0)
+
+
+def catalog_compile(catalog_file: str, cache_dir: Optional[str] = None) -> None:
+    """Validate a catalog file, cache its compiled index, and exit."""
+    from .catalog import cache_path, default_cache_dir, load_catalog
+
+    cache_dir = cache_dir or ServerConfig.from_env().catalog_cache_dir or default_cache_dir()
+    try:
+        started = time.perf_counter()
+        catalog = load_catalog(catalog_file, cache_dir)
+        catalog.matcher.matcher.compile()
+        elapsed = time.perf_counter() - started
+    except (OSError, ValueError) as error:
+        print(f"Invalid catalog {catalog_file}: {error}", file=sys.stderr)
+        sys.exit(1)
+    with open(catalog_file, "rb") as handle:
+        cached = cache_path(handle.read(), cache_dir)
+    pairs = sum(len(pairs) for pairs in catalog.persona_pairs.values())
+    print(
+        f"{catalog_file}: {len(catalog.domain_keywords)} domains, {pairs} persona pairs, "
+        f"{len(catalog.matcher.matcher.keywords)} keywords, loaded in {elapsed * 1000:.1f} ms"
+    )
+    print(f"Index cached at {cached}")
+    sys.exit(0)
+
+
+# serve options and the environment variables they set before the server is imported
+SERVE_OPTIONS = (
+    ("transport", "COUNTER_POSE_TRANSPORT"),
+    ("host", "COUNTER_POSE_HTTP_HOST"),
+    ("port", "COUNTER_POSE_HTTP_PORT"),
+    ("path", "COUNTER_POSE_HTTP_PATH"),
+    ("keep_alive", "COUNTER_POSE_HTTP_KEEP_ALIVE"),
+    ("max_concurrent_requests", "COUNTER_POSE_HTTP_MAX_CONCURRENT_REQUESTS"),
+    ("max_body_bytes", "COUNTER_POSE_HTTP_MAX_BODY_BYTES"),
+    ("workers", "COUNTER_POSE_PROCESS_WORKERS"),
+)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Run the server with command-line settings taking precedence over the environment."""
+    for option, variable in SERVE_OPTIONS:
+        value = getattr(args, option)
+        if value is not None:
+            os.environ[variable] = str(value)
+    # The server reads its configuration when it is imported
+    from .main import main as run_server
+
+    run_server()
+    sys.exit(0)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the ``counter-pose`` command."""
+    parser = argparse.ArgumentParser(prog="counter-pose", description=__doc__)
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Report import, catalog, and first-call times of server startup",
+    )
+    subcommands = parser.add_subparsers(dest="command")
+    subcommands.add_parser("version", help="Print version information")
+
+    report = subcommands.add_parser(
+        "usage-report", help="Summarize the usage log across all rotated segments"
+    )
+    report.add_argument(
+        "--log-file",
+        default=ServerConfig.from_env().usage_log_path,
+        help="Active usage log file; rotated segments next to it are included",
+    )
+    report.add_argument("--json", action="store_true", help="Print the report as JSON")
+    report.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes reading segments in parallel (default: CPU count)",
+    )
+
+    trace = subcommands.add_parser(
+        "trace-export",
+        help="Convert the JSONL trace file to Chrome trace-event JSON (chrome://tracing)",
+    )
+    trace.add_argument(
+        "--trace-file",
+        default=ServerConfig.from_env().trace_file,
+        help="Active trace file; rotated segments next to it are included",
+    )
+    trace.add_argument("--output", default="counter_pose_trace.json", help="Output JSON path")
+
+    scorer = subcommands.add_parser(
+        "score",
+        help="Detect the domain and rank persona pairs of many texts at once (needs NumPy)",
+    )
+    scorer.add_argument("input", help="File with one text per line, or - for stdin")
+    scorer.add_argument("--output", help="JSON lines output file (default: stdout)")
+
+    export = subcommands.add_parser(
+        "catalog-export", help="Write the persona catalog in use to a .toml or .json file"
+    )
+    export.add_argument("output", help="Catalog file to write")
+
+    compiler = subcommands.add_parser(
+        "catalog-compile",
+        help="Validate a catalog file and cache its compiled index for fast startup",
+    )
+    compiler.add_argument("catalog_file", help="Catalog .toml or .json file")
+    compiler.add_argument(
+        "--cache-dir",
+        help="Directory for compiled indexes (default: COUNTER_POSE_CATALOG_CACHE_DIR "
+        "or the per-user cache)",
+    )
+
+    config = ServerConfig.from_env()
+    server = subcommands.add_parser(
+        "serve", help="Run the MCP server over stdio, or over HTTP for many clients at once"
+    )
+    server.add_argument(
+        "--transport",
+        choices=("stdio", "http", "sse"),
+        help=f"stdio, Streamable HTTP, or legacy SSE (default: {config.transport})",
+    )
+    server.add_argument("--host", help=f"Address to listen on (default: {config.http_host})")
+    server.add_argument("--port", type=int, help=f"Port to listen on (default: {config.http_port})")
+    server.add_argument(
+        "--path", help=f"Streamable HTTP endpoint path (default: {config.http_path})"
+    )
+    server.add_argument(
+        "--keep-alive",
+        type=float,
+        help=f"Seconds an idle connection stays open (default: {config.http_keep_alive:g})",
+    )
+    server.add_argument(
+        "--max-concurrent-requests",
+        type=int,
+        help="Requests handled at once before new ones get 503; 0 for no limit "
+        f"(default: {config.http_max_concurrent_requests})",
+    )
+    server.add_argument(
+        "--max-body-bytes",
+        type=int,
+        help="Largest request body accepted; 0 for no limit "
+        f"(default: {config.http_max_body_bytes})",
+    )
+    server.add_argument(
+        "--workers",
+        type=int,
+        help=f"Worker processes that run tool calls (default: {config.process_workers})",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Run the CLI application."""
+    args = build_parser().parse_args(argv)
+    if args.startup_profile:
+        startup_profile()
+    if args.command == "usage-report":
+        usage_report(args.log_file, as_json=args.json, jobs=args.jobs)
+    if args.command == "trace-export":
+        trace_export(args.trace_file, args.output)
+    if args.command == "score":
+        score(args.input, args.output)
+    if args.command == "catalog-export":
+        catalog_export(args.output)
+    if args.command == "catalog-compile":
+        catalog_compile(args.catalog_file, args.cache_dir)
+    if args.command == "serve":
+        serve(args)
     version()
 
 
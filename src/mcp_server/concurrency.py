@@ -0,0 +1,165 @@
+"""Offloading blocking tool work from the event loop, and measuring loop lag."""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .histogram import Histogram
+
+T = TypeVar("T")
+
+
+class Offloader:
+    """Runs tool work inline or on a bounded thread pool.
+
+    Calls whose input is at least ``threshold`` characters, and every call when
+    ``blocking_io`` is set (for example with a disk-backed session store), run on a
+    pool of ``workers`` threads so the event loop keeps serving other requests. At
+    most ``max_pending`` calls wait for or occupy the pool; further callers wait
+    on the event loop without holding a thread. Small calls run inline because
+    handing them to a thread costs more than the work itself.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_pending: int = 64,
+        threshold: int = 64 * 1024,
+        blocking_io: bool = False,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.threshold = threshold
+        self.blocking_io = blocking_io
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.waiting = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def should_offload(self, size: int) -> bool:
+        """Whether a call with ``size`` characters of input should leave the loop."""
+        return self.blocking_io or size >= self.threshold
+
+    async def run(
+        self, function: Callable[..., T], *args: object, size: int = 0, offload: bool = False
+    ) -> T:
+        """Call ``function(*args)``, on the pool if the input is large or does I/O.
+
+        ``offload`` sends the call to the pool whatever its size, for example when it
+        would have to wait for a lock. The caller's context variables, such as the
+        active tracing span, are visible to the function wherever it runs.
+        """
+        if not offload and not self.should_offload(size):
+            return self.run_inline(function, *args)
+        loop = asyncio.get_running_loop()
+        slots = self._semaphore(loop)
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            self.offloaded_calls += 1
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, function, *args)
+            return await loop.run_in_executor(self.executor, call)
+        finally:
+            slots.release()
+
+    def run_inline(self, function: Callable[..., T], *args: object) -> T:
+        """Call ``function(*args)`` on the calling thread, counting it as an inline call."""
+        self.inline_calls += 1
+        return function(*args)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="counter-pose-worker"
+                    )
+        return self._executor
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; tests and benchmarks may run several
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        return self._slots
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "threshold": self.threshold,
+            "blocking_io": self.blocking_io,
+            "inline_calls": self.inline_calls,
+            "offloaded_calls": self.offloaded_calls,
+            "waiting": self.waiting,
+        }
+
+    def close(self) -> None:
+        """Wait for running calls and stop the pool threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps ``interval`` seconds.
+
+    Lag is the time the loop spent running something else, such as a handler doing
+    CPU-bound work inline, and bounds the extra latency of every request that was
+    waiting. Samples are kept in microseconds in an HDR-style histogram.
+    """
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.lag_us = Histogram()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def ensure_started(self) -> None:
+        """Start sampling on the running loop, if not already sampling there."""
+        if not self.enabled:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - expected
+            with self._lock:
+                self.lag_us.record(int(lag * 1e6))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lag percentiles in milliseconds."""
+        with self._lock:
+            lag = self.lag_us
+            return {
+                "interval_ms": round(self.interval * 1000, 3),
+                "samples": lag.count,
+                "p50_ms": round(lag.percentile(50) / 1000, 3),
+                "p99_ms": round(lag.percentile(99) / 1000, 3),
+                "max_ms": round(lag.max / 1000, 3),
+            }
@@ -0,0 +1,217 @@
+"""Runtime configuration for the Counter-Pose MCP Server.
+
+Every setting can be overridden with a ``COUNTER_POSE_*`` environment variable so the
+server can be tuned per deployment without code changes.
+"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to ``default``."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to ``default``."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/0, true/false, yes/no, on/off) from the environment."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_str(name: str, default: str) -> str:
+    """Read a string setting from the environment, falling back to ``default``."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip()
+
+
+class ServerConfig:
+    """Tunable limits for the Counter-Pose server."""
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        max_session_bytes: int = 256 * 1024 * 1024,
+        session_idle_ttl: float = 3600.0,
+        session_backend: str = "memory",
+        session_db_path: str = "/tmp/counter_pose_sessions.db",
+        usage_log_path: str = "/tmp/counter_pose_usage.log",
+        usage_log_batch_size: int = 256,
+        usage_log_flush_interval: float = 1.0,
+        usage_log_fsync: str = "never",
+        usage_log_queue_size: int = 10_000,
+        usage_log_overflow: str = "drop",
+        usage_log_max_bytes: int = 64 * 1024 * 1024,
+        usage_log_max_age: float = 0.0,
+        usage_log_backups: int = 50,
+        usage_log_compress: bool = True,
+        max_batch_items: int = 10_000,
+        analysis_cache_size: int = 1024,
+        detection_engine: str = "keyword",
+        catalog_file: str = "",
+        catalog_cache_dir: str = "",
+        admin_tools: bool = False,
+        blob_dir: str = "",
+        blob_threshold: int = 16 * 1024,
+        max_resident_steps: int = 32,
+        metrics_enabled: bool = True,
+        trace_sample_rate: float = 0.0,
+        trace_file: str = "/tmp/counter_pose_trace.jsonl",
+        trace_max_bytes: int = 64 * 1024 * 1024,
+        trace_backups: int = 10,
+        worker_threads: int = 4,
+        max_offloaded_calls: int = 64,
+        offload_threshold: int = 64 * 1024,
+        loop_lag_interval: float = 0.1,
+        session_shards: int = 16,
+        process_workers: int = 0,
+        process_routing: str = "session",
+        transport: str = "stdio",
+        http_host: str = "127.0.0.1",
+        http_port: int = 8000,
+        http_path: str = "/mcp",
+        http_keep_alive: float = 5.0,
+        http_max_concurrent_requests: int = 256,
+        http_max_body_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+        self.session_idle_ttl = session_idle_ttl
+        self.session_backend = session_backend
+        self.session_db_path = session_db_path
+        self.usage_log_path = usage_log_path
+        self.usage_log_batch_size = usage_log_batch_size
+        self.usage_log_flush_interval = usage_log_flush_interval
+        self.usage_log_fsync = usage_log_fsync
+        self.usage_log_queue_size = usage_log_queue_size
+        self.usage_log_overflow = usage_log_overflow
+        self.usage_log_max_bytes = usage_log_max_bytes
+        self.usage_log_max_age = usage_log_max_age
+        self.usage_log_backups = usage_log_backups
+        self.usage_log_compress = usage_log_compress
+        self.max_batch_items = max_batch_items
+        self.analysis_cache_size = analysis_cache_size
+        self.detection_engine = detection_engine
+        self.catalog_file = catalog_file
+        self.catalog_cache_dir = catalog_cache_dir
+        self.admin_tools = admin_tools
+        self.blob_dir = blob_dir
+        self.blob_threshold = blob_threshold
+        self.max_resident_steps = max_resident_steps
+        self.metrics_enabled = metrics_enabled
+        self.trace_sample_rate = trace_sample_rate
+        self.trace_file = trace_file
+        self.trace_max_bytes = trace_max_bytes
+        self.trace_backups = trace_backups
+        self.worker_threads = worker_threads
+        self.max_offloaded_calls = max_offloaded_calls
+        self.offload_threshold = offload_threshold
+        self.loop_lag_interval = loop_lag_interval
+        self.session_shards = session_shards
+        self.process_workers = process_workers
+        self.process_routing = process_routing
+        self.transport = transport
+        self.http_host = http_host
+        self.http_port = http_port
+        self.http_path = http_path
+        self.http_keep_alive = http_keep_alive
+        self.http_max_concurrent_requests = http_max_concurrent_requests
+        self.http_max_body_bytes = http_max_body_bytes
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """Build a configuration from ``COUNTER_POSE_*`` environment variables."""
+        defaults = cls()
+        return cls(
+            max_sessions=env_int("COUNTER_POSE_MAX_SESSIONS", defaults.max_sessions),
+            max_session_bytes=env_int("COUNTER_POSE_MAX_SESSION_BYTES", defaults.max_session_bytes),
+            session_idle_ttl=env_float("COUNTER_POSE_SESSION_IDLE_TTL", defaults.session_idle_ttl),
+            session_backend=env_str("COUNTER_POSE_SESSION_BACKEND", defaults.session_backend),
+            session_db_path=env_str("COUNTER_POSE_SESSION_DB", defaults.session_db_path),
+            usage_log_path=env_str("COUNTER_POSE_USAGE_LOG", defaults.usage_log_path),
+            usage_log_batch_size=env_int(
+                "COUNTER_POSE_USAGE_LOG_BATCH_SIZE", defaults.usage_log_batch_size
+            ),
+            usage_log_flush_interval=env_float(
+                "COUNTER_POSE_USAGE_LOG_FLUSH_INTERVAL", defaults.usage_log_flush_interval
+            ),
+            usage_log_fsync=env_str("COUNTER_POSE_USAGE_LOG_FSYNC", defaults.usage_log_fsync),
+            usage_log_queue_size=env_int(
+                "COUNTER_POSE_USAGE_LOG_QUEUE_SIZE", defaults.usage_log_queue_size
+            ),
+            usage_log_overflow=env_str(
+                "COUNTER_POSE_USAGE_LOG_OVERFLOW", defaults.usage_log_overflow
+            ),
+            usage_log_max_bytes=env_int(
+                "COUNTER_POSE_USAGE_LOG_MAX_BYTES", defaults.usage_log_max_bytes
+            ),
+            usage_log_max_age=env_float(
+                "COUNTER_POSE_USAGE_LOG_MAX_AGE", defaults.usage_log_max_age
+            ),
+            usage_log_backups=env_int("COUNTER_POSE_USAGE_LOG_BACKUPS", defaults.usage_log_backups),
+            usage_log_compress=env_bool(
+                "COUNTER_POSE_USAGE_LOG_COMPRESS", defaults.usage_log_compress
+            ),
+            max_batch_items=env_int("COUNTER_POSE_MAX_BATCH_ITEMS", defaults.max_batch_items),
+            analysis_cache_size=env_int(
+                "COUNTER_POSE_ANALYSIS_CACHE_SIZE", defaults.analysis_cache_size
+            ),
+            detection_engine=env_str("COUNTER_POSE_DETECTION_ENGINE", defaults.detection_engine),
+            catalog_file=env_str("COUNTER_POSE_CATALOG_FILE", defaults.catalog_file),
+            catalog_cache_dir=env_str("COUNTER_POSE_CATALOG_CACHE_DIR", defaults.catalog_cache_dir),
+            admin_tools=env_bool("COUNTER_POSE_ADMIN_TOOLS", defaults.admin_tools),
+            blob_dir=env_str("COUNTER_POSE_BLOB_DIR", defaults.blob_dir),
+            blob_threshold=env_int("COUNTER_POSE_BLOB_THRESHOLD", defaults.blob_threshold),
+            max_resident_steps=env_int(
+                "COUNTER_POSE_MAX_RESIDENT_STEPS", defaults.max_resident_steps
+            ),
+            metrics_enabled=env_bool("COUNTER_POSE_METRICS", defaults.metrics_enabled),
+            trace_sample_rate=env_float(
+                "COUNTER_POSE_TRACE_SAMPLE_RATE", defaults.trace_sample_rate
+            ),
+            trace_file=env_str("COUNTER_POSE_TRACE_FILE", defaults.trace_file),
+            trace_max_bytes=env_int("COUNTER_POSE_TRACE_MAX_BYTES", defaults.trace_max_bytes),
+            trace_backups=env_int("COUNTER_POSE_TRACE_BACKUPS", defaults.trace_backups),
+            worker_threads=env_int("COUNTER_POSE_WORKER_THREADS", defaults.worker_threads),
+            max_offloaded_calls=env_int(
+                "COUNTER_POSE_MAX_OFFLOADED_CALLS", defaults.max_offloaded_calls
+            ),
+            offload_threshold=env_int("COUNTER_POSE_OFFLOAD_THRESHOLD", defaults.offload_threshold),
+            loop_lag_interval=env_float(
+                "COUNTER_POSE_LOOP_LAG_INTERVAL", defaults.loop_lag_interval
+            ),
+            session_shards=env_int("COUNTER_POSE_SESSION_SHARDS", defaults.session_shards),
+            process_workers=env_int("COUNTER_POSE_PROCESS_WORKERS", defaults.process_workers),
+            process_routing=env_str("COUNTER_POSE_PROCESS_ROUTING", defaults.process_routing),
+            transport=env_str("COUNTER_POSE_TRANSPORT", defaults.transport),
+            http_host=env_str("COUNTER_POSE_HTTP_HOST", defaults.http_host),
+            http_port=env_int("COUNTER_POSE_HTTP_PORT", defaults.http_port),
+            http_path=env_str("COUNTER_POSE_HTTP_PATH", defaults.http_path),
+            http_keep_alive=env_float("COUNTER_POSE_HTTP_KEEP_ALIVE", defaults.http_keep_alive),
+            http_max_concurrent_requests=env_int(
+                "COUNTER_POSE_HTTP_MAX_CONCURRENT_REQUESTS", defaults.http_max_concurrent_requests
+            ),
+            http_max_body_bytes=env_int(
+                "COUNTER_POSE_HTTP_MAX_BODY_BYTES", defaults.http_max_body_bytes
+            ),
+        )
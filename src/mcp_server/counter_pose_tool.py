@@ -1,115 +1,422 @@
 """Counter-Pose Tool for RPT (Reasoning-through-Perspective-Transition) prompted reasoning."""
 
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import functools
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
+from .analysis_cache import Analysis, AnalysisCache, normalize_text
+from .blob_store import BlobStore
+from .catalog import DEFAULT_PERSONA_ICON, Catalog, load_catalog
+from .config import ServerConfig
+from .keyword_matcher import CatalogMatch, CatalogMatcher, IncrementalMatch
+from .session_model import (
+    DOMAINS,
+    PERSONAS,
+    Code,
+    Step,
+    format_timestamp,
+    now_us,
+    parse_timestamp,
+)
+from .session_store import FOUND, NOT_FOUND, InMemorySessionStore, SessionStore, session_error
+from .string_pool import PooledText, StringPool
+from .tracing import Tracer
+from .usage_log import UsageLogger
 
-class UsageLogger:
-    """Logger for counter-pose tool usage and statistics."""
+if TYPE_CHECKING:
+    from .ngram_classifier import NgramClassifier
 
-    def __init__(self, log_file: str = "/tmp/counter_pose_usage.log") -> None:
-        self.log_file = log_file
 
-    def log_usage(
-        self, session_id: str, domain: str, persona: str, step: str, reasoning_length: int
-    ) -> None:
-        """Log usage of the counter-pose reasoning validator."""
-        timestamp = datetime.now().isoformat()
-        try:
-            with open(self.log_file, "a") as f:
-                f.write(f"{timestamp},{session_id},{domain},{persona},{step},{reasoning_length}\n")
-        except OSError:
-            pass  # Optionally, print a warning or log to console
+# Critique focus for each known persona, keyed by lowercased persona name
+PERSONA_GUIDANCE: Mapping[str, str] = MappingProxyType(
+    {
+        # Software Development personas
+        "developer": "Focus on implementation feasibility, component design, and technical debt",
+        "security expert": (
+            "Focus on security vulnerabilities, data privacy, and regulatory compliance"
+        ),
+        "frontend engineer": (
+            "Focus on frontend architecture, component design, and user interface implementation"
+        ),
+        "ux designer": "Focus on user experience, accessibility, and usability",
+        "backend engineer": (
+            "Focus on server architecture, database design, API structure, and scalability"
+        ),
+        "devops engineer": (
+            "Focus on deployment, infrastructure, automation, and operational reliability"
+        ),
+        "performance engineer": (
+            "Focus on speed optimization, resource efficiency, and performance bottlenecks"
+        ),
+        "maintainability advocate": (
+            "Focus on code clarity, documentation, refactoring, and long-term sustainability"
+        ),
+        # Digital Marketing personas
+        "creative director": (
+            "Focus on brand consistency, emotional impact, and creative storytelling"
+        ),
+        "analytics specialist": (
+            "Focus on measurable outcomes, data validation, and statistical rigor"
+        ),
+        "brand strategist": "Focus on brand positioning, market differentiation, and brand equity",
+        "conversion optimizer": (
+            "Focus on funnel optimization, A/B testing, and conversion rate improvement"
+        ),
+        "social media expert": (
+            "Focus on platform-specific strategies, community engagement, and viral potential"
+        ),
+        "growth hacker": (
+            "Focus on rapid experimentation, user acquisition, and scalable growth tactics"
+        ),
+        "content creator": "Focus on content quality, storytelling, and audience engagement",
+        "performance marketer": (
+            "Focus on paid advertising efficiency, ROAS, and campaign optimization"
+        ),
+        "b2b marketer": (
+            "Focus on enterprise sales cycles, stakeholder management, and business value"
+        ),
+        "b2c marketer": "Focus on consumer psychology, mass appeal, and emotional triggers",
+        "landing page expert": "Focus on conversion optimization, user flow, and page performance",
+        "seo specialist": (
+            "Focus on search visibility, organic traffic, and content discoverability"
+        ),
+        # Visual Design personas
+        "ui minimalist": "Focus on simplicity, clarity, and cognitive load reduction",
+        "feature-rich designer": (
+            "Focus on functionality completeness, discoverability, and feature organization"
+        ),
+        "brand identity expert": (
+            "Focus on visual consistency, brand recognition, and identity system coherence"
+        ),
+        "user-centered designer": (
+            "Focus on user research, usability testing, and human-centered design principles"
+        ),
+        "print design specialist": (
+            "Focus on typography, layout hierarchy, and traditional design principles"
+        ),
+        "digital-first designer": (
+            "Focus on interactive elements, responsive design, and digital-native experiences"
+        ),
+        "artistic creative": (
+            "Focus on aesthetic impact, creative expression, and visual innovation"
+        ),
+        "data-driven designer": (
+            "Focus on user analytics, A/B testing, and evidence-based design decisions"
+        ),
+        "accessibility expert": (
+            "Focus on inclusive design, WCAG compliance, and barrier-free experiences"
+        ),
+        "visual artist": "Focus on aesthetic beauty, artistic composition, and visual storytelling",
+        # Product Strategy personas
+        "customer advocate": "Focus on user needs, pain points, and accessibility",
+        "business strategist": (
+            "Focus on strategic alignment, competitive positioning, and monetization"
+        ),
+        "innovative disruptor": (
+            "Focus on breakthrough innovation, market disruption, and paradigm shifts"
+        ),
+        "market researcher": (
+            "Focus on market validation, competitive analysis, and data-driven insights"
+        ),
+        "mvp champion": "Focus on minimal viable features, rapid iteration, and speed to market",
+        "quality perfectionist": (
+            "Focus on polish, reliability, and comprehensive feature completeness"
+        ),
+        "long-term strategist": (
+            "Focus on sustainable growth, strategic vision, and future planning"
+        ),
+        "quick-to-market tactician": (
+            "Focus on immediate opportunities, tactical execution, and rapid deployment"
+        ),
+        "technical pm": (
+            "Focus on technical feasibility, engineering constraints, and implementation details"
+        ),
+        "business pm": "Focus on market fit, business metrics, and stakeholder alignment",
+    }
+)
+
+# Icon shown in each known persona's critique heading, keyed by lowercased persona name
+PERSONA_ICONS: Mapping[str, str] = MappingProxyType(
+    {
+        "developer": "👨‍💻",
+        "security expert": "🔒",
+        "frontend engineer": "🎨",
+        "ux designer": "🧑‍🎨",
+        "backend engineer": "⚙️",
+        "devops engineer": "🔧",
+        "performance engineer": "⚡",
+        "maintainability advocate": "🧹",
+        "creative director": "🎭",
+        "analytics specialist": "📊",
+        "social media expert": "📱",
+        "growth hacker": "📈",
+        "brand strategist": "🎯",
+        "conversion optimizer": "💰",
+        "content creator": "✍️",
+        "performance marketer": "🎪",
+        "b2b marketer": "🏢",
+        "b2c marketer": "👥",
+        "landing page expert": "🖥️",
+        "seo specialist": "🔍",
+        "ui minimalist": "⚪",
+        "feature-rich designer": "🧩",
+        "brand identity expert": "🏷️",
+        "user-centered designer": "👤",
+        "print design specialist": "📄",
+        "digital-first designer": "💻",
+        "artistic creative": "🎨",
+        "data-driven designer": "📊",
+        "accessibility expert": "♿",
+        "visual artist": "🖼️",
+        "customer advocate": "👥",
+        "business strategist": "📈",
+        "innovative disruptor": "💡",
+        "market researcher": "📊",
+        "mvp champion": "🚀",
+        "quality perfectionist": "✨",
+        "long-term strategist": "🔭",
+        "quick-to-market tactician": "⚡",
+        "technical pm": "⚙️",
+        "business pm": "💼",
+    }
+)
+
+# Upper bound on distinct personas and persona pairs whose rendered guidance is cached
+GUIDANCE_CACHE_SIZE = 1024
+
+# Domain detection engines: keyword presence, or character n-gram similarity (NumPy)
+DETECTION_ENGINES = ("keyword", "ngram")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The built-in catalog, built on first use and shared by every tool in the process
+_builtin_catalog: Optional[Catalog] = None
+_builtin_catalog_lock = threading.Lock()
 
 
 class CounterPoseSession:
-    """Represents an ongoing Counter-Pose RPT reasoning session."""
+    """Represents an ongoing Counter-Pose RPT reasoning session.
+
+    Sessions are kept compact because hundreds of thousands may be live at once: the
+    domain and personas are stored as codebook codes, timestamps as integer
+    microseconds formatted only when read, and collections are allocated on first use.
+    """
+
+    __slots__ = (
+        "session_id",
+        "_domain",
+        "_personas",
+        "current_persona_index",
+        "_steps",
+        "_started_at",
+        "_domain_keywords",
+        "_available_personas",
+        "confidence",
+        "changes_needed",
+        "_blind_spots",
+        "_contradictions",
+        "reasoning_match",
+        "catalog_version",
+    )
 
     def __init__(self, session_id: str, domain: Optional[str] = None) -> None:
         self.session_id = session_id
         self.domain = domain
-        self.personas = []
+        self._personas: Tuple[Code, ...] = ()
         self.current_persona_index = -1
-        self.steps = []
-        self.started_at = datetime.now().isoformat()
-        self.domain_keywords = {}
-        self.available_personas = {}
+        self._steps: Optional[List[Step]] = None
+        self._started_at = now_us()
+        self._domain_keywords: Optional[Dict] = None
+        self._available_personas: Optional[Dict] = None
         self.confidence = None
         self.changes_needed = None
-        self.blind_spots = []
-        self.contradictions = []
+        self._blind_spots: Optional[List] = None
+        self._contradictions: Optional[List] = None
+        # Keyword hits for reasoning still being uploaded with append_reasoning
+        self.reasoning_match: Optional[IncrementalMatch] = None
+        # Version of the catalog the session was created under; sessions outlive reloads
+        self.catalog_version: Optional[str] = None
+
+    @property
+    def domain(self) -> Optional[str]:
+        return None if self._domain is None else DOMAINS.decode(self._domain)
+
+    @domain.setter
+    def domain(self, domain: Optional[str]) -> None:
+        self._domain = None if domain is None else DOMAINS.encode(domain)
+
+    @property
+    def personas(self) -> List[str]:
+        return [PERSONAS.decode(code) for code in self._personas]
+
+    @personas.setter
+    def personas(self, personas: List[str]) -> None:
+        self._personas = tuple(PERSONAS.encode(persona) for persona in personas)
+
+    @property
+    def started_at(self) -> str:
+        return format_timestamp(self._started_at)
+
+    @started_at.setter
+    def started_at(self, started_at: str) -> None:
+        self._started_at = parse_timestamp(started_at)
+
+    @property
+    def steps(self) -> List[Step]:
+        if self._steps is None:
+            self._steps = []
+        return self._steps
+
+    @steps.setter
+    def steps(self, steps: List[Step]) -> None:
+        self._steps = steps or None
+
+    @property
+    def domain_keywords(self) -> Dict:
+        if self._domain_keywords is None:
+            self._domain_keywords = {}
+        return self._domain_keywords
+
+    @domain_keywords.setter
+    def domain_keywords(self, domain_keywords: Dict) -> None:
+        self._domain_keywords = domain_keywords or None
+
+    @property
+    def available_personas(self) -> Dict:
+        if self._available_personas is None:
+            self._available_personas = {}
+        return self._available_personas
+
+    @available_personas.setter
+    def available_personas(self, available_personas: Dict) -> None:
+        self._available_personas = available_personas or None
+
+    @property
+    def blind_spots(self) -> List:
+        if self._blind_spots is None:
+            self._blind_spots = []
+        return self._blind_spots
+
+    @blind_spots.setter
+    def blind_spots(self, blind_spots: List) -> None:
+        self._blind_spots = blind_spots or None
+
+    @property
+    def contradictions(self) -> List:
+        if self._contradictions is None:
+            self._contradictions = []
+        return self._contradictions
+
+    @contradictions.setter
+    def contradictions(self, contradictions: List) -> None:
+        self._contradictions = contradictions or None
+
+    def iter_steps(self) -> Iterator[Step]:
+        """Iterate over the step history without allocating an empty list."""
+        return iter(self._steps or ())
 
     def to_dict(self) -> Dict:
         """Convert session to dictionary for JSON serialization."""
+        steps = [dict(step) for step in self.iter_steps()]
         return {
             "session_id": self.session_id,
             "domain": self.domain,
             "personas": self.personas,
             "current_persona_index": self.current_persona_index,
-            "steps": self.steps,
+            "steps": steps,
             "started_at": self.started_at,
-            "completed_steps": len(self.steps),
-            "blind_spots": self.blind_spots,
-            "contradictions": self.contradictions,
+            "completed_steps": len(steps),
+            "blind_spots": list(self._blind_spots or ()),
+            "contradictions": list(self._contradictions or ()),
             "confidence": self.confidence,
             "changes_needed": self.changes_needed,
+            "catalog_version": self.catalog_version,
         }
 
 
+def _serialized(method: F) -> F:
+    """Run a ``CounterPoseTool`` method while holding its session's lock.
+
+    Only for methods whose work between the store read and write is small; methods
+    that analyze text do so before taking the lock.
+    """
+
+    @functools.wraps(method)
+    def wrapper(
+        self: "CounterPoseTool", session_id: str, *args: object, **kwargs: object
+    ) -> object:
+        with self.sessions.session_lock(session_id):
+            return method(self, session_id, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
 class CounterPoseTool:
     """Implementation of the RPT (Reasoning-through-Perspective-Transition) technique
     for structured reasoning validation."""
 
-    def __init__(self) -> None:
-        self.sessions = {}
-        self.domain_keywords = self._generate_domain_keywords()
-        self.persona_pairs = self._load_persona_pairs()
-        self.persona_keywords = self._generate_persona_keywords()
-        self.logger = UsageLogger()
-        self.persona_icons = {
-            "developer": "👨‍💻",
-            "security expert": "🔒",
-            "frontend engineer": "🎨",
-            "ux designer": "🧑‍🎨",
-            "backend engineer": "⚙️",
-            "devops engineer": "🔧",
-            "performance engineer": "⚡",
-            "maintainability advocate": "🧹",
-            "creative director": "🎭",
-            "analytics specialist": "📊",
-            "social media expert": "📱",
-            "growth hacker": "📈",
-            "brand strategist": "🎯",
-            "conversion optimizer": "💰",
-            "content creator": "✍️",
-            "performance marketer": "🎪",
-            "b2b marketer": "🏢",
-            "b2c marketer": "👥",
-            "landing page expert": "🖥️",
-            "seo specialist": "🔍",
-            "ui minimalist": "⚪",
-            "feature-rich designer": "🧩",
-            "brand identity expert": "🏷️",
-            "user-centered designer": "👤",
-            "print design specialist": "📄",
-            "digital-first designer": "💻",
-            "artistic creative": "🎨",
-            "data-driven designer": "📊",
-            "accessibility expert": "♿",
-            "visual artist": "🖼️",
-            "customer advocate": "👥",
-            "business strategist": "📈",
-            "innovative disruptor": "💡",
-            "market researcher": "📊",
-            "mvp champion": "🚀",
-            "quality perfectionist": "✨",
-            "long-term strategist": "🔭",
-            "quick-to-market tactician": "⚡",
-            "technical pm": "⚙️",
-            "business pm": "💼",
-        }
+    def __init__(
+        self,
+        sessions: Optional[SessionStore] = None,
+        logger: Optional[UsageLogger] = None,
+        analysis_cache_size: Optional[int] = None,
+        blob_store: Optional[BlobStore] = None,
+        tracer: Optional[Tracer] = None,
+        catalog: Optional[Catalog] = None,
+    ) -> None:
+        config = ServerConfig.from_env()
+        self.sessions = sessions if sessions is not None else InMemorySessionStore()
+        if analysis_cache_size is None:
+            analysis_cache_size = config.analysis_cache_size
+        self.analysis_cache = AnalysisCache(analysis_cache_size)
+        self.detection_engine = config.detection_engine
+        # Large critiques, and all but the newest steps of long histories, are kept on
+        # disk when sessions live in process memory
+        self.blob_store = blob_store if blob_store is not None else BlobStore(config.blob_dir)
+        self.blob_threshold = config.blob_threshold
+        self.max_resident_steps = config.max_resident_steps
+        # Identical critiques submitted to many sessions are kept once while any of
+        # those sessions is still stored
+        self.string_pool = StringPool()
+        self.sessions.add_removal_listener(self.string_pool.release)
+        # Rendered guidance depends only on the catalog and persona names, so it is built
+        # once per persona and once per pair; responses differ only in session_id and domain
+        self._critique_format_cache = lru_cache(maxsize=GUIDANCE_CACHE_SIZE)(
+            self._render_critique_format
+        )
+        self._guidance_format_cache = lru_cache(maxsize=GUIDANCE_CACHE_SIZE)(
+            self._render_guidance_format
+        )
+        # The catalog's matcher is compiled on first use so that importing the server stays
+        # fast; main() compiles it in the background while the client connects
+        self.catalog_file = config.catalog_file
+        self.catalog_cache_dir = config.catalog_cache_dir
+        self._reload_lock = threading.Lock()
+        if catalog is None and self.catalog_file:
+            catalog = load_catalog(self.catalog_file, self.catalog_cache_dir or None)
+        if catalog is None:
+            catalog = builtin_catalog()
+        self.use_catalog(catalog)
+        self.logger = logger if logger is not None else UsageLogger()
+        self.tracer = tracer if tracer is not None else Tracer()
 
-    def _load_persona_pairs(self) -> Dict[str, List[Tuple[str, str]]]:
+    @staticmethod
+    def _load_persona_pairs() -> Dict[str, List[Tuple[str, str]]]:
         """Load predefined persona pairs for each domain."""
         return {
             "software_development": [
@@ -142,7 +449,8 @@ class CounterPoseTool:
             ],
         }
 
-    def _generate_persona_keywords(self) -> Dict[str, Dict[str, List[str]]]:
+    @staticmethod
+    def _generate_persona_keywords() -> Dict[str, Dict[str, List[str]]]:
         """Generate keywords for intelligent persona pair selection within domains."""
         return {
             "software_development": {
@@ -318,7 +626,8 @@ class CounterPoseTool:
             },
         }
 
-    def _generate_domain_keywords(self) -> Dict[str, List[str]]:
+    @staticmethod
+    def _generate_domain_keywords() -> Dict[str, List[str]]:
         """Generate keywords for domain detection."""
         return {
             "software_development": [
@@ -449,39 +758,178 @@ class CounterPoseTool:
             ],
         }
 
+    def set_catalog(
+        self,
+        domain_keywords: Dict[str, List[str]],
+        persona_pairs: Dict[str, List[Tuple[str, str]]],
+        persona_keywords: Dict[str, Dict[str, List[str]]],
+        matcher: Optional[CatalogMatcher] = None,
+    ) -> None:
+        """Install a keyword/persona catalog, keeping the current icons and guidance.
+
+        The current default domain is kept if the new catalog defines it; otherwise the
+        first domain becomes the default. A ``matcher`` already compiled for the same
+        keywords is used as is; otherwise one is compiled on first use.
+        """
+        catalog = self.catalog
+        default_domain = catalog.default_domain
+        self.use_catalog(
+            Catalog(
+                domain_keywords,
+                persona_pairs,
+                persona_keywords,
+                catalog.persona_icons,
+                catalog.persona_guidance,
+                matcher=matcher,
+                default_domain=default_domain if default_domain in domain_keywords else None,
+            )
+        )
+
+    def override_catalog(
+        self,
+        domain_keywords: Optional[Mapping[str, Sequence[str]]] = None,
+        persona_pairs: Optional[Mapping[str, Sequence[Tuple[str, str]]]] = None,
+        persona_keywords: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None,
+        persona_icons: Optional[Mapping[str, str]] = None,
+        persona_guidance: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Replace some catalog entries for this tool only.
+
+        The shared catalog is left as is; this tool gets a copy-on-write variant from
+        ``Catalog.with_overrides`` that shares every entry not named here.
+        """
+        self.use_catalog(
+            self.catalog.with_overrides(
+                domain_keywords, persona_pairs, persona_keywords, persona_icons, persona_guidance
+            )
+        )
+
+    def use_catalog(self, catalog: Catalog) -> None:
+        """Swap in a catalog for every call that starts after this returns.
+
+        The swap is a single reference assignment, so it never waits for calls in
+        progress. Each call reads the catalog once and finishes on that version, which
+        stays alive until the last call using it returns. The catalog version changes
+        with the content and is part of every analysis cache key, so analyses cached
+        under the previous catalog are never returned for the new one.
+        """
+        self.catalog = catalog
+        self._critique_format_cache.cache_clear()
+        self._guidance_format_cache.cache_clear()
+
+    def reload_catalog(self) -> Dict:
+        """Load the catalog file again and swap it in, without pausing other calls.
+
+        The new catalog is read (from the compiled index cache when the file is
+        unchanged) and compiled on the calling thread before the swap. A file that
+        fails to load raises and leaves the current catalog in place.
+        """
+        if not self.catalog_file:
+            raise ValueError("No catalog file to reload; set COUNTER_POSE_CATALOG_FILE")
+        with self._reload_lock:
+            started = time.perf_counter()
+            catalog = load_catalog(self.catalog_file, self.catalog_cache_dir or None)
+            catalog.prepare(ngram=self.detection_engine == "ngram")
+            previous = self.catalog
+            self.use_catalog(catalog)
+            seconds = time.perf_counter() - started
+        return {
+            "catalog_file": self.catalog_file,
+            "catalog_version": catalog.version,
+            "previous_version": previous.version,
+            "changed": catalog.version != previous.version,
+            "domains": len(catalog.domain_keywords),
+            "persona_pairs": sum(len(pairs) for pairs in catalog.persona_pairs.values()),
+            "reload_seconds": round(seconds, 6),
+        }
+
+    @property
+    def domain_keywords(self) -> Mapping[str, Tuple[str, ...]]:
+        return self.catalog.domain_keywords
+
+    @property
+    def persona_pairs(self) -> Mapping[str, Tuple[Tuple[str, str], ...]]:
+        return self.catalog.persona_pairs
+
+    @property
+    def persona_keywords(self) -> Mapping[str, Mapping[str, Tuple[str, ...]]]:
+        return self.catalog.persona_keywords
+
+    @property
+    def persona_icons(self) -> Mapping[str, str]:
+        return self.catalog.persona_icons
+
+    @property
+    def persona_guidance(self) -> Mapping[str, str]:
+        return self.catalog.persona_guidance
+
+    @property
+    def default_domain(self) -> str:
+        return self.catalog.default_domain
+
+    @property
+    def catalog_version(self) -> str:
+        return self.catalog.version
+
+    @property
+    def matcher(self) -> CatalogMatcher:
+        """The compiled matcher for the current catalog."""
+        return self.catalog.matcher
+
+    @property
+    def ngram_classifier(self) -> "NgramClassifier":
+        """The n-gram classifier for the current catalog, built on first use."""
+        return self.catalog.ngram_classifier
+
+    def warm_up(self) -> None:
+        """Compile the matcher and render common guidance ahead of the first call."""
+        self.catalog.prepare(ngram=self.detection_engine == "ngram")
+        for persona in ("Developer", "Security Expert"):
+            self._get_critique_format(persona)
+
     def get_persona_icon(self, persona: str) -> str:
         """Get an icon for the persona."""
-        return self.persona_icons.get(persona.lower(), "👤")
+        return self.catalog.persona_icons.get(persona.lower(), DEFAULT_PERSONA_ICON)
+
+    def match_keywords(self, text: str) -> CatalogMatch:
+        """Scan the text once for every domain and persona keyword in the catalog."""
+        return self.matcher.match(text)
 
     def determine_domain(self, text: str) -> str:
         """Determine the domain of the reasoning based on keyword matching."""
-        # Count matches for each domain
-        matches = {domain: 0 for domain in self.domain_keywords}
-        for domain, domain_keywords in self.domain_keywords.items():
-            for keyword in domain_keywords:
-                if keyword.lower() in text.lower():
-                    matches[domain] += 1
+        return self._domain_from_match(self.match_keywords(text))
 
-        # Return domain with most matches, default to product_strategy if no matches
-        best_match = max(matches.items(), key=lambda x: x[1])
-        return best_match[0] if best_match[1] > 0 else "product_strategy"
+    def _domain_from_match(self, match: CatalogMatch, catalog: Optional[Catalog] = None) -> str:
+        """Pick the domain with the most keyword hits from a catalog match."""
+        return self._domain_from_counts(match.domain_counts, catalog)
+
+    def _domain_from_counts(
+        self, domain_counts: Mapping[str, int], catalog: Optional[Catalog] = None
+    ) -> str:
+        """Pick the domain with the most keyword hits from per-domain counts."""
+        # Return domain with most matches, default to the catalog's default domain
+        best_match = max(domain_counts.items(), key=lambda x: x[1])
+        if best_match[1] > 0:
+            return best_match[0]
+        return (catalog or self.catalog).default_domain
 
     def _rank_persona_pairs(
         self, domain: str, text: str
     ) -> List[Tuple[Tuple[str, str], float, str]]:
         """Rank persona pairs within a domain based on keyword matching."""
+        return self._rank_pairs_from_match(domain, self.match_keywords(text))
+
+    def _rank_pairs_from_match(
+        self, domain: str, match: CatalogMatch, catalog: Optional[Catalog] = None
+    ) -> List[Tuple[Tuple[str, str], float, str]]:
+        """Rank persona pairs within a domain from a match against ``catalog``."""
+        order = (catalog or self.catalog).persona_pairs.get(domain, [])
         pairs_with_scores = []
-        domain_pairs = self.persona_keywords.get(domain, {})
+        domain_counts = match.pair_counts.get(domain, {})
 
-        for pair_key, keywords in domain_pairs.items():
+        for pair_key, score in domain_counts.items():
             persona_pair = tuple(pair_key.split(","))
-            score = 0
-            matched_keywords = []
-
-            for keyword in keywords:
-                if keyword.lower() in text.lower():
-                    score += 1
-                    matched_keywords.append(keyword)
+            matched_keywords = match.matched_keywords(domain, pair_key) if score else []
 
             reason = (
                 f"Matched keywords: {', '.join(matched_keywords)}"
@@ -491,42 +939,92 @@ class CounterPoseTool:
             pairs_with_scores.append((persona_pair, score, reason))
 
         # Sort by score (highest first), then by pair order in original list
-        pairs_with_scores.sort(key=lambda x: (-x[1], self.persona_pairs[domain].index(x[0])))
+        pairs_with_scores.sort(key=lambda x: (-x[1], order.index(x[0])))
         return pairs_with_scores
 
-    def submit_reasoning(self, session_id: str, initial_reasoning: str) -> Dict:
+    def analyze_many(self, texts: Sequence[str]) -> List[Analysis]:
+        """Analyze a large batch of texts at once, for offline sweeps over a corpus.
+
+        Results equal ``analyze`` for each text, but are neither cached nor logged.
+        Needs NumPy; the vectorized scorer is compiled on first use.
+        """
+        return self.catalog.batch_scorer.analyze(texts)
+
+    def analyze(
+        self, text: str, engine: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> Analysis:
+        """Return the detected domain and ranked persona pairs, memoized by content hash.
+
+        ``engine`` picks one of ``DETECTION_ENGINES`` for this text, defaulting to the
+        configured one. ``catalog`` defaults to the current one. The returned ranking is
+        shared with the cache and must not be modified.
+        """
+        catalog = catalog or self.catalog
+        engine = engine or self.detection_engine
+        if engine not in DETECTION_ENGINES:
+            raise ValueError(f"Unknown detection engine {engine!r}")
+        normalized = normalize_text(text)
+        version = catalog.version
+        key = self.analysis_cache.key(normalized, version, engine)
+        analysis = self.analysis_cache.get(key)
+        if analysis is None:
+            if engine == "ngram":
+                analysis = catalog.ngram_classifier.analyze(normalized)
+            else:
+                matcher = catalog.matcher
+                match = matcher.match_found(matcher.matcher.find_lowered(normalized))
+                domain = self._domain_from_match(match, catalog)
+                analysis = (domain, self._rank_pairs_from_match(domain, match, catalog))
+            self.analysis_cache.put(key, analysis)
+        return analysis
+
+    def submit_reasoning(
+        self, session_id: str, initial_reasoning: str, engine: Optional[str] = None
+    ) -> Dict:
         """Submit reasoning for analysis and get persona options."""
-        return self.init_session(session_id, initial_reasoning)
+        return self.init_session(session_id, initial_reasoning, engine)
 
-    def init_session(self, session_id: str, initial_reasoning: str) -> Dict:
+    def init_session(
+        self, session_id: str, initial_reasoning: str, engine: Optional[str] = None
+    ) -> Dict:
         """Initialize a new Counter-Pose session with persona options."""
-        # Determine domain from initial reasoning
-        domain = self.determine_domain(initial_reasoning)
+        with self.tracer.span("init_session", reasoning_length=len(initial_reasoning)):
+            # Scan the reasoning once (or reuse the analysis of identical text), then
+            # determine domain and rank persona pairs from the hits. This needs no
+            # session state, so the session lock is only taken to store the result.
+            catalog = self.catalog
+            with self.tracer.span("analyze"):
+                domain, ranked_pairs = self.analyze(initial_reasoning, engine, catalog)
 
-        # Rank persona pairs for this domain and reasoning
-        ranked_pairs = self._rank_persona_pairs(domain, initial_reasoning)
+            # Create new session
+            with self.tracer.span("store_session"):
+                session = CounterPoseSession(session_id, domain)
+                session.catalog_version = catalog.version
+                with self.sessions.session_lock(session_id):
+                    self.sessions.put(session)
 
-        # Create new session
-        session = CounterPoseSession(session_id, domain)
-        self.sessions[session_id] = session
+            # Log usage
+            with self.tracer.span("log_usage"):
+                self.logger.log_usage(
+                    session_id=session_id,
+                    domain=domain,
+                    persona="system",
+                    step="init",
+                    reasoning_length=len(initial_reasoning),
+                )
 
-        # Log usage
-        self.logger.log_usage(
-            session_id=session_id,
-            domain=domain,
-            persona="system",
-            step="init",
-            reasoning_length=len(initial_reasoning),
-        )
+            # Return session info with persona options
+            with self.tracer.span("build_response"):
+                return self._session_options(session_id, domain, ranked_pairs)
 
-        # Return session info with persona options
+    def _session_options(
+        self, session_id: str, domain: str, ranked_pairs: List[Tuple[Tuple[str, str], float, str]]
+    ) -> Dict:
+        """Build the response offering ranked persona pairs for a new session."""
         return {
             "session_id": session_id,
             "domain": domain,
-            "persona_options": [
-                {"personas": list(pair), "score": score, "reason": reason, "recommended": i == 0}
-                for i, (pair, score, reason) in enumerate(ranked_pairs)
-            ],
+            "persona_options": self._persona_options(ranked_pairs),
             "next_step": "get_persona_guidance",
             "instructions": (
                 "Choose a persona pair from the options above, or specify your own "
@@ -534,256 +1032,378 @@ class CounterPoseTool:
             ),
         }
 
-    def get_persona_guidance(self, session_id: str, persona_pair: List[str]) -> Dict:
-        """Get guidance for performing critique with selected personas."""
-        # Get session
-        session = self.sessions.get(session_id)
-        if not session:
-            return {"error": f"Session {session_id} not found"}
+    def append_reasoning(self, session_id: str, chunk: str, early_stop: bool = False) -> Dict:
+        """Add a chunk of reasoning to a session, creating the session on the first chunk.
+
+        Keyword counts are updated from the new chunk only. ``early_stop`` is read on
+        the first chunk and lets later chunks skip domain keywords once no other
+        domain can overtake the leader.
 
-        # Validate persona pair
-        if len(persona_pair) != 2:
-            return {"error": "Persona pair must contain exactly 2 personas"}
+        Without ``early_stop`` the chunk is scanned before the session lock is taken,
+        and only the boundary with the previous chunk is scanned under it. With it,
+        which keywords to look for depends on the upload so far, so the chunk is
+        scanned under the lock, with the narrower matcher once the domain settles.
+        """
+        catalog = self.catalog
+        scan = None if early_stop else catalog.matcher.scan(chunk)
+        with self.sessions.session_lock(session_id):
+            session, status = self.sessions.lookup(session_id, load_steps=False)
+            created = status == NOT_FOUND
+            if created:
+                session = CounterPoseSession(session_id)
+                session.reasoning_match = catalog.matcher.start(early_stop)
+                session.catalog_version = catalog.version
+            elif status != FOUND:
+                return {"error": session_error(session_id, status)}
+            elif session.reasoning_match is None:
+                return {"error": f"Session {session_id} already has its reasoning"}
 
-        # Set personas for session
-        session.personas = persona_pair
-        session.current_persona_index = -1
+            state = session.reasoning_match
+            self._rebase_upload(session, catalog)
+            catalog.matcher.feed(state, chunk, scan)
+            if created:
+                self.sessions.put(session)
+            else:
+                status = self.sessions.update(session)
+                if status != FOUND:
+                    return {"error": session_error(session_id, status)}
 
-        # Log usage
+        leading_domain = self._domain_from_counts(state.domain_counts, catalog)
         self.logger.log_usage(
             session_id=session_id,
-            domain=session.domain,
+            domain=leading_domain,
             persona="system",
-            step="get_persona_guidance",
-            reasoning_length=len(str(persona_pair)),
+            step="append_reasoning",
+            reasoning_length=len(chunk),
         )
 
-        # Return critique instructions for both personas
         return {
             "session_id": session_id,
-            "domain": session.domain,
-            "selected_personas": persona_pair,
-            "next_step": "critique",
-            "format": {
-                "persona1_guidance": self._get_critique_format(persona_pair[0]),
-                "persona2_guidance": self._get_critique_format(persona_pair[1])
-            },
-            "total_steps": 3,  # submit_reasoning + get_persona_guidance + submit_critique
+            "chunks": state.chunks,
+            "characters": state.characters,
+            "leading_domain": leading_domain,
+            "domain_settled": state.settled_domain is not None,
+            "next_step": "append_reasoning or finalize_reasoning",
         }
 
-    def _get_critique_format(self, persona: str) -> str:
-        """Get formatting guidance for a specific persona's critique."""
-        icon = self.get_persona_icon(persona)
+    @_serialized
+    def finalize_reasoning(self, session_id: str) -> Dict:
+        """Finish a chunked upload and return persona options from the accumulated hits."""
+        session, error = self._load_session(session_id)
+        if error:
+            return {"error": error}
+        state = session.reasoning_match
+        if state is None:
+            return {"error": f"Session {session_id} has no reasoning upload in progress"}
 
-        # Provide guidance based on persona type
-        persona_guidance = {
-            # Software Development personas
-            "developer": (
-                "Focus on implementation feasibility, component design, and technical debt"
-            ),
-            "security expert": (
-                "Focus on security vulnerabilities, data privacy, and regulatory compliance"
-            ),
-            "frontend engineer": (
-                "Focus on frontend architecture, component design, "
-                "and user interface implementation"
-            ),
-            "ux designer": "Focus on user experience, accessibility, and usability",
-            "backend engineer": (
-                "Focus on server architecture, database design, API structure, and scalability"
-            ),
-            "devops engineer": (
-                "Focus on deployment, infrastructure, automation, and operational reliability"
-            ),
-            "performance engineer": (
-                "Focus on speed optimization, resource efficiency, and performance bottlenecks"
-            ),
-            "maintainability advocate": (
-                "Focus on code clarity, documentation, refactoring, and long-term sustainability"
-            ),
-            # Digital Marketing personas
-            "creative director": (
-                "Focus on brand consistency, emotional impact, and creative storytelling"
-            ),
-            "analytics specialist": (
-                "Focus on measurable outcomes, data validation, and statistical rigor"
-            ),
-            "brand strategist": (
-                "Focus on brand positioning, market differentiation, and brand equity"
-            ),
-            "conversion optimizer": (
-                "Focus on funnel optimization, A/B testing, and conversion rate improvement"
-            ),
-            "social media expert": (
-                "Focus on platform-specific strategies, community engagement, and viral potential"
-            ),
-            "growth hacker": (
-                "Focus on rapid experimentation, user acquisition, and scalable growth tactics"
-            ),
-            "content creator": (
-                "Focus on content quality, storytelling, and audience engagement"
-            ),
-            "performance marketer": (
-                "Focus on paid advertising efficiency, ROAS, and campaign optimization"
-            ),
-            "b2b marketer": (
-                "Focus on enterprise sales cycles, stakeholder management, and business value"
-            ),
-            "b2c marketer": (
-                "Focus on consumer psychology, mass appeal, and emotional triggers"
-            ),
-            "landing page expert": (
-                "Focus on conversion optimization, user flow, and page performance"
-            ),
-            "seo specialist": (
-                "Focus on search visibility, organic traffic, and content discoverability"
-            ),
-            # Visual Design personas
-            "ui minimalist": "Focus on simplicity, clarity, and cognitive load reduction",
-            "feature-rich designer": (
-                "Focus on functionality completeness, discoverability, and feature organization"
-            ),
-            "brand identity expert": (
-                "Focus on visual consistency, brand recognition, and identity system coherence"
-            ),
-            "user-centered designer": (
-                "Focus on user research, usability testing, and human-centered design principles"
-            ),
-            "print design specialist": (
-                "Focus on typography, layout hierarchy, and traditional design principles"
-            ),
-            "digital-first designer": (
-                "Focus on interactive elements, responsive design, and digital-native experiences"
-            ),
-            "artistic creative": (
-                "Focus on aesthetic impact, creative expression, and visual innovation"
-            ),
-            "data-driven designer": (
-                "Focus on user analytics, A/B testing, and evidence-based design decisions"
-            ),
-            "accessibility expert": (
-                "Focus on inclusive design, WCAG compliance, and barrier-free experiences"
-            ),
-            "visual artist": (
-                "Focus on aesthetic beauty, artistic composition, and visual storytelling"
-            ),
-            # Product Strategy personas
-            "customer advocate": "Focus on user needs, pain points, and accessibility",
-            "business strategist": (
-                "Focus on strategic alignment, competitive positioning, and monetization"
-            ),
-            "innovative disruptor": (
-                "Focus on breakthrough innovation, market disruption, and paradigm shifts"
-            ),
-            "market researcher": (
-                "Focus on market validation, competitive analysis, and data-driven insights"
-            ),
-            "mvp champion": (
-                "Focus on minimal viable features, rapid iteration, and speed to market"
-            ),
-            "quality perfectionist": (
-                "Focus on polish, reliability, and comprehensive feature completeness"
-            ),
-            "long-term strategist": (
-                "Focus on sustainable growth, strategic vision, and future planning"
-            ),
-            "quick-to-market tactician": (
-                "Focus on immediate opportunities, tactical execution, and rapid deployment"
-            ),
-            "technical pm": (
-                "Focus on technical feasibility, engineering constraints, and implementation details"
-            ),
-            "business pm": (
-                "Focus on market fit, business metrics, and stakeholder alignment"
+        catalog = self.catalog
+        self._rebase_upload(session, catalog)
+        match = catalog.matcher.finish(state)
+        domain = self._domain_from_match(match, catalog)
+        ranked_pairs = self._rank_pairs_from_match(domain, match, catalog)
+        session.domain = domain
+        session.reasoning_match = None
+        status = self.sessions.update(session)
+        if status != FOUND:
+            return {"error": session_error(session_id, status)}
+
+        self.logger.log_usage(
+            session_id=session_id,
+            domain=domain,
+            persona="system",
+            step="init",
+            reasoning_length=state.characters,
+        )
+        return self._session_options(session_id, domain, ranked_pairs)
+
+    def _rebase_upload(self, session: CounterPoseSession, catalog: Catalog) -> None:
+        """Carry a chunked upload started before a catalog reload over to ``catalog``."""
+        if session.catalog_version != catalog.version and session.reasoning_match is not None:
+            catalog.matcher.rebase(session.reasoning_match)
+            session.catalog_version = catalog.version
+
+    def submit_reasoning_batch(
+        self, items: List[Tuple[str, str]], engine: Optional[str] = None
+    ) -> Dict:
+        """Create a session for each ``(session_id, reasoning)`` item in one call.
+
+        Identical reasoning texts are analyzed once, all sessions are stored with a
+        single ``put_many``, and the usage log receives one bulk entry for the batch.
+        """
+        catalog = self.catalog
+        analyses: Dict[str, Analysis] = {}
+        sessions = []
+        results = []
+        for session_id, reasoning in items:
+            analysis = analyses.get(reasoning)
+            if analysis is None:
+                analysis = analyses[reasoning] = self.analyze(reasoning, engine, catalog)
+            domain, ranked_pairs = analysis
+            session = CounterPoseSession(session_id, domain)
+            session.catalog_version = catalog.version
+            sessions.append(session)
+            results.append(
+                {
+                    "session_id": session_id,
+                    "domain": domain,
+                    "persona_options": self._persona_options(ranked_pairs),
+                }
+            )
+
+        self.sessions.put_many(sessions)
+        self.logger.log_usage_batch(
+            (session_id, session.domain, "system", "init", len(reasoning))
+            for session, (session_id, reasoning) in zip(sessions, items)
+        )
+
+        return {
+            "count": len(results),
+            "results": results,
+            "next_step": "get_persona_guidance",
+            "instructions": (
+                "Choose a persona pair for any session above and continue it with "
+                "get_persona_guidance."
             ),
         }
 
-        guidance = persona_guidance.get(
-            persona.lower(), "Consider the perspective's unique expertise"
-        )
+    def _persona_options(
+        self, ranked_pairs: List[Tuple[Tuple[str, str], float, str]]
+    ) -> List[Dict]:
+        """Format ranked persona pairs as response options, recommending the first."""
+        return [
+            {"personas": list(pair), "score": score, "reason": reason, "recommended": i == 0}
+            for i, (pair, score, reason) in enumerate(ranked_pairs)
+        ]
 
-        return f"""
-            As {persona}, critique the reasoning from your specific perspective.
+    def _load_session(self, session_id: str) -> Tuple[Optional[CounterPoseSession], str]:
+        """Look up a session, returning an error message if it is missing or expired."""
+        # Tool calls only read the session header and append steps, never the history
+        session, status = self.sessions.lookup(session_id, load_steps=False)
+        if status != FOUND:
+            return None, session_error(session_id, status)
+        return session, ""
 
-            {guidance}
+    @_serialized
+    def get_persona_guidance(self, session_id: str, persona_pair: List[str]) -> Dict:
+        """Get guidance for performing critique with selected personas."""
+        with self.tracer.span("get_persona_guidance") as span:
+            # Get session
+            with self.tracer.span("load_session"):
+                session, error = self._load_session(session_id)
+            if error:
+                span.set(error="session")
+                return {"error": error}
 
-            Identify:
-            1. Key claims that need examination
-            2. Potential blind spots or unconsidered factors
-            3. Logical contradictions or tensions
-            4. Alternative approaches worth considering
+            # Validate persona pair
+            if len(persona_pair) != 2:
+                span.set(error="validation")
+                return {"error": "Persona pair must contain exactly 2 personas"}
 
-            Format your critique as:
+            # Set personas for session
+            with self.tracer.span("update_session"):
+                session.personas = persona_pair
+                session.current_persona_index = -1
+                status = self.sessions.update(session)
+            if status != FOUND:
+                span.set(error="session")
+                return {"error": session_error(session_id, status)}
 
-            {icon} {persona.upper()}'s CRITIQUE:
-            <Your critique here>
+            # Log usage
+            with self.tracer.span("log_usage"):
+                self.logger.log_usage(
+                    session_id=session_id,
+                    domain=session.domain,
+                    persona="system",
+                    step="get_persona_guidance",
+                    reasoning_length=len(str(persona_pair)),
+                )
 
-            END CRITIQUE
-            """
+            # Return critique instructions for both personas
+            with self.tracer.span("render_guidance"):
+                guidance = self._get_guidance_format(persona_pair[0], persona_pair[1])
+            return {
+                "session_id": session_id,
+                "domain": session.domain,
+                "selected_personas": persona_pair,
+                "next_step": "critique",
+                "format": guidance,
+                "total_steps": 3,  # submit_reasoning + get_persona_guidance + submit_critique
+            }
+
+    def _get_critique_format(self, persona: str) -> str:
+        """Get formatting guidance for a specific persona's critique."""
+        return self._critique_format_cache(self.catalog, persona)
+
+    def _get_guidance_format(self, persona1: str, persona2: str) -> Dict[str, str]:
+        """Get the critique guidance block for a persona pair."""
+        return dict(self._guidance_format_cache(self.catalog, persona1, persona2))
+
+    def _render_guidance_format(
+        self, catalog: Catalog, persona1: str, persona2: str
+    ) -> Mapping[str, str]:
+        """Render the read-only guidance block for a persona pair."""
+        return MappingProxyType(
+            {
+                "persona1_guidance": self._critique_format_cache(catalog, persona1),
+                "persona2_guidance": self._critique_format_cache(catalog, persona2),
+            }
+        )
+
+    def _render_critique_format(self, catalog: Catalog, persona: str) -> str:
+        """Render the critique instructions for one persona."""
+        return catalog.critique_format(persona)
 
     def submit_critique(
-        self, 
-        session_id: str, 
-        persona1_name: str, 
-        persona1_critique: str, 
-        persona2_name: str, 
-        persona2_critique: str
+        self,
+        session_id: str,
+        persona1_name: str,
+        persona1_critique: str,
+        persona2_name: str,
+        persona2_critique: str,
     ) -> Dict:
         """Submit critiques from both selected personas."""
-        # Get session
-        session = self.sessions.get(session_id)
-        if not session:
-            return {"error": f"Session {session_id} not found"}
+        critique_length = len(persona1_critique) + len(persona2_critique)
+        with self.tracer.span("submit_critique", critique_length=critique_length) as span:
+            # Add both critique steps to session history
+            critiques = [(persona1_name, persona1_critique), (persona2_name, persona2_critique)]
+            # Hash the contents for the string pool before the session is locked
+            digests = [
+                StringPool.digest(content) if self.sessions.resident else b""
+                for _, content in critiques
+            ]
+
+            with self.sessions.session_lock(session_id):
+                # Get session
+                with self.tracer.span("load_session"):
+                    session, error = self._load_session(session_id)
+                if error:
+                    span.set(error="session")
+                    return {"error": error}
+
+                # Validate both personas are part of session
+                with self.tracer.span("validate"):
+                    error = self._critique_error(session, persona1_name, persona2_name)
+                if error:
+                    span.set(error="validation")
+                    return {"error": error}
+
+                with self.tracer.span("append_steps"):
+                    timestamp = now_us()
+                    steps = [
+                        Step(
+                            "critique",
+                            persona,
+                            self._store_content(session_id, content, digest),
+                            timestamp,
+                        )
+                        for (persona, content), digest in zip(critiques, digests)
+                    ]
+                    self._offload_steps(session, steps)
+                    status = self.sessions.append_steps(session, steps)
+                if status != FOUND:
+                    # The store already released the session's pooled contents when it
+                    # removed the session; drop the references taken for these steps too
+                    self.string_pool.release(session_id)
+                    span.set(error="session")
+                    return {"error": session_error(session_id, status)}
 
-        # Validate both personas are part of session
-        if persona1_name not in session.personas:
-            return {"error": f"Persona '{persona1_name}' not part of this session. Expected: {session.personas}"}
-        if persona2_name not in session.personas:
-            return {"error": f"Persona '{persona2_name}' not part of this session. Expected: {session.personas}"}
+            with self.tracer.span("log_usage"):
+                for persona_name, critique_content in critiques:
+                    # Log usage for each critique
+                    self.logger.log_usage(
+                        session_id=session_id,
+                        domain=session.domain,
+                        persona=persona_name,
+                        step="critique",
+                        reasoning_length=len(critique_content),
+                    )
+
+            # All critiques complete - return ready for synthesis format
+            with self.tracer.span("render_synthesis"):
+                synthesis_format = self._get_synthesis_format(session)
+            return {
+                "session_id": session_id,
+                "domain": session.domain,
+                "personas": session.personas,
+                "critiques_complete": True,
+                "next_step": "synthesis",
+                "format": synthesis_format,
+                "total_steps": 3,  # submit_reasoning + get_persona_guidance + submit_critique
+                "steps_completed": 3,
+                "critiques_received": {
+                    persona1_name: len(persona1_critique),
+                    persona2_name: len(persona2_critique),
+                },
+            }
+
+    def _critique_error(
+        self, session: CounterPoseSession, persona1_name: str, persona2_name: str
+    ) -> str:
+        """Return why a critique submission does not match the session's personas, or ""."""
+        for persona_name in (persona1_name, persona2_name):
+            if persona_name not in session.personas:
+                return (
+                    f"Persona '{persona_name}' not part of this session. "
+                    f"Expected: {session.personas}"
+                )
 
         # Validate we have both expected personas
         if set([persona1_name, persona2_name]) != set(session.personas):
-            return {"error": f"Must provide critiques for both personas: {session.personas}"}
+            return f"Must provide critiques for both personas: {session.personas}"
+        return ""
 
-        # Add both critique steps to session history
-        critiques = [
-            (persona1_name, persona1_critique),
-            (persona2_name, persona2_critique)
-        ]
-        
-        for persona_name, critique_content in critiques:
-            session.steps.append(
-                {
-                    "type": "critique",
-                    "persona": persona_name,
-                    "content": critique_content,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
+    def _store_content(self, session_id: str, content: str, digest: bytes = b"") -> PooledText:
+        """Return the shared copy of a step's content for a session kept in memory."""
+        if not self.sessions.resident:
+            return content
+        return self.string_pool.intern(session_id, content, self._keep_content, digest)
 
-            # Log usage for each critique
-            self.logger.log_usage(
-                session_id=session_id,
-                domain=session.domain,
-                persona=persona_name,
-                step="critique",
-                reasoning_length=len(critique_content),
-            )
+    def _keep_content(self, content: str) -> PooledText:
+        """Keep new pooled content inline, or in the blob store if it is large."""
+        if self.blob_threshold > 0 and len(content) >= self.blob_threshold:
+            return self.blob_store.put(content)
+        return content
+
+    def dedup_stats(self) -> Dict:
+        """Return step content deduplication counters for the configured store."""
+        if self.sessions.resident:
+            return self.string_pool.stats()
+        return self.sessions.stats().get("dedup", {})
+
+    def _offload_steps(self, session: CounterPoseSession, new_steps: List[Step]) -> None:
+        """Move the content of the oldest resident steps to the blob store.
+
+        Contents are spilled through the string pool, which swaps its shared copy for
+        the blob reference, so the text is freed once no step holds it and the blob is
+        freed with the pool entry.
+        """
+        if not self.sessions.resident:
+            return
+        if self.max_resident_steps > 0:
+            existing = list(session.iter_steps())
+            overflow = len(existing) + len(new_steps) - self.max_resident_steps
+            for step in existing[: max(0, overflow)]:
+                step.spill(self._spill_content)
 
-        # All critiques complete - return ready for synthesis format
+    def _spill_content(self, content: str) -> PooledText:
+        return self.string_pool.spill(content, self.blob_store.put)
+
+    @_serialized
+    def get_session_history(self, session_id: str, offset: int = 0, limit: int = 20) -> Dict:
+        """Return a page of a session's steps, reading spilled contents as needed."""
+        session, status = self.sessions.lookup(session_id)
+        if status != FOUND:
+            return {"error": session_error(session_id, status)}
+        if offset < 0 or limit < 0:
+            return {"error": "offset and limit must not be negative"}
+        steps = list(session.iter_steps())
         return {
             "session_id": session_id,
             "domain": session.domain,
             "personas": session.personas,
-            "critiques_complete": True,
-            "next_step": "synthesis",
-            "format": self._get_synthesis_format(session),
-            "total_steps": 3,  # submit_reasoning + get_persona_guidance + submit_critique
-            "steps_completed": 3,
-            "critiques_received": {
-                persona1_name: len(persona1_critique),
-                persona2_name: len(persona2_critique)
-            }
+            "total_steps": len(steps),
+            "offset": offset,
+            "steps": [dict(step) for step in steps[offset : offset + limit]],
         }
 
     def _get_synthesis_format(self, session: CounterPoseSession) -> str:
@@ -830,3 +1450,27 @@ class CounterPoseTool:
             """
 
     # complete_analysis method removed - synthesis now handled by submit_critique
+
+
+def builtin_catalog() -> Catalog:
+    """Return the process-wide built-in catalog, building it on the first call.
+
+    Its contents are frozen, so tools share it by reference; a tool that needs different
+    entries uses ``CounterPoseTool.override_catalog``. The matcher compiled for it is
+    shared as well, so only the first tool in a process pays for compiling it.
+    """
+    global _builtin_catalog
+    catalog = _builtin_catalog
+    if catalog is None:
+        with _builtin_catalog_lock:
+            if _builtin_catalog is None:
+                _builtin_catalog = Catalog(
+                    CounterPoseTool._generate_domain_keywords(),
+                    CounterPoseTool._load_persona_pairs(),
+                    CounterPoseTool._generate_persona_keywords(),
+                    PERSONA_ICONS,
+                    PERSONA_GUIDANCE,
+                    default_domain="product_strategy",
+                )
+            catalog = _builtin_catalog
+    return catalog
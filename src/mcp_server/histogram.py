@@ -0,0 +1,86 @@
+"""Fixed-precision histograms for lengths, sizes, and latencies."""
+
+import math
+from typing import Dict, Iterator, Tuple
+
+
+class Histogram:
+    """HDR-style histogram of non-negative integers with bounded relative error.
+
+    Values below ``2 ** significant_bits`` are counted exactly. Larger values share
+    log-linear buckets, so each recorded value is off by at most
+    ``2 ** (1 - significant_bits)`` of its magnitude while memory stays proportional
+    to the number of distinct buckets, not the number of values.
+    """
+
+    def __init__(self, significant_bits: int = 6) -> None:
+        self.significant_bits = significant_bits
+        self._exact_limit = 1 << significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._exact_limit:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return shift * self._half + (value >> shift)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """Return the inclusive value range covered by a bucket index."""
+        if index < self._exact_limit:
+            return index, index
+        shift, offset = divmod(index - self._exact_limit, self._half)
+        shift += 1
+        mantissa = self._half + offset
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        """Record ``count`` occurrences of ``value`` (negative values count as zero)."""
+        value = max(0, int(value))
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += count
+        self.total += value * count
+
+    def merge(self, other: "Histogram") -> None:
+        """Add another histogram with the same precision into this one."""
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        if other.count == 0:
+            return
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percent: float) -> int:
+        """Return the value at ``percent`` (0-100), clamped to the recorded range."""
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = self._bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        """Return the exact mean of recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+    def iter_buckets(self) -> Iterator[Tuple[int, int]]:
+        """Yield ``(upper_bound, count)`` for each occupied bucket in ascending order."""
+        for index in sorted(self.buckets):
+            yield self._bounds(index)[1], self.buckets[index]
@@ -0,0 +1,250 @@
+"""Serving the MCP server over Streamable HTTP or SSE, so many clients share one server."""
+
+import contextlib
+import json
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from mcp.server.lowlevel import Server
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+HTTP_TRANSPORTS = ("http", "sse")
+TRANSPORTS = ("stdio",) + HTTP_TRANSPORTS
+
+
+class RequestLimits:
+    """ASGI middleware that bounds request bodies and the number of requests in flight.
+
+    Only POST requests are limited: they carry every JSON-RPC message, while GET
+    requests hold open event streams for as long as a client stays connected. A body
+    larger than ``max_body_bytes`` is answered with 413 before the MCP server parses
+    it, and a request arriving while ``max_concurrent_requests`` are in flight is
+    answered with 503 and ``Retry-After``. Zero disables either limit.
+
+    Over SSE a POST is answered with 202 as soon as its message is queued, and the
+    call then runs on the client's event stream, so counting requests does not bound
+    the calls still running. Tool handlers therefore also take a call slot with
+    ``enter_call``, under the same ``max_concurrent_requests``.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int, max_concurrent_requests: int) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.max_concurrent_requests = max_concurrent_requests
+        # Only touched from the event loop thread
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.rejected_too_large = 0
+        self.rejected_busy = 0
+        self.calls_in_flight = 0
+        self.peak_calls_in_flight = 0
+        self.rejected_busy_calls = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        length = _content_length(scope)
+        if self.max_body_bytes > 0 and length is not None and length > self.max_body_bytes:
+            self.rejected_too_large += 1
+            await self._reject(send, 413, f"Request body exceeds {self.max_body_bytes} bytes")
+            return
+        if 0 < self.max_concurrent_requests <= self.in_flight:
+            self.rejected_busy += 1
+            await self._reject(send, 503, "Server busy, retry shortly", retry_after=1)
+            return
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.requests += 1
+        try:
+            if self.max_body_bytes > 0 and length is None:
+                # Without a Content-Length the body is read up to the limit before the
+                # request is passed on, then replayed
+                body = await self._read_body(receive)
+                if body is None:
+                    self.rejected_too_large += 1
+                    await self._reject(
+                        send, 413, f"Request body exceeds {self.max_body_bytes} bytes"
+                    )
+                    return
+                receive = _replay(body, receive)
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return b"".join(chunks)
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    def enter_call(self) -> bool:
+        """Take a slot for one tool call, or return False if every slot is taken."""
+        if 0 < self.max_concurrent_requests <= self.calls_in_flight:
+            self.rejected_busy_calls += 1
+            return False
+        self.calls_in_flight += 1
+        self.peak_calls_in_flight = max(self.peak_calls_in_flight, self.calls_in_flight)
+        return True
+
+    def exit_call(self) -> None:
+        """Release the slot taken by ``enter_call``."""
+        self.calls_in_flight -= 1
+
+    @staticmethod
+    async def _reject(
+        send: Send, status: int, message: str, retry_after: Optional[int] = None
+    ) -> None:
+        # Shaped as a JSON-RPC error so MCP clients can report it
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": message}}
+        ).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(retry_after).encode("ascii")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_body_bytes": self.max_body_bytes,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "rejected_too_large": self.rejected_too_large,
+            "rejected_busy": self.rejected_busy,
+            "calls_in_flight": self.calls_in_flight,
+            "peak_calls_in_flight": self.peak_calls_in_flight,
+            "rejected_busy_calls": self.rejected_busy_calls,
+        }
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """Return a receive callable that yields ``body`` once, then defers to ``receive``."""
+    sent = False
+
+    async def replayed() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replayed
+
+
+def low_level_server(server: "FastMCP") -> "Server":
+    """Return the low-level MCP server inside ``server``.
+
+    FastMCP 2.2 has no public factory for a Streamable HTTP app, so the session
+    manager is given the server FastMCP keeps in ``_mcp_server``. requirements.txt pins
+    the FastMCP minor version this was checked against, and the tests fail if the
+    attribute goes away.
+    """
+    try:
+        return server._mcp_server
+    except AttributeError:
+        raise RuntimeError(
+            "This FastMCP version does not expose its low-level server; "
+            "install fastmcp>=2.2,<2.3 to serve Streamable HTTP"
+        ) from None
+
+
+class _Endpoint:
+    """Adapts the session manager to an ASGI app, so Starlette routes it unchanged."""
+
+    def __init__(self, handle: ASGIApp) -> None:
+        self.handle = handle
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.handle(scope, receive, send)
+
+
+def create_app(
+    server: "FastMCP",
+    transport: str = "http",
+    path: str = "/mcp",
+    max_body_bytes: int = 16 * 1024 * 1024,
+    max_concurrent_requests: int = 256,
+) -> RequestLimits:
+    """Build the ASGI app serving ``server`` over ``transport``, wrapped in request limits.
+
+    ``http`` is the Streamable HTTP transport at ``path``, answering each call with a
+    plain JSON response. ``sse`` is the older transport with an event stream at
+    ``/sse`` and messages posted to ``/messages/``.
+    """
+    if transport == "sse":
+        app = server.sse_app()
+    elif transport == "http":
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        # FastMCP 2.2 only ships stdio and SSE, so its low-level server is mounted directly
+        manager = StreamableHTTPSessionManager(app=low_level_server(server), json_response=True)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(_: object) -> AsyncIterator[None]:
+            async with manager.run():
+                yield
+
+        app = Starlette(routes=[Route(path, _Endpoint(manager.handle_request))], lifespan=lifespan)
+    else:
+        raise ValueError(f"transport must be one of {HTTP_TRANSPORTS}, got {transport!r}")
+    return RequestLimits(app, max_body_bytes, max_concurrent_requests)
+
+
+def serve(
+    app: ASGIApp,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    keep_alive: float = 5.0,
+    shutdown_timeout: Optional[float] = None,
+    log_level: str = "warning",
+) -> None:
+    """Serve ``app`` with uvicorn until interrupted.
+
+    ``shutdown_timeout`` bounds how long shutdown waits for open requests; SSE needs
+    it, since its event streams stay open until the client leaves.
+    """
+    import uvicorn
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        timeout_keep_alive=keep_alive,
+        timeout_graceful_shutdown=shutdown_timeout,
+        log_level=log_level,
+    )
+    uvicorn.Server(config).run()
@@ -0,0 +1,391 @@
+"""Single-pass keyword matching for domain detection and persona pair ranking."""
+
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Characters scanned per regex call; see KeywordMatcher.find_lowered
+SCAN_SLICE_CHARS = 64 * 1024
+
+
+def _compile_trie(keywords: Iterable[str]) -> str:
+    """Build a regular expression that walks a character trie of the keywords.
+
+    Factoring the alternation into a trie keeps the work done at each text offset
+    bounded by the longest keyword rather than by the number of keywords.
+    """
+    trie: Dict[str, Dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional: prefer the longest keyword starting at this offset
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Compiled matcher that finds every keyword occurring in a text in one scan.
+
+    Matching is case-insensitive substring presence, identical to
+    ``keyword.lower() in text.lower()`` for each keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        lowered = {keyword.lower() for keyword in keywords}
+        self.always_present = frozenset(k for k in lowered if not k)
+        self.keywords: Tuple[str, ...] = tuple(sorted(k for k in lowered if k))
+        self.max_length = max((len(k) for k in self.keywords), default=0)
+
+        # A lookahead lets matches overlap; each offset reports its longest keyword,
+        # and every keyword that is a prefix of it is present at the same offset.
+        trie = _compile_trie(self.keywords)
+        self._source = "(?=(" + trie + "))" if trie else ""
+        self._pattern: Optional[re.Pattern[str]] = None
+        self.compile()
+        keyword_set = set(self.keywords)
+        self._prefixes: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(
+                keyword[:end] for end in range(1, len(keyword) + 1) if keyword[:end] in keyword_set
+            )
+            for keyword in self.keywords
+        }
+
+    def compile(self) -> None:
+        """Compile the regular expression if it is not compiled yet.
+
+        Pickling and ``to_data`` drop the compiled pattern, which a matcher restored from
+        either, such as one loaded from a cached catalog index, recompiles here on first
+        use.
+        """
+        if self._pattern is None and self._source:
+            self._pattern = re.compile(self._source)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_pattern"] = None
+        return state
+
+    def to_data(self) -> Dict[str, Any]:
+        """Return the compiled tables as JSON-serializable data for ``from_data``."""
+        return {
+            "keywords": list(self.keywords),
+            "always_present": sorted(self.always_present),
+            "source": self._source,
+            "prefixes": {keyword: sorted(found) for keyword, found in self._prefixes.items()},
+        }
+
+    @classmethod
+    def from_data(cls, data: Mapping[str, Any]) -> "KeywordMatcher":
+        """Rebuild a matcher from ``to_data`` output without recompiling its trie.
+
+        The regular expression is compiled on first use, as for an unpickled matcher.
+        """
+        matcher = cls.__new__(cls)
+        matcher.keywords = tuple(data["keywords"])
+        matcher.always_present = frozenset(data["always_present"])
+        matcher.max_length = max((len(k) for k in matcher.keywords), default=0)
+        matcher._source = data["source"]
+        matcher._pattern = None
+        matcher._prefixes = {
+            keyword: frozenset(found) for keyword, found in data["prefixes"].items()
+        }
+        return matcher
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Return the set of (lowercased) keywords present in ``text``."""
+        return self.find_lowered(text.lower())
+
+    def find_lowered(self, lowered_text: str) -> FrozenSet[str]:
+        """Return the keywords present in text that has already been lowercased.
+
+        Long texts are scanned in overlapping slices of ``SCAN_SLICE_CHARS``. A regex
+        scan holds the GIL until it returns, so slicing lets the event loop and other
+        threads run between slices when a large text is matched on a worker thread.
+        """
+        if not self._source:
+            return self.always_present
+        if self._pattern is None:
+            self.compile()
+        found = set(self.always_present)
+        findall = self._pattern.findall  # type: ignore[union-attr]
+        if len(lowered_text) <= SCAN_SLICE_CHARS:
+            matches = set(findall(lowered_text))
+        else:
+            # Each slice starts early enough to contain any keyword crossing its start
+            overlap = self.max_length - 1
+            matches = set()
+            for start in range(0, len(lowered_text), SCAN_SLICE_CHARS):
+                end = start + SCAN_SLICE_CHARS
+                matches.update(findall(lowered_text, max(0, start - overlap), end))
+        for longest in matches:
+            found.update(self._prefixes[longest])
+        return frozenset(found)
+
+
+class CatalogMatch:
+    """Keyword hits for one text against every domain and persona pair in a catalog."""
+
+    def __init__(
+        self,
+        found: FrozenSet[str],
+        domain_counts: Dict[str, int],
+        pair_counts: Dict[str, Dict[str, int]],
+        pair_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+    ) -> None:
+        self.found = found
+        self.domain_counts = domain_counts
+        self.pair_counts = pair_counts
+        self._pair_keywords = pair_keywords
+
+    def matched_keywords(self, domain: str, pair_key: str) -> List[str]:
+        """Return the keywords of a persona pair that matched, in catalog order."""
+        keywords = self._pair_keywords.get(domain, {}).get(pair_key, [])
+        return [keyword for keyword in keywords if keyword.lower() in self.found]
+
+
+class ChunkScan:
+    """Keywords found inside one chunk on its own, by ``CatalogMatcher.scan``."""
+
+    __slots__ = ("matcher", "lowered", "found")
+
+    def __init__(self, matcher: "CatalogMatcher", lowered: str, found: FrozenSet[str]) -> None:
+        self.matcher = matcher
+        self.lowered = lowered
+        self.found = found
+
+
+class IncrementalMatch:
+    """Running keyword hits for reasoning that arrives in chunks.
+
+    Only the keywords found so far, their per-domain and per-pair counts, and the
+    last few lowercased characters are kept, so earlier chunks are never rescanned.
+    """
+
+    def __init__(
+        self,
+        found: Set[str],
+        domain_counts: Dict[str, int],
+        pair_counts: Dict[str, Dict[str, int]],
+        early_stop: bool = False,
+    ) -> None:
+        self.found = found
+        self.domain_counts = domain_counts
+        self.pair_counts = pair_counts
+        self.early_stop = early_stop
+        # Lowercased end of the text so far, long enough to hold all but one character
+        # of a keyword that continues into the next chunk
+        self.tail = ""
+        self.chunks = 0
+        self.characters = 0
+        # Set once early stopping determines that no other domain can overtake the leader
+        self.settled_domain: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state as JSON-serializable data."""
+        return {
+            "found": sorted(self.found),
+            "domain_counts": self.domain_counts,
+            "pair_counts": self.pair_counts,
+            "early_stop": self.early_stop,
+            "tail": self.tail,
+            "chunks": self.chunks,
+            "characters": self.characters,
+            "settled_domain": self.settled_domain,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "IncrementalMatch":
+        """Rebuild a state produced by ``to_dict``."""
+        state = cls(
+            set(data["found"]),
+            dict(data["domain_counts"]),
+            {domain: dict(pairs) for domain, pairs in data["pair_counts"].items()},
+            data["early_stop"],
+        )
+        state.tail = data["tail"]
+        state.chunks = data["chunks"]
+        state.characters = data["characters"]
+        state.settled_domain = data["settled_domain"]
+        return state
+
+
+class CatalogMatcher:
+    """Matcher compiled once from the domain and persona keyword catalogs."""
+
+    def __init__(
+        self,
+        domain_keywords: Mapping[str, Sequence[str]],
+        persona_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+        matcher: Optional[KeywordMatcher] = None,
+    ) -> None:
+        self.domain_keywords = domain_keywords
+        self.persona_keywords = persona_keywords
+        if matcher is None:
+            all_keywords = [k for keywords in domain_keywords.values() for k in keywords]
+            for pairs in persona_keywords.values():
+                all_keywords.extend(k for keywords in pairs.values() for k in keywords)
+            matcher = KeywordMatcher(all_keywords)
+        # A matcher passed in must have been compiled from these same keywords
+        self.matcher = matcher
+
+        # Lowercase each keyword list once so counting is a set lookup per entry
+        self._domain_lowered = {
+            domain: tuple(k.lower() for k in keywords)
+            for domain, keywords in domain_keywords.items()
+        }
+        self._pair_lowered = {
+            domain: {pair: tuple(k.lower() for k in keywords) for pair, keywords in pairs.items()}
+            for domain, pairs in persona_keywords.items()
+        }
+
+        # Reverse indexes let chunked matching add counts for newly found keywords only.
+        # Keywords listed twice under a domain or pair count twice, as in match_found.
+        self._domain_index: Dict[str, List[str]] = {}
+        for domain, keywords in self._domain_lowered.items():
+            for keyword in keywords:
+                self._domain_index.setdefault(keyword, []).append(domain)
+        self._pair_index: Dict[str, List[Tuple[str, str]]] = {}
+        for domain, pairs in self._pair_lowered.items():
+            for pair, keywords in pairs.items():
+                for keyword in keywords:
+                    self._pair_index.setdefault(keyword, []).append((domain, pair))
+        self._pair_matchers: Dict[str, KeywordMatcher] = {}
+
+    def match(self, text: str) -> CatalogMatch:
+        """Scan ``text`` once and count keyword hits per domain and persona pair."""
+        return self.match_found(self.matcher.find(text))
+
+    def match_found(self, found: FrozenSet[str]) -> CatalogMatch:
+        """Build per-domain and per-pair counts from an already computed keyword set."""
+        domain_counts = {
+            domain: sum(1 for k in keywords if k in found)
+            for domain, keywords in self._domain_lowered.items()
+        }
+        pair_counts = {
+            domain: {
+                pair: sum(1 for k in keywords if k in found) for pair, keywords in pairs.items()
+            }
+            for domain, pairs in self._pair_lowered.items()
+        }
+        return CatalogMatch(found, domain_counts, pair_counts, self.persona_keywords)
+
+    def start(self, early_stop: bool = False) -> IncrementalMatch:
+        """Return an empty chunked-matching state."""
+        empty = self.match_found(self.matcher.always_present)
+        return IncrementalMatch(
+            set(empty.found), empty.domain_counts, empty.pair_counts, early_stop
+        )
+
+    def scan(self, chunk: str) -> ChunkScan:
+        """Find every catalog keyword inside ``chunk`` on its own.
+
+        This is the bulk of the work of ``feed`` and needs no upload state, so it can
+        run before the session is locked; ``feed`` then only scans the boundary with
+        the previous chunks.
+        """
+        lowered = chunk.lower()
+        return ChunkScan(self, lowered, self.matcher.find_lowered(lowered))
+
+    def feed(self, state: IncrementalMatch, chunk: str, scan: Optional[ChunkScan] = None) -> None:
+        """Scan the next chunk of text and update ``state`` in place.
+
+        The chunk is scanned together with the retained tail of the previous chunks,
+        so keywords spanning a chunk boundary are found exactly once. After early
+        stopping settles the domain, only that domain's persona pair keywords are
+        searched, and scanning stops entirely once all of them have been found.
+        Domain counts are no longer updated at that point. A ``scan`` of the chunk
+        made by this matcher is reused, leaving only the boundary to scan.
+        """
+        state.chunks += 1
+        state.characters += len(chunk)
+        matcher = self.matcher
+        if state.settled_domain is not None:
+            matcher = self._pair_matcher(state.settled_domain)
+            if state.found.issuperset(matcher.keywords):
+                return
+
+        # The tail always covers the longest keyword in the catalog, not just the
+        # narrower matcher, because the state may be resumed by either
+        keep = self.matcher.max_length - 1
+        if scan is not None and scan.matcher is self:
+            lowered = scan.lowered
+            # Keywords starting in the tail end within ``keep`` characters of the chunk
+            found = matcher.find_lowered(state.tail + lowered[:keep])
+            found |= scan.found if matcher is self.matcher else scan.found & set(matcher.keywords)
+        else:
+            lowered = chunk.lower()
+            found = matcher.find_lowered(state.tail + lowered)
+        for keyword in found - state.found:
+            state.found.add(keyword)
+            for domain in self._domain_index.get(keyword, ()):
+                state.domain_counts[domain] += 1
+            for domain, pair in self._pair_index.get(keyword, ()):
+                state.pair_counts[domain][pair] += 1
+        if keep <= 0:
+            state.tail = ""
+        elif len(lowered) >= keep:
+            state.tail = lowered[-keep:]
+        else:
+            state.tail = (state.tail + lowered)[-keep:]
+
+        if state.early_stop and state.settled_domain is None:
+            state.settled_domain = self.settled_domain(state.domain_counts)
+
+    def finish(self, state: IncrementalMatch) -> CatalogMatch:
+        """Return the accumulated hits as a regular catalog match."""
+        return CatalogMatch(
+            frozenset(state.found),
+            dict(state.domain_counts),
+            {domain: dict(pairs) for domain, pairs in state.pair_counts.items()},
+            self.persona_keywords,
+        )
+
+    def rebase(self, state: IncrementalMatch) -> None:
+        """Recount a chunked-matching state that was started under another catalog.
+
+        Counts are rebuilt from the keywords found so far, so keywords this catalog
+        adds are only searched for in the chunks that follow.
+        """
+        match = self.match_found(frozenset(state.found))
+        state.domain_counts = match.domain_counts
+        state.pair_counts = match.pair_counts
+        state.settled_domain = None
+        if state.early_stop:
+            state.settled_domain = self.settled_domain(state.domain_counts)
+
+    def settled_domain(self, domain_counts: Mapping[str, int]) -> Optional[str]:
+        """Return the leading domain if no further text can change the winner.
+
+        A rival can at most match every one of its keywords. Ties go to the domain
+        listed first, as in ``max`` over the catalog order.
+        """
+        leader, lead = max(domain_counts.items(), key=lambda item: item[1])
+        if lead == 0:
+            return None
+        leader_seen = False
+        for domain, keywords in self._domain_lowered.items():
+            if domain == leader:
+                leader_seen = True
+                continue
+            ceiling = len(keywords)
+            if ceiling > lead or (ceiling == lead and not leader_seen):
+                return None
+        return leader
+
+    def _pair_matcher(self, domain: str) -> KeywordMatcher:
+        """Return a matcher for one domain's persona pair keywords, built on first use."""
+        matcher = self._pair_matchers.get(domain)
+        if matcher is None:
+            keywords = [k for pair in self._pair_lowered.get(domain, {}).values() for k in pair]
+            matcher = self._pair_matchers[domain] = KeywordMatcher(keywords)
+        return matcher
@@ -1,27 +1,216 @@
-"""Main entry point for the Counter-Pose MCP Server."""
+"""Main entry point for the Counter-Pose MCP Server.
 
+Importing this module only reads the configuration. The CounterPoseTool, the thread pool,
+and the FastMCP server (with FastMCP itself) are built on first use, by ``main()`` or by
+reading ``mcp``, ``counter_pose``, ``offloader``, or ``loop_lag`` from the module.
+"""
+
+import asyncio
+import copy
+import functools
+import signal
+import sys
+import threading
 import uuid
-from typing import List, Optional
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .config import ServerConfig
+from .http_transport import TRANSPORTS, RequestLimits
+from .metrics import ServerMetrics
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+
+    from .concurrency import LoopLagMonitor, Offloader
+    from .counter_pose_tool import CounterPoseTool
+    from .process_workers import ProcessWorkerPool
+    from .usage_log import UsageLogger
+
+T = TypeVar("T")
+
+config = ServerConfig.from_env()
+metrics = ServerMetrics(config.metrics_enabled, session_count=lambda: session_count())
+# Worker processes that run tool calls when COUNTER_POSE_PROCESS_WORKERS is set
+workers: Optional["ProcessWorkerPool"] = None
+# Request limits in front of the MCP server when it is served over HTTP
+http_limits: Optional[RequestLimits] = None
+
+# Built on first use by the getters below
+_counter_pose: Optional["CounterPoseTool"] = None
+_offloader: Optional["Offloader"] = None
+_loop_lag: Optional["LoopLagMonitor"] = None
+_mcp: Optional["FastMCP"] = None
+_build_lock = threading.RLock()
+
+
+def get_counter_pose() -> "CounterPoseTool":
+    """Return the server's CounterPoseTool, created with the configured session backend."""
+    global _counter_pose
+    if _counter_pose is None:
+        with _build_lock:
+            if _counter_pose is None:
+                from .counter_pose_tool import CounterPoseTool
+                from .session_store import create_session_store
+
+                _counter_pose = CounterPoseTool(sessions=create_session_store(config))
+    return _counter_pose
+
+
+def get_offloader() -> "Offloader":
+    """Return the thread pool that offloaded tool calls run on.
+
+    Large inputs, and every call when sessions are stored on disk, run on a bounded
+    thread pool so one slow request does not stall the event loop for the others.
+    """
+    global _offloader
+    if _offloader is None:
+        with _build_lock:
+            if _offloader is None:
+                from .concurrency import Offloader
 
-from fastmcp import FastMCP
+                _offloader = Offloader(
+                    workers=config.worker_threads,
+                    max_pending=config.max_offloaded_calls,
+                    threshold=config.offload_threshold,
+                    blocking_io=not get_counter_pose().sessions.resident,
+                )
+    return _offloader
+
+
+def get_loop_lag() -> "LoopLagMonitor":
+    """Return the event loop lag monitor."""
+    global _loop_lag
+    if _loop_lag is None:
+        with _build_lock:
+            if _loop_lag is None:
+                from .concurrency import LoopLagMonitor
+
+                _loop_lag = LoopLagMonitor(config.loop_lag_interval)
+    return _loop_lag
+
+
+async def run_tool(
+    function: Callable[..., T], *args: object, size: int = 0, offload: bool = False
+) -> T:
+    """Run a CounterPoseTool method from an async handler, offloading it if needed."""
+    get_loop_lag().ensure_started()
+    return await get_offloader().run(function, *args, size=size, offload=offload)
+
+
+async def run_session_tool(method: str, session_id: str, *args: object, size: int = 0) -> dict:
+    """Run a CounterPoseTool session method here, or on a worker process if there are any.
+
+    The event loop never waits for a session lock: a call small enough to run inline
+    takes its session's lock without blocking and holds it for the whole call, and if
+    an offloaded call holds the lock, it waits on the thread pool instead.
+    """
+    if workers is not None:
+        get_loop_lag().ensure_started()
+        return await workers.call(method, session_id, *args)
+    tool = get_counter_pose()
+    offloader = get_offloader()
+    function = getattr(tool, method)
+    if offloader.should_offload(size):
+        return await run_tool(function, session_id, *args, size=size)
+    lock = tool.sessions.session_lock(session_id)
+    if not lock.acquire(blocking=False):
+        return await run_tool(function, session_id, *args, offload=True)
+    try:
+        get_loop_lag().ensure_started()
+        return offloader.run_inline(function, session_id, *args)
+    finally:
+        lock.release()
+
+
+def call_slot(handler: Callable[..., Awaitable[dict]]) -> Callable[..., Awaitable[dict]]:
+    """Wrap a tool handler so each call holds an HTTP call slot while it runs.
+
+    Over SSE a request is answered before its call runs, so the request limit alone
+    does not bound the calls in flight. A call arriving with every slot taken is
+    answered with an error instead of queuing.
+    """
 
-from .counter_pose_tool import CounterPoseTool
+    @functools.wraps(handler)
+    async def wrapper(**arguments: object) -> dict:
+        limits = http_limits
+        if limits is None:
+            return await handler(**arguments)
+        if not limits.enter_call():
+            return {"error": "Server busy, retry shortly"}
+        try:
+            return await handler(**arguments)
+        finally:
+            limits.exit_call()
 
-# Create an instance of the CounterPoseTool
-counter_pose = CounterPoseTool()
+    return wrapper
 
-# Name the FastMCP instance 'mcp' to make it discoverable by the CLI
-mcp = FastMCP(
-    title="Counter-Pose MCP Server",
-    description=(
-        "An MCP server implementing the RPT (Reasoning-through-Perspective-Transition) "
-        "technique for structured reasoning validation"
-    ),
-)
 
+def session_count() -> int:
+    """Return the number of stored sessions, wherever they are stored."""
+    return workers.session_count() if workers is not None else len(get_counter_pose().sessions)
 
-@mcp.tool()
-def submit_reasoning(reasoning: str, session_id: Optional[str] = None) -> dict:
+
+def engine_error(engine: Optional[str]) -> Optional[str]:
+    """Return the error message for an unknown detection engine, or None if it is known."""
+    from .counter_pose_tool import DETECTION_ENGINES
+
+    if engine is None or engine in DETECTION_ENGINES:
+        return None
+    expected = " or ".join(f"'{name}'" for name in DETECTION_ENGINES)
+    return f"Unknown detection engine '{engine}'. Expected {expected}"
+
+
+def worker_tool(index: int, logger: "UsageLogger") -> "CounterPoseTool":
+    """Build the CounterPoseTool that worker process ``index`` serves calls with.
+
+    The worker reuses the catalog compiled before it was forked. With session
+    routing each worker holds its own share of the session limits.
+    """
+    from .counter_pose_tool import CounterPoseTool
+    from .session_store import create_session_store
+    from .tracing import Tracer
+
+    worker_config = copy.copy(config)
+    if config.process_routing == "session":
+        worker_config.max_sessions = -(-config.max_sessions // config.process_workers)
+        worker_config.max_session_bytes = -(-config.max_session_bytes // config.process_workers)
+    tool = CounterPoseTool(
+        sessions=create_session_store(worker_config),
+        logger=logger,
+        tracer=Tracer(trace_file=f"{config.trace_file}.worker{index}"),
+        catalog=get_counter_pose().catalog,
+    )
+    return tool
+
+
+def start_workers() -> "ProcessWorkerPool":
+    """Compile the catalog, then fork the worker processes that will share it."""
+    global workers
+    if config.process_routing == "shared" and config.session_backend != "sqlite":
+        raise ValueError(
+            "Shared process routing needs a session store every worker can reach; "
+            "set COUNTER_POSE_SESSION_BACKEND=sqlite"
+        )
+    from .process_workers import ProcessWorkerPool
+
+    tool = get_counter_pose()
+    tool.warm_up()
+    pool = ProcessWorkerPool(
+        worker_tool, config.process_workers, config.process_routing, logger=tool.logger
+    )
+    pool.start()
+    workers = pool
+    # Waiting on workers blocks, so calls still made here (metrics) leave the event loop
+    get_offloader().blocking_io = True
+    return pool
+
+
+@metrics.instrument
+@call_slot
+async def submit_reasoning(
+    reasoning: str, session_id: Optional[str] = None, engine: Optional[str] = None
+) -> dict:
     """Submit reasoning for Counter-Pose RPT analysis.
 
     The Counter-Pose tool implements the Reasoning-through-Perspective-Transition (RPT) technique
@@ -35,19 +224,108 @@ def submit_reasoning(reasoning: str, session_id: Optional[str] = None) -> dict:
     Args:
         reasoning: The initial reasoning to analyze
         session_id: Optional custom session ID (will be generated if not provided)
+        engine: Optional domain detection engine: "keyword" (keyword matches) or "ngram"
+            (character n-gram similarity, which also places text without keyword hits)
 
     Returns:
         A session object with domain detection, ranked persona options, and next step instructions.
     """
+    error = engine_error(engine)
+    if error is not None:
+        return {"error": error}
     # Generate session ID if not provided
     if not session_id:
         session_id = str(uuid.uuid4())
 
-    return counter_pose.submit_reasoning(session_id, reasoning)
+    return await run_session_tool(
+        "submit_reasoning", session_id, reasoning, engine, size=len(reasoning)
+    )
 
 
-@mcp.tool()
-def get_persona_guidance(session_id: str, persona_pair: List[str]) -> dict:
+@metrics.instrument
+@call_slot
+async def submit_reasoning_batch(
+    reasonings: List[str],
+    session_ids: Optional[List[Optional[str]]] = None,
+    engine: Optional[str] = None,
+) -> dict:
+    """Submit many reasoning texts for Counter-Pose RPT analysis in one call.
+
+    Equivalent to calling submit_reasoning once per text, but sessions are created and
+    usage is logged in bulk. Each returned session continues with get_persona_guidance.
+
+    Args:
+        reasonings: The reasoning texts to analyze
+        session_ids: Optional session IDs aligned with reasonings; missing or empty
+            entries are generated
+        engine: Optional domain detection engine, as for submit_reasoning
+
+    Returns:
+        The domain and ranked persona options for each session, in input order.
+    """
+    if len(reasonings) > config.max_batch_items:
+        return {
+            "error": f"Batch of {len(reasonings)} items exceeds the limit of "
+            f"{config.max_batch_items}"
+        }
+    if session_ids is None:
+        session_ids = [None] * len(reasonings)
+    elif len(session_ids) != len(reasonings):
+        return {"error": "session_ids must have the same length as reasonings"}
+    error = engine_error(engine)
+    if error is not None:
+        return {"error": error}
+
+    items = [
+        (session_id or str(uuid.uuid4()), reasoning)
+        for session_id, reasoning in zip(session_ids, reasonings)
+    ]
+    if workers is not None:
+        get_loop_lag().ensure_started()
+        return await workers.submit_reasoning_batch(items, engine)
+    size = sum(len(reasoning) for reasoning in reasonings)
+    return await run_tool(get_counter_pose().submit_reasoning_batch, items, engine, size=size)
+
+
+@metrics.instrument
+@call_slot
+async def append_reasoning(session_id: str, chunk: str, early_stop: bool = False) -> dict:
+    """Upload reasoning that is too large for one call, one chunk at a time.
+
+    The first chunk creates the session. Each call only scans the new chunk, and keywords
+    that span two chunks are still detected. Call finalize_reasoning after the last chunk.
+
+    Args:
+        session_id: The session to append to (created by the first chunk)
+        chunk: The next piece of reasoning text, in order
+        early_stop: On the first chunk, stop matching domain keywords once the leading
+            domain can no longer be overtaken
+
+    Returns:
+        Upload progress with the currently leading domain.
+    """
+    return await run_session_tool(
+        "append_reasoning", session_id, chunk, early_stop, size=len(chunk)
+    )
+
+
+@metrics.instrument
+@call_slot
+async def finalize_reasoning(session_id: str) -> dict:
+    """Finish a chunked upload and get ranked persona pair options.
+
+    Args:
+        session_id: The session the chunks were appended to
+
+    Returns:
+        The same domain detection and persona options as submit_reasoning.
+    """
+    return await run_session_tool("finalize_reasoning", session_id)
+
+
+@metrics.instrument
+@call_slot
+async def get_persona_guidance(session_id: str, persona_pair: List[str]) -> dict:
     """Get guidance for performing critique with selected personas.
 
     Args:
@@ -57,21 +335,22 @@ def get_persona_guidance(session_id: str, persona_pair: List[str]) -> dict:
     Returns:
         Guidance and formatting instructions for performing critiques with the selected personas
     """
-    return counter_pose.get_persona_guidance(session_id, persona_pair)
+    return await run_session_tool("get_persona_guidance", session_id, persona_pair)
 
 
-@mcp.tool()
-def submit_critique(
-    session_id: str, 
-    persona1_name: str, 
-    persona1_critique: str, 
-    persona2_name: str, 
-    persona2_critique: str
+@metrics.instrument
+@call_slot
+async def submit_critique(
+    session_id: str,
+    persona1_name: str,
+    persona1_critique: str,
+    persona2_name: str,
+    persona2_critique: str,
 ) -> dict:
     """Submit critiques from both selected personas.
 
-    This function expects exactly 2 persona critiques as determined by the get_persona_guidance step.
-    Both personas must match those selected in the previous step.
+    This function expects exactly 2 persona critiques as determined by the
+    get_persona_guidance step. Both personas must match those selected in the previous step.
 
     Args:
         session_id: The session ID from submit_reasoning
@@ -83,15 +362,215 @@ def submit_critique(
     Returns:
         Complete analysis with synthesis format guidance for the calling LLM
     """
-    return counter_pose.submit_critique(session_id, persona1_name, persona1_critique, persona2_name, persona2_critique)
+    return await run_session_tool(
+        "submit_critique",
+        session_id,
+        persona1_name,
+        persona1_critique,
+        persona2_name,
+        persona2_critique,
+        size=len(persona1_critique) + len(persona2_critique),
+    )
+
+
+@metrics.instrument
+@call_slot
+async def get_session_history(session_id: str, offset: int = 0, limit: int = 20) -> dict:
+    """Get the recorded steps of a session, such as submitted critiques.
+
+    Args:
+        session_id: The session ID from submit_reasoning
+        offset: Index of the first step to return
+        limit: Maximum number of steps to return
+
+    Returns:
+        The session's domain, personas, total step count, and the requested steps
+    """
+    return await run_session_tool("get_session_history", session_id, offset, limit)
+
+
+async def get_server_metrics(format: str = "json") -> dict:
+    """Get per-tool latency, payload size, and error metrics for this server.
+
+    Args:
+        format: "json" for a structured snapshot, or "openmetrics" for the OpenMetrics
+            text exposition format
+
+    Returns:
+        Call and error counts, latency and payload size percentiles for each tool, the
+        number of live sessions, worker pool usage, and event loop lag
+    """
+    if format == "openmetrics":
+        text = await run_tool(metrics.to_openmetrics)
+        return {"format": "openmetrics", "text": text}
+    if format != "json":
+        return {"error": f"Unknown metrics format '{format}'. Expected 'json' or 'openmetrics'"}
+    snapshot = await run_tool(metrics.snapshot)
+    snapshot["workers"] = get_offloader().stats()
+    snapshot["event_loop_lag"] = get_loop_lag().stats()
+    if workers is not None:
+        snapshot["processes"] = workers.stats()
+    if http_limits is not None:
+        snapshot["http"] = http_limits.stats()
+    return snapshot
+
+
+def reload_catalog_everywhere() -> dict:
+    """Reload the catalog file here and on every worker process, blocking until done."""
+    result = get_counter_pose().reload_catalog()
+    if workers is not None:
+        workers.command("reload_catalog", timeout=None)
+        result["processes"] = workers.size
+    return result
+
+
+async def reload_catalog() -> dict:
+    """Reload the persona catalog file without restarting the server.
+
+    Registered as a tool only when COUNTER_POSE_ADMIN_TOOLS is set. Sessions are kept;
+    calls already running finish on the previous catalog.
+
+    Returns:
+        The new and previous catalog versions, whether the content changed, the number of
+        domains and persona pairs, and the reload time
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, reload_catalog_everywhere)
+    except (OSError, RuntimeError, ValueError) as error:
+        return {"error": f"Catalog reload failed: {error}"}
+
+
+# Registered in this order by get_server
+TOOLS = [
+    submit_reasoning,
+    submit_reasoning_batch,
+    append_reasoning,
+    finalize_reasoning,
+    get_persona_guidance,
+    submit_critique,
+    get_session_history,
+    get_server_metrics,
+]
+
+
+def get_server() -> "FastMCP":
+    """Return the FastMCP server, importing FastMCP and registering the tools on first use."""
+    global _mcp
+    if _mcp is None:
+        with _build_lock:
+            if _mcp is None:
+                from fastmcp import FastMCP
+
+                server = FastMCP(
+                    title="Counter-Pose MCP Server",
+                    description=(
+                        "An MCP server implementing the RPT "
+                        "(Reasoning-through-Perspective-Transition) technique for "
+                        "structured reasoning validation"
+                    ),
+                )
+                for handler in TOOLS:
+                    server.tool()(handler)
+                if config.admin_tools:
+                    server.tool()(reload_catalog)
+                _mcp = server
+    return _mcp
+
+
+# Module attributes built on first access; 'mcp' keeps the server discoverable by the
+# FastMCP CLI
+LAZY_ATTRIBUTES: Dict[str, Callable[[], Any]] = {
+    "mcp": get_server,
+    "counter_pose": get_counter_pose,
+    "offloader": get_offloader,
+    "loop_lag": get_loop_lag,
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401 - the attributes differ in type
+    """Build ``mcp``, ``counter_pose``, ``offloader``, or ``loop_lag`` when first read."""
+    try:
+        getter = LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getter()
+
+
+def reload_on_sighup() -> None:
+    """Reload the catalog on SIGHUP, on a background thread so no request waits for it."""
+
+    def reload() -> None:
+        try:
+            result = reload_catalog_everywhere()
+        except (OSError, RuntimeError, ValueError) as error:
+            print(f"Catalog reload failed: {error}", file=sys.stderr)
+            return
+        print(
+            f"Reloaded catalog {result['catalog_file']} (version {result['catalog_version']}) "
+            f"in {result['reload_seconds'] * 1000:.1f} ms",
+            file=sys.stderr,
+        )
+
+    def handle(signum: int, frame: Optional[FrameType]) -> None:
+        threading.Thread(target=reload, name="counter-pose-reload", daemon=True).start()
+
+    signal.signal(signal.SIGHUP, handle)
 
 
 # complete_analysis function removed - synthesis now handled by submit_critique
 
 
-def main() -> None:
-    """Run the FastMCP application."""
-    mcp.run()
+def serve_http(transport: str) -> None:
+    """Serve the MCP server over Streamable HTTP or SSE until interrupted."""
+    global http_limits
+    from .http_transport import create_app, serve
+
+    http_limits = create_app(
+        get_server(),
+        transport,
+        path=config.http_path,
+        max_body_bytes=config.http_max_body_bytes,
+        max_concurrent_requests=config.http_max_concurrent_requests,
+    )
+    serve(
+        http_limits,
+        host=config.http_host,
+        port=config.http_port,
+        keep_alive=config.http_keep_alive,
+        shutdown_timeout=0 if transport == "sse" else None,
+    )
+
+
+def main(transport: Optional[str] = None) -> None:
+    """Run the FastMCP application over stdio, or over HTTP for many clients at once."""
+    transport = transport or config.transport
+    if transport not in TRANSPORTS:
+        raise ValueError(f"transport must be one of {TRANSPORTS}, got {transport!r}")
+    tool = get_counter_pose()
+    if config.process_workers > 0:
+        # Workers must be forked before any other thread starts
+        start_workers()
+    else:
+        # Compile the catalog while FastMCP is imported and the client is still connecting
+        threading.Thread(target=tool.warm_up, name="counter-pose-warm-up", daemon=True).start()
+    server = get_server()
+    if config.catalog_file and hasattr(signal, "SIGHUP"):
+        reload_on_sighup()
+    try:
+        if transport == "stdio":
+            server.run()
+        else:
+            serve_http(transport)
+    finally:
+        # Write out buffered usage lines and release session storage on shutdown
+        if workers is not None:
+            workers.close()
+        get_offloader().close()
+        tool.logger.close()
+        tool.tracer.close()
+        tool.sessions.close()
+        tool.blob_store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+"""Per-tool latency, payload size, and error metrics for the MCP tool handlers."""
+
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from .histogram import Histogram
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Distinct error strings kept per tool; further ones are counted under OTHER_ERRORS
+MAX_ERROR_KINDS = 64
+OTHER_ERRORS = "other"
+
+# Fixed OpenMetrics bucket bounds, so every tool exposes the same series
+LATENCY_BOUNDS_SECONDS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+SIZE_BOUNDS_BYTES = tuple(4**power for power in range(3, 14))  # 64 B to 64 MiB
+
+
+def payload_bytes(value: object) -> int:
+    """Approximate the JSON-encoded size of a tool argument or result.
+
+    Strings count their UTF-8 length without escapes or quotes, which keeps the cost
+    to one scan of non-ASCII text and nothing for ASCII beyond ``str.isascii``.
+    """
+    if isinstance(value, str):
+        return len(value) if value.isascii() else len(value.encode("utf-8", "surrogatepass"))
+    if isinstance(value, dict):
+        return sum(len(str(key)) + payload_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_bytes(item) for item in value)
+    if value is None:
+        return 4
+    return len(str(value))
+
+
+class ToolMetrics:
+    """Counters and histograms for one tool.
+
+    Latencies are recorded in microseconds and payload sizes in bytes, both in
+    HDR-style histograms whose memory does not grow with the number of calls.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.error_counts: Dict[str, int] = {}
+        self.latency_us = Histogram()
+        self.request_bytes = Histogram()
+        self.response_bytes = Histogram()
+        self.lock = threading.Lock()
+
+    def record(self, elapsed_us: int, request: int, response: int, error: Optional[str]) -> None:
+        """Record one call."""
+        with self.lock:
+            self.calls += 1
+            self.latency_us.record(elapsed_us)
+            self.request_bytes.record(request)
+            self.response_bytes.record(response)
+            if error is not None:
+                self.errors += 1
+                if error not in self.error_counts and len(self.error_counts) >= MAX_ERROR_KINDS:
+                    error = OTHER_ERRORS
+                self.error_counts[error] = self.error_counts.get(error, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return call and error counts with latency and size percentiles."""
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_counts": dict(self.error_counts),
+                "latency_ms": _summary(self.latency_us, 1000),
+                "request_bytes": _summary(self.request_bytes),
+                "response_bytes": _summary(self.response_bytes),
+            }
+
+
+def _summary(histogram: Histogram, scale: float = 1) -> Dict[str, float]:
+    def value(raw: float) -> float:
+        return round(raw / scale, 3) if scale != 1 else raw
+
+    return {
+        "p50": value(histogram.percentile(50)),
+        "p95": value(histogram.percentile(95)),
+        "p99": value(histogram.percentile(99)),
+        "mean": value(round(histogram.mean(), 1)),
+        "max": value(histogram.max),
+    }
+
+
+def _error_key(error: str, arguments: Dict[str, Any]) -> str:
+    """Replace the caller's session ID in an error message so messages group together."""
+    session_id = arguments.get("session_id")
+    if isinstance(session_id, str) and session_id and session_id in error:
+        return error.replace(session_id, "<session_id>")
+    return error
+
+
+class ServerMetrics:
+    """Registry of per-tool metrics with an instrumenting decorator.
+
+    When disabled, ``instrument`` returns handlers unchanged, so metrics cost nothing
+    on the request path.
+    """
+
+    def __init__(
+        self, enabled: bool = True, session_count: Optional[Callable[[], int]] = None
+    ) -> None:
+        self.enabled = enabled
+        self.session_count = session_count
+        self.started = time.monotonic()
+        self.tools: Dict[str, ToolMetrics] = {}
+
+    def instrument(self, handler: F) -> F:
+        """Wrap a keyword-argument tool handler to record each call."""
+        if not self.enabled:
+            return handler
+        metrics = self.tools.setdefault(handler.__name__, ToolMetrics(handler.__name__))
+
+        def finish(start: int, arguments: Dict[str, Any], result: object) -> None:
+            elapsed = (time.perf_counter_ns() - start) // 1000
+            error = result.get("error") if isinstance(result, dict) else None
+            if error is not None:
+                error = _error_key(str(error), arguments)
+            metrics.record(elapsed, payload_bytes(arguments), payload_bytes(result), error)
+
+        def fail(start: int, arguments: Dict[str, Any], exc: Exception) -> None:
+            elapsed = (time.perf_counter_ns() - start) // 1000
+            error = _error_key(f"{type(exc).__name__}: {exc}", arguments)
+            metrics.record(elapsed, payload_bytes(arguments), 0, error)
+
+        if inspect.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def async_wrapper(**arguments: object) -> object:
+                start = time.perf_counter_ns()
+                try:
+                    result = await handler(**arguments)
+                except Exception as exc:
+                    fail(start, arguments, exc)
+                    raise
+                finish(start, arguments, result)
+                return result
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(handler)
+        def wrapper(**arguments: object) -> object:
+            start = time.perf_counter_ns()
+            try:
+                result = handler(**arguments)
+            except Exception as exc:
+                fail(start, arguments, exc)
+                raise
+            finish(start, arguments, result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    def live_sessions(self) -> Optional[int]:
+        return self.session_count() if self.session_count is not None else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every tool's metrics with uptime and the live session count."""
+        return {
+            "enabled": self.enabled,
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "live_sessions": self.live_sessions(),
+            "tools": {name: metrics.to_dict() for name, metrics in sorted(self.tools.items())},
+        }
+
+    def to_openmetrics(self, prefix: str = "counter_pose") -> str:
+        """Render the metrics in the OpenMetrics text exposition format.
+
+        Histogram buckets use fixed bounds. Each recorded value is attributed to the
+        bound above its HDR bucket, which is within the histogram's relative error.
+        """
+        lines: List[str] = []
+        tools = sorted(self.tools.items())
+
+        def family(name: str, kind: str, help_text: str, unit: str = "") -> str:
+            full = f"{prefix}_{name}"
+            lines.append(f"# TYPE {full} {kind}")
+            if unit:
+                lines.append(f"# UNIT {full} {unit}")
+            lines.append(f"# HELP {full} {help_text}")
+            return full
+
+        name = family("tool_calls", "counter", "Tool calls handled.")
+        for tool, metrics in tools:
+            lines.append(f'{name}_total{{tool="{tool}"}} {metrics.calls}')
+
+        name = family("tool_errors", "counter", "Tool calls that returned an error.")
+        for tool, metrics in tools:
+            with metrics.lock:
+                errors = sorted(metrics.error_counts.items())
+            for error, count in errors:
+                lines.append(f'{name}_total{{tool="{tool}",error="{_escape(error)}"}} {count}')
+
+        histograms: Sequence[Tuple[str, str, str, str, Sequence[float], float]] = (
+            ("tool_latency_seconds", "latency_us", "Tool call latency.", "seconds",
+             LATENCY_BOUNDS_SECONDS, 1e-6),
+            ("tool_request_bytes", "request_bytes", "Approximate request payload size.",
+             "bytes", SIZE_BOUNDS_BYTES, 1),
+            ("tool_response_bytes", "response_bytes", "Approximate response payload size.",
+             "bytes", SIZE_BOUNDS_BYTES, 1),
+        )  # fmt: skip
+        for metric, attribute, help_text, unit, bounds, scale in histograms:
+            name = family(metric, "histogram", help_text, unit)
+            for tool, metrics in tools:
+                with metrics.lock:
+                    histogram: Histogram = getattr(metrics, attribute)
+                    buckets = list(histogram.iter_buckets())
+                    count, total = histogram.count, histogram.total
+                cumulative, index = 0, 0
+                for bound in bounds:
+                    while index < len(buckets) and buckets[index][0] * scale <= bound:
+                        cumulative += buckets[index][1]
+                        index += 1
+                    lines.append(f'{name}_bucket{{tool="{tool}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{tool="{tool}",le="+Inf"}} {count}')
+                lines.append(f'{name}_count{{tool="{tool}"}} {count}')
+                lines.append(f'{name}_sum{{tool="{tool}"}} {_number(total * scale)}')
+
+        live = self.live_sessions()
+        if live is not None:
+            name = family("live_sessions", "gauge", "Sessions currently stored.")
+            lines.append(f"{name} {live}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(round(value, 6))
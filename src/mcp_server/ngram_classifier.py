@@ -0,0 +1,173 @@
+"""Domain detection and persona pair ranking by hashed character n-gram similarity.
+
+An alternative to keyword presence that also scores text without a literal keyword
+hit. Requires NumPy (``pip install counter-pose-mcp[batch]``).
+"""
+
+import re
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analysis_cache import Analysis
+
+# Vectors have 2**NGRAM_BITS hashed buckets whatever the catalog size
+NGRAM_BITS = 16
+NGRAM_SIZES = (3, 4, 5)
+# Only the start of longer texts is featurized, which bounds the time per text
+NGRAM_MAX_BYTES = 256 * 1024
+
+_SEPARATORS = re.compile(r"[\W_]+")
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def ngram_buckets(text: str, bits: int = NGRAM_BITS) -> np.ndarray:
+    """Return the hashed bucket of every character n-gram of ``text``.
+
+    Text is lowercased with runs of punctuation and whitespace folded to one space, so
+    n-grams also span word boundaries.
+    """
+    # A character takes at least one byte, so slicing first keeps normalizing bounded too
+    text = text[:NGRAM_MAX_BYTES]
+    normalized = " " + _SEPARATORS.sub(" ", text.lower()).strip() + " "
+    data = np.frombuffer(normalized.encode("utf-8")[:NGRAM_MAX_BYTES], np.uint8)
+    data = data.astype(np.uint64)
+    buckets = [np.zeros(0, np.intp)]
+    with np.errstate(over="ignore"):
+        for size in NGRAM_SIZES:
+            count = len(data) - size + 1
+            if count <= 0:
+                continue
+            # Polynomial hash of each window, wrapping at 64 bits, seeded by gram length
+            hashes = np.full(count, size, np.uint64)
+            for offset in range(size):
+                hashes = hashes * _HASH_MULTIPLIER + data[offset : offset + count]
+            buckets.append(((hashes * _HASH_MIX) >> np.uint64(64 - bits)).astype(np.intp))
+    return np.concatenate(buckets)
+
+
+def featurize(text: str, bits: int = NGRAM_BITS) -> np.ndarray:
+    """Return the hashed character n-gram counts of ``text``, damped with ``log1p``."""
+    counts = np.bincount(ngram_buckets(text, bits), minlength=1 << bits)
+    return np.log1p(counts).astype(np.float32)
+
+
+def seed_corpus(
+    domain_keywords: Mapping[str, Sequence[str]],
+    persona_pairs: Mapping[str, Sequence[Tuple[str, str]]],
+    persona_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+    guidance: Mapping[str, str],
+) -> Tuple[Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]:
+    """Build training texts per domain and per ``(domain, pair_key)`` from the catalog.
+
+    A pair's texts are its keywords, its persona names, and their critique guidance;
+    a domain's are its name, its own keywords, and the texts of all its pairs.
+    """
+    pair_texts: Dict[Tuple[str, str], List[str]] = {}
+    for domain, pairs in persona_keywords.items():
+        for pair_key, keywords in pairs.items():
+            personas = pair_key.split(",")
+            texts = list(keywords) + personas
+            texts.extend(guidance[p.lower()] for p in personas if p.lower() in guidance)
+            pair_texts[(domain, pair_key)] = texts
+    domain_texts: Dict[str, List[str]] = {}
+    for domain, keywords in domain_keywords.items():
+        texts = [domain.replace("_", " ")] + list(keywords)
+        for pair in persona_pairs.get(domain, ()):
+            texts.extend(pair_texts.get((domain, ",".join(pair)), ()))
+        domain_texts[domain] = texts
+    return domain_texts, pair_texts
+
+
+class NgramClassifier:
+    """Scores text by cosine similarity to per-domain and per-pair seed corpus vectors.
+
+    Each domain and persona pair is represented by the n-gram vector of its seed texts,
+    with every bucket weighted by how few domains use it. A text is featurized once and
+    scored against every domain, then against its domain's pairs, with one matrix-vector
+    product each, so the cost does not grow with the number of keywords. Text with no
+    n-grams falls back to ``default_domain`` (the first domain unless given), and ties
+    go to the domain or pair listed first, as with keyword matching.
+    """
+
+    def __init__(
+        self,
+        domain_keywords: Mapping[str, Sequence[str]],
+        persona_pairs: Mapping[str, Sequence[Tuple[str, str]]],
+        persona_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+        guidance: Mapping[str, str],
+        default_domain: Optional[str] = None,
+    ) -> None:
+        domain_texts, pair_texts = seed_corpus(
+            domain_keywords, persona_pairs, persona_keywords, guidance
+        )
+        self.domains: Tuple[str, ...] = tuple(domain_keywords)
+        self.default_domain = default_domain or next(iter(self.domains), "")
+        corpora = {domain: featurize(" . ".join(domain_texts[domain])) for domain in self.domains}
+
+        # Inverse domain frequency of each bucket
+        frequency = np.zeros(1 << NGRAM_BITS, np.float32)
+        for vector in corpora.values():
+            frequency += vector > 0
+        self.weights = np.log((1 + len(self.domains)) / (1 + frequency)).astype(np.float32) + 1
+
+        self.domain_vectors = self._stack([corpora[domain] for domain in self.domains])
+        self.pairs: Dict[str, List[Tuple[str, str]]] = {}
+        self.pair_vectors: Dict[str, np.ndarray] = {}
+        for domain, pairs in persona_pairs.items():
+            ordered = [(a, b) for a, b in pairs if (domain, f"{a},{b}") in pair_texts]
+            self.pairs[domain] = ordered
+            self.pair_vectors[domain] = self._stack(
+                [featurize(" . ".join(pair_texts[(domain, f"{a},{b}")])) for a, b in ordered]
+            )
+
+    def _stack(self, vectors: List[np.ndarray]) -> np.ndarray:
+        """Weight featurized counts and stack them as unit-length rows."""
+        matrix = np.zeros((len(vectors), len(self.weights)), np.float32)
+        for row, vector in enumerate(vectors):
+            weighted = vector * self.weights
+            norm = float(np.linalg.norm(weighted))
+            matrix[row] = weighted / norm if norm else weighted
+        return matrix
+
+    def embed(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the buckets used by ``text`` and its weighted, unit-length values there.
+
+        Short texts use a small fraction of the buckets, so only those are scored.
+        """
+        buckets = ngram_buckets(text)
+        if len(buckets) * 4 < len(self.weights):
+            index, counts = np.unique(buckets, return_counts=True)
+        else:
+            all_counts = np.bincount(buckets, minlength=len(self.weights))
+            index = np.flatnonzero(all_counts)
+            counts = all_counts[index]
+        values = np.log1p(counts).astype(np.float32) * self.weights[index]
+        norm = float(np.linalg.norm(values))
+        return index, values / norm if norm else values
+
+    def analyze(self, text: str) -> Analysis:
+        """Return the most similar domain and its persona pairs ranked by similarity."""
+        index, values = self.embed(text)
+        domain = self.default_domain
+        if self.domains and len(index):
+            scores = self.domain_vectors[:, index] @ values
+            best = int(scores.argmax())
+            if scores[best] > 0:
+                domain = self.domains[best]
+        ranked_pairs = []
+        pairs = self.pairs.get(domain, [])
+        if pairs:
+            # Rounded so that near-identical similarities tie and keep catalog order
+            similarities = self.pair_vectors[domain][:, index] @ values
+            similarities = np.round(similarities.astype(np.float64), 3)
+            for position in np.argsort(-similarities, kind="stable").tolist():
+                score = float(similarities[position])
+                reason = (
+                    f"Character n-gram similarity {score:.3f}"
+                    if score > 0
+                    else "General domain fit"
+                )
+                ranked_pairs.append((pairs[position], score, reason))
+        return domain, ranked_pairs
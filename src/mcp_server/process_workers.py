@@ -0,0 +1,458 @@
+"""Forked worker processes that run CounterPoseTool calls on every core of one host."""
+
+import asyncio
+import gc
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .usage_log import UsageLogger
+
+if TYPE_CHECKING:
+    from .counter_pose_tool import CounterPoseTool
+
+ROUTING_MODES = ("session", "shared")
+
+# CounterPoseTool methods a worker runs; each takes a session ID (or batch items) first
+WORKER_METHODS = frozenset(
+    {
+        "submit_reasoning",
+        "submit_reasoning_batch",
+        "append_reasoning",
+        "finalize_reasoning",
+        "get_persona_guidance",
+        "submit_critique",
+        "get_session_history",
+    }
+)
+
+# Requests about the worker itself rather than one session
+WORKER_COMMANDS: Dict[str, Callable[["CounterPoseTool"], Any]] = {
+    "session_count": lambda tool: len(tool.sessions),
+    "stats": lambda tool: {"pid": os.getpid(), "sessions": tool.sessions.stats()},
+    "reload_catalog": lambda tool: tool.reload_catalog(),
+}
+
+ToolFactory = Callable[[int, UsageLogger], "CounterPoseTool"]
+
+# Seconds before replacing a worker that exited without answering a call, doubling for
+# each such exit in a row up to the maximum, so a worker that cannot start is not
+# forked in a tight loop
+RESPAWN_DELAY = 0.1
+RESPAWN_MAX_DELAY = 30.0
+
+
+class ForwardingUsageLogger(UsageLogger):
+    """Usage logger for worker processes that hands its lines back to the server process.
+
+    Lines are collected until the current call finishes and travel back with its
+    response, so only the server process writes and rotates the usage log.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(log_file=os.devnull)
+        self._pending: List[str] = []
+
+    def enqueue(self, line: Union[str, List[str]]) -> bool:
+        with self._lock:
+            if isinstance(line, str):
+                self._pending.append(line)
+            else:
+                self._pending.extend(line)
+        return True
+
+    def drain(self) -> List[str]:
+        """Return and forget the lines logged since the last call."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+        return lines
+
+
+def _serve(conn: Connection, inherited: List[Connection], factory: ToolFactory, index: int) -> None:
+    """Worker process main loop: run calls from ``conn`` one at a time until told to stop."""
+    # The server process decides when workers stop, including on Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGHUP"):
+        # Catalog reloads reach workers as a command from the server process
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    # Pipe ends copied by fork keep other workers from seeing the server exit
+    for other in inherited:
+        other.close()
+    logger = ForwardingUsageLogger()
+    tool = factory(index, logger)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            call_id, method, args = message
+            result, error = None, None
+            try:
+                command = WORKER_COMMANDS.get(method)
+                result = command(tool) if command is not None else getattr(tool, method)(*args)
+            except Exception as exc:  # noqa: BLE001 - reported to the caller
+                error = f"{type(exc).__name__}: {exc}"
+            conn.send((call_id, result, error, logger.drain()))
+    finally:
+        tool.tracer.close()
+        tool.sessions.close()
+        tool.blob_store.close()
+
+
+class _Worker:
+    """Server-side handle for one worker process."""
+
+    def __init__(
+        self, index: int, process: BaseProcess, conn: Connection, restarts: int = 0
+    ) -> None:
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.outbox: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        # Calls sent and not yet answered: call ID -> (future, session IDs)
+        self.pending: Dict[int, Tuple[Future, Tuple[str, ...]]] = {}
+        self.calls = 0
+        self.answered = 0
+        self.restarts = restarts
+        # Exits in a row without answering a call, which delay the next replacement
+        self.failures = 0
+        self.alive = True
+        self.threads: List[threading.Thread] = []
+
+
+class ProcessWorkerPool:
+    """Runs CounterPoseTool calls on forked worker processes, one call at a time each.
+
+    Everything expensive to build, such as the compiled keyword catalog, is built by
+    the server process before ``start`` forks the workers, so they share those pages
+    copy-on-write instead of building their own. ``factory(index, logger)`` runs in
+    each worker to build the tool that serves its calls. Usage lines the worker logs
+    come back with each response and are written by ``logger`` in the server process.
+
+    With ``routing="session"`` a session lives on the worker its ID hashes to, and
+    every call for it goes there. With ``routing="shared"`` the workers share one
+    session store on disk, so a call goes to the least busy worker; calls for a
+    session that already has a call in flight follow it to the same worker, which
+    keeps calls on one session in order.
+
+    A worker that exits is replaced. Calls it had not answered fail at once, as do
+    calls routed to it until the replacement is running; sessions it held in memory are
+    lost. By then the server process runs many threads, and a fork copies only the one
+    that calls it, so a lock another thread holds would stay locked in the child.
+    Replacements are therefore started by a ``forkserver``: a fresh single-threaded
+    process that forks them. They import the package and build their tool, catalog
+    included, themselves instead of sharing the server's pages; where forkserver is
+    unavailable they are spawned.
+    """
+
+    def __init__(
+        self,
+        factory: ToolFactory,
+        workers: int,
+        routing: str = "session",
+        logger: Optional[UsageLogger] = None,
+    ) -> None:
+        if routing not in ROUTING_MODES:
+            raise ValueError(f"routing must be one of {ROUTING_MODES}, got {routing!r}")
+        self.factory = factory
+        self.size = max(1, workers)
+        self.routing = routing
+        self.logger = logger
+        self._workers: List[_Worker] = []
+        # Sessions with calls in flight under shared routing: ID -> [worker, calls]
+        self._active: Dict[str, List[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._context: Any = None
+        self._respawn_context: Any = None
+
+    def start(self) -> None:
+        """Fork the worker processes and start the threads that talk to them.
+
+        Call this before the server starts other threads; forking copies only the
+        calling thread, so locks held elsewhere at that moment stay locked in the
+        workers.
+        """
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._respawn_context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        # Move everything allocated so far out of the collector's reach, so its scans
+        # do not write to (and un-share) the pages the workers inherit
+        gc.freeze()
+        for index in range(self.size):
+            self._workers.append(self._spawn(index, [worker.conn for worker in self._workers]))
+        for worker in self._workers:
+            self._start_threads(worker)
+
+    def _spawn(
+        self,
+        index: int,
+        parent_ends: List[Connection],
+        restarts: int = 0,
+        context: Optional[BaseContext] = None,
+    ) -> _Worker:
+        """Start worker process ``index``; ``parent_ends`` are the other workers' pipes.
+
+        ``context`` is the multiprocessing context to start it with, by default the
+        one ``start`` forks the first workers with.
+        """
+        context = context or self._context
+        parent_end, child_end = context.Pipe()
+        inherited = parent_ends + [parent_end] if context.get_start_method() == "fork" else []
+        process = context.Process(
+            target=_serve,
+            args=(child_end, inherited, self.factory, index),
+            name=f"counter-pose-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_end.close()
+        return _Worker(index, process, parent_end, restarts)
+
+    def _start_threads(self, worker: _Worker) -> None:
+        for target, role in ((self._send_loop, "send"), (self._receive_loop, "receive")):
+            thread = threading.Thread(
+                target=target,
+                args=(worker,),
+                name=f"counter-pose-worker-{worker.index}-{role}",
+                daemon=True,
+            )
+            thread.start()
+            worker.threads.append(thread)
+
+    def _respawn(self, dead: _Worker) -> None:
+        """Replace a worker that exited, unless the pool is closing."""
+        failures = 0 if dead.answered else dead.failures + 1
+        if failures:
+            time.sleep(min(RESPAWN_MAX_DELAY, RESPAWN_DELAY * 2 ** (failures - 1)))
+        with self._lock:
+            if self._closed:
+                return
+            parent_ends = [worker.conn for worker in self._workers if worker is not dead]
+        replacement = self._spawn(
+            dead.index, parent_ends, dead.restarts + 1, context=self._respawn_context
+        )
+        replacement.failures = failures
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._workers[dead.index] = replacement
+        if closed:
+            replacement.conn.close()
+            replacement.process.join()
+            return
+        self._start_threads(replacement)
+
+    def worker_for(self, session_id: str) -> int:
+        """Return the worker that owns ``session_id`` under session routing.
+
+        CRC32 rather than ``hash`` keeps the choice independent of the session store's
+        own sharding, which would otherwise leave most shards of each worker unused.
+        """
+        return zlib.crc32(session_id.encode("utf-8", "surrogatepass")) % self.size
+
+    def submit(self, method: str, session_id: str, *args: object) -> Future:
+        """Send ``CounterPoseTool.<method>(session_id, *args)`` to a worker."""
+        if method not in WORKER_METHODS:
+            raise ValueError(f"Workers do not run {method!r}")
+        with self._lock:
+            index = self._assign([session_id])[0]
+            return self._send(index, method, (session_id,) + args, (session_id,))
+
+    async def call(self, method: str, session_id: str, *args: object) -> Dict:
+        """Run ``CounterPoseTool.<method>(session_id, *args)`` on a worker and await it."""
+        return await asyncio.wrap_future(self.submit(method, session_id, *args))
+
+    async def submit_reasoning_batch(
+        self, items: List[Tuple[str, str]], engine: Optional[str] = None
+    ) -> Dict:
+        """Split a batch between workers by session, and merge their results in order."""
+        groups: Dict[int, List[int]] = {}
+        with self._lock:
+            for position, index in enumerate(self._assign([item[0] for item in items])):
+                groups.setdefault(index, []).append(position)
+            futures = [
+                self._send(
+                    index,
+                    "submit_reasoning_batch",
+                    ([items[position] for position in positions], engine),
+                    tuple(items[position][0] for position in positions),
+                )
+                for index, positions in (groups.items() or [(0, [])])
+            ]
+        responses = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        results: List[Any] = [None] * len(items)
+        for positions, response in zip(groups.values(), responses):
+            for position, result in zip(positions, response["results"]):
+                results[position] = result
+        return {**responses[0], "count": len(results), "results": results}
+
+    def command(self, name: str, timeout: Optional[float] = 10.0) -> List[Any]:
+        """Run a worker command on every live worker and return their answers."""
+        return self._command(name, self.size, timeout)
+
+    def session_count(self) -> int:
+        """Return the number of stored sessions across the workers."""
+        if self.routing == "shared":
+            # Every worker sees the same store, so one of them is asked
+            return sum(self._command("session_count", 1))
+        return sum(self._command("session_count", self.size))
+
+    def _command(self, name: str, limit: int, timeout: Optional[float] = 10.0) -> List[Any]:
+        if name not in WORKER_COMMANDS:
+            raise ValueError(f"Unknown worker command {name!r}")
+        with self._lock:
+            live = [worker.index for worker in self._workers if worker.alive][:limit]
+            futures = [self._send(index, name, (), ()) for index in live]
+        return [future.result(timeout) for future in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-worker process IDs, call counts, calls in flight, and restarts."""
+        with self._lock:
+            workers = [
+                {
+                    "pid": worker.process.pid,
+                    "alive": worker.alive,
+                    "calls": worker.calls,
+                    "in_flight": len(worker.pending),
+                    "restarts": worker.restarts,
+                }
+                for worker in self._workers
+            ]
+        return {"processes": self.size, "routing": self.routing, "workers": workers}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Let the workers finish the calls already sent, then stop them."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.outbox.put(None)
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(timeout)
+            for thread in worker.threads:
+                thread.join(timeout)
+            worker.conn.close()
+
+    def _assign(self, session_ids: Sequence[str]) -> List[int]:
+        """Pick a worker for each session; the caller holds ``self._lock``."""
+        if self.routing == "session":
+            return [self.worker_for(session_id) for session_id in session_ids]
+        live = [worker for worker in self._workers if worker.alive] or self._workers
+        # A single call goes to the least busy worker; a batch is spread over all of them
+        live.sort(key=lambda worker: len(worker.pending))
+        indexes = []
+        for position, session_id in enumerate(session_ids):
+            active = self._active.get(session_id)
+            if active is None:
+                index = live[position * len(live) // len(session_ids)].index
+                active = self._active[session_id] = [index, 0]
+            active[1] += 1
+            indexes.append(active[0])
+        return indexes
+
+    def _release(self, session_ids: Sequence[str]) -> None:
+        """Forget finished calls' sessions; the caller holds ``self._lock``."""
+        if self.routing != "shared":
+            return
+        for session_id in session_ids:
+            active = self._active.get(session_id)
+            if active is not None:
+                active[1] -= 1
+                if active[1] <= 0:
+                    del self._active[session_id]
+
+    def _send(
+        self, index: int, method: str, args: Tuple[Any, ...], session_ids: Tuple[str, ...]
+    ) -> Future:
+        """Queue a call for a worker; the caller holds ``self._lock``."""
+        future: Future = Future()
+        # Running futures cannot be cancelled, so an answer can always be delivered
+        future.set_running_or_notify_cancel()
+        worker = self._workers[index] if self._workers else None
+        if self._closed or worker is None or not worker.alive:
+            self._release(session_ids)
+            state = "closed" if self._closed else "not running; it is being restarted"
+            future.set_exception(RuntimeError(f"Worker {index} is {state}"))
+            return future
+        call_id = next(self._ids)
+        worker.pending[call_id] = (future, session_ids)
+        worker.calls += 1
+        worker.outbox.put((call_id, method, args))
+        return future
+
+    def _send_loop(self, worker: _Worker) -> None:
+        """Write queued calls to one worker's pipe, so large inputs never block callers."""
+        while True:
+            message = worker.outbox.get()
+            try:
+                worker.conn.send(message)
+            except OSError:
+                # The worker is gone; the receive loop fails its pending calls
+                return
+            except Exception as exc:  # noqa: BLE001 - arguments that cannot be pickled
+                self._finish(worker, message[0], None, f"{type(exc).__name__}: {exc}")
+                continue
+            if message is None:
+                return
+
+    def _receive_loop(self, worker: _Worker) -> None:
+        """Deliver one worker's answers to their callers until the worker exits."""
+        while True:
+            try:
+                call_id, result, error, lines = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            if lines and self.logger is not None:
+                self.logger.enqueue(lines)
+            worker.answered += 1
+            self._finish(worker, call_id, result, error)
+        with self._lock:
+            worker.alive = False
+            pending, worker.pending = worker.pending, {}
+            for _, session_ids in pending.values():
+                self._release(session_ids)
+            closed = self._closed
+        for future, _ in pending.values():
+            future.set_exception(RuntimeError(f"Worker {worker.index} exited"))
+        if closed:
+            return
+        # Stop the send loop, reap the process, and fork a replacement
+        worker.outbox.put(None)
+        worker.threads[0].join()
+        worker.conn.close()
+        worker.process.join()
+        self._respawn(worker)
+
+    def _finish(self, worker: _Worker, call_id: int, result: object, error: Optional[str]) -> None:
+        with self._lock:
+            entry = worker.pending.pop(call_id, None)
+            if entry is None:
+                return
+            self._release(entry[1])
+        if error is None:
+            entry[0].set_result(result)
+        else:
+            entry[0].set_exception(RuntimeError(f"Worker {worker.index} failed: {error}"))
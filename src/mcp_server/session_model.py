@@ -0,0 +1,180 @@
+"""Compact building blocks for session state: codebooks, timestamps, and steps."""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from .blob_store import BlobRef
+
+# Names beyond this many per codebook are stored as plain strings instead of codes
+MAX_CODES = 65_536
+
+# Integer codes are 64-bit microseconds since the Unix epoch, read from the monotonic
+# clock anchored to wall time once at import, so they never step backwards
+_EPOCH_OFFSET_US = time.time_ns() // 1000 - time.monotonic_ns() // 1000
+
+
+def now_us() -> int:
+    """Return the current time as integer microseconds since the Unix epoch."""
+    return _EPOCH_OFFSET_US + time.monotonic_ns() // 1000
+
+
+def format_timestamp(stamp: Optional[int]) -> Optional[str]:
+    """Format integer microseconds as a local ISO 8601 string, like ``datetime.isoformat``."""
+    if stamp is None:
+        return None
+    seconds, micros = divmod(stamp, 1_000_000)
+    return (datetime.fromtimestamp(seconds) + timedelta(microseconds=micros)).isoformat()
+
+
+def parse_timestamp(text: Optional[str]) -> Optional[int]:
+    """Parse a local ISO 8601 string produced by ``format_timestamp`` back into microseconds."""
+    if text is None:
+        return None
+    moment = datetime.fromisoformat(text)
+    return int(moment.replace(microsecond=0).timestamp()) * 1_000_000 + moment.microsecond
+
+
+Code = Union[int, str]
+
+
+class Codebook:
+    """Process-wide mapping between names and small integer codes.
+
+    Codes let many sessions refer to the same domain or persona with one machine word.
+    Callers can supply arbitrary persona names, so once ``max_codes`` names are known
+    further names are kept as strings rather than growing the table without bound.
+    """
+
+    def __init__(self, max_codes: int = MAX_CODES) -> None:
+        self.max_codes = max_codes
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, name: str) -> Code:
+        """Return the code for ``name``, assigning one if there is room."""
+        code = self._codes.get(name)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self._codes.get(name)
+            if code is None:
+                if len(self._names) >= self.max_codes:
+                    return name
+                code = len(self._names)
+                self._names.append(name)
+                self._codes[name] = code
+            return code
+
+    def decode(self, code: Code) -> str:
+        """Return the name for a code produced by ``encode``."""
+        return code if isinstance(code, str) else self._names[code]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+DOMAINS = Codebook()
+PERSONAS = Codebook()
+STEP_TYPES = Codebook()
+
+
+class Step:
+    """One entry of a session's history.
+
+    Reads like the ``{"type", "persona", "content", "timestamp"}`` dict it replaces,
+    including ``dict(step)``, while storing the type and persona as codes and the
+    timestamp as integer microseconds. Content may live in a blob store, in which
+    case it is decoded each time it is read.
+    """
+
+    __slots__ = ("_type", "_persona", "_content", "_timestamp")
+
+    KEYS = ("type", "persona", "content", "timestamp")
+
+    def __init__(
+        self,
+        kind: str,
+        persona: Optional[str],
+        content: Union[str, None, "BlobRef"],
+        timestamp: Optional[int],
+    ) -> None:
+        self._type = STEP_TYPES.encode(kind)
+        self._persona = None if persona is None else PERSONAS.encode(persona)
+        self._content: Union[str, None, BlobRef] = content
+        self._timestamp = timestamp
+
+    @classmethod
+    def from_record(
+        cls, kind: str, persona: Optional[str], content: Optional[str], timestamp: Optional[str]
+    ) -> "Step":
+        """Build a step from stored fields with an ISO timestamp."""
+        return cls(kind, persona, content, parse_timestamp(timestamp))
+
+    @property
+    def type(self) -> str:
+        return STEP_TYPES.decode(self._type)
+
+    @property
+    def persona(self) -> Optional[str]:
+        return None if self._persona is None else PERSONAS.decode(self._persona)
+
+    @property
+    def content(self) -> Optional[str]:
+        content = self._content
+        if content is None or isinstance(content, str):
+            return content
+        return content.read()
+
+    @content.setter
+    def content(self, content: Union[str, None, "BlobRef"]) -> None:
+        self._content = content
+
+    @property
+    def timestamp(self) -> Optional[str]:
+        return format_timestamp(self._timestamp)
+
+    @property
+    def resident(self) -> bool:
+        """Whether the content is held in memory rather than in a blob store."""
+        return self._content is None or isinstance(self._content, str)
+
+    def resident_bytes(self) -> int:
+        """Return the memory held by the content, without reading spilled content."""
+        return sys.getsizeof(self._content)
+
+    def spill(self, store: Callable[[str], Union[str, "BlobRef"]]) -> None:
+        """Replace in-memory content with what ``store`` returns for it, such as a reference."""
+        if isinstance(self._content, str):
+            self._content = store(self._content)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.KEYS
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return getattr(self, key) if key in self.KEYS else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Step):
+            other = dict(other)
+        return isinstance(other, dict) and dict(self) == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Step({dict(self)!r})"
@@ -0,0 +1,483 @@
+"""Session storage for Counter-Pose sessions."""
+
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import ServerConfig
+from .session_model import Step
+
+if TYPE_CHECKING:
+    from .counter_pose_tool import CounterPoseSession
+
+# Lookup outcomes reported by SessionStore.lookup
+FOUND = "found"
+NOT_FOUND = "not_found"
+EXPIRED = "expired"
+EVICTED = "evicted"
+
+# Fixed per-session and per-step overhead used when estimating resident size
+SESSION_OVERHEAD_BYTES = 1024
+STEP_OVERHEAD_BYTES = 256
+# Per-domain and per-pair counters held while reasoning is uploaded in chunks
+MATCH_STATE_OVERHEAD_BYTES = 4096
+# Session IDs hash onto this many locks, which serialize operations on one session
+SESSION_LOCK_STRIPES = 256
+
+_session_locks_guard = threading.Lock()
+
+
+def estimate_session_bytes(session: "CounterPoseSession") -> int:
+    """Estimate the resident size of a session, dominated by its step contents."""
+    size = SESSION_OVERHEAD_BYTES + sys.getsizeof(session.session_id)
+    for step in session.iter_steps():
+        size += STEP_OVERHEAD_BYTES + step.resident_bytes()
+    state = session.reasoning_match
+    if state is not None:
+        size += MATCH_STATE_OVERHEAD_BYTES + sys.getsizeof(state.tail) + 64 * len(state.found)
+    return size
+
+
+def session_error(session_id: str, status: str) -> str:
+    """Return the error message reported for a failed session lookup."""
+    if status == EXPIRED:
+        return f"Session {session_id} expired after being idle too long"
+    if status == EVICTED:
+        return f"Session {session_id} expired (evicted to stay within session limits)"
+    return f"Session {session_id} not found"
+
+
+class SessionStore(ABC):
+    """Interface for session storage backends used by CounterPoseTool."""
+
+    # Whether sessions stay resident in process memory between calls, which is when
+    # moving large step contents out to a blob store saves memory
+    resident = True
+    _removal_listeners: Tuple[Callable[[str], None], ...] = ()
+    _session_locks: Tuple["threading.RLock", ...] = ()
+
+    def add_removal_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(session_id)`` whenever a stored session is removed or replaced.
+
+        Listeners run while the store holds its lock, so they must be quick and must
+        not call back into the store. Backends that cannot cheaply tell a replacement
+        from an insert may also call it for IDs that were not stored.
+        """
+        self._removal_listeners = self._removal_listeners + (listener,)
+
+    def _notify_removed(self, session_id: str) -> None:
+        for listener in self._removal_listeners:
+            listener(session_id)
+
+    def session_lock(self, session_id: str) -> "threading.RLock":
+        """Return the lock that serializes operations on one session.
+
+        Callers hold it across a lookup, the changes they make to the session, and
+        the ``update`` or ``append_steps`` that records them, so concurrent calls on
+        the same session see each other's changes whole. Locks are striped by session
+        ID, so unrelated sessions occasionally share one.
+        """
+        locks = self._session_locks
+        if not locks:
+            with _session_locks_guard:
+                if not self._session_locks:
+                    self._session_locks = tuple(
+                        threading.RLock() for _ in range(SESSION_LOCK_STRIPES)
+                    )
+                locks = self._session_locks
+        return locks[hash(session_id) % len(locks)]
+
+    @abstractmethod
+    def lookup(
+        self, session_id: str, load_steps: bool = True
+    ) -> Tuple[Optional["CounterPoseSession"], str]:
+        """Return the session and a lookup status (FOUND, NOT_FOUND, EXPIRED, EVICTED).
+
+        With ``load_steps`` false, backends may skip loading the step history; the
+        returned session then only holds steps appended through it.
+        """
+
+    @abstractmethod
+    def put(self, session: "CounterPoseSession") -> None:
+        """Insert or replace a session."""
+
+    def put_many(self, sessions: List["CounterPoseSession"]) -> None:
+        """Insert or replace several sessions; backends may do this in one operation."""
+        for session in sessions:
+            self.put(session)
+
+    @abstractmethod
+    def update(self, session: "CounterPoseSession") -> str:
+        """Record that a stored session was modified, returning a lookup status.
+
+        FOUND means the change was recorded. Any other status means the session was
+        removed since it was looked up (for example evicted or expired) and the change
+        was lost; callers report it like a failed lookup, with ``session_error``.
+        """
+
+    def append_steps(self, session: "CounterPoseSession", steps: List[Step]) -> str:
+        """Append steps to a stored session's history, returning a status like ``update``."""
+        session.steps.extend(steps)
+        return self.update(session)
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a session, returning whether it existed."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored sessions."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the stored session IDs."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters describing the store."""
+        return {"sessions": len(self)}
+
+    def close(self) -> None:  # noqa: B027 - optional hook, a no-op by default
+        """Release any resources held by the store."""
+
+    def get(
+        self, session_id: str, default: Optional["CounterPoseSession"] = None
+    ) -> Optional["CounterPoseSession"]:
+        """Return the session, or ``default`` if it is missing or expired."""
+        session, _ = self.lookup(session_id)
+        return session if session is not None else default
+
+    def __getitem__(self, session_id: str) -> "CounterPoseSession":
+        session, _ = self.lookup(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id: str, session: "CounterPoseSession") -> None:
+        self.put(session)
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self.get(session_id) is not None
+
+
+class _Entry:
+    """Bookkeeping for one stored session."""
+
+    __slots__ = ("session", "size", "last_access")
+
+    def __init__(self, session: "CounterPoseSession", size: int, last_access: float) -> None:
+        self.session = session
+        self.size = size
+        self.last_access = last_access
+
+
+class InMemorySessionStore(SessionStore):
+    """Bounded in-memory session store with LRU eviction and idle expiry.
+
+    Entries are kept in least-recently-used order, which is also idle-time order, so
+    expiry only ever inspects the oldest entries. A timer armed for the oldest entry's
+    deadline expires idle sessions even when no requests arrive.
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        background_expiry: bool = True,
+        max_tombstones: int = 10_000,
+    ) -> None:
+        config = ServerConfig.from_env()
+        self.max_sessions = config.max_sessions if max_sessions is None else max_sessions
+        self.max_bytes = config.max_session_bytes if max_bytes is None else max_bytes
+        self.idle_ttl = config.session_idle_ttl if idle_ttl is None else idle_ttl
+        self.clock = clock
+        self.background_expiry = background_expiry
+        self.max_tombstones = max_tombstones
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tombstones: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.expirations = 0
+
+    def lookup(
+        self, session_id: str, load_steps: bool = True
+    ) -> Tuple[Optional["CounterPoseSession"], str]:
+        """Return the session, refreshing its idle timer, and a lookup status."""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None, self._tombstones.get(session_id, NOT_FOUND)
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+            return entry.session, FOUND
+
+    def put(self, session: "CounterPoseSession") -> None:
+        """Insert or replace a session, evicting the least recently used if over budget."""
+        self.put_many([session])
+
+    def put_many(self, sessions: List["CounterPoseSession"]) -> None:
+        """Insert or replace sessions under one lock, enforcing limits once at the end."""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            for session in sessions:
+                self._remove(session.session_id)
+                self._tombstones.pop(session.session_id, None)
+                entry = _Entry(session, estimate_session_bytes(session), now)
+                self._entries[session.session_id] = entry
+                self._bytes += entry.size
+            self._enforce_limits()
+            self._arm_timer()
+
+    def update(self, session: "CounterPoseSession") -> str:
+        """Re-measure a session after it changed and enforce the byte budget."""
+        with self._lock:
+            entry = self._entries.get(session.session_id)
+            if entry is None or entry.session is not session:
+                return self._tombstones.get(session.session_id, NOT_FOUND)
+            size = estimate_session_bytes(session)
+            self._bytes += size - entry.size
+            entry.size = size
+            entry.last_access = self.clock()
+            self._entries.move_to_end(session.session_id)
+            self._enforce_limits()
+            return FOUND
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session without recording it as expired or evicted."""
+        with self._lock:
+            return self._remove(session_id) is not None
+
+    def expire(self) -> int:
+        """Expire idle sessions now and return how many were removed."""
+        with self._lock:
+            return self._expire(self.clock())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy, limits, and eviction/expiry counters."""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "expirations": self.expirations,
+            }
+
+    def close(self) -> None:
+        """Cancel the expiry timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _remove(self, session_id: str) -> Optional[_Entry]:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            self._notify_removed(session_id)
+        return entry
+
+    def _tombstone(self, session_id: str, status: str) -> None:
+        self._tombstones[session_id] = status
+        while len(self._tombstones) > self.max_tombstones:
+            self._tombstones.popitem(last=False)
+
+    def _expire(self, now: float) -> int:
+        """Drop sessions idle longer than the TTL, oldest first."""
+        if self.idle_ttl <= 0:
+            return 0
+        expired = 0
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_access < self.idle_ttl:
+                break
+            self._remove(session_id)
+            self._tombstone(session_id, EXPIRED)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def _enforce_limits(self) -> None:
+        """Evict least recently used sessions until within count and byte limits."""
+        while self._entries and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            # Never evict the only remaining session just for exceeding the byte budget
+            if len(self._entries) == 1 and len(self._entries) <= self.max_sessions:
+                break
+            session_id, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._notify_removed(session_id)
+            self._tombstone(session_id, EVICTED)
+            self.evictions += 1
+            self.evicted_bytes += entry.size
+
+    def _arm_timer(self) -> None:
+        """Schedule an expiry pass for when the oldest session becomes idle."""
+        if not self.background_expiry or self.idle_ttl <= 0 or self._timer is not None:
+            return
+        if not self._entries:
+            return
+        oldest = next(iter(self._entries.values()))
+        delay = max(0.0, oldest.last_access + self.idle_ttl - self.clock())
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._expire(self.clock())
+            self._arm_timer()
+
+
+class ShardedSessionStore(SessionStore):
+    """In-memory session store split into independently locked shards.
+
+    Each session ID hashes to one of ``shards`` ``InMemorySessionStore`` instances,
+    so calls on different sessions rarely wait for the same lock. The session count
+    and byte limits are divided evenly between the shards and enforced per shard,
+    which makes eviction approximately rather than exactly least recently used
+    across the whole store.
+    """
+
+    def __init__(
+        self,
+        shards: int = 16,
+        max_sessions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        background_expiry: bool = True,
+        max_tombstones: int = 10_000,
+    ) -> None:
+        config = ServerConfig.from_env()
+        max_sessions = config.max_sessions if max_sessions is None else max_sessions
+        max_bytes = config.max_session_bytes if max_bytes is None else max_bytes
+        count = max(1, shards)
+        self.shards: Tuple[InMemorySessionStore, ...] = tuple(
+            InMemorySessionStore(
+                max_sessions=-(-max_sessions // count),
+                max_bytes=-(-max_bytes // count),
+                idle_ttl=idle_ttl,
+                clock=clock,
+                background_expiry=background_expiry,
+                max_tombstones=-(-max_tombstones // count),
+            )
+            for _ in range(count)
+        )
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+
+    def shard(self, session_id: str) -> InMemorySessionStore:
+        """Return the shard that holds ``session_id``."""
+        return self.shards[hash(session_id) % len(self.shards)]
+
+    def add_removal_listener(self, listener: Callable[[str], None]) -> None:
+        for shard in self.shards:
+            shard.add_removal_listener(listener)
+
+    def session_lock(self, session_id: str) -> "threading.RLock":
+        return self.shard(session_id).session_lock(session_id)
+
+    def lookup(
+        self, session_id: str, load_steps: bool = True
+    ) -> Tuple[Optional["CounterPoseSession"], str]:
+        return self.shard(session_id).lookup(session_id, load_steps)
+
+    def put(self, session: "CounterPoseSession") -> None:
+        self.shard(session.session_id).put(session)
+
+    def put_many(self, sessions: List["CounterPoseSession"]) -> None:
+        """Insert or replace sessions, taking each shard's lock once."""
+        by_shard: Dict[int, List[CounterPoseSession]] = {}
+        for session in sessions:
+            index = hash(session.session_id) % len(self.shards)
+            by_shard.setdefault(index, []).append(session)
+        for index, group in by_shard.items():
+            self.shards[index].put_many(group)
+
+    def update(self, session: "CounterPoseSession") -> str:
+        return self.shard(session.session_id).update(session)
+
+    def append_steps(self, session: "CounterPoseSession", steps: List[Step]) -> str:
+        return self.shard(session.session_id).append_steps(session, steps)
+
+    def delete(self, session_id: str) -> bool:
+        return self.shard(session_id).delete(session_id)
+
+    def expire(self) -> int:
+        """Expire idle sessions in every shard and return how many were removed."""
+        return sum(shard.expire() for shard in self.shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def __iter__(self) -> Iterator[str]:
+        return (session_id for shard in self.shards for session_id in shard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and counters summed over the shards."""
+        totals = {"sessions": 0, "bytes": 0, "evictions": 0, "evicted_bytes": 0, "expirations": 0}
+        for shard in self.shards:
+            shard_stats = shard.stats()
+            for key in totals:
+                totals[key] += shard_stats[key]
+        return {
+            "backend": "memory",
+            "shards": len(self.shards),
+            **totals,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "idle_ttl": self.shards[0].idle_ttl,
+        }
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+
+def create_session_store(config: Optional[ServerConfig] = None) -> SessionStore:
+    """Create the session store selected by ``config.session_backend``."""
+    config = config or ServerConfig.from_env()
+    if config.session_backend == "sqlite":
+        from .sqlite_store import SqliteSessionStore
+
+        return SqliteSessionStore(config.session_db_path, idle_ttl=config.session_idle_ttl)
+    if config.session_backend != "memory":
+        raise ValueError(f"Unknown session backend: {config.session_backend}")
+    if config.session_shards > 1:
+        return ShardedSessionStore(
+            shards=config.session_shards,
+            max_sessions=config.max_sessions,
+            max_bytes=config.max_session_bytes,
+            idle_ttl=config.session_idle_ttl,
+        )
+    return InMemorySessionStore(
+        max_sessions=config.max_sessions,
+        max_bytes=config.max_session_bytes,
+        idle_ttl=config.session_idle_ttl,
+    )
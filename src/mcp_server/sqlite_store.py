@@ -0,0 +1,392 @@
+"""SQLite-backed persistent session store."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .keyword_matcher import IncrementalMatch
+from .session_model import Step
+from .session_store import EXPIRED, FOUND, NOT_FOUND, SessionStore
+from .string_pool import DIGEST_BYTES, dedup_stats
+
+if TYPE_CHECKING:
+    from .counter_pose_tool import CounterPoseSession
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    domain TEXT,
+    personas TEXT NOT NULL DEFAULT '[]',
+    current_persona_index INTEGER NOT NULL DEFAULT -1,
+    started_at TEXT NOT NULL,
+    confidence TEXT,
+    changes_needed TEXT,
+    blind_spots TEXT NOT NULL DEFAULT '[]',
+    contradictions TEXT NOT NULL DEFAULT '[]',
+    last_access REAL NOT NULL,
+    reasoning_match TEXT,
+    catalog_version TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+CREATE TABLE IF NOT EXISTS steps (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    persona TEXT,
+    content TEXT,
+    timestamp TEXT,
+    content_hash BLOB,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS contents (
+    hash BLOB PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Step contents are stored once per distinct text and reference counted; deleting a
+# step (directly or through the cascade from its session) releases its reference
+TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS steps_release_content AFTER DELETE ON steps
+WHEN OLD.content_hash IS NOT NULL
+BEGIN
+    UPDATE contents SET refs = refs - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM contents WHERE hash = OLD.content_hash AND refs <= 0;
+END;
+"""
+
+# Statements are kept as constants so sqlite3's statement cache reuses the prepared form
+_SELECT_SESSION = (
+    "SELECT domain, personas, current_persona_index, started_at, confidence, changes_needed, "
+    "blind_spots, contradictions, last_access, reasoning_match, catalog_version FROM sessions "
+    "WHERE session_id = ?"
+)
+_SELECT_STEPS = (
+    "SELECT s.type, s.persona, COALESCE(c.text, s.content), s.timestamp FROM steps AS s "
+    "LEFT JOIN contents AS c ON c.hash = s.content_hash WHERE s.session_id = ? ORDER BY s.seq"
+)
+_UPSERT_SESSION = (
+    "INSERT OR REPLACE INTO sessions (session_id, domain, personas, current_persona_index, "
+    "started_at, confidence, changes_needed, blind_spots, contradictions, last_access, "
+    "reasoning_match, catalog_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_SESSION = (
+    "UPDATE sessions SET domain = ?, personas = ?, current_persona_index = ?, confidence = ?, "
+    "changes_needed = ?, blind_spots = ?, contradictions = ?, last_access = ?, "
+    "reasoning_match = ?, catalog_version = ? WHERE session_id = ?"
+)
+_TOUCH_SESSION = "UPDATE sessions SET last_access = ? WHERE session_id = ?"
+_NEXT_SEQ = "SELECT COALESCE(MAX(seq) + 1, 0) FROM steps WHERE session_id = ?"
+_INSERT_STEP = (
+    "INSERT INTO steps (session_id, seq, type, persona, timestamp, content_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_ACQUIRE_CONTENT = (
+    "INSERT INTO contents (hash, text, size, refs) VALUES (?, ?, ?, 1) "
+    "ON CONFLICT (hash) DO UPDATE SET refs = refs + 1"
+)
+_CONTENT_STATS = (
+    "SELECT COUNT(*), COALESCE(SUM(refs), 0), COALESCE(SUM(size), 0), "
+    "COALESCE(SUM(size * refs), 0) FROM contents"
+)
+_DELETE_SESSION = "DELETE FROM sessions WHERE session_id = ?"
+_SELECT_EXPIRED = "SELECT session_id FROM sessions WHERE last_access < ?"
+_DELETE_EXPIRED = "DELETE FROM sessions WHERE last_access < ?"
+
+
+# Open stores, whose connections are closed around os.fork(); see _before_fork
+_open_stores: "weakref.WeakSet[SqliteSessionStore]" = weakref.WeakSet()
+_forking: List["SqliteSessionStore"] = []
+
+
+def _before_fork() -> None:
+    # A SQLite connection must not be carried into a child process, and closing the
+    # inherited copy there would drop the parent's file locks. Each store waits for
+    # its current operation, closes its connection, and reopens it on next use.
+    _forking[:] = list(_open_stores)
+    for store in _forking:
+        store._lock.acquire()
+        store._disconnect()
+
+
+def _after_fork_in_parent() -> None:
+    for store in _forking:
+        store._lock.release()
+    _forking.clear()
+
+
+def _after_fork_in_child() -> None:
+    for store in _forking:
+        store._lock = threading.RLock()
+    _forking.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
+
+
+class SqliteSessionStore(SessionStore):
+    """Session store persisted to SQLite in WAL mode so sessions survive restarts.
+
+    Session headers and steps live in separate tables. Lookups that do not need the
+    step history read a single row, and new steps are inserted in one batch. The
+    connection is closed before the process forks and reopened on next use, in the
+    parent and in the child, so forked workers never share it.
+    """
+
+    resident = False
+
+    def __init__(
+        self,
+        path: str,
+        idle_ttl: float = 0.0,
+        clock: Callable[[], float] = time.time,
+        max_tombstones: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self.max_tombstones = max_tombstones
+        self.expirations = 0
+
+        self._lock = threading.RLock()
+        self._tombstones: OrderedDict[str, str] = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._closed = False
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "reasoning_match" not in columns:
+            # Databases created before chunked uploads lack the column
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN reasoning_match TEXT")
+        if "catalog_version" not in columns:
+            # Databases created before catalog reloads lack the column
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN catalog_version TEXT")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(steps)")}
+        if "content_hash" not in columns:
+            # Older steps keep their inline content; new steps reference the contents table
+            self._conn.execute("ALTER TABLE steps ADD COLUMN content_hash BLOB")
+        self._conn.executescript(TRIGGERS)
+        _open_stores.add(self)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The connection, opened on first use after construction or a fork."""
+        connection = self._connection
+        if connection is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed session store")
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, cached_statements=64
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._connection = connection
+        return connection
+
+    def _disconnect(self) -> None:
+        """Close the connection; the caller holds ``self._lock``."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def lookup(
+        self, session_id: str, load_steps: bool = True
+    ) -> Tuple[Optional["CounterPoseSession"], str]:
+        """Load a session header, plus its steps when ``load_steps`` is set."""
+        from .counter_pose_tool import CounterPoseSession
+
+        with self._lock:
+            now = self.clock()
+            row = self._conn.execute(_SELECT_SESSION, (session_id,)).fetchone()
+            if row is None:
+                return None, self._tombstones.get(session_id, NOT_FOUND)
+            if self.idle_ttl > 0 and now - row[8] >= self.idle_ttl:
+                self._conn.execute(_DELETE_SESSION, (session_id,))
+                self._tombstone(session_id)
+                self.expirations += 1
+                return None, EXPIRED
+
+            session = CounterPoseSession(session_id, row[0])
+            session.personas = json.loads(row[1])
+            session.current_persona_index = row[2]
+            session.started_at = row[3]
+            session.confidence = row[4]
+            session.changes_needed = row[5]
+            session.blind_spots = json.loads(row[6])
+            session.contradictions = json.loads(row[7])
+            if row[9] is not None:
+                session.reasoning_match = IncrementalMatch.from_dict(json.loads(row[9]))
+            session.catalog_version = row[10]
+            if load_steps:
+                session.steps = [
+                    Step.from_record(*record)
+                    for record in self._conn.execute(_SELECT_STEPS, (session_id,))
+                ]
+            self._conn.execute(_TOUCH_SESSION, (now, session_id))
+            return session, FOUND
+
+    def put(self, session: "CounterPoseSession") -> None:
+        """Insert or replace a session together with its current steps."""
+        self.put_many([session])
+
+    def put_many(self, sessions: List["CounterPoseSession"]) -> None:
+        """Insert or replace sessions and their steps in a single transaction."""
+        with self._lock:
+            for session in sessions:
+                self._tombstones.pop(session.session_id, None)
+                self._notify_removed(session.session_id)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # REPLACE deletes the old row, and the foreign key cascades to its steps
+                self._conn.executemany(
+                    _UPSERT_SESSION, [self._session_row(session) for session in sessions]
+                )
+                for session in sessions:
+                    if session.steps:
+                        self._insert_steps(session.session_id, 0, session.steps)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update(self, session: "CounterPoseSession") -> str:
+        """Write a session's header fields back without touching its steps."""
+        row = self._session_row(session)
+        # Every column except session_id and started_at, then the key for the WHERE clause
+        values = row[1:4] + row[5:] + (session.session_id,)
+        with self._lock:
+            if self._conn.execute(_UPDATE_SESSION, values).rowcount == 0:
+                return self._tombstones.get(session.session_id, NOT_FOUND)
+            return FOUND
+
+    def append_steps(self, session: "CounterPoseSession", steps: List[Step]) -> str:
+        """Insert new steps in a single transaction."""
+        session.steps.extend(steps)
+        with self._lock:
+            # Take the write lock before reading the next sequence number, so a writer in
+            # another process waits out the busy timeout instead of failing the upgrade
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                touched = self._conn.execute(_TOUCH_SESSION, (self.clock(), session.session_id))
+                if touched.rowcount == 0:
+                    # Deleted or expired, possibly by another process, since the lookup
+                    self._conn.execute("ROLLBACK")
+                    return self._tombstones.get(session.session_id, NOT_FOUND)
+                start = self._conn.execute(_NEXT_SEQ, (session.session_id,)).fetchone()[0]
+                self._insert_steps(session.session_id, start, steps)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return FOUND
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session and its steps."""
+        with self._lock:
+            deleted = self._conn.execute(_DELETE_SESSION, (session_id,)).rowcount > 0
+            if deleted:
+                self._notify_removed(session_id)
+            return deleted
+
+    def expire(self) -> int:
+        """Delete every session idle longer than the TTL, using the last-access index."""
+        if self.idle_ttl <= 0:
+            return 0
+        with self._lock:
+            cutoff = self.clock() - self.idle_ttl
+            expired = [row[0] for row in self._conn.execute(_SELECT_EXPIRED, (cutoff,))]
+            self._conn.execute(_DELETE_EXPIRED, (cutoff,))
+            for session_id in expired:
+                self._tombstone(session_id)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM sessions").fetchall()
+        return iter([row[0] for row in rows])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return session and step counts plus the expiry counter."""
+        with self._lock:
+            steps = self._conn.execute("SELECT COUNT(*) FROM steps").fetchone()[0]
+            content = self._conn.execute(_CONTENT_STATS).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": len(self),
+            "steps": steps,
+            "idle_ttl": self.idle_ttl,
+            "expirations": self.expirations,
+            "dedup": dedup_stats(*content),
+        }
+
+    def close(self) -> None:
+        """Checkpoint the write-ahead log and close the connection."""
+        with self._lock:
+            self._closed = True
+            self._disconnect()
+            _open_stores.discard(self)
+
+    def _session_row(self, session: "CounterPoseSession") -> Tuple[Any, ...]:
+        state = session.reasoning_match
+        return (
+            session.session_id,
+            session.domain,
+            json.dumps(session.personas),
+            session.current_persona_index,
+            session.started_at,
+            session.confidence,
+            session.changes_needed,
+            json.dumps(session.blind_spots),
+            json.dumps(session.contradictions),
+            self.clock(),
+            None if state is None else json.dumps(state.to_dict()),
+            session.catalog_version,
+        )
+
+    def _insert_steps(self, session_id: str, start: int, steps: List[Step]) -> None:
+        rows = []
+        contents = []
+        for offset, step in enumerate(steps):
+            content = step.get("content")
+            digest = None
+            if content is not None:
+                data = content.encode("utf-8", "surrogatepass")
+                digest = hashlib.blake2b(data, digest_size=DIGEST_BYTES).digest()
+                contents.append((digest, content, len(data)))
+            rows.append(
+                (
+                    session_id,
+                    start + offset,
+                    step.get("type", ""),
+                    step.get("persona"),
+                    step.get("timestamp"),
+                    digest,
+                )
+            )
+        self._conn.executemany(_ACQUIRE_CONTENT, contents)
+        self._conn.executemany(_INSERT_STEP, rows)
+
+    def _tombstone(self, session_id: str) -> None:
+        self._notify_removed(session_id)
+        self._tombstones[session_id] = EXPIRED
+        while len(self._tombstones) > self.max_tombstones:
+            self._tombstones.popitem(last=False)
@@ -0,0 +1,123 @@
+"""Content-addressed, reference-counted pool for step contents shared across sessions."""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .blob_store import BlobRef
+
+DIGEST_BYTES = 16
+
+PooledText = Union[str, BlobRef]
+
+
+class _PoolEntry:
+    __slots__ = ("value", "size", "refs")
+
+    def __init__(self, value: PooledText, size: int) -> None:
+        self.value = value
+        self.size = size
+        self.refs = 0
+
+
+class StringPool:
+    """Stores each distinct text once, shared by every session that submits it.
+
+    Entries are keyed by a blake2b digest of the UTF-8 text. Each reference is owned
+    by a session, and ``release`` drops all of a session's references when the session
+    store removes it; an entry is freed when its last reference goes, along with its
+    blob if it was kept in a blob store.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[bytes, _PoolEntry] = {}
+        self._owners: Dict[str, List[bytes]] = {}
+        self._lock = threading.Lock()
+        self.references = 0
+        self.stored_bytes = 0
+        self.logical_bytes = 0
+
+    def intern(
+        self,
+        owner: str,
+        text: str,
+        store: Optional[Callable[[str], PooledText]] = None,
+        digest: bytes = b"",
+    ) -> PooledText:
+        """Return the shared copy of ``text``, adding a reference owned by ``owner``.
+
+        The first time a text is seen, ``store`` decides how it is kept (for example
+        as a blob reference); later callers receive that same value. ``digest`` is
+        ``StringPool.digest(text)`` if the caller already computed it.
+        """
+        digest = digest or self.digest(text)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                value = store(text) if store is not None else text
+                size = len(text.encode("utf-8", "surrogatepass"))
+                entry = self._entries[digest] = _PoolEntry(value, size)
+                self.stored_bytes += entry.size
+            entry.refs += 1
+            self._owners.setdefault(owner, []).append(digest)
+            self.references += 1
+            self.logical_bytes += entry.size
+            return entry.value
+
+    def spill(self, text: str, store: Callable[[str], BlobRef]) -> PooledText:
+        """Move a pooled text out of memory with ``store`` and return its blob reference.
+
+        The entry itself is replaced, so the text is written once however many sessions
+        share it, and later ``intern`` calls return the reference. Text that is not
+        pooled is returned unchanged, since nothing would free a blob written for it.
+        """
+        digest = self.digest(text)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return text
+            if isinstance(entry.value, str):
+                entry.value = store(entry.value)
+            return entry.value
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """Return the key ``text`` is pooled under."""
+        data = text.encode("utf-8", "surrogatepass")
+        return hashlib.blake2b(data, digest_size=DIGEST_BYTES).digest()
+
+    def release(self, owner: str) -> None:
+        """Drop every reference held by ``owner``, freeing unreferenced entries."""
+        with self._lock:
+            for digest in self._owners.pop(owner, ()):
+                entry = self._entries[digest]
+                entry.refs -= 1
+                self.references -= 1
+                self.logical_bytes -= entry.size
+                if entry.refs == 0:
+                    del self._entries[digest]
+                    self.stored_bytes -= entry.size
+                    if isinstance(entry.value, BlobRef):
+                        entry.value.free()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry and reference counts, bytes saved, and the dedup ratio."""
+        with self._lock:
+            return dedup_stats(
+                len(self._entries), self.references, self.stored_bytes, self.logical_bytes
+            )
+
+
+def dedup_stats(unique: int, references: int, stored_bytes: int, logical_bytes: int) -> Dict:
+    """Format deduplication counters shared by the pool and persistent stores."""
+    return {
+        "unique": unique,
+        "references": references,
+        "stored_bytes": stored_bytes,
+        "logical_bytes": logical_bytes,
+        "bytes_saved": logical_bytes - stored_bytes,
+        "dedup_ratio": round(logical_bytes / stored_bytes, 3) if stored_bytes else 1.0,
+    }
@@ -0,0 +1,259 @@
+"""Sampled phase-level tracing spans exported as JSONL or Chrome trace events."""
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
+
+from .config import ServerConfig
+from .session_model import now_us
+from .usage_log import UsageLogger, list_segments
+
+
+class _Trace:
+    """Spans of one sampled root operation, exported together when the root ends."""
+
+    __slots__ = ("trace_id", "spans", "next_id")
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.next_id = 0
+
+
+class Span:
+    """A timed phase; use as a context manager from ``Tracer.span``."""
+
+    __slots__ = (
+        "tracer", "trace", "name", "span_id", "parent_id", "attributes",
+        "start_us", "duration_us", "thread", "_start_ns", "_token",
+    )  # fmt: skip
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        trace: _Trace,
+        name: str,
+        parent: Optional["Span"],
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.span_id = trace.next_id
+        trace.next_id += 1
+        self.parent_id = None if parent is None else parent.span_id
+        self.attributes = attributes
+        self.start_us = 0
+        self.duration_us = 0
+        self.thread = 0
+        self._start_ns = 0
+        self._token: Any = None
+
+    def set(self, **attributes: object) -> None:
+        """Attach attributes, such as sizes or outcomes, to the span."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.thread = threading.get_ident()
+        self.start_us = now_us()
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.duration_us = (time.perf_counter_ns() - self._start_ns) // 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.spans.append(self)
+        if self.parent_id is None:
+            self.tracer.export(self.trace)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_us": self.start_us,
+            "duration_us": self.duration_us,
+            "pid": os.getpid(),
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in for spans that are not recorded."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: object) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Marks an unsampled root so its phases are not sampled as roots of their own."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "_UnsampledSpan":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        _current_span.reset(self._token)
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[_NoopSpan]] = ContextVar("counter_pose_span", default=None)
+
+
+class Tracer:
+    """Creates spans for operations and their internal phases.
+
+    The first span opened in a context is a root and decides, with probability
+    ``sample_rate``, whether the whole operation is traced; spans opened inside it
+    through the same ``contextvars`` context become its children. A finished root's
+    spans are written as JSON lines through a ``UsageLogger``, which batches writes
+    on a background thread and rotates the trace file. With ``sample_rate`` at 0,
+    ``span`` returns a shared no-op object and nothing is recorded.
+    """
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        trace_file: Optional[str] = None,
+        writer: Optional[UsageLogger] = None,
+    ) -> None:
+        config = ServerConfig.from_env()
+        rate = config.trace_sample_rate if sample_rate is None else sample_rate
+        self.sample_rate = min(1.0, max(0.0, rate))
+        self.trace_file = config.trace_file if trace_file is None else trace_file
+        self._writer = writer
+        self._writer_lock = threading.Lock()
+        self._max_bytes = config.trace_max_bytes
+        self._backups = config.trace_backups
+        self.sampled = 0
+        self.spans = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def span(self, name: str, **attributes: object) -> Union[Span, _NoopSpan]:
+        """Return a context manager timing ``name`` as a root or child span."""
+        if self.sample_rate <= 0:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if isinstance(parent, Span):
+            return Span(self, parent.trace, name, parent, attributes)
+        if parent is not None:
+            return NOOP_SPAN
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return _UnsampledSpan()
+        trace = _Trace(f"{random.getrandbits(64):016x}")
+        return Span(self, trace, name, None, attributes)
+
+    def export(self, trace: _Trace) -> None:
+        """Queue a finished trace's spans, in start order, for the trace file."""
+        spans = sorted(trace.spans, key=lambda span: (span.start_us, span.span_id))
+        self.sampled += 1
+        self.spans += len(spans)
+        self.writer.enqueue(
+            [json.dumps(span.to_dict(), separators=(",", ":")) + "\n" for span in spans]
+        )
+
+    @property
+    def writer(self) -> UsageLogger:
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = UsageLogger(
+                        log_file=self.trace_file,
+                        max_bytes=self._max_bytes,
+                        backups=self._backups,
+                    )
+        return self._writer
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every finished trace has been written."""
+        return self._writer is None or self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Write out pending spans and stop the writer."""
+        if self._writer is not None:
+            self._writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "trace_file": self.trace_file,
+            "traces": self.sampled,
+            "spans": self.spans,
+        }
+
+
+def read_spans(trace_file: str) -> Iterator[Dict[str, Any]]:
+    """Yield spans from the trace file and its rotated segments, oldest first."""
+    for path in list_segments(trace_file):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A segment cut off mid-line by a crash loses only that span
+                    continue
+
+
+def chrome_trace(spans: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert spans to the Chrome trace-event format (chrome://tracing, Perfetto)."""
+    events = []
+    for span in spans:
+        args = dict(span.get("attributes") or {})
+        args["trace_id"] = span["trace_id"]
+        events.append(
+            {
+                "name": span["name"],
+                "cat": "counter_pose",
+                "ph": "X",
+                "ts": span["start_us"],
+                "dur": span["duration_us"],
+                "pid": span.get("pid", 0),
+                "tid": span.get("thread", 0),
+                "args": args,
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,345 @@
+"""Buffered usage logging for the Counter-Pose tool."""
+
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .config import ServerConfig
+
+FSYNC_POLICIES = ("never", "batch", "close")
+OVERFLOW_POLICIES = ("drop", "block")
+
+# Field values are percent-encoded where they would break the comma-separated line
+# format; usage_report decodes them with urllib.parse.unquote
+_FIELD_ESCAPES = {ord("%"): "%25", ord(","): "%2C", ord("\n"): "%0A", ord("\r"): "%0D"}
+
+
+def escape_field(value: object) -> str:
+    """Return ``value`` as a usage log field, escaping characters used as separators."""
+    return str(value).translate(_FIELD_ESCAPES)
+
+
+def format_line(
+    timestamp: str, session_id: str, domain: str, persona: str, step: str, reasoning_length: int
+) -> str:
+    """Return one usage log line: ``timestamp,session_id,domain,persona,step,length``."""
+    return (
+        f"{timestamp},{escape_field(session_id)},{escape_field(domain)},"
+        f"{escape_field(persona)},{escape_field(step)},{reasoning_length}\n"
+    )
+
+
+class _Flush:
+    """Queue marker asking the writer to write out everything received so far."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+def list_segments(log_file: str) -> List[str]:
+    """Return the log's rotated segments, oldest first, followed by the active file.
+
+    Rotated segments are named ``<log_file>.<timestamp>`` and, once compressed,
+    ``<log_file>.<timestamp>.gz``. Partially written compressed files are ignored.
+    """
+    directory = os.path.dirname(log_file) or "."
+    pattern = re.compile(re.escape(os.path.basename(log_file)) + r"\.(\d{8}T\d{12})(\.gz)?$")
+    segments: Dict[str, str] = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        names = []
+    for name in names:
+        match = pattern.match(name)
+        if match is None:
+            continue
+        # Prefer the compressed copy when compression has finished but not yet cleaned up
+        if match.group(2) or match.group(1) not in segments:
+            segments[match.group(1)] = os.path.join(directory, name)
+    ordered = [segments[stamp] for stamp in sorted(segments)]
+    if os.path.exists(log_file):
+        ordered.append(log_file)
+    return ordered
+
+
+def compress_segment(path: str) -> Optional[str]:
+    """Gzip a rotated segment in place, returning the compressed path."""
+    target = path + ".gz"
+    partial = target + ".tmp"
+    try:
+        with open(path, "rb") as source, gzip.open(partial, "wb", compresslevel=6) as sink:
+            shutil.copyfileobj(source, sink, 1024 * 1024)
+        os.replace(partial, target)
+        os.remove(path)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        return None
+    return target
+
+
+class UsageLogger:
+    """Logger for counter-pose tool usage and statistics.
+
+    ``log_usage`` only formats a line and hands it to a bounded queue. A background
+    writer thread batches lines and appends them to the log file once ``batch_size``
+    lines are pending or ``flush_interval`` seconds have passed. When the queue is
+    full, lines are dropped (``overflow="drop"``) or the caller waits
+    (``overflow="block"``).
+
+    The active file is rotated once it reaches ``max_bytes`` or has been open for
+    ``max_age`` seconds. Rotated segments are gzip-compressed on a background thread
+    and only the newest ``backups`` segments are kept.
+    """
+
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        fsync: Optional[str] = None,
+        queue_size: Optional[int] = None,
+        overflow: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        backups: Optional[int] = None,
+        compress: Optional[bool] = None,
+    ) -> None:
+        config = ServerConfig.from_env()
+        self.log_file = config.usage_log_path if log_file is None else log_file
+        self.batch_size = config.usage_log_batch_size if batch_size is None else batch_size
+        self.flush_interval = (
+            config.usage_log_flush_interval if flush_interval is None else flush_interval
+        )
+        self.fsync = config.usage_log_fsync if fsync is None else fsync
+        self.overflow = config.usage_log_overflow if overflow is None else overflow
+        self.max_bytes = config.usage_log_max_bytes if max_bytes is None else max_bytes
+        self.max_age = config.usage_log_max_age if max_age is None else max_age
+        self.backups = config.usage_log_backups if backups is None else backups
+        self.compress = config.usage_log_compress if compress is None else compress
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {self.fsync!r}")
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {self.overflow!r}")
+
+        self._queue: queue.Queue[Any] = queue.Queue(
+            maxsize=config.usage_log_queue_size if queue_size is None else queue_size
+        )
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._compressors: List[threading.Thread] = []
+        self._segment_size = 0
+        self._segment_opened = 0.0
+
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.rotations = 0
+
+    def log_usage(
+        self, session_id: str, domain: str, persona: str, step: str, reasoning_length: int
+    ) -> None:
+        """Log usage of the counter-pose reasoning validator."""
+        timestamp = datetime.now().isoformat()
+        self.enqueue(format_line(timestamp, session_id, domain, persona, step, reasoning_length))
+
+    def log_usage_batch(self, entries: Iterable[Tuple[str, str, str, str, int]]) -> bool:
+        """Log many ``(session_id, domain, persona, step, reasoning_length)`` entries at once.
+
+        The entries share one timestamp and travel through the queue as a single item,
+        so a large batch costs one queue slot rather than one per line.
+        """
+        timestamp = datetime.now().isoformat()
+        lines = [format_line(timestamp, *entry) for entry in entries]
+        if not lines:
+            return True
+        return self.enqueue(lines)
+
+    def enqueue(self, line: Union[str, List[str]]) -> bool:
+        """Queue a preformatted log line (or list of lines), returning False if dropped."""
+        count = 1 if isinstance(line, str) else len(line)
+        if self._closed:
+            self.dropped += count
+            return False
+        self._ensure_started()
+        if self.overflow == "block":
+            self._queue.put(line)
+            return True
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += count
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every line queued so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write out pending lines and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        for compressor in list(self._compressors):
+            compressor.join(timeout)
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        """Return queue depth and line counters."""
+        return {
+            "log_file": self.log_file,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "rotations": self.rotations,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="counter-pose-usage-log", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Writer loop: collect lines and write them in batches."""
+        pending: List[str] = []
+        markers: List[_Flush] = []
+        handle: Optional[IO[bytes]] = None
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _Flush):
+                markers.append(item)
+            elif isinstance(item, list):
+                pending.extend(item)
+            elif item is not None:
+                pending.append(item)
+
+            due = stopping or markers or time.monotonic() >= deadline
+            if pending and (due or len(pending) >= self.batch_size):
+                handle = self._write(handle, pending)
+                pending = []
+            if due:
+                deadline = time.monotonic() + self.flush_interval
+            for marker in markers:
+                marker.done.set()
+            markers = []
+
+        if handle is not None:
+            try:
+                if self.fsync != "never":
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                handle.close()
+            except OSError:
+                self.write_errors += 1
+
+    def _write(self, handle: Optional[IO[bytes]], lines: List[str]) -> Optional[IO[bytes]]:
+        """Append a batch of lines, reopening the file if needed."""
+        # Encoded once here, so rotation counts the bytes written rather than characters
+        data = "".join(lines).encode("utf-8", "backslashreplace")
+        try:
+            if handle is None:
+                handle = open(self.log_file, "ab")
+                self._segment_size = os.fstat(handle.fileno()).st_size
+                self._segment_opened = time.monotonic()
+            handle.write(data)
+            handle.flush()
+            if self.fsync == "batch":
+                os.fsync(handle.fileno())
+            self._segment_size += len(data)
+        except OSError:
+            # Losing usage statistics must never break a tool call
+            self.write_errors += 1
+            self.dropped += len(lines)
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+            return None
+        self.written += len(lines)
+        self.batches += 1
+        if self._should_rotate():
+            return self._rotate(handle)
+        return handle
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes > 0 and self._segment_size >= self.max_bytes:
+            return True
+        return self.max_age > 0 and time.monotonic() - self._segment_opened >= self.max_age
+
+    def _rotate(self, handle: IO[bytes]) -> None:
+        """Move the active file aside, compress it in the background, and prune."""
+        try:
+            if self.fsync != "never":
+                os.fsync(handle.fileno())
+            handle.close()
+            stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            rotated = f"{self.log_file}.{stamp}"
+            os.replace(self.log_file, rotated)
+        except OSError:
+            self.write_errors += 1
+            return None
+        self.rotations += 1
+        self._prune()
+        if self.compress:
+            self._compressors = [t for t in self._compressors if t.is_alive()]
+            compressor = threading.Thread(
+                target=compress_segment,
+                args=(rotated,),
+                name="counter-pose-usage-log-compress",
+                daemon=True,
+            )
+            compressor.start()
+            self._compressors.append(compressor)
+        return None
+
+    def _prune(self) -> None:
+        """Delete the oldest rotated segments beyond the configured backup count."""
+        if self.backups <= 0:
+            return
+        rotated = [path for path in list_segments(self.log_file) if path != self.log_file]
+        for path in rotated[: max(0, len(rotated) - self.backups)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
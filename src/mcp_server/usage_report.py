@@ -0,0 +1,189 @@
+"""Streaming summary of the usage log across all rotated segments."""
+
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote
+
+from .histogram import Histogram
+from .usage_log import list_segments
+
+PERCENTILES = (50, 90, 95, 99)
+READ_BUFFER_BYTES = 1024 * 1024
+# Distinct (step, length) pairs buffered before folding them into the histograms
+MAX_PENDING_LENGTHS = 65_536
+
+
+class UsageReport:
+    """Counts and reasoning-length distribution accumulated from usage log lines.
+
+    Memory is bounded by the number of distinct domain/persona/step combinations plus
+    fixed-precision length histograms, regardless of how many lines are read.
+    """
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.malformed = 0
+        self.segments = 0
+        # Raw byte fields are counted as-is and only decoded when the report is rendered
+        self.combinations: Dict[Tuple[bytes, bytes, bytes], int] = {}
+        self.lengths_by_step: Dict[bytes, Histogram] = {}
+
+    def add_lines(self, lines: Iterable[bytes]) -> None:
+        """Accumulate raw CSV lines ``timestamp,session_id,domain,persona,step,length``."""
+        combinations = self.combinations
+        pending: Dict[Tuple[bytes, bytes], int] = {}
+        malformed = 0
+        for line in lines:
+            # Fields are escaped when written; lines from older logs may still have commas
+            # in the caller-supplied session ID, so split from the right
+            parts = line.rsplit(b",", 4)
+            if len(parts) != 5:
+                if line.strip():
+                    malformed += 1
+                continue
+            key = (parts[1], parts[2], parts[3])
+            combinations[key] = combinations.get(key, 0) + 1
+            length_key = (parts[3], parts[4])
+            pending[length_key] = pending.get(length_key, 0) + 1
+            if len(pending) >= MAX_PENDING_LENGTHS:
+                malformed += self._fold_lengths(pending)
+                pending = {}
+        malformed += self._fold_lengths(pending)
+        self.malformed += malformed
+
+    def _fold_lengths(self, pending: Dict[Tuple[bytes, bytes], int]) -> int:
+        """Record buffered lengths into per-step histograms, returning unparseable lines."""
+        malformed = 0
+        for (step, raw_length), count in pending.items():
+            try:
+                length = int(raw_length)
+            except ValueError:
+                malformed += count
+                continue
+            histogram = self.lengths_by_step.get(step)
+            if histogram is None:
+                histogram = self.lengths_by_step[step] = Histogram()
+            histogram.record(length, count)
+            self.lines += count
+        return malformed
+
+    def add_file(self, handle: IO[bytes]) -> None:
+        """Accumulate every line of an open binary file."""
+        self.segments += 1
+        self.add_lines(handle)
+
+    def merge(self, other: "UsageReport") -> None:
+        """Add another partial report (for example from another segment) into this one."""
+        self.lines += other.lines
+        self.malformed += other.malformed
+        self.segments += other.segments
+        for key, count in other.combinations.items():
+            self.combinations[key] = self.combinations.get(key, 0) + count
+        for step, histogram in other.lengths_by_step.items():
+            if step not in self.lengths_by_step:
+                self.lengths_by_step[step] = Histogram(histogram.significant_bits)
+            self.lengths_by_step[step].merge(histogram)
+
+    def to_dict(self) -> Dict:
+        """Return the report as plain data."""
+        domains: Dict[str, int] = {}
+        personas: Dict[str, int] = {}
+        steps: Dict[str, int] = {}
+        for (domain, persona, step), count in self.combinations.items():
+            for counts, raw in ((domains, domain), (personas, persona), (steps, step)):
+                name = unquote(raw.decode("utf-8", "replace"))
+                counts[name] = counts.get(name, 0) + count
+
+        overall = Histogram()
+        by_step = {}
+        for step, histogram in self.lengths_by_step.items():
+            overall.merge(histogram)
+            by_step[unquote(step.decode("utf-8", "replace"))] = _summary(histogram)
+
+        return {
+            "segments": self.segments,
+            "lines": self.lines,
+            "malformed_lines": self.malformed,
+            "domains": _sorted_counts(domains),
+            "personas": _sorted_counts(personas),
+            "steps": _sorted_counts(steps),
+            "reasoning_length": _summary(overall),
+            "reasoning_length_by_step": dict(sorted(by_step.items())),
+        }
+
+
+def _sorted_counts(counts: Dict[str, int]) -> Dict[str, int]:
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def _summary(histogram: Histogram) -> Dict[str, float]:
+    summary: Dict[str, float] = {
+        "count": histogram.count,
+        "min": histogram.min,
+        "mean": round(histogram.mean(), 1),
+        "max": histogram.max,
+    }
+    for percent in PERCENTILES:
+        summary[f"p{percent}"] = histogram.percentile(percent)
+    return summary
+
+
+def read_segment(path: str) -> UsageReport:
+    """Stream one (possibly gzip-compressed) segment into a partial report."""
+    report = UsageReport()
+    try:
+        if path.endswith(".gz"):
+            with gzip.open(path, "rb") as handle:
+                report.add_file(handle)
+        else:
+            with open(path, "rb", buffering=READ_BUFFER_BYTES) as handle:
+                report.add_file(handle)
+    except (OSError, EOFError):
+        # Segments can be pruned or still compressing while the report runs
+        pass
+    return report
+
+
+def build_report(log_file: str, jobs: Optional[int] = None) -> UsageReport:
+    """Stream every segment of ``log_file`` into a report.
+
+    Segments are independent, so with ``jobs`` above one they are read in parallel
+    worker processes and the partial reports merged.
+    """
+    segments = list_segments(log_file)
+    jobs = min(jobs or os.cpu_count() or 1, len(segments))
+    report = UsageReport()
+    if jobs <= 1:
+        for path in segments:
+            report.merge(read_segment(path))
+        return report
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for partial in pool.map(read_segment, segments):
+            report.merge(partial)
+    return report
+
+
+def format_report(report: UsageReport) -> str:
+    """Render a report as aligned plain-text tables."""
+    data = report.to_dict()
+    lines = [
+        f"Usage report: {data['lines']} lines from {data['segments']} segment(s)"
+        + (f", {data['malformed_lines']} malformed" if data["malformed_lines"] else ""),
+    ]
+    for title, key in (("Domain", "domains"), ("Persona", "personas"), ("Step", "steps")):
+        counts = data[key]
+        width = max([len(title)] + [len(name) for name in counts])
+        lines.append("")
+        lines.append(f"{title:<{width}}  {'count':>10}")
+        lines.extend(f"{name:<{width}}  {count:>10}" for name, count in counts.items())
+
+    columns = ["count", "min", "mean"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+    rows = [("all", data["reasoning_length"])] + list(data["reasoning_length_by_step"].items())
+    width = max(len("Reasoning length"), max(len(name) for name, _ in rows))
+    lines.append("")
+    lines.append(f"{'Reasoning length':<{width}}" + "".join(f"  {c:>10}" for c in columns))
+    for name, summary in rows:
+        lines.append(f"{name:<{width}}" + "".join(f"  {summary[c]:>10}" for c in columns))
+    return "\n".join(lines)
@@ -1,31 +1,61 @@
 """Test the MCP Server with a direct integration test."""
 
 import asyncio
-from fastmcp import Client, FastMCP
+import json
+
+from fastmcp import Client
+
 from src.mcp_server.main import mcp
 
 
-async def test_hello_tool():
-    """Test the hello tool by calling it directly."""
-    client = Client(mcp)
-    
-    async with client:
-        result = await client.call_tool("hello", {"name": "Test User"})
-        print(f"Tool result: {result}")
-        
-        # The result is a list with a TextContent object
-        # Extract the text from the first item
-        text_content = str(result[0])
-        print(f"Extracted text: {text_content}")
-        
-        assert "Test User" in text_content, "Name should be included in the response"
-        print("Test passed!")
-
-
-def main():
+async def run_full_flow() -> None:
+    """Drive submit_reasoning, get_persona_guidance, and submit_critique end to end."""
+    async with Client(mcp) as client:
+        tools = {tool.name for tool in await client.list_tools()}
+        for name in ("submit_reasoning", "get_persona_guidance", "submit_critique"):
+            assert name in tools, f"{name} should be registered"
+
+        result = await client.call_tool(
+            "submit_reasoning",
+            {"reasoning": "Add JWT authentication to the backend API", "session_id": "flow"},
+        )
+        session = json.loads(result[0].text)
+        print(f"submit_reasoning: {session}")
+        assert session["session_id"] == "flow"
+        pair = session["persona_options"][0]["personas"]
+
+        result = await client.call_tool(
+            "get_persona_guidance", {"session_id": "flow", "persona_pair": pair}
+        )
+        guidance = json.loads(result[0].text)
+        print(f"get_persona_guidance: {guidance}")
+        assert "error" not in guidance, guidance
+
+        result = await client.call_tool(
+            "submit_critique",
+            {
+                "session_id": "flow",
+                "persona1_name": pair[0],
+                "persona1_critique": "The token lifetime is not specified.",
+                "persona2_name": pair[1],
+                "persona2_critique": "Refresh tokens need rotation.",
+            },
+        )
+        critique = json.loads(result[0].text)
+        print(f"submit_critique: {critique}")
+        assert "error" not in critique, critique
+
+
+def test_full_flow() -> None:
+    """Run the three-tool flow through an in-process client."""
+    asyncio.run(run_full_flow())
+    print("Test passed!")
+
+
+def main() -> None:
     """Run the test."""
-    asyncio.run(test_hello_tool())
+    test_full_flow()
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,105 @@
+"""Test content-hash memoization of domain detection and pair ranking."""
+
+import os
+import sys
+
+from src.mcp_server.analysis_cache import AnalysisCache
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+
+def make_tool(capacity: int = 16) -> CounterPoseTool:
+    return CounterPoseTool(logger=UsageLogger(log_file=os.devnull), analysis_cache_size=capacity)
+
+
+def test_resubmission_hits_cache() -> bool:
+    """Resubmitting the same text, in any letter case, reuses the cached analysis."""
+    tool = make_tool()
+
+    print("TESTING ANALYSIS CACHE HITS")
+    print("=" * 40)
+
+    first = tool.submit_reasoning("a", "JWT security for the API")
+    second = tool.submit_reasoning("b", "jwt SECURITY for the api")
+    third = tool.submit_reasoning("c", "JWT security for the API gateway")
+
+    assert first["persona_options"] == second["persona_options"]
+    assert first["persona_options"] is not second["persona_options"]
+    assert third["domain"] == "software_development"
+    stats = tool.analysis_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert tool.analyze("JWT security for the API") == (
+        tool.determine_domain("JWT security for the API"),
+        tool._rank_persona_pairs("software_development", "JWT security for the API"),
+    )
+    print(f"✅ Cache stats: {stats}")
+    return True
+
+
+def test_capacity_and_eviction() -> bool:
+    """The cache holds at most its capacity, evicting least recently used entries."""
+    cache = AnalysisCache(capacity=2)
+
+    print("\n" + "=" * 40)
+    print("TESTING ANALYSIS CACHE EVICTION")
+    print("=" * 40)
+
+    keys = [cache.key(text, "v1") for text in ("one", "two", "three")]
+    cache.put(keys[0], ("a", []))
+    cache.put(keys[1], ("b", []))
+    assert cache.get(keys[0]) == ("a", [])
+    cache.put(keys[2], ("c", []))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == ("a", [])
+    assert len(cache) == 2 and cache.evictions == 1
+
+    disabled = make_tool(capacity=0)
+    disabled.submit_reasoning("x", "email campaign")
+    disabled.submit_reasoning("y", "email campaign")
+    assert len(disabled.analysis_cache) == 0 and disabled.analysis_cache.hits == 0
+    print("✅ LRU eviction and disabled cache behave as expected")
+    return True
+
+
+def test_catalog_change_invalidates() -> bool:
+    """Analyses are cached per catalog version; a catalog change never reuses old ones."""
+    tool = make_tool()
+    text = "a moodboard for the launch"
+
+    print("\n" + "=" * 40)
+    print("TESTING CATALOG INVALIDATION")
+    print("=" * 40)
+
+    before = tool.submit_reasoning("a", text)
+    old_catalog = tool.catalog
+    domain_keywords = {domain: list(words) for domain, words in tool.domain_keywords.items()}
+    domain_keywords["visual_design"].append("moodboard")
+    tool.set_catalog(domain_keywords, tool.persona_pairs, tool.persona_keywords)
+    after = tool.submit_reasoning("b", text)
+
+    assert tool.catalog_version != old_catalog.version
+    assert before["domain"] == "product_strategy"
+    assert after["domain"] == "visual_design"
+    assert tool.analysis_cache.hits == 0 and len(tool.analysis_cache) == 2
+
+    # Calls still running on the previous catalog during a reload keep their entries
+    for _ in range(3):
+        assert tool.analyze(text, catalog=old_catalog)[0] == "product_strategy"
+        assert tool.analyze(text)[0] == "visual_design"
+    assert tool.analysis_cache.hits == 6 and len(tool.analysis_cache) == 2
+    print(f"✅ Catalog {old_catalog.version[:8]} -> {tool.catalog_version[:8]} cached separately")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_resubmission_hits_cache(),
+        test_capacity_and_eviction(),
+        test_catalog_change_invalidates(),
+    ]
+
+    if all(results):
+        print("\n🎉 All analysis cache tests passed!")
+    else:
+        print("\n💥 Some analysis cache tests failed!")
+        sys.exit(1)
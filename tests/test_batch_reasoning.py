@@ -0,0 +1,100 @@
+"""Test batch submission of reasoning through submit_reasoning_batch."""
+
+import os
+import sys
+import tempfile
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.sqlite_store import SqliteSessionStore
+from src.mcp_server.usage_log import UsageLogger
+
+
+def test_batch_matches_single_calls() -> bool:
+    """Each batch result equals what submit_reasoning returns for the same text."""
+    tool = CounterPoseTool()
+
+    print("TESTING BATCH RESULTS")
+    print("=" * 40)
+
+    texts = [
+        "JWT security for the API",
+        "email campaign and conversion funnel",
+        "JWT security for the API",
+        "",
+    ]
+    items = [(f"batch-{i}", text) for i, text in enumerate(texts)]
+    batch = tool.submit_reasoning_batch(items)
+
+    assert batch["count"] == len(texts)
+    assert [r["session_id"] for r in batch["results"]] == [sid for sid, _ in items]
+    for (session_id, text), result in zip(items, batch["results"]):
+        single = tool.submit_reasoning(f"single-{session_id}", text)
+        assert result["domain"] == single["domain"]
+        assert result["persona_options"] == single["persona_options"]
+        assert tool.sessions.get(session_id).domain == result["domain"]
+
+    first, third = batch["results"][0], batch["results"][2]
+    assert first["persona_options"] is not third["persona_options"]
+    assert tool.get_persona_guidance("batch-1", ["Developer", "Security Expert"])["domain"]
+    assert tool.submit_reasoning_batch([])["count"] == 0
+    print(f"✅ {batch['count']} batch results match single-call results")
+    return True
+
+
+def test_batch_logs_in_bulk() -> bool:
+    """A batch reaches the usage log as one queue item with one line per session."""
+    print("\n" + "=" * 40)
+    print("TESTING BULK USAGE LOGGING")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=path, queue_size=1, flush_interval=60)
+        tool = CounterPoseTool(logger=logger)
+        tool.submit_reasoning_batch([(f"s{i}", "x" * i) for i in range(50)])
+        assert logger.dropped == 0
+        logger.close()
+
+        with open(path) as handle:
+            lines = handle.read().splitlines()
+        assert len(lines) == 50
+        assert logger.written == 50 and logger.batches == 1
+        assert lines[7].endswith(",s7,product_strategy,system,init,7")
+        print(f"✅ {len(lines)} lines written in {logger.batches} batch")
+    return True
+
+
+def test_batch_with_sqlite_store() -> bool:
+    """Batch sessions are stored in one transaction and survive reopening the store."""
+    print("\n" + "=" * 40)
+    print("TESTING BATCH WITH SQLITE STORE")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        store = SqliteSessionStore(path)
+        tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+        tool.submit_reasoning_batch([(f"s{i}", "UI layout and color") for i in range(20)])
+        tool.logger.close()
+        store.close()
+
+        reopened = SqliteSessionStore(path)
+        assert len(reopened) == 20
+        assert reopened.get("s19").domain == "visual_design"
+        reopened.close()
+    print("✅ 20 sessions persisted from one batch")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_batch_matches_single_calls(),
+        test_batch_logs_in_bulk(),
+        test_batch_with_sqlite_store(),
+    ]
+
+    if all(results):
+        print("\n🎉 All batch reasoning tests passed!")
+    else:
+        print("\n💥 Some batch reasoning tests failed!")
+        sys.exit(1)
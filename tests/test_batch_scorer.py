@@ -0,0 +1,105 @@
+"""Test that vectorized batch scoring reproduces the scalar analysis exactly."""
+
+import random
+import sys
+
+from src.mcp_server.analysis_cache import Analysis
+from src.mcp_server.batch_scorer import BatchScorer
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+
+def scalar_analysis(tool: CounterPoseTool, text: str) -> Analysis:
+    domain = tool.determine_domain(text)
+    return domain, tool._rank_persona_pairs(domain, text)
+
+
+def test_matches_scalar_path() -> bool:
+    """Domains and rankings equal the scalar path across chunk boundaries."""
+    print("TESTING BATCH SCORING EQUIVALENCE")
+    print("=" * 40)
+
+    tool = CounterPoseTool()
+    vocabulary = [k for keywords in tool.domain_keywords.values() for k in keywords]
+    for pairs in tool.persona_keywords.values():
+        vocabulary.extend(k for keywords in pairs.values() for k in keywords)
+    vocabulary.extend(["the", "and", "we", "x", "Ünïcode", "💻", "\n"])
+    rng = random.Random(2024)
+    texts = ["", "nothing relevant here", "software development " * 20]
+    for _ in range(400):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 25))]
+        texts.append(("" if rng.random() < 0.3 else " ").join(words))
+
+    scorer = BatchScorer(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        chunk_size=64,
+        default_domain=tool.default_domain,
+    )
+    expected = [scalar_analysis(tool, text) for text in texts]
+    assert scorer.analyze(texts) == expected
+    assert scorer.determine_domains(texts) == [domain for domain, _ in expected]
+    assert tool.analyze_many(texts) == expected
+    assert scorer.analyze([]) == []
+    print(f"✅ {len(texts)} texts scored identically in chunks of {scorer.chunk_size}")
+    return True
+
+
+def test_ties_and_fallback() -> bool:
+    """Ties keep catalog order and unmatched texts fall back to the default domain."""
+    print("\n" + "=" * 40)
+    print("TESTING TIE-BREAKING")
+    print("=" * 40)
+
+    tool = CounterPoseTool()
+    # Duplicate and differently cased keywords count once per listing, and the
+    # persona keyword order differs from the pair order used to break ties
+    domain_keywords = {
+        "alpha": ["api", "API", "shared"],
+        "beta": ["shared", "launch", "launch"],
+        "gamma": ["orphan"],
+    }
+    persona_pairs = {
+        "alpha": [("A", "B"), ("C", "D"), ("E", "F")],
+        "beta": [("G", "H"), ("I", "J")],
+    }
+    persona_keywords = {
+        "alpha": {"E,F": ["shared"], "C,D": ["api"], "A,B": ["shared", "Api"]},
+        "beta": {"I,J": ["launch"], "G,H": ["launch"]},
+    }
+    tool.set_catalog(domain_keywords, persona_pairs, persona_keywords)
+    texts = ["api", "shared", "launch", "shared launch", "orphan", "none", "API shared"]
+    expected = [scalar_analysis(tool, text) for text in texts]
+    analyses = tool.analyze_many(texts)
+    assert analyses == expected
+    assert [domain for domain, _ in analyses] == [
+        "alpha",
+        "alpha",
+        "beta",
+        "beta",
+        "gamma",
+        "alpha",
+        "alpha",
+    ]
+    assert [pair for pair, _, _ in analyses[3][1]] == [("G", "H"), ("I", "J")]
+    assert analyses[4][1] == []
+    assert [pair for pair, _, _ in analyses[5][1]] == [("A", "B"), ("C", "D"), ("E", "F")]
+
+    # Installing another catalog recompiles the scorer
+    tool.set_catalog({"alpha": ["launch"]}, persona_pairs, {"alpha": persona_keywords["alpha"]})
+    assert tool.analyze_many(["launch"]) == [scalar_analysis(tool, "launch")]
+    print(f"✅ Rankings: {[[pair for pair, _, _ in ranking] for _, ranking in analyses[:4]]}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_matches_scalar_path(),
+        test_ties_and_fallback(),
+    ]
+
+    if all(results):
+        print("\n🎉 All batch scoring tests passed!")
+    else:
+        print("\n💥 Some batch scoring tests failed!")
+        sys.exit(1)
@@ -0,0 +1,159 @@
+"""Test the disk-backed blob store for critique content."""
+
+import os
+import sys
+import tempfile
+
+from src.mcp_server.blob_store import BlobStore
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.session_store import estimate_session_bytes
+from src.mcp_server.sqlite_store import SqliteSessionStore
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+
+
+def start_session(tool: CounterPoseTool, session_id: str) -> None:
+    tool.submit_reasoning(session_id, "JWT security")
+    tool.get_persona_guidance(session_id, PAIR)
+
+
+def test_blob_round_trip() -> bool:
+    """Blobs read back intact, including after the file grows past the mapped size."""
+    print("TESTING BLOB ROUND TRIP")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(tmp)
+        first = store.put("héllo wörld ✅")
+        assert first.read() == "héllo wörld ✅"
+        refs = [store.put(f"blob {i} " * i) for i in range(200)]
+        assert store.put("").read() == ""
+        assert all(ref.read() == f"blob {i} " * i for i, ref in enumerate(refs))
+        assert first.read() == "héllo wörld ✅"
+        assert store.stats()["blobs"] == 202
+        store.close()
+        assert os.listdir(tmp) == []
+    print("✅ 202 blobs read back after remapping")
+    return True
+
+
+def test_freed_space_reused() -> bool:
+    """Freed blobs leave gaps that later blobs fill; a freed tail shrinks the file."""
+    print("\n" + "=" * 40)
+    print("TESTING FREED BLOB SPACE")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(tmp)
+        first, second, third = (store.put(char * 100) for char in "abc")
+        first.free()
+        second.free()
+        assert store.stats()["free_bytes"] == 200 and store.stats()["blobs"] == 1
+        reused = store.put("d" * 150)
+        assert reused.offset == 0 and reused.read() == "d" * 150
+        assert store.stats()["file_bytes"] == 300 and store.stats()["free_bytes"] == 50
+        try:
+            first.read()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("read a freed blob")
+        first.free()
+        assert store.stats()["blobs"] == 2
+
+        third.free()
+        reused.free()
+        assert store.stats() == {"blobs": 0, "file_bytes": 0, "free_bytes": 0, "reads": 1}
+        assert store.put("e" * 10).read() == "e" * 10
+        store.close()
+    print("✅ Gaps reused first fit, stale references rejected, file truncated")
+    return True
+
+
+def test_large_critiques_spill() -> bool:
+    """Critiques above the threshold are kept on disk and decoded on demand."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    tool.blob_threshold = 1000
+
+    print("\n" + "=" * 40)
+    print("TESTING LARGE CRITIQUE SPILL")
+    print("=" * 40)
+
+    start_session(tool, "big")
+    large = "Consider token rotation. " * 4000
+    tool.submit_critique("big", "Developer", "short", "Security Expert", large)
+    session = tool.sessions.get("big")
+
+    assert session.steps[0].resident and not session.steps[1].resident
+    assert estimate_session_bytes(session) < 4000
+    assert session.to_dict()["steps"][1]["content"] == large
+    history = tool.get_session_history("big", offset=1, limit=5)
+    assert history["total_steps"] == 2 and history["steps"][0]["content"] == large
+    print(f"✅ {len(large)} character critique stored as a blob reference")
+    return True
+
+
+def test_step_history_cap() -> bool:
+    """Only the newest steps keep their content in memory."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    tool.max_resident_steps = 2
+
+    print("\n" + "=" * 40)
+    print("TESTING RESIDENT STEP CAP")
+    print("=" * 40)
+
+    start_session(tool, "long")
+    for round_number in range(3):
+        tool.submit_critique(
+            "long", "Developer", f"dev {round_number}", "Security Expert", f"sec {round_number}"
+        )
+    session = tool.sessions.get("long")
+    assert [step.resident for step in session.steps] == [False] * 4 + [True] * 2
+    contents = [step["content"] for step in tool.get_session_history("long")["steps"]]
+    assert contents == ["dev 0", "sec 0", "dev 1", "sec 1", "dev 2", "sec 2"]
+    assert "error" in tool.get_session_history("missing")
+    # Spilling replaces the pooled copy, so the text is written once and not kept too
+    assert tool.blob_store.stats()["blobs"] == 4
+    assert sum(isinstance(entry.value, str) for entry in tool.string_pool._entries.values()) == 2
+
+    tool.sessions.delete("long")
+    assert tool.blob_store.stats()["blobs"] == 0
+    assert tool.blob_store.stats()["file_bytes"] == 0
+    print("✅ Four oldest steps spilled, history still complete, blobs freed with session")
+    return True
+
+
+def test_persistent_store_keeps_content_inline() -> bool:
+    """Sessions in SQLite are not resident, so their content is never spilled."""
+    print("\n" + "=" * 40)
+    print("TESTING BLOB STORE WITH SQLITE")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteSessionStore(os.path.join(tmp, "s.db"))
+        tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+        tool.blob_threshold = 10
+        start_session(tool, "s1")
+        tool.submit_critique("s1", "Developer", "x" * 100, "Security Expert", "y" * 100)
+        assert tool.blob_store.stats()["blobs"] == 0
+        assert store.get("s1").steps[0]["content"] == "x" * 100
+        store.close()
+    print("✅ SQLite sessions keep content in the database")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_blob_round_trip(),
+        test_freed_space_reused(),
+        test_large_critiques_spill(),
+        test_step_history_cap(),
+        test_persistent_store_keeps_content_inline(),
+    ]
+
+    if all(results):
+        print("\n🎉 All blob store tests passed!")
+    else:
+        print("\n💥 Some blob store tests failed!")
+        sys.exit(1)
@@ -0,0 +1,269 @@
+"""Test loading persona catalogs from files and caching their compiled index."""
+
+import json
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from typing import Any, Dict
+
+from src.mcp_server.catalog import (
+    FrozenDict,
+    cache_path,
+    catalog_data,
+    load_catalog,
+    parse_catalog,
+    write_catalog_file,
+)
+from src.mcp_server.counter_pose_tool import CounterPoseTool, builtin_catalog
+
+CUSTOM_TOML = """
+[domains.data_engineering]
+keywords = ["pipeline", "etl", "warehouse", "schema"]
+
+[[domains.data_engineering.pairs]]
+personas = ["Data Engineer", "Analyst"]
+keywords = ["schema", "dashboard"]
+
+[[domains.data_engineering.pairs]]
+personas = ["Platform Owner", "Data Engineer"]
+keywords = ["warehouse", "cost"]
+
+[personas."Data Engineer"]
+icon = "🛠️"
+guidance = "Focus on data quality, lineage, and pipeline reliability"
+"""
+
+
+def builtin_data(tool: CounterPoseTool) -> Dict[str, Any]:
+    return catalog_data(
+        tool.domain_keywords,
+        tool.persona_pairs,
+        tool.persona_keywords,
+        tool.persona_icons,
+        tool.persona_guidance,
+        tool.default_domain,
+    )
+
+
+def test_builtin_round_trip() -> bool:
+    """The exported built-in catalog loads back to identical analyses and guidance."""
+    print("TESTING CATALOG ROUND TRIP")
+    print("=" * 40)
+
+    builtin = CounterPoseTool()
+    text = "We should add JWT authentication and encrypt the database for privacy"
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("catalog.toml", "catalog.json"):
+            path = os.path.join(directory, name)
+            write_catalog_file(path, builtin_data(builtin))
+            tool = CounterPoseTool(catalog=load_catalog(path, cache_dir=""))
+            assert tool.domain_keywords == builtin.domain_keywords
+            assert tool.persona_pairs == builtin.persona_pairs
+            assert tool.persona_keywords == builtin.persona_keywords
+            assert tool.analyze(text) == builtin.analyze(text)
+            for persona in ("Developer", "SEO Specialist", "Unknown Persona"):
+                assert tool._get_critique_format(persona) == builtin._get_critique_format(persona)
+            assert tool.get_persona_icon("ux designer") == builtin.get_persona_icon("UX Designer")
+            print(f"✅ {name} reproduces the built-in catalog")
+    return True
+
+
+def test_index_cache() -> bool:
+    """Later loads of an unchanged file come from the cache; edits recompile."""
+    print("\n" + "=" * 40)
+    print("TESTING COMPILED INDEX CACHE")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.toml")
+        cache_dir = os.path.join(directory, "cache")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(CUSTOM_TOML)
+
+        compiled = load_catalog(path, cache_dir)
+        with open(path, "rb") as handle:
+            cached = cache_path(handle.read(), cache_dir)
+        assert os.listdir(cache_dir) == [os.path.basename(cached)]
+
+        loaded = load_catalog(path, cache_dir)
+        assert loaded is not compiled and loaded.version == compiled.version
+        # The regex is recompiled on first use rather than stored in the index
+        assert loaded.matcher.matcher._pattern is None
+        assert loaded.matcher.match("a schema for the warehouse").domain_counts == {
+            "data_engineering": 2
+        }
+        assert loaded.critique_formats == compiled.critique_formats
+
+        # A corrupt entry is replaced rather than trusted
+        with open(cached, "wb") as handle:
+            handle.write(b"not json")
+        assert load_catalog(path, cache_dir).version == compiled.version
+        with open(cached, "rb") as handle:
+            assert json.load(handle)["default_domain"] == "data_engineering"
+
+        # So is an entry that others could have written
+        with open(cached, "r+", encoding="utf-8") as handle:
+            entry = json.load(handle)
+            entry["domain_keywords"]["data_engineering"].append("planted")
+            handle.seek(0)
+            json.dump(entry, handle)
+            handle.truncate()
+        os.chmod(cached, 0o664)
+        assert "planted" not in load_catalog(path, cache_dir).domain_keywords["data_engineering"]
+        assert not os.stat(cached).st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write('\n[personas.Analyst]\nicon = "🔎"\n')
+        edited = load_catalog(path, cache_dir)
+        assert "🔎 ANALYST" in edited.critique_formats["Analyst"]
+        assert len(os.listdir(cache_dir)) == 2
+        print(f"✅ Cached index reused, rebuilt when corrupt, keyed by content: {cached}")
+    return True
+
+
+def test_custom_catalog() -> bool:
+    """A custom catalog drives detection and guidance, including via the environment."""
+    print("\n" + "=" * 40)
+    print("TESTING CUSTOM CATALOG")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.toml")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(CUSTOM_TOML)
+        os.environ["COUNTER_POSE_CATALOG_FILE"] = path
+        os.environ["COUNTER_POSE_CATALOG_CACHE_DIR"] = os.path.join(directory, "cache")
+        try:
+            tool = CounterPoseTool()
+        finally:
+            del os.environ["COUNTER_POSE_CATALOG_FILE"]
+            del os.environ["COUNTER_POSE_CATALOG_CACHE_DIR"]
+
+    result = tool.submit_reasoning("s1", "Move the ETL pipeline to a cheaper warehouse at low cost")
+    assert result["domain"] == "data_engineering"
+    pairs = [option["personas"] for option in result["persona_options"]]
+    assert pairs == [["Platform Owner", "Data Engineer"], ["Data Engineer", "Analyst"]]
+    guidance = tool.get_persona_guidance("s1", ["Data Engineer", "Analyst"])["format"]
+    assert "🛠️ DATA ENGINEER's CRITIQUE" in guidance["persona1_guidance"]
+    assert "pipeline reliability" in guidance["persona1_guidance"]
+    assert "👤 ANALYST's CRITIQUE" in guidance["persona2_guidance"]
+    assert tool.determine_domain("nothing relevant") == "data_engineering"
+    fallback = tool.submit_reasoning("s2", "hello world")
+    assert fallback["domain"] == "data_engineering"
+    assert fallback["persona_options"]
+    print(f"✅ Detected {result['domain']} with pairs {pairs}")
+
+    invalid = [
+        {},
+        {"domains": {}},
+        {"domains": {"d": {"keywords": "etl"}}},
+        {"domains": {"d": {"pairs": [{"personas": ["Solo"]}]}}},
+        {"domains": {"d": {"pairs": [{"personas": ["A,B", "C"]}]}}},
+        {"domains": {"d": {"pairs": [{"personas": ["A", "B"]}, {"personas": ["A", "B"]}]}}},
+        {"domains": {"d": {"keyword": ["typo"]}}},
+        {"domains": {"d": {}}, "personas": {"A": {"icon": 1}}},
+        {"domains": {"d": {}}, "default_domain": "missing"},
+        {"domains": {"d": {}}, "default_domain": ["d"]},
+    ]
+    for data in invalid:
+        try:
+            parse_catalog(data)
+        except ValueError as error:
+            print(f"✅ Rejected {json.dumps(data)}: {error}")
+        else:
+            raise AssertionError(f"accepted invalid catalog {data}")
+    return True
+
+
+def test_shared_builtin_catalog() -> bool:
+    """Tools share one frozen built-in catalog; overrides copy only what they change."""
+    print("\n" + "=" * 40)
+    print("TESTING SHARED BUILT-IN CATALOG")
+    print("=" * 40)
+
+    shared = builtin_catalog()
+    first, second = CounterPoseTool(), CounterPoseTool()
+    assert first.catalog is second.catalog is shared
+    assert first.matcher is second.matcher
+    for change in (
+        lambda: first.domain_keywords.update(extra=("x",)),
+        lambda: first.persona_icons.__setitem__("developer", "🐛"),
+        lambda: first.domain_keywords["software_development"].append("x"),
+    ):
+        try:
+            change()
+        except (TypeError, AttributeError):
+            pass
+        else:
+            raise AssertionError("the shared catalog must not be changeable")
+    assert pickle.loads(pickle.dumps(shared.persona_keywords)) == shared.persona_keywords
+    assert isinstance(pickle.loads(pickle.dumps(shared.persona_keywords)), FrozenDict)
+    assert json.loads(json.dumps(shared.persona_pairs))["visual_design"][0] == [
+        "UI Minimalist",
+        "Feature-Rich Designer",
+    ]
+
+    first.override_catalog(persona_icons={"Developer": "🐛"})
+    assert "🐛 DEVELOPER" in first._get_critique_format("Developer")
+    assert "👨‍💻 DEVELOPER" in second._get_critique_format("Developer")
+    assert first.catalog.persona_keywords is shared.persona_keywords
+    assert first.matcher is shared.matcher and first.catalog_version != shared.version
+
+    text = "a moodboard for the launch"
+    words = shared.domain_keywords["visual_design"] + ("moodboard",)
+    first.override_catalog(domain_keywords={"visual_design": words})
+    assert first.determine_domain(text) == "visual_design"
+    assert second.determine_domain(text) == "product_strategy"
+    assert first.persona_icons["developer"] == "🐛"
+    changed = first.domain_keywords
+    assert changed is not shared.domain_keywords
+    assert changed["software_development"] is shared.domain_keywords["software_development"]
+    assert builtin_catalog() is shared and CounterPoseTool().catalog is shared
+    print("✅ One catalog shared by reference, overrides stay per tool")
+    return True
+
+
+def test_override_persona_pairs() -> bool:
+    """Overriding persona pairs alone rebuilds the matcher and ranks in the new order."""
+    print("\n" + "=" * 40)
+    print("TESTING PERSONA PAIR OVERRIDES")
+    print("=" * 40)
+
+    shared = builtin_catalog()
+    tool = CounterPoseTool()
+    pairs = shared.persona_pairs["software_development"]
+    tool.override_catalog(persona_pairs={"software_development": pairs[::-1]})
+    assert tool.matcher is not shared.matcher
+    result = tool.submit_reasoning("pairs", "JWT security for the API")
+    assert result["domain"] == "software_development"
+    scores = {tuple(option["personas"]): option["score"] for option in result["persona_options"]}
+    order = list(pairs[::-1])
+    assert list(scores) == sorted(order, key=lambda pair: (-scores[pair], order.index(pair)))
+
+    try:
+        tool.override_catalog(persona_pairs={"software_development": [pairs[0]]})
+    except ValueError as error:
+        assert "not in persona_pairs['software_development']" in str(error)
+    else:
+        raise AssertionError("pairs without their keywords must be rejected")
+    assert tool.catalog.persona_pairs["software_development"] == pairs[::-1]
+    print(f"✅ {len(pairs)} pairs reordered; dropping a pair with keywords is rejected")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_builtin_round_trip(),
+        test_index_cache(),
+        test_custom_catalog(),
+        test_shared_builtin_catalog(),
+        test_override_persona_pairs(),
+    ]
+
+    if all(results):
+        print("\n🎉 All catalog tests passed!")
+    else:
+        print("\n💥 Some catalog tests failed!")
+        sys.exit(1)
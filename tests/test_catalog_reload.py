@@ -0,0 +1,280 @@
+"""Test reloading the catalog file while sessions and calls are in progress."""
+
+import asyncio
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from src.mcp_server.catalog import catalog_data, write_catalog_file
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+
+CATALOG_V1 = """
+[domains.data_engineering]
+keywords = ["pipeline", "etl", "warehouse"]
+
+[[domains.data_engineering.pairs]]
+personas = ["Data Engineer", "Analyst"]
+keywords = ["schema"]
+"""
+
+CATALOG_V2 = CATALOG_V1 + """
+[domains.security]
+keywords = ["breach", "pipeline", "etl", "phishing"]
+
+[[domains.security.pairs]]
+personas = ["Red Team", "Blue Team"]
+keywords = ["phishing"]
+"""
+
+
+def tool_for(path: str, cache_dir: str) -> CounterPoseTool:
+    """Build a tool that loads its catalog from ``path``, as the server does."""
+    os.environ["COUNTER_POSE_CATALOG_FILE"] = path
+    os.environ["COUNTER_POSE_CATALOG_CACHE_DIR"] = cache_dir
+    try:
+        return CounterPoseTool()
+    finally:
+        del os.environ["COUNTER_POSE_CATALOG_FILE"]
+        del os.environ["COUNTER_POSE_CATALOG_CACHE_DIR"]
+
+
+def write(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def test_reload_keeps_sessions() -> bool:
+    """A reload swaps the catalog; existing sessions and uploads carry on."""
+    print("TESTING CATALOG RELOAD")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.toml")
+        write(path, CATALOG_V1)
+        tool = tool_for(path, os.path.join(directory, "cache"))
+        old_version = tool.catalog_version
+        text = "An ETL pipeline hit by a phishing breach"
+        assert tool.submit_reasoning("before", text)["domain"] == "data_engineering"
+        tool.append_reasoning("upload", "the etl pipeline ")
+
+        write(path, CATALOG_V2)
+        result = tool.reload_catalog()
+        assert result["changed"] and result["previous_version"] == old_version
+        assert result["catalog_version"] == tool.catalog_version != old_version
+        assert result["domains"] == 2 and result["persona_pairs"] == 2
+
+        assert tool.submit_reasoning("after", text)["domain"] == "security"
+        before, _ = tool.sessions.lookup("before")
+        after, _ = tool.sessions.lookup("after")
+        assert before.catalog_version == old_version
+        assert after.catalog_version == tool.catalog_version
+        assert before.to_dict()["catalog_version"] == old_version
+        assert "error" not in tool.get_persona_guidance("before", ["Data Engineer", "Analyst"])
+
+        # The upload started under the old catalog is recounted under the new one
+        tool.append_reasoning("upload", "after a phishing breach")
+        finalized = tool.finalize_reasoning("upload")
+        assert finalized["domain"] == "security"
+        assert finalized["persona_options"][0]["personas"] == ["Red Team", "Blue Team"]
+
+        # A broken file leaves the current catalog in place
+        write(path, '[domains.security]\nkeywords = "phishing"\n')
+        current = tool.catalog
+        try:
+            tool.reload_catalog()
+        except ValueError as error:
+            print(f"✅ Rejected broken catalog: {error}")
+        else:
+            raise AssertionError("a broken catalog must not be installed")
+        assert tool.catalog is current
+
+    try:
+        CounterPoseTool().reload_catalog()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("reloading without a catalog file must fail")
+
+    from src.mcp_server import main
+
+    assert "No catalog file" in asyncio.run(main.reload_catalog())["error"]
+    print(f"✅ Reloaded {old_version[:8]} -> {result['catalog_version'][:8]}, sessions kept")
+    return True
+
+
+def test_calls_see_one_catalog() -> bool:
+    """Every call runs entirely on the catalog it started with while reloads happen."""
+    print("\n" + "=" * 40)
+    print("TESTING ATOMIC CATALOG SWAP")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"v{i}.toml") for i in (1, 2)]
+        write(paths[0], CATALOG_V1)
+        write(paths[1], CATALOG_V2)
+        tool = tool_for(paths[0], os.path.join(directory, "cache"))
+        domains = {}
+        for path in paths:
+            tool.catalog_file = path
+            tool.reload_catalog()
+            domains[tool.catalog_version] = set(tool.domain_keywords)
+
+        stop = threading.Event()
+        mismatches = []
+
+        def call_loop() -> None:
+            text = "a phishing breach in the etl pipeline"
+            count = 0
+            while not stop.is_set():
+                session_id = f"s{count}"
+                result = tool.submit_reasoning(session_id, text)
+                session, _ = tool.sessions.lookup(session_id)
+                expected = "security" if "security" in domains[session.catalog_version] else None
+                if result["domain"] != (expected or "data_engineering"):
+                    mismatches.append((session.catalog_version, result["domain"]))
+                count += 1
+
+        thread = threading.Thread(target=call_loop)
+        thread.start()
+        try:
+            for i in range(200):
+                tool.catalog_file = paths[i % 2]
+                tool.reload_catalog()
+        finally:
+            stop.set()
+            thread.join()
+        assert not mismatches, mismatches[:5]
+    print("✅ 200 reloads, no call mixed two catalogs")
+    return True
+
+
+def test_reload_guidance_only() -> bool:
+    """Editing only a persona's icon or guidance still counts as a new catalog."""
+    print("\n" + "=" * 40)
+    print("TESTING GUIDANCE-ONLY RELOAD")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.toml")
+        write(path, CATALOG_V1)
+        tool = tool_for(path, os.path.join(directory, "cache"))
+        old_version = tool.catalog_version
+        tool.submit_reasoning("before", "An ETL pipeline")
+
+        guidance = '\n[personas."Analyst"]\nicon = "📊"\nguidance = "Question the numbers."\n'
+        write(path, CATALOG_V1 + guidance)
+        result = tool.reload_catalog()
+        assert result["changed"] and result["catalog_version"] != old_version
+        assert tool.catalog.persona_guidance["analyst"] == "Question the numbers."
+
+        tool.submit_reasoning("after", "An ETL pipeline")
+        before, _ = tool.sessions.lookup("before")
+        after, _ = tool.sessions.lookup("after")
+        assert before.catalog_version == old_version != after.catalog_version
+
+    print("✅ Guidance and icon edits change the catalog version")
+    return True
+
+
+def test_reload_latency() -> bool:
+    """Reload time, and call latency while reloads run on another thread."""
+    print("\n" + "=" * 40)
+    print("TESTING RELOAD LATENCY")
+    print("=" * 40)
+
+    builtin = CounterPoseTool()
+    data = catalog_data(
+        builtin.domain_keywords,
+        builtin.persona_pairs,
+        builtin.persona_keywords,
+        builtin.persona_icons,
+        builtin.persona_guidance,
+        builtin.default_domain,
+    )
+    # A catalog ten times the built-in one, so that compiling it takes a while
+    scaled = {"personas": data["personas"], "domains": {}}
+    for copy in range(10):
+        for domain, entry in data["domains"].items():
+            scaled["domains"][f"{domain}_{copy}"] = {
+                "keywords": [f"{k}{copy}" for k in entry["keywords"]],
+                "pairs": [
+                    {"personas": p["personas"], "keywords": [f"{k}{copy}" for k in p["keywords"]]}
+                    for p in entry["pairs"]
+                ],
+            }
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.json")
+        write_catalog_file(path, scaled)
+        tool = tool_for(path, os.path.join(directory, "cache"))
+        tool.warm_up()
+
+        text = "we should refactor the api0 and add jwt0 authentication " * 4
+        baseline = []
+        for i in range(300):
+            started = time.perf_counter()
+            tool.submit_reasoning(f"base{i}", f"{text} {i}")
+            baseline.append(time.perf_counter() - started)
+
+        stop = threading.Event()
+        during = []
+
+        def call_loop() -> None:
+            i = 0
+            while not stop.is_set():
+                started = time.perf_counter()
+                tool.submit_reasoning(f"during{i}", f"{text} during {i}")
+                during.append(time.perf_counter() - started)
+                i += 1
+
+        compiled_ms = []
+        cached_ms = []
+        thread = threading.Thread(target=call_loop)
+        thread.start()
+        try:
+            for _ in range(3):
+                # A server reloads once per change, so no compiled regex is reused
+                re.purge()
+                tool.catalog_cache_dir = ""
+                compiled_ms.append(tool.reload_catalog()["reload_seconds"] * 1000)
+                re.purge()
+                tool.catalog_cache_dir = os.path.join(directory, "cache")
+                cached_ms.append(tool.reload_catalog()["reload_seconds"] * 1000)
+        finally:
+            stop.set()
+            thread.join()
+
+    base_p50 = statistics.median(baseline) * 1000
+    during_p50 = statistics.median(during) * 1000
+    during_max = max(during) * 1000
+    reload_ms = statistics.median(compiled_ms)
+    print(f"Reload, compiling:       {reload_ms:7.1f} ms")
+    print(f"Reload, cached index:    {statistics.median(cached_ms):7.1f} ms")
+    print(f"Call p50 without reload: {base_p50:7.3f} ms ({len(baseline)} calls)")
+    print(f"Call p50 during reloads: {during_p50:7.3f} ms, max {during_max:.1f} ms")
+    print(f"({len(during)} calls)")
+    # Calls are served throughout the reloads at their usual latency rather than
+    # queueing behind them
+    assert len(during) > 6 * 10
+    assert during_p50 < max(1.0, 5 * base_p50) < reload_ms
+    print("✅ Calls kept flowing during reloads")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_reload_keeps_sessions(),
+        test_calls_see_one_catalog(),
+        test_reload_guidance_only(),
+        test_reload_latency(),
+    ]
+
+    if all(results):
+        print("\n🎉 All catalog reload tests passed!")
+    else:
+        print("\n💥 Some catalog reload tests failed!")
+        sys.exit(1)
@@ -0,0 +1,148 @@
+"""Test chunked reasoning upload with incremental keyword counts."""
+
+import os
+import random
+import sys
+import tempfile
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.keyword_matcher import CatalogMatcher
+from src.mcp_server.sqlite_store import SqliteSessionStore
+from src.mcp_server.usage_log import UsageLogger
+
+REASONING = (
+    "We plan a Landing Page redesign with A/B testing, then an email campaign. "
+    "The backend API needs JWT security, database indexing, and deployment automation. "
+    "Typography and color choices should follow the brand identity."
+)
+
+
+def test_chunk_boundaries() -> bool:
+    """Every split point gives the same counts as matching the whole text at once."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    matcher = tool.matcher
+
+    print("TESTING CHUNK BOUNDARIES")
+    print("=" * 40)
+
+    whole = matcher.match(REASONING)
+    for split in range(len(REASONING) + 1):
+        state = matcher.start()
+        matcher.feed(state, REASONING[:split])
+        matcher.feed(state, REASONING[split:])
+        chunked = matcher.finish(state)
+        assert chunked.found == whole.found, split
+        assert chunked.domain_counts == whole.domain_counts, split
+        assert chunked.pair_counts == whole.pair_counts, split
+
+    rng = random.Random(7)
+    for _ in range(50):
+        state = matcher.start()
+        position = 0
+        while position < len(REASONING):
+            size = rng.randint(1, 12)
+            matcher.feed(state, REASONING[position : position + size])
+            position += size
+        assert matcher.finish(state).pair_counts == whole.pair_counts
+    print(f"✅ {len(REASONING) + 1} two-way splits and 50 random splits match")
+    return True
+
+
+def test_append_and_finalize() -> bool:
+    """Finalizing a chunked upload returns what submit_reasoning returns for the text."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+
+    print("\n" + "=" * 40)
+    print("TESTING APPEND AND FINALIZE")
+    print("=" * 40)
+
+    for start in range(0, len(REASONING), 40):
+        progress = tool.append_reasoning("chunked", REASONING[start : start + 40])
+    assert progress["characters"] == len(REASONING)
+    assert progress["chunks"] == (len(REASONING) + 39) // 40
+
+    final = tool.finalize_reasoning("chunked")
+    single = tool.submit_reasoning("single", REASONING)
+    assert final["domain"] == single["domain"]
+    assert final["persona_options"] == single["persona_options"]
+    assert tool.sessions["chunked"].reasoning_match is None
+
+    assert "error" in tool.append_reasoning("chunked", "more")
+    assert "error" in tool.finalize_reasoning("chunked")
+    assert "error" in tool.finalize_reasoning("missing")
+    guidance = tool.get_persona_guidance("chunked", ["Developer", "Security Expert"])
+    assert guidance["domain"] == final["domain"]
+    print(f"✅ Finalized domain {final['domain']} matches single-call analysis")
+    return True
+
+
+def test_early_stop() -> bool:
+    """Once the leader cannot be overtaken, only its pair keywords are searched."""
+    matcher = CatalogMatcher(
+        {"alpha": ["apple", "apricot", "avocado"], "beta": ["banana", "cherry"]},
+        {
+            "alpha": {"A1,A2": ["orchard", "juice"]},
+            "beta": {"B1,B2": ["peel"]},
+        },
+    )
+
+    print("\n" + "=" * 40)
+    print("TESTING EARLY STOP")
+    print("=" * 40)
+
+    state = matcher.start(early_stop=True)
+    matcher.feed(state, "an apple")
+    assert state.settled_domain is None
+    matcher.feed(state, " and an apricot from the orch")
+    assert state.settled_domain == "alpha"
+    matcher.feed(state, "ard, then banana peel")
+    match = matcher.finish(state)
+    assert "orchard" in match.found
+    assert match.domain_counts == {"alpha": 2, "beta": 0}
+    assert "banana" not in match.found and "peel" not in match.found
+
+    tied = matcher.start(early_stop=True)
+    matcher.feed(tied, "banana")
+    assert tied.settled_domain is None
+    print("✅ Domain settled after two hits; later text only matched pair keywords")
+    return True
+
+
+def test_upload_resumes_from_sqlite() -> bool:
+    """Chunk state is persisted, so an upload can continue after reopening the store."""
+    print("\n" + "=" * 40)
+    print("TESTING CHUNKED UPLOAD WITH SQLITE STORE")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        half = len(REASONING) // 2
+        store = SqliteSessionStore(path)
+        tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+        tool.append_reasoning("resumed", REASONING[:half])
+        store.close()
+
+        store = SqliteSessionStore(path)
+        tool.sessions = store
+        tool.append_reasoning("resumed", REASONING[half:])
+        final = tool.finalize_reasoning("resumed")
+        assert final["persona_options"] == tool.submit_reasoning("x", REASONING)["persona_options"]
+        assert store.get("resumed").reasoning_match is None
+        store.close()
+    print("✅ Upload resumed across store restarts")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_chunk_boundaries(),
+        test_append_and_finalize(),
+        test_early_stop(),
+        test_upload_resumes_from_sqlite(),
+    ]
+
+    if all(results):
+        print("\n🎉 All chunked reasoning tests passed!")
+    else:
+        print("\n💥 Some chunked reasoning tests failed!")
+        sys.exit(1)
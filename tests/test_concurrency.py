@@ -0,0 +1,181 @@
+"""Test offloading tool work to the worker pool and the event loop lag monitor."""
+
+import asyncio
+import contextvars
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from src.mcp_server.concurrency import LoopLagMonitor, Offloader
+
+REQUEST = contextvars.ContextVar("request", default=None)
+
+
+def worker_name(_: str = "") -> str:
+    return f"{threading.current_thread().name}:{REQUEST.get()}"
+
+
+def test_large_inputs_are_offloaded() -> bool:
+    """Small calls run on the loop thread; large ones run on the pool with the caller's context."""
+    print("TESTING OFFLOAD THRESHOLD")
+    print("=" * 40)
+
+    offloader = Offloader(workers=2, threshold=1000)
+
+    async def scenario() -> Tuple[str, str]:
+        REQUEST.set("r1")
+        return (
+            await offloader.run(worker_name, "small", size=10),
+            await offloader.run(worker_name, "large", size=5000),
+        )
+
+    small, large = asyncio.run(scenario())
+    offloader.close()
+    assert small == "MainThread:r1"
+    assert large.startswith("counter-pose-worker") and large.endswith(":r1")
+    assert offloader.stats()["inline_calls"] == 1 and offloader.stats()["offloaded_calls"] == 1
+
+    blocking = Offloader(threshold=1000, blocking_io=True)
+    assert blocking.should_offload(0)
+    print(f"✅ Small call on {small}, large call on {large}")
+    return True
+
+
+def test_pending_calls_are_bounded() -> bool:
+    """No more than max_pending offloaded calls run at once."""
+    print("\n" + "=" * 40)
+    print("TESTING OFFLOAD CONCURRENCY LIMIT")
+    print("=" * 40)
+
+    offloader = Offloader(workers=8, max_pending=2, threshold=0)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def work() -> None:
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+
+    async def scenario() -> None:
+        await asyncio.gather(*(offloader.run(work) for _ in range(8)))
+
+    asyncio.run(scenario())
+    offloader.close()
+    assert state["peak"] == 2
+    assert offloader.stats()["offloaded_calls"] == 8 and offloader.stats()["waiting"] == 0
+    print(f"✅ Peak concurrency {state['peak']}")
+    return True
+
+
+def test_loop_lag_monitor() -> bool:
+    """Blocking the event loop shows up as lag."""
+    print("\n" + "=" * 40)
+    print("TESTING EVENT LOOP LAG MONITOR")
+    print("=" * 40)
+
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def scenario() -> None:
+        monitor.ensure_started()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # stall the loop
+        await asyncio.sleep(0.03)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    stats = monitor.stats()
+    assert stats["samples"] >= 3
+    assert stats["max_ms"] >= 80
+    assert LoopLagMonitor(interval=0).enabled is False
+    print(f"✅ Lag stats: {stats}")
+    return True
+
+
+def test_server_reports_workers_and_lag() -> bool:
+    """Async tool handlers offload large reasoning and report pool and lag stats."""
+    print("\n" + "=" * 40)
+    print("TESTING ASYNC TOOL HANDLERS")
+    print("=" * 40)
+
+    from fastmcp import Client
+
+    from src.mcp_server import main
+
+    large = "JWT security for the backend API. " * (main.offloader.threshold // 20)
+
+    async def scenario() -> Dict[str, Any]:
+        async with Client(main.mcp) as client:
+            before = main.offloader.offloaded_calls
+            result = await client.call_tool("submit_reasoning", {"reasoning": large})
+            assert json.loads(result[0].text)["domain"] == "software_development"
+            assert main.offloader.offloaded_calls == before + 1
+            result = await client.call_tool("get_server_metrics", {})
+            return json.loads(result[0].text)
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["workers"]["workers"] == main.offloader.workers
+    assert "p99_ms" in snapshot["event_loop_lag"]
+    print(f"✅ Workers: {snapshot['workers']}")
+    return True
+
+
+def test_busy_session_lock_is_offloaded() -> bool:
+    """A small call whose session lock is held elsewhere waits on the pool, not the loop."""
+    print("\n" + "=" * 40)
+    print("TESTING BUSY SESSION LOCK")
+    print("=" * 40)
+
+    from src.mcp_server import main
+
+    main.counter_pose.submit_reasoning("busy", "JWT security")
+    lock = main.counter_pose.sessions.session_lock("busy")
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder() -> None:
+        with lock:
+            held.set()
+            release.wait()
+
+    async def scenario() -> Tuple[int, Dict[str, Any], int]:
+        thread = threading.Thread(target=holder)
+        thread.start()
+        held.wait()
+        before = main.offloader.offloaded_calls
+        call = asyncio.ensure_future(main.run_session_tool("get_session_history", "busy", 0, 5))
+        # The loop keeps running while the call waits for the lock
+        ticks = 0
+        while not call.done() and ticks < 5:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        release.set()
+        result = await call
+        thread.join()
+        return ticks, result, main.offloader.offloaded_calls - before
+
+    ticks, result, offloaded = asyncio.run(scenario())
+    assert ticks == 5 and offloaded == 1
+    assert result["session_id"] == "busy"
+    print(f"✅ Loop ran {ticks} ticks while the call waited for the lock")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_large_inputs_are_offloaded(),
+        test_pending_calls_are_bounded(),
+        test_loop_lag_monitor(),
+        test_server_reports_workers_and_lag(),
+        test_busy_session_lock_is_offloaded(),
+    ]
+
+    if all(results):
+        print("\n🎉 All concurrency tests passed!")
+    else:
+        print("\n💥 Some concurrency tests failed!")
+        sys.exit(1)
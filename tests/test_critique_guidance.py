@@ -0,0 +1,62 @@
+"""Test the precomputed critique guidance and its caches."""
+
+import sys
+import uuid
+
+from src.mcp_server.counter_pose_tool import PERSONA_GUIDANCE, CounterPoseTool
+
+
+def test_guidance_content() -> bool:
+    """Rendered guidance contains the persona's focus, icon, and critique markers."""
+    tool = CounterPoseTool()
+
+    print("TESTING CRITIQUE GUIDANCE CONTENT")
+    print("=" * 40)
+
+    text = tool._get_critique_format("Security Expert")
+    assert "As Security Expert, critique the reasoning" in text
+    assert PERSONA_GUIDANCE["security expert"] in text
+    assert "🔒 SECURITY EXPERT's CRITIQUE:" in text
+    assert "END CRITIQUE" in text
+
+    custom = tool._get_critique_format("Chief Skeptic")
+    assert "Consider the perspective's unique expertise" in custom
+    assert "👤 CHIEF SKEPTIC's CRITIQUE:" in custom
+    assert len(PERSONA_GUIDANCE) == len(tool.persona_icons)
+    print("✅ Guidance rendered for known and custom personas")
+    return True
+
+
+def test_guidance_cached_per_pair() -> bool:
+    """Repeated requests for a pair reuse rendered guidance but not the response dicts."""
+    tool = CounterPoseTool()
+
+    print("\n" + "=" * 40)
+    print("TESTING GUIDANCE CACHING")
+    print("=" * 40)
+
+    first_id, second_id = str(uuid.uuid4()), str(uuid.uuid4())
+    tool.submit_reasoning(first_id, "JWT security")
+    tool.submit_reasoning(second_id, "email campaign")
+    pair = ["Developer", "Security Expert"]
+    first = tool.get_persona_guidance(first_id, pair)
+    second = tool.get_persona_guidance(second_id, pair)
+
+    assert first["session_id"] == first_id and second["session_id"] == second_id
+    assert first["domain"] != second["domain"]
+    assert first["format"] == second["format"]
+    assert first["format"] is not second["format"]
+    assert first["format"]["persona1_guidance"] is second["format"]["persona1_guidance"]
+    assert tool._guidance_format_cache.cache_info().hits == 1
+    print(f"✅ Pair cache: {tool._guidance_format_cache.cache_info()}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [test_guidance_content(), test_guidance_cached_per_pair()]
+
+    if all(results):
+        print("\n🎉 All critique guidance tests passed!")
+    else:
+        print("\n💥 Some critique guidance tests failed!")
+        sys.exit(1)
@@ -0,0 +1,226 @@
+"""Test the HTTP request limits and serving the tools to several clients over HTTP."""
+
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from src.mcp_server.http_transport import (
+    ASGIApp,
+    Message,
+    Receive,
+    RequestLimits,
+    Scope,
+    Send,
+    create_app,
+    low_level_server,
+)
+
+
+async def echo_app(scope: Scope, receive: Receive, send: Send) -> None:
+    """ASGI app that answers with the size of the request body it read."""
+    size = 0
+    while True:
+        message = await receive()
+        size += len(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(size).encode()})
+
+
+def request(
+    app: ASGIApp, body: bytes, chunked: bool = False, method: str = "POST"
+) -> Tuple[int, bytes]:
+    """Send one request through ``app`` and return ``(status, body)``."""
+    headers = [] if chunked else [(b"content-length", str(len(body)).encode())]
+    scope = {"type": "http", "method": method, "headers": headers}
+    chunks = [body[i : i + 10] for i in range(0, len(body), 10)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive() -> Message:
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_body_size_limit() -> bool:
+    """Bodies over the limit get 413, with or without a Content-Length header."""
+    print("TESTING REQUEST BODY LIMIT")
+    print("=" * 40)
+
+    limits = RequestLimits(echo_app, max_body_bytes=100, max_concurrent_requests=0)
+    assert request(limits, b"x" * 100) == (200, b"100")
+    assert request(limits, b"x" * 100, chunked=True) == (200, b"100")
+    status, body = request(limits, b"x" * 101)
+    assert status == 413 and "exceeds 100 bytes" in json.loads(body)["error"]["message"]
+    assert request(limits, b"x" * 101, chunked=True)[0] == 413
+    assert request(limits, b"x" * 500, method="GET") == (200, b"500")
+    assert limits.stats()["rejected_too_large"] == 2
+    print(f"✅ {limits.stats()}")
+    return True
+
+
+def test_concurrency_limit() -> bool:
+    """Requests beyond the concurrency limit get 503 until others finish."""
+    print("\n" + "=" * 40)
+    print("TESTING CONCURRENT REQUEST LIMIT")
+    print("=" * 40)
+
+    release = None
+
+    async def slow_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await release.wait()
+        await echo_app(scope, receive, send)
+
+    limits = RequestLimits(slow_app, max_body_bytes=0, max_concurrent_requests=2)
+    statuses = []
+
+    async def one() -> None:
+        sent = []
+        messages = [{"type": "http.request", "body": b"{}", "more_body": False}]
+
+        async def receive() -> Message:
+            return messages.pop(0)
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "headers": []}
+        await limits(scope, receive, send)
+        statuses.append(sent[0]["status"])
+
+    async def scenario() -> None:
+        nonlocal release
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(one()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*tasks)
+        await one()
+
+    asyncio.run(scenario())
+    assert sorted(statuses) == [200, 200, 200, 503]
+    assert limits.stats()["peak_in_flight"] == 2 and limits.stats()["in_flight"] == 0
+    print(f"✅ Statuses {sorted(statuses)}")
+    return True
+
+
+def test_tool_call_slots() -> bool:
+    """Tool calls beyond the concurrency limit get a busy error, even without a request."""
+    print("\n" + "=" * 40)
+    print("TESTING TOOL CALL SLOTS")
+    print("=" * 40)
+
+    from src.mcp_server import main
+
+    limits = RequestLimits(echo_app, max_body_bytes=0, max_concurrent_requests=1)
+    previous = main.http_limits
+    main.http_limits = limits
+    try:
+        assert limits.enter_call()
+        busy = asyncio.run(main.get_session_history(session_id="missing"))
+        assert busy == {"error": "Server busy, retry shortly"}
+        limits.exit_call()
+        answered = asyncio.run(main.get_session_history(session_id="missing"))
+        assert "not found" in answered["error"]
+    finally:
+        main.http_limits = previous
+    stats = limits.stats()
+    assert stats["rejected_busy_calls"] == 1 and stats["calls_in_flight"] == 0
+    assert stats["peak_calls_in_flight"] == 1
+    print(f"✅ {stats}")
+    return True
+
+
+def test_low_level_server_available() -> bool:
+    """The pinned FastMCP still exposes the server Streamable HTTP is mounted on."""
+    print("\n" + "=" * 40)
+    print("TESTING FASTMCP LOW-LEVEL SERVER")
+    print("=" * 40)
+
+    from fastmcp import FastMCP
+    from mcp.server.lowlevel import Server
+
+    assert isinstance(low_level_server(FastMCP()), Server)
+    print("✅ FastMCP exposes its low-level server")
+    return True
+
+
+def test_clients_share_sessions_over_http() -> bool:
+    """Two clients of one HTTP server continue the same Counter-Pose session."""
+    print("\n" + "=" * 40)
+    print("TESTING STREAMABLE HTTP TRANSPORT")
+    print("=" * 40)
+
+    import uvicorn
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    from src.mcp_server import main
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}/mcp"
+    app = create_app(main.mcp, "http", max_body_bytes=64 * 1024)
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    async def call(tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        async with streamablehttp_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                result = await session.call_tool(tool, arguments)
+                return json.loads(result.content[0].text)
+
+    async def scenario() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        first = await call(
+            "submit_reasoning", {"reasoning": "JWT security for the API", "session_id": "http-1"}
+        )
+        second = await call(
+            "get_persona_guidance",
+            {"session_id": "http-1", "persona_pair": ["Developer", "Security Expert"]},
+        )
+        return first, second
+
+    try:
+        first, second = asyncio.run(scenario())
+    finally:
+        server.should_exit = True
+        thread.join(10)
+        sock.close()
+    assert first["domain"] == "software_development"
+    assert second["selected_personas"] == ["Developer", "Security Expert"]
+    assert app.stats()["requests"] > 0 and app.stats()["in_flight"] == 0
+    print(f"✅ Session continued by a second client; {app.stats()['requests']} requests")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_body_size_limit(),
+        test_concurrency_limit(),
+        test_tool_call_slots(),
+        test_low_level_server_available(),
+        test_clients_share_sessions_over_http(),
+    ]
+
+    if all(results):
+        print("\n🎉 All HTTP transport tests passed!")
+    else:
+        print("\n💥 Some HTTP transport tests failed!")
+        sys.exit(1)
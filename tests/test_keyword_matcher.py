@@ -0,0 +1,120 @@
+"""Test the single-pass keyword matcher against the original per-keyword scan."""
+
+import random
+import sys
+from typing import List, Tuple
+
+from src.mcp_server import keyword_matcher
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.keyword_matcher import KeywordMatcher
+
+
+def _reference_domain(tool: CounterPoseTool, text: str) -> str:
+    """Original determine_domain: one lowercase + substring scan per keyword."""
+    matches = {domain: 0 for domain in tool.domain_keywords}
+    for domain, domain_keywords in tool.domain_keywords.items():
+        for keyword in domain_keywords:
+            if keyword.lower() in text.lower():
+                matches[domain] += 1
+    best_match = max(matches.items(), key=lambda x: x[1])
+    return best_match[0] if best_match[1] > 0 else "product_strategy"
+
+
+def _reference_ranking(
+    tool: CounterPoseTool, domain: str, text: str
+) -> List[Tuple[Tuple[str, ...], int, str]]:
+    """Original _rank_persona_pairs implementation."""
+    pairs_with_scores = []
+    for pair_key, keywords in tool.persona_keywords.get(domain, {}).items():
+        persona_pair = tuple(pair_key.split(","))
+        matched_keywords = [k for k in keywords if k.lower() in text.lower()]
+        reason = (
+            f"Matched keywords: {', '.join(matched_keywords)}"
+            if matched_keywords
+            else "General domain fit"
+        )
+        pairs_with_scores.append((persona_pair, len(matched_keywords), reason))
+    pairs_with_scores.sort(key=lambda x: (-x[1], tool.persona_pairs[domain].index(x[0])))
+    return pairs_with_scores
+
+
+def test_overlapping_and_prefix_keywords() -> bool:
+    """Keywords that overlap or prefix each other are all reported."""
+    matcher = KeywordMatcher(["design", "design system", "custom design", "app", "application"])
+
+    print("TESTING OVERLAPPING KEYWORDS")
+    print("=" * 40)
+
+    found = matcher.find("A Custom Design System for the Application")
+    print(f"Found: {sorted(found)}")
+    assert found == {"design", "design system", "custom design", "app", "application"}
+    assert matcher.find("nothing relevant") == frozenset()
+    assert KeywordMatcher([]).find("anything") == frozenset()
+    return True
+
+
+def test_matches_reference_implementation() -> bool:
+    """Domain detection and pair ranking are identical to the per-keyword scan."""
+    tool = CounterPoseTool()
+
+    print("\n" + "=" * 40)
+    print("TESTING EQUIVALENCE WITH REFERENCE SCAN")
+    print("=" * 40)
+
+    vocabulary = [k for keywords in tool.domain_keywords.values() for k in keywords]
+    for pairs in tool.persona_keywords.values():
+        vocabulary.extend(k for keywords in pairs.values() for k in keywords)
+    vocabulary.extend(["the", "and", "we", "should", "x", "Ünïcode", "💻", "\n"])
+
+    rng = random.Random(1234)
+    texts = ["", "a", "software development " * 50]
+    for _ in range(300):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 30))]
+        # Join with and without separators so keywords also straddle word boundaries
+        texts.append(("" if rng.random() < 0.3 else " ").join(words))
+
+    for text in texts:
+        domain = tool.determine_domain(text)
+        assert domain == _reference_domain(tool, text)
+        for candidate in tool.persona_keywords:
+            assert tool._rank_persona_pairs(candidate, text) == _reference_ranking(
+                tool, candidate, text
+            )
+
+    print(f"✅ {len(texts)} texts produced identical domains and rankings")
+    return True
+
+
+def test_sliced_scan_matches_single_scan() -> bool:
+    """Scanning long texts in overlapping slices finds exactly the same keywords."""
+    matcher = KeywordMatcher(["design", "design system", "custom design", "app", "application"])
+
+    print("\n" + "=" * 40)
+    print("TESTING SLICED SCANS")
+    print("=" * 40)
+
+    rng = random.Random(99)
+    pieces = ["custom design system", "application", "app", "desi", "gn", " ", "x"]
+    original = keyword_matcher.SCAN_SLICE_CHARS
+    try:
+        for _ in range(200):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 60)))
+            keyword_matcher.SCAN_SLICE_CHARS = rng.randint(1, 40)
+            expected = {k for k in matcher.keywords if k in text}
+            assert matcher.find_lowered(text) == expected, text
+    finally:
+        keyword_matcher.SCAN_SLICE_CHARS = original
+    print("✅ 200 texts matched identically across slice sizes")
+    return True
+
+
+if __name__ == "__main__":
+    test1_success = test_overlapping_and_prefix_keywords()
+    test2_success = test_matches_reference_implementation()
+    test3_success = test_sliced_scan_matches_single_scan()
+
+    if test1_success and test2_success and test3_success:
+        print("\n🎉 All keyword matcher tests passed!")
+    else:
+        print("\n💥 Some keyword matcher tests failed!")
+        sys.exit(1)
@@ -0,0 +1,152 @@
+"""Test per-tool metrics recording and the OpenMetrics dump."""
+
+import sys
+from typing import Callable
+
+from src.mcp_server.metrics import MAX_ERROR_KINDS, OTHER_ERRORS, ServerMetrics, payload_bytes
+
+
+def make_handlers(metrics: ServerMetrics) -> Callable[..., dict]:
+    @metrics.instrument
+    def lookup(session_id: str, text: str = "") -> dict:
+        if session_id == "missing":
+            return {"error": f"Session {session_id} not found"}
+        if session_id == "boom":
+            raise RuntimeError("backend down")
+        return {"session_id": session_id, "echo": text}
+
+    return lookup
+
+
+def test_records_calls_and_errors() -> bool:
+    """Latency, sizes, and errors are recorded per tool, grouped by error string."""
+    print("TESTING METRICS RECORDING")
+    print("=" * 40)
+
+    metrics = ServerMetrics(session_count=lambda: 3)
+    lookup = make_handlers(metrics)
+    assert lookup.__name__ == "lookup" and lookup.__wrapped__ is not None
+
+    for _ in range(5):
+        lookup(session_id="ok", text="x" * 100)
+    lookup(session_id="missing")
+    try:
+        lookup(session_id="boom")
+        raise AssertionError("exception should propagate")
+    except RuntimeError:
+        pass
+
+    snapshot = metrics.snapshot()
+    tool = snapshot["tools"]["lookup"]
+    assert snapshot["live_sessions"] == 3
+    assert tool["calls"] == 7 and tool["errors"] == 2
+    assert tool["error_counts"] == {
+        "Session <session_id> not found": 1,
+        "RuntimeError: backend down": 1,
+    }
+    assert tool["request_bytes"]["max"] >= 100
+    assert tool["latency_ms"]["p99"] >= tool["latency_ms"]["p50"] >= 0
+    print(f"✅ {tool['calls']} calls, errors {tool['error_counts']}")
+    return True
+
+
+def test_error_kinds_are_bounded() -> bool:
+    """Distinct error strings beyond the limit share one counter."""
+    print("\n" + "=" * 40)
+    print("TESTING ERROR CARDINALITY LIMIT")
+    print("=" * 40)
+
+    metrics = ServerMetrics()
+
+    @metrics.instrument
+    def fail(code: int) -> dict:
+        return {"error": f"failure {code}"}
+
+    for code in range(MAX_ERROR_KINDS + 10):
+        fail(code=code)
+    counts = metrics.snapshot()["tools"]["fail"]["error_counts"]
+    assert len(counts) == MAX_ERROR_KINDS + 1
+    assert counts[OTHER_ERRORS] == 10
+    print(f"✅ {len(counts)} error kinds kept")
+    return True
+
+
+def test_disabled_leaves_handlers_unwrapped() -> bool:
+    """Disabled metrics return the original handler."""
+    print("\n" + "=" * 40)
+    print("TESTING DISABLED METRICS")
+    print("=" * 40)
+
+    metrics = ServerMetrics(enabled=False)
+
+    def handler() -> dict:
+        return {}
+
+    assert metrics.instrument(handler) is handler
+    assert metrics.snapshot()["tools"] == {}
+    print("✅ Handler returned unchanged")
+    return True
+
+
+def test_payload_bytes() -> bool:
+    """Payload sizes approximate the UTF-8 JSON size."""
+    print("\n" + "=" * 40)
+    print("TESTING PAYLOAD SIZES")
+    print("=" * 40)
+
+    assert payload_bytes("abc") == 3
+    assert payload_bytes("é") == 2
+    assert payload_bytes(["ab", "cd"]) == 4
+    assert payload_bytes({"k": "vv"}) == 3
+    assert payload_bytes(None) == 4 and payload_bytes(12) == 2
+    print("✅ Sizes match")
+    return True
+
+
+def test_openmetrics_dump() -> bool:
+    """The OpenMetrics dump has cumulative buckets, counts, and a terminating EOF."""
+    print("\n" + "=" * 40)
+    print("TESTING OPENMETRICS DUMP")
+    print("=" * 40)
+
+    metrics = ServerMetrics(session_count=lambda: 2)
+    lookup = make_handlers(metrics)
+    lookup(session_id="ok", text='quote " and newline\n')
+    lookup(session_id="missing")
+
+    text = metrics.to_openmetrics()
+    lines = text.splitlines()
+    assert lines[-1] == "# EOF" and text.endswith("\n")
+    assert 'counter_pose_tool_calls_total{tool="lookup"} 2' in lines
+    assert (
+        'counter_pose_tool_errors_total{tool="lookup",error="Session <session_id> not found"} 1'
+        in lines
+    )
+    assert 'counter_pose_tool_latency_seconds_bucket{tool="lookup",le="+Inf"} 2' in lines
+    assert 'counter_pose_tool_latency_seconds_count{tool="lookup"} 2' in lines
+    assert "counter_pose_live_sessions 2" in lines
+
+    buckets = [
+        int(line.rsplit(" ", 1)[1])
+        for line in lines
+        if line.startswith("counter_pose_tool_request_bytes_bucket")
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == 2
+    print(f"✅ {len(lines)} exposition lines")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_records_calls_and_errors(),
+        test_error_kinds_are_bounded(),
+        test_disabled_leaves_handlers_unwrapped(),
+        test_payload_bytes(),
+        test_openmetrics_dump(),
+    ]
+
+    if all(results):
+        print("\n🎉 All metrics tests passed!")
+    else:
+        print("\n💥 Some metrics tests failed!")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+"""Test the character n-gram detection engine and selecting it per request."""
+
+import asyncio
+import sys
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.ngram_classifier import NGRAM_MAX_BYTES, featurize
+
+# Reasoning without a single catalog keyword, which keyword matching cannot place
+UNMATCHED = {
+    "software_development": "Let's containerize the service with Docker and run it on Kubernetes.",
+    "digital_marketing": (
+        "Post three times a week and reply to every comment to grow the community."
+    ),
+    "visual_design": "Increase the whitespace between sections so the page feels less cluttered.",
+}
+
+
+def test_featurize() -> bool:
+    """Vectors are deterministic, case-insensitive, and bounded in size and input."""
+    print("TESTING N-GRAM FEATURES")
+    print("=" * 40)
+
+    vector = featurize("JWT security for the API")
+    assert np.array_equal(vector, featurize("jwt  SECURITY, for the api!"))
+    assert vector.shape == featurize("x" * 10).shape and vector.any()
+    assert not featurize("").any() and not featurize(" ... ").any()
+    long_text = "a b " * NGRAM_MAX_BYTES
+    assert np.array_equal(featurize(long_text), featurize(long_text[:NGRAM_MAX_BYTES]))
+    print(f"✅ {vector.shape[0]} buckets, {int((vector > 0).sum())} used by a short text")
+    return True
+
+
+def test_places_text_without_keywords() -> bool:
+    """The n-gram engine detects domains where keyword matching falls back."""
+    print("\n" + "=" * 40)
+    print("TESTING N-GRAM DOMAIN DETECTION")
+    print("=" * 40)
+
+    tool = CounterPoseTool()
+    for domain, text in UNMATCHED.items():
+        assert not any(tool.match_keywords(text).domain_counts.values())
+        assert tool.analyze(text, "keyword")[0] == "product_strategy"
+        detected, ranked_pairs = tool.analyze(text, "ngram")
+        assert detected == domain, (text, detected)
+        pairs = [pair for pair, _, _ in ranked_pairs]
+        assert sorted(pairs) == sorted(tool.persona_pairs[domain])
+        scores = [score for _, score, _ in ranked_pairs]
+        assert scores == sorted(scores, reverse=True)
+        print(f"✅ {domain}: {pairs[0]} ({scores[0]})")
+
+    assert tool.analyze("JWT security for the backend API", "ngram")[0] == "software_development"
+    assert tool.analyze("", "ngram")[0] == "product_strategy"
+    return True
+
+
+def test_engine_per_request() -> bool:
+    """Each request may pick an engine; results are cached per engine."""
+    print("\n" + "=" * 40)
+    print("TESTING ENGINE SELECTION")
+    print("=" * 40)
+
+    from src.mcp_server import main
+
+    text = UNMATCHED["visual_design"]
+    tool = CounterPoseTool()
+    assert tool.submit_reasoning("keyword", text)["domain"] == "product_strategy"
+    assert tool.submit_reasoning("ngram", text, "ngram")["domain"] == "visual_design"
+    assert tool.submit_reasoning("again", text)["domain"] == "product_strategy"
+    batch = tool.submit_reasoning_batch([("b1", text), ("b2", text)], "ngram")
+    assert [result["domain"] for result in batch["results"]] == ["visual_design"] * 2
+    try:
+        tool.analyze(text, "regex")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown engines must be rejected")
+
+    async def scenario() -> Tuple[Dict, Dict, Dict]:
+        chosen = await main.submit_reasoning(reasoning=text, engine="ngram")
+        rejected = await main.submit_reasoning(reasoning=text, engine="regex")
+        rejected_batch = await main.submit_reasoning_batch(reasonings=[text], engine="regex")
+        return chosen, rejected, rejected_batch
+
+    chosen, rejected, rejected_batch = asyncio.run(scenario())
+    assert chosen["domain"] == "visual_design"
+    assert "Unknown detection engine 'regex'" in rejected["error"]
+    assert rejected["error"] == rejected_batch["error"]
+    print(f"✅ {rejected['error']}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_featurize(),
+        test_places_text_without_keywords(),
+        test_engine_per_request(),
+    ]
+
+    if all(results):
+        print("\n🎉 All n-gram classifier tests passed!")
+    else:
+        print("\n💥 Some n-gram classifier tests failed!")
+        sys.exit(1)
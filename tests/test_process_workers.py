@@ -0,0 +1,197 @@
+"""Test running tool calls on forked worker processes with session and shared routing."""
+
+import asyncio
+import functools
+import os
+import signal
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.process_workers import ProcessWorkerPool
+from src.mcp_server.session_store import InMemorySessionStore
+from src.mcp_server.sqlite_store import SqliteSessionStore
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+REASONING = "JWT security for the backend API"
+
+
+def memory_tool(index: int, logger: UsageLogger) -> CounterPoseTool:
+    return CounterPoseTool(sessions=InMemorySessionStore(background_expiry=False), logger=logger)
+
+
+def sqlite_tool(path: str, index: int, logger: UsageLogger) -> CounterPoseTool:
+    return CounterPoseTool(sessions=SqliteSessionStore(path), logger=logger)
+
+
+async def run_flow(pool: ProcessWorkerPool, session_id: str) -> dict:
+    await pool.call("submit_reasoning", session_id, REASONING)
+    await pool.call("get_persona_guidance", session_id, PAIR)
+    return await pool.call("submit_critique", session_id, PAIR[0], "a", PAIR[1], "b")
+
+
+def test_session_routing() -> bool:
+    """Each session stays on the worker its ID hashes to; usage lines reach the server log."""
+    print("TESTING SESSION ROUTING")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=log_file)
+        pool = ProcessWorkerPool(memory_tool, 2, routing="session", logger=logger)
+        pool.start()
+        try:
+            session_ids = [f"session-{i}" for i in range(20)]
+
+            async def scenario() -> List[dict]:
+                return await asyncio.gather(*(run_flow(pool, sid) for sid in session_ids))
+
+            results = asyncio.run(scenario())
+            assert all("error" not in result for result in results), results
+            assert pool.session_count() == len(session_ids)
+            per_worker = [stats["sessions"]["sessions"] for stats in pool.command("stats")]
+            expected = [0, 0]
+            for session_id in session_ids:
+                expected[pool.worker_for(session_id)] += 1
+            assert per_worker == expected
+        finally:
+            pool.close()
+        logger.close()
+        with open(log_file) as handle:
+            lines = handle.readlines()
+        # submit_reasoning, get_persona_guidance, and one line per critique
+        assert len(lines) == 4 * len(session_ids)
+        assert {line.split(",")[1] for line in lines} == set(session_ids)
+    print(f"✅ Sessions per worker {per_worker}, {len(lines)} usage lines forwarded")
+    return True
+
+
+def test_shared_routing_with_sqlite() -> bool:
+    """With a shared SQLite store, steps of one session may run on different workers."""
+    print("\n" + "=" * 40)
+    print("TESTING SHARED ROUTING")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        factory = functools.partial(sqlite_tool, path)
+        # The server's own store is closed around the fork and reopened on next use
+        server_store = SqliteSessionStore(path)
+        pool = ProcessWorkerPool(factory, 2, routing="shared")
+        pool.start()
+        assert server_store._connection is None
+        try:
+            session_ids = [f"shared-{i}" for i in range(12)]
+
+            async def scenario() -> List[dict]:
+                return await asyncio.gather(*(run_flow(pool, sid) for sid in session_ids))
+
+            results = asyncio.run(scenario())
+            assert all("error" not in result for result in results), results
+            assert pool.session_count() == len(session_ids)
+            calls = [worker["calls"] for worker in pool.stats()["workers"]]
+            assert all(count > 0 for count in calls)
+            assert sum(calls) == 3 * len(session_ids) + 1  # and the session count
+            assert len(server_store) == len(session_ids)
+        finally:
+            pool.close()
+            server_store.close()
+    print(f"✅ Calls per worker {calls}")
+    return True
+
+
+def test_batches_and_failures() -> bool:
+    """Batches are split between workers and merged in order; worker errors are raised."""
+    print("\n" + "=" * 40)
+    print("TESTING BATCHES AND FAILURES")
+    print("=" * 40)
+
+    pool = ProcessWorkerPool(memory_tool, 2, routing="session")
+    pool.start()
+    items = [(f"batch-{i}", REASONING) for i in range(10)]
+
+    async def scenario() -> Tuple[Dict, str]:
+        batch = await pool.submit_reasoning_batch(items)
+        try:
+            await pool.call("get_persona_guidance", "batch-0", None)
+        except RuntimeError as error:
+            failure = str(error)
+        else:
+            failure = ""
+        return batch, failure
+
+    try:
+        batch, failure = asyncio.run(scenario())
+        assert batch["count"] == len(items)
+        assert [result["session_id"] for result in batch["results"]] == [sid for sid, _ in items]
+        assert "TypeError" in failure
+        assert pool.session_count() == len(items)
+        try:
+            pool.submit("set_catalog", "batch-0")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("workers must reject methods outside WORKER_METHODS")
+    finally:
+        pool.close()
+    closed = pool.submit("get_session_history", "batch-0")
+    assert isinstance(closed.exception(), RuntimeError)
+    print(f"✅ Batch of {batch['count']} merged in order; failure reported as: {failure}")
+    return True
+
+
+def test_dead_worker_replaced() -> bool:
+    """Calls on a worker that died fail at once, and a replacement takes over."""
+    print("\n" + "=" * 40)
+    print("TESTING WORKER RESTART")
+    print("=" * 40)
+
+    pool = ProcessWorkerPool(memory_tool, 2, routing="session")
+    pool.start()
+    session_id = next(f"s{i}" for i in range(100) if pool.worker_for(f"s{i}") == 0)
+    try:
+        first = pool.submit("submit_reasoning", session_id, REASONING).result(10)
+        assert first["session_id"] == session_id
+        pid = pool.stats()["workers"][0]["pid"]
+        os.kill(pid, signal.SIGKILL)
+        # The call fails at once, or if the replacement is already up, finds no session
+        started = time.perf_counter()
+        call = pool.submit("get_session_history", session_id)
+        failed = call.exception(10) or call.result()["error"]
+        assert time.perf_counter() - started < 5
+
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline:
+            worker = pool.stats()["workers"][0]
+            if worker["alive"] and worker["restarts"] == 1:
+                break
+            time.sleep(0.01)
+        assert worker["pid"] != pid and worker["restarts"] == 1
+        # The replacement comes from the fork server, not a fork of this threaded process
+        assert pool._workers[0].process._start_method == "forkserver"
+        # The replacement starts empty; sessions held by the dead worker are gone
+        history = pool.submit("get_session_history", session_id).result(10)
+        assert "not found" in history["error"]
+        assert pool.submit("submit_reasoning", session_id, REASONING).result(10)["domain"]
+    finally:
+        pool.close()
+    print(f"✅ Worker {pid} replaced by {worker['pid']}; its call failed: {failed}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_session_routing(),
+        test_shared_routing_with_sqlite(),
+        test_batches_and_failures(),
+        test_dead_worker_replaced(),
+    ]
+
+    if all(results):
+        print("\n🎉 All process worker tests passed!")
+    else:
+        print("\n💥 Some process worker tests failed!")
+        sys.exit(1)
@@ -0,0 +1,195 @@
+"""Stress test the sharded session store and per-session serialization from many threads."""
+
+import os
+import random
+import sys
+import threading
+from typing import Callable, TypeVar
+
+from src.mcp_server.counter_pose_tool import CounterPoseSession, CounterPoseTool
+from src.mcp_server.session_store import (
+    EVICTED,
+    FOUND,
+    NOT_FOUND,
+    ShardedSessionStore,
+    estimate_session_bytes,
+)
+from src.mcp_server.usage_log import UsageLogger
+
+PAIRS = [["Developer", "Security Expert"], ["UX Designer", "Frontend Engineer"]]
+THREADS = 8
+
+T = TypeVar("T")
+
+
+def make_tool(shards: int = 8) -> CounterPoseTool:
+    store = ShardedSessionStore(shards=shards, max_sessions=100_000, background_expiry=False)
+    return CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+
+
+def run_threads(target: Callable[[int], object], count: int = THREADS) -> None:
+    errors = []
+
+    def guarded(index: int) -> None:
+        try:
+            target(index)
+        except BaseException as error:  # noqa: BLE001 - reported by the main thread
+            errors.append(error)
+
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        threads = [threading.Thread(target=guarded, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+    assert not errors, errors[0]
+
+
+def test_sharded_store_basics() -> bool:
+    """Sessions route to shards; limits, tombstones, and iteration work across shards."""
+    print("TESTING SHARDED SESSION STORE")
+    print("=" * 40)
+
+    store = ShardedSessionStore(shards=4, max_sessions=8, background_expiry=False)
+    store.put_many([CounterPoseSession(f"s{i}", "software_development") for i in range(40)])
+
+    assert len(store) <= 8 + len(store.shards) - 1
+    assert sorted(store) == sorted(sid for shard in store.shards for sid in shard)
+    statuses = {store.lookup(f"s{i}")[1] for i in range(40)}
+    assert statuses == {FOUND, EVICTED}
+    assert store.lookup("never")[1] == NOT_FOUND
+    stats = store.stats()
+    assert stats["shards"] == 4 and stats["sessions"] == len(store)
+    assert stats["evictions"] == 40 - len(store)
+    assert store.session_lock("s1") is store.session_lock("s1")
+    print(f"✅ {len(store)} sessions kept across {stats['shards']} shards")
+    return True
+
+
+def test_one_session_from_many_threads() -> bool:
+    """Concurrent persona changes and critiques on one session never interleave."""
+    print("\n" + "=" * 40)
+    print("TESTING ONE HOT SESSION")
+    print("=" * 40)
+
+    tool = make_tool()
+    tool.submit_reasoning("hot", "JWT security and a responsive UI")
+    accepted = [0] * THREADS
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        for _ in range(150):
+            pair = rng.choice(PAIRS)
+            tool.get_persona_guidance("hot", pair)
+            result = tool.submit_critique("hot", pair[0], f"t{index}", pair[1], f"t{index}")
+            if "error" in result:
+                assert "not part of this session" in result["error"], result
+            else:
+                accepted[index] += 1
+
+    run_threads(worker)
+
+    steps = tool.sessions.get("hot").steps
+    assert len(steps) == 2 * sum(accepted)
+    for first, second in zip(steps[::2], steps[1::2]):
+        # Both critiques of one submission are adjacent, from one thread, and one pair
+        assert [first["persona"], second["persona"]] in PAIRS
+        assert first["content"] == second["content"]
+        assert first["timestamp"] == second["timestamp"]
+    print(f"✅ {sum(accepted)} critiques recorded without interleaving")
+    return True
+
+
+def test_many_sessions_from_many_threads() -> bool:
+    """Many threads creating and using their own sessions keep the store consistent."""
+    print("\n" + "=" * 40)
+    print("TESTING MANY SESSIONS")
+    print("=" * 40)
+
+    tool = make_tool()
+    per_thread = 100
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        for i in range(per_thread):
+            session_id = f"t{index}-{i}"
+            tool.submit_reasoning(session_id, "JWT security for the backend API")
+            tool.get_persona_guidance(session_id, PAIRS[0])
+            result = tool.submit_critique(session_id, *[PAIRS[0][0], "a", PAIRS[0][1], "b"])
+            assert "error" not in result, result
+            # Read sessions other threads may be writing
+            other = f"t{rng.randrange(THREADS)}-{rng.randrange(per_thread)}"
+            tool.get_session_history(other)
+
+    run_threads(worker)
+
+    store = tool.sessions
+    assert len(store) == THREADS * per_thread
+    sessions = [store.get(session_id) for session_id in store]
+    assert all(len(session.steps) == 2 for session in sessions)
+    assert store.stats()["bytes"] == sum(estimate_session_bytes(s) for s in sessions)
+    print(f"✅ {len(store)} sessions with consistent byte accounting")
+    return True
+
+
+def test_analysis_outside_session_lock() -> bool:
+    """Text is analyzed and scanned before the session lock is taken."""
+    print("\n" + "=" * 40)
+    print("TESTING LOCK SCOPE")
+    print("=" * 40)
+
+    tool = make_tool()
+    locks = [tool.sessions.session_lock("s1"), tool.sessions.session_lock("s2")]
+    free_while_scanning = []
+
+    def probe() -> None:
+        # Another thread can take the locks only if this call does not hold them
+        acquired = [lock.acquire(timeout=1) for lock in locks]
+        free_while_scanning.append(all(acquired))
+        for lock, held in zip(locks, acquired):
+            if held:
+                lock.release()
+
+    def checked(function: Callable[..., T]) -> Callable[..., T]:
+        def wrapper(*args: object, **kwargs: object) -> T:
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    analyze, matcher = tool.analyze, tool.catalog.matcher
+    tool.analyze = checked(analyze)
+    matcher.scan = checked(matcher.scan)
+    try:
+        assert tool.submit_reasoning("s1", "JWT security")["domain"] == "software_development"
+        tool.append_reasoning("s2", "JWT sec")
+        result = tool.append_reasoning("s2", "urity and a responsive UI")
+        assert result["chunks"] == 2
+    finally:
+        del matcher.scan
+    finalized = tool.finalize_reasoning("s2")
+    assert finalized == tool._session_options("s2", *analyze("JWT security and a responsive UI"))
+    assert free_while_scanning == [True, True, True]
+    print("✅ Analysis and chunk scans ran with the session lock free")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_sharded_store_basics(),
+        test_one_session_from_many_threads(),
+        test_many_sessions_from_many_threads(),
+        test_analysis_outside_session_lock(),
+    ]
+
+    if all(results):
+        print("\n🎉 All session concurrency tests passed!")
+    else:
+        print("\n💥 Some session concurrency tests failed!")
+        sys.exit(1)
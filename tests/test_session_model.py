@@ -0,0 +1,101 @@
+"""Test the compact session and step representation."""
+
+import sys
+from datetime import datetime
+
+from src.mcp_server.counter_pose_tool import CounterPoseSession, CounterPoseTool
+from src.mcp_server.session_model import (
+    Codebook,
+    Step,
+    format_timestamp,
+    now_us,
+    parse_timestamp,
+)
+
+
+def test_session_is_compact() -> bool:
+    """Sessions have no __dict__ and allocate collections only when used."""
+    session = CounterPoseSession("s1", "software_development")
+
+    print("TESTING COMPACT SESSION")
+    print("=" * 40)
+
+    assert not hasattr(session, "__dict__")
+    assert session._steps is None and session._blind_spots is None
+    assert session.to_dict()["steps"] == [] and session._steps is None
+    assert session.domain == "software_development"
+    assert isinstance(session._domain, int)
+
+    session.personas = ["Developer", "Security Expert"]
+    assert session.personas == ["Developer", "Security Expert"]
+    assert all(isinstance(code, int) for code in session._personas)
+
+    session.blind_spots.append("rate limits")
+    assert session.to_dict()["blind_spots"] == ["rate limits"]
+    print("✅ Slots, codes, and lazy collections in place")
+    return True
+
+
+def test_steps_read_like_dicts() -> bool:
+    """Steps keep the dict interface and to_dict output of the old representation."""
+    tool = CounterPoseTool()
+
+    print("\n" + "=" * 40)
+    print("TESTING STEP COMPATIBILITY")
+    print("=" * 40)
+
+    tool.submit_reasoning("s2", "JWT security")
+    tool.get_persona_guidance("s2", ["Developer", "Security Expert"])
+    tool.submit_critique("s2", "Developer", "first", "Security Expert", "second")
+    session = tool.sessions.get("s2")
+
+    step = session.steps[1]
+    assert step["type"] == "critique" and step.get("persona") == "Security Expert"
+    assert "timestamp" in step and step.get("missing", "default") == "default"
+    data = session.to_dict()
+    assert data["steps"][0] == {
+        "type": "critique",
+        "persona": "Developer",
+        "content": "first",
+        "timestamp": session.steps[0]["timestamp"],
+    }
+    assert data["steps"][0]["timestamp"] == data["steps"][1]["timestamp"]
+    datetime.fromisoformat(data["started_at"])
+    assert step == dict(step)
+    print(f"✅ Step serializes as {data['steps'][1]}")
+    return True
+
+
+def test_timestamps_and_codebooks() -> bool:
+    """Integer timestamps round-trip through ISO strings, and codebooks stay bounded."""
+    print("\n" + "=" * 40)
+    print("TESTING TIMESTAMPS AND CODEBOOKS")
+    print("=" * 40)
+
+    stamp = now_us()
+    assert parse_timestamp(format_timestamp(stamp)) == stamp
+    assert now_us() >= stamp
+    text = datetime(2024, 6, 15, 12, 30, 15, 123456).isoformat()
+    assert format_timestamp(parse_timestamp(text)) == text
+
+    book = Codebook(max_codes=2)
+    assert (book.encode("a"), book.encode("b"), book.encode("a")) == (0, 1, 0)
+    assert book.encode("c") == "c" and book.decode("c") == "c"
+    assert len(book) == 2
+    assert Step("critique", "Anyone", "x", stamp).persona == "Anyone"
+    print("✅ Timestamps round-trip; codebook overflow falls back to strings")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_session_is_compact(),
+        test_steps_read_like_dicts(),
+        test_timestamps_and_codebooks(),
+    ]
+
+    if all(results):
+        print("\n🎉 All session model tests passed!")
+    else:
+        print("\n💥 Some session model tests failed!")
+        sys.exit(1)
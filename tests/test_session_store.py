@@ -0,0 +1,179 @@
+"""Test the bounded in-memory session store."""
+
+import sys
+import uuid
+from typing import Optional, Tuple
+
+from src.mcp_server.counter_pose_tool import CounterPoseSession, CounterPoseTool
+from src.mcp_server.session_model import Step
+from src.mcp_server.session_store import (
+    EVICTED,
+    EXPIRED,
+    FOUND,
+    NOT_FOUND,
+    InMemorySessionStore,
+    SessionStore,
+    estimate_session_bytes,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_by_count() -> bool:
+    """The least recently used session is evicted once the count limit is reached."""
+    store = InMemorySessionStore(max_sessions=2, idle_ttl=0, background_expiry=False)
+
+    print("TESTING LRU EVICTION")
+    print("=" * 40)
+
+    for session_id in ("a", "b"):
+        store.put(CounterPoseSession(session_id, "software_development"))
+    store.get("a")  # "b" is now least recently used
+    store.put(CounterPoseSession("c", "software_development"))
+
+    assert store.lookup("a")[1] == FOUND
+    assert store.lookup("c")[1] == FOUND
+    assert store.lookup("b") == (None, EVICTED)
+    assert store.stats()["evictions"] == 1
+    print("✅ Least recently used session evicted")
+    return True
+
+
+def test_byte_budget_eviction() -> bool:
+    """Growing a session past the byte budget evicts older sessions."""
+    store = InMemorySessionStore(max_sessions=100, max_bytes=20_000, idle_ttl=0)
+
+    print("\n" + "=" * 40)
+    print("TESTING BYTE BUDGET")
+    print("=" * 40)
+
+    old = CounterPoseSession("old", "visual_design")
+    big = CounterPoseSession("big", "visual_design")
+    store.put(old)
+    store.put(big)
+    big.steps.append(Step("critique", "UI Minimalist", "x" * 19_000, None))
+    store.update(big)
+
+    assert store.lookup("old")[1] == EVICTED
+    assert store.lookup("big")[1] == FOUND
+    stats = store.stats()
+    assert stats["bytes"] == estimate_session_bytes(big)
+    assert stats["evicted_bytes"] > 0
+    print(f"✅ Older session evicted; store holds {stats['bytes']} bytes")
+    return True
+
+
+def test_idle_expiry() -> bool:
+    """Idle sessions expire and report a distinct error."""
+    clock = FakeClock()
+    store = InMemorySessionStore(idle_ttl=60, clock=clock, background_expiry=False)
+    tool = CounterPoseTool(sessions=store)
+
+    print("\n" + "=" * 40)
+    print("TESTING IDLE EXPIRY")
+    print("=" * 40)
+
+    active_id = str(uuid.uuid4())
+    idle_id = str(uuid.uuid4())
+    tool.submit_reasoning(idle_id, "software security")
+    tool.submit_reasoning(active_id, "software security")
+
+    clock.now += 45
+    assert "error" not in tool.get_persona_guidance(active_id, ["Developer", "Security Expert"])
+    clock.now += 30
+
+    result = tool.get_persona_guidance(idle_id, ["Developer", "Security Expert"])
+    assert "expired" in result["error"]
+    assert "not found" in tool.get_persona_guidance(str(uuid.uuid4()), ["A", "B"])["error"]
+    assert store.lookup(active_id)[1] == FOUND
+    assert store.stats()["expirations"] == 1
+    print(f"✅ Expired session reports: {result['error']}")
+
+    clock.now += 61
+    assert store.expire() == 1
+    assert store.lookup(active_id)[1] == EXPIRED
+    assert store.lookup("never-existed")[1] == NOT_FOUND
+    return True
+
+
+class EvictAfterLookup(InMemorySessionStore):
+    """Store that evicts each session right after it is looked up, as a busy server might."""
+
+    def lookup(
+        self, session_id: str, load_steps: bool = True
+    ) -> Tuple[Optional[CounterPoseSession], str]:
+        result = super().lookup(session_id, load_steps)
+        if result[1] == FOUND:
+            self.put(CounterPoseSession(f"other-{session_id}", "software_development"))
+        return result
+
+
+def test_write_after_eviction() -> bool:
+    """A session evicted between lookup and write reports expiry instead of success."""
+    store = EvictAfterLookup(max_sessions=1, idle_ttl=0, background_expiry=False)
+    tool = CounterPoseTool(sessions=store)
+
+    print("\n" + "=" * 40)
+    print("TESTING WRITES AFTER EVICTION")
+    print("=" * 40)
+
+    session = CounterPoseSession("a", "software_development")
+    session.personas = ["Developer", "Security Expert"]
+    store.put(session)
+    result = tool.submit_critique("a", "Developer", "one", "Security Expert", "two")
+    assert "evicted" in result["error"], result
+    assert tool.string_pool.stats()["references"] == 0
+
+    store.put(session)
+    result = tool.get_persona_guidance("a", ["Developer", "Security Expert"])
+    assert "evicted" in result["error"], result
+    assert store.update(session) == EVICTED
+    assert store.update(CounterPoseSession("never-stored")) == NOT_FOUND
+    print(f"✅ Lost write reports: {result['error']}")
+    return True
+
+
+def test_incomplete_backend_rejected() -> bool:
+    """A backend missing part of the SessionStore interface cannot be created."""
+    print("\n" + "=" * 40)
+    print("TESTING INCOMPLETE BACKENDS")
+    print("=" * 40)
+
+    class LookupOnly(SessionStore):
+        def lookup(
+            self, session_id: str, load_steps: bool = True
+        ) -> Tuple[Optional[CounterPoseSession], str]:
+            return None, NOT_FOUND
+
+    try:
+        LookupOnly()
+    except TypeError as error:
+        print(f"✅ Rejected: {error}")
+    else:
+        raise AssertionError("a backend without put/update/delete must not be created")
+    assert not InMemorySessionStore.__abstractmethods__
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_lru_eviction_by_count(),
+        test_byte_budget_eviction(),
+        test_idle_expiry(),
+        test_write_after_eviction(),
+        test_incomplete_backend_rejected(),
+    ]
+
+    if all(results):
+        print("\n🎉 All session store tests passed!")
+    else:
+        print("\n💥 Some session store tests failed!")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+"""Test the SQLite persistent session backend."""
+
+import os
+import sys
+import tempfile
+import uuid
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.session_model import Step
+from src.mcp_server.session_store import EXPIRED, FOUND, NOT_FOUND
+from src.mcp_server.sqlite_store import SqliteSessionStore
+
+
+def test_sessions_survive_restart() -> bool:
+    """A session started before a restart can be completed after it."""
+    print("TESTING SQLITE RESTART SURVIVAL")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        session_id = str(uuid.uuid4())
+
+        store = SqliteSessionStore(path)
+        tool = CounterPoseTool(sessions=store)
+        init_result = tool.submit_reasoning(session_id, "Our JWT auth needs better security")
+        tool.get_persona_guidance(session_id, ["Developer", "Security Expert"])
+        store.close()
+
+        # Simulate a deploy: a fresh process opens the same database
+        store = SqliteSessionStore(path)
+        tool = CounterPoseTool(sessions=store)
+        result = tool.submit_critique(
+            session_id, "Developer", "Looks fine", "Security Expert", "Rotate the keys"
+        )
+        assert "error" not in result, result
+        assert result["domain"] == init_result["domain"]
+        assert result["personas"] == ["Developer", "Security Expert"]
+
+        session = store.get(session_id)
+        assert [step["persona"] for step in session.steps] == ["Developer", "Security Expert"]
+        assert session.steps[1]["content"] == "Rotate the keys"
+        assert store.stats()["steps"] == 2
+        print("✅ Critique accepted after restart with steps persisted")
+
+        # Re-submitting reasoning for the same id starts a fresh session
+        tool.submit_reasoning(session_id, "pricing strategy")
+        assert store.get(session_id).steps == []
+        store.close()
+    return True
+
+
+def test_header_only_lookup_and_expiry() -> bool:
+    """Tool lookups skip step rows, and idle sessions report expiry."""
+    print("\n" + "=" * 40)
+    print("TESTING SQLITE LOOKUP AND EXPIRY")
+    print("=" * 40)
+
+    now = [1000.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteSessionStore(os.path.join(tmp, "s.db"), idle_ttl=60, clock=lambda: now[0])
+        tool = CounterPoseTool(sessions=store)
+        tool.submit_reasoning("s1", "design system")
+        tool.get_persona_guidance("s1", ["UI Minimalist", "Feature-Rich Designer"])
+        tool.submit_critique("s1", "UI Minimalist", "a", "Feature-Rich Designer", "b")
+
+        header, status = store.lookup("s1", load_steps=False)
+        assert status == FOUND and header.steps == []
+        assert len(store.get("s1").steps) == 2
+
+        now[0] += 61
+        result = tool.submit_critique("s1", "UI Minimalist", "a", "Feature-Rich Designer", "b")
+        assert "expired" in result["error"]
+        assert store.lookup("s1")[1] == EXPIRED
+        assert len(store) == 0
+        print(f"✅ Expired session reports: {result['error']}")
+
+        # Writes to a session deleted after it was looked up are not reported as saved
+        tool.submit_reasoning("s2", "design system")
+        header, _ = store.lookup("s2", load_steps=False)
+        store.delete("s2")
+        assert store.update(header) == NOT_FOUND
+        assert store.append_steps(header, [Step("critique", "A", "x", None)]) == NOT_FOUND
+        assert store.lookup("s2")[1] == NOT_FOUND
+        store.close()
+    return True
+
+
+if __name__ == "__main__":
+    results = [test_sessions_survive_restart(), test_header_only_lookup_and_expiry()]
+
+    if all(results):
+        print("\n🎉 All SQLite store tests passed!")
+    else:
+        print("\n💥 Some SQLite store tests failed!")
+        sys.exit(1)
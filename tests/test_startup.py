@@ -0,0 +1,119 @@
+"""Test deferred startup work and the startup profile helpers."""
+
+import os
+import subprocess
+import sys
+
+from src.mcp_server.catalog import Catalog
+from src.mcp_server.cli import parse_importtime
+from src.mcp_server.counter_pose_tool import CounterPoseTool, builtin_catalog
+from src.mcp_server.usage_log import UsageLogger
+
+
+def test_cli_does_not_import_fastmcp() -> bool:
+    """Importing the CLI leaves FastMCP unloaded until a command needs it."""
+    print("TESTING LAZY CLI IMPORTS")
+    print("=" * 40)
+
+    code = "import sys, src.mcp_server.cli; print('fastmcp' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+    print("✅ fastmcp not imported by the CLI")
+    return True
+
+
+def test_server_built_on_first_use() -> bool:
+    """Importing the server module builds neither the tool nor the FastMCP server."""
+    print("\n" + "=" * 40)
+    print("TESTING LAZY SERVER CONSTRUCTION")
+    print("=" * 40)
+
+    code = (
+        "import asyncio, sys, src.mcp_server.main as server\n"
+        "print('fastmcp' in sys.modules, server._counter_pose is None, server._mcp is None)\n"
+        "print(sorted(asyncio.run(server.mcp.get_tools())))\n"
+        "print(server.counter_pose is server.get_counter_pose())"
+    )
+    env = dict(os.environ, COUNTER_POSE_USAGE_LOG=os.devnull, COUNTER_POSE_SESSION_BACKEND="memory")
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    )
+    lazy, tools, shared = result.stdout.strip().splitlines()
+    assert lazy == "False True True"
+    assert "submit_reasoning" in tools and "get_server_metrics" in tools
+    assert shared == "True"
+    print("✅ Tool and server built on first access")
+    return True
+
+
+def uncompiled_catalog() -> Catalog:
+    """A copy of the shared built-in catalog whose matcher is not built yet."""
+    shared = builtin_catalog()
+    return Catalog(
+        shared.domain_keywords,
+        shared.persona_pairs,
+        shared.persona_keywords,
+        shared.persona_icons,
+        shared.persona_guidance,
+    )
+
+
+def test_matcher_compiled_on_first_use() -> bool:
+    """The catalog matcher is built lazily and once, by warm_up or the first analysis."""
+    print("\n" + "=" * 40)
+    print("TESTING DEFERRED CATALOG COMPILATION")
+    print("=" * 40)
+
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull), catalog=uncompiled_catalog())
+    assert tool.catalog._matcher is None
+    result = tool.submit_reasoning("s1", "JWT security for the API")
+    assert result["domain"] == "software_development"
+    matcher = tool.catalog._matcher
+    assert matcher is not None and tool.matcher is matcher
+
+    warmed = CounterPoseTool(logger=UsageLogger(log_file=os.devnull), catalog=uncompiled_catalog())
+    warmed.warm_up()
+    assert warmed.catalog._matcher is not None
+    print("✅ Matcher compiled on demand")
+    return True
+
+
+def test_parse_importtime() -> bool:
+    """-X importtime lines are parsed into module, depth, self, and cumulative times."""
+    print("\n" + "=" * 40)
+    print("TESTING IMPORTTIME PARSING")
+    print("=" * 40)
+
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     encodings.idna",
+            "import time:       500 |        620 |   fastmcp.server",
+            "import time:      1000 |       1620 | fastmcp",
+            "unrelated warning",
+        ]
+    )
+    assert parse_importtime(stderr) == [
+        ("encodings.idna", 2, 120, 120),
+        ("fastmcp.server", 1, 500, 620),
+        ("fastmcp", 0, 1000, 1620),
+    ]
+    print("✅ Parsed 3 modules")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_cli_does_not_import_fastmcp(),
+        test_server_built_on_first_use(),
+        test_matcher_compiled_on_first_use(),
+        test_parse_importtime(),
+    ]
+
+    if all(results):
+        print("\n🎉 All startup tests passed!")
+    else:
+        print("\n💥 Some startup tests failed!")
+        sys.exit(1)
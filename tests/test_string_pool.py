@@ -0,0 +1,131 @@
+"""Test content-addressed deduplication of critique text."""
+
+import os
+import sys
+import tempfile
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.session_store import InMemorySessionStore
+from src.mcp_server.sqlite_store import SqliteSessionStore
+from src.mcp_server.string_pool import StringPool
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+
+
+def run_sessions(tool: CounterPoseTool, count: int, critique: str) -> None:
+    for i in range(count):
+        session_id = f"retry-{i}"
+        tool.submit_reasoning(session_id, "JWT security")
+        tool.get_persona_guidance(session_id, PAIR)
+        tool.submit_critique(session_id, PAIR[0], critique, PAIR[1], f"unique {i}")
+
+
+def test_pool_reference_counting() -> bool:
+    """Entries are shared between owners and freed with their last reference."""
+    pool = StringPool()
+
+    print("TESTING STRING POOL")
+    print("=" * 40)
+
+    first = pool.intern("a", "".join(["same ", "text"]))
+    second = pool.intern("b", "".join(["same ", "text"]))
+    pool.intern("b", "other")
+    assert first is second
+    stats = pool.stats()
+    assert (stats["unique"], stats["references"], stats["bytes_saved"]) == (2, 3, 9)
+
+    pool.release("a")
+    assert len(pool) == 2
+    pool.release("b")
+    assert len(pool) == 0 and pool.stats()["logical_bytes"] == 0
+    pool.release("unknown")
+    print("✅ References counted per owner and released")
+    return True
+
+
+def test_identical_critiques_stored_once() -> bool:
+    """Retried sessions share one copy of a critique until they are evicted."""
+    store = InMemorySessionStore(max_sessions=5, background_expiry=False)
+    tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+
+    print("\n" + "=" * 40)
+    print("TESTING DEDUPLICATED CRITIQUES")
+    print("=" * 40)
+
+    critique = "The refresh token flow needs rotation. " * 100
+    run_sessions(tool, 5, critique)
+    contents = [store.get(f"retry-{i}").steps[0].content for i in range(5)]
+    assert all(content is contents[0] for content in contents)
+    stats = tool.dedup_stats()
+    assert stats["unique"] == 6 and stats["references"] == 10
+    assert stats["bytes_saved"] == 4 * len(critique)
+
+    # Evicting sessions releases their references
+    for i in range(5):
+        tool.submit_reasoning(f"fresh-{i}", "pricing")
+    assert tool.dedup_stats()["references"] == 0
+    assert len(tool.string_pool) == 0
+    print(f"✅ Dedup ratio {stats['dedup_ratio']}, {stats['bytes_saved']} bytes saved")
+    return True
+
+
+def test_pooled_blobs_written_once() -> bool:
+    """Large duplicate critiques share one blob."""
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull))
+    tool.blob_threshold = 100
+
+    print("\n" + "=" * 40)
+    print("TESTING POOLED BLOBS")
+    print("=" * 40)
+
+    run_sessions(tool, 3, "x" * 1000)
+    assert tool.blob_store.stats()["blobs"] == 1
+    assert tool.get_session_history("retry-2")["steps"][0]["content"] == "x" * 1000
+    print("✅ Three sessions share one blob")
+    return True
+
+
+def test_sqlite_deduplicates_in_database() -> bool:
+    """The SQLite store keeps one row per distinct content and counts references."""
+    print("\n" + "=" * 40)
+    print("TESTING SQLITE DEDUPLICATION")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteSessionStore(os.path.join(tmp, "s.db"))
+        tool = CounterPoseTool(sessions=store, logger=UsageLogger(log_file=os.devnull))
+        run_sessions(tool, 4, "Same critique from a retried run")
+        stats = tool.dedup_stats()
+        assert stats["unique"] == 5 and stats["references"] == 8
+        assert store.get("retry-3").steps[0]["content"] == "Same critique from a retried run"
+
+        # Steps written before deduplication keep their content inline
+        store._conn.execute(
+            "INSERT INTO steps (session_id, seq, type, content) VALUES (?, 2, 'critique', ?)",
+            ("retry-3", "legacy inline content"),
+        )
+        assert store.get("retry-3").steps[2]["content"] == "legacy inline content"
+
+        tool.submit_reasoning("retry-0", "pricing")
+        store.delete("retry-1")
+        assert tool.dedup_stats()["references"] == 4
+        assert tool.dedup_stats()["unique"] == 3
+        store.close()
+    print(f"✅ SQLite dedup ratio {stats['dedup_ratio']}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_pool_reference_counting(),
+        test_identical_critiques_stored_once(),
+        test_pooled_blobs_written_once(),
+        test_sqlite_deduplicates_in_database(),
+    ]
+
+    if all(results):
+        print("\n🎉 All string pool tests passed!")
+    else:
+        print("\n💥 Some string pool tests failed!")
+        sys.exit(1)
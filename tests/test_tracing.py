@@ -0,0 +1,127 @@
+"""Test phase-level tracing spans and their export."""
+
+import os
+import sys
+import tempfile
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.tracing import NOOP_SPAN, Tracer, chrome_trace, read_spans
+from src.mcp_server.usage_log import UsageLogger
+
+PAIR = ["Developer", "Security Expert"]
+
+
+def run_flow(tracer: Tracer) -> None:
+    tool = CounterPoseTool(logger=UsageLogger(log_file=os.devnull), tracer=tracer)
+    tool.submit_reasoning("s1", "JWT security for the API")
+    tool.get_persona_guidance("s1", PAIR)
+    tool.submit_critique("s1", "Developer", "a", "Security Expert", "bb")
+    tool.submit_critique("s1", "Developer", "a", "Designer", "bb")
+
+
+def test_phases_are_traced() -> bool:
+    """Each operation writes a root span with its phases as children."""
+    print("TESTING TRACED PHASES")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        tracer = Tracer(sample_rate=1.0, trace_file=path)
+        run_flow(tracer)
+        tracer.close()
+
+        spans = list(read_spans(path))
+        roots = [span for span in spans if span["parent_id"] is None]
+        assert [root["name"] for root in roots] == [
+            "init_session",
+            "get_persona_guidance",
+            "submit_critique",
+            "submit_critique",
+        ]
+        assert roots[0]["attributes"] == {"reasoning_length": 24}
+        assert roots[3]["attributes"]["error"] == "validation"
+
+        critique = [span for span in spans if span["trace_id"] == roots[2]["trace_id"]]
+        assert [span["name"] for span in critique] == [
+            "submit_critique",
+            "load_session",
+            "validate",
+            "append_steps",
+            "log_usage",
+            "render_synthesis",
+        ]
+        assert all(span["parent_id"] == roots[2]["span_id"] for span in critique[1:])
+        assert sum(span["duration_us"] for span in critique[1:]) <= roots[2]["duration_us"]
+        print(f"✅ {len(spans)} spans across {len(roots)} traces")
+
+        events = chrome_trace(read_spans(path))["traceEvents"]
+        assert len(events) == len(spans)
+        assert events[0]["ph"] == "X" and events[0]["name"] == "init_session"
+        print("✅ Chrome trace events exported")
+    return True
+
+
+def test_sampling() -> bool:
+    """Unsampled operations record nothing, including their phases."""
+    print("\n" + "=" * 40)
+    print("TESTING TRACE SAMPLING")
+    print("=" * 40)
+
+    disabled = Tracer(sample_rate=0.0, trace_file=os.devnull)
+    assert disabled.span("anything") is NOOP_SPAN
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        tracer = Tracer(sample_rate=0.5, trace_file=path)
+        for _ in range(200):
+            with tracer.span("root"):
+                with tracer.span("child"):
+                    pass
+        tracer.close()
+
+        spans = list(read_spans(path))
+        roots = [span for span in spans if span["name"] == "root"]
+        children = [span for span in spans if span["name"] == "child"]
+        assert 40 < len(roots) < 160
+        assert len(children) == len(roots) == tracer.stats()["traces"]
+        assert all(child["parent_id"] is not None for child in children)
+        print(f"✅ {len(roots)} of 200 operations sampled")
+    return True
+
+
+def test_exceptions_mark_spans() -> bool:
+    """A phase that raises is recorded with the exception type."""
+    print("\n" + "=" * 40)
+    print("TESTING SPAN ERRORS")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        tracer = Tracer(sample_rate=1.0, trace_file=path)
+        try:
+            with tracer.span("root"):
+                with tracer.span("phase"):
+                    raise KeyError("missing")
+        except KeyError:
+            pass
+        tracer.close()
+
+        spans = {span["name"]: span for span in read_spans(path)}
+        assert spans["phase"]["attributes"]["error"] == "KeyError"
+        assert spans["root"]["attributes"]["error"] == "KeyError"
+        print("✅ Errors recorded on both spans")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_phases_are_traced(),
+        test_sampling(),
+        test_exceptions_mark_spans(),
+    ]
+
+    if all(results):
+        print("\n🎉 All tracing tests passed!")
+    else:
+        print("\n💥 Some tracing tests failed!")
+        sys.exit(1)
@@ -0,0 +1,70 @@
+"""Test the buffered background usage logger."""
+
+import os
+import sys
+import tempfile
+
+from src.mcp_server.counter_pose_tool import CounterPoseTool
+from src.mcp_server.usage_log import UsageLogger
+
+
+def test_lines_written_on_flush_and_close() -> bool:
+    """Queued lines reach the file on flush and on close."""
+    print("TESTING BUFFERED USAGE LOG")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=path, batch_size=1000, flush_interval=60, fsync="batch")
+        tool = CounterPoseTool(logger=logger)
+        tool.submit_reasoning("s1", "software security")
+        tool.get_persona_guidance("s1", ["Developer", "Security Expert"])
+
+        assert logger.flush(timeout=5)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert [line.split(",")[4] for line in lines] == ["init", "get_persona_guidance"]
+
+        tool.submit_critique("s1", "Developer", "a", "Security Expert", "bb")
+        logger.close()
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 4
+        assert lines[-1].split(",")[3:] == ["Security Expert", "critique", "2"]
+
+        stats = logger.stats()
+        assert stats["written"] == 4 and stats["queue_depth"] == 0 and stats["dropped"] == 0
+        print(f"✅ Stats after close: {stats}")
+
+        # Lines logged after shutdown are counted as dropped rather than raising
+        logger.log_usage("s1", "software_development", "system", "init", 1)
+        assert logger.stats()["dropped"] == 1
+    return True
+
+
+def test_drop_policy_when_queue_full() -> bool:
+    """A full queue drops lines and counts them instead of blocking the caller."""
+    print("\n" + "=" * 40)
+    print("TESTING QUEUE OVERFLOW")
+    print("=" * 40)
+
+    logger = UsageLogger(log_file=os.devnull, queue_size=3, overflow="drop")
+    logger._ensure_started = lambda: None  # keep the writer stopped so the queue fills
+    for _ in range(5):
+        logger.log_usage("s1", "visual_design", "system", "init", 10)
+
+    stats = logger.stats()
+    assert stats["queue_depth"] == 3
+    assert stats["dropped"] == 2
+    print(f"✅ Queue depth {stats['queue_depth']}, dropped {stats['dropped']}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [test_lines_written_on_flush_and_close(), test_drop_policy_when_queue_full()]
+
+    if all(results):
+        print("\n🎉 All usage log tests passed!")
+    else:
+        print("\n💥 Some usage log tests failed!")
+        sys.exit(1)
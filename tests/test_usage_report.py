@@ -0,0 +1,113 @@
+"""Test usage log rotation and the streaming usage report."""
+
+import gzip
+import os
+import sys
+import tempfile
+
+from src.mcp_server.cli import main as cli_main
+from src.mcp_server.usage_log import UsageLogger, list_segments
+from src.mcp_server.usage_report import build_report
+
+
+def test_rotation_compression_and_pruning() -> bool:
+    """The log rotates by size, compresses segments, and keeps the newest backups."""
+    print("TESTING USAGE LOG ROTATION")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=path, batch_size=10, max_bytes=1500, backups=3)
+        for i in range(300):
+            logger.log_usage(f"session-{i}", "digital_marketing", "SEO Specialist", "init", i)
+        logger.close()
+
+        segments = list_segments(path)
+        rotated = [segment for segment in segments if segment != path]
+        print(f"Segments: {[os.path.basename(s) for s in segments]}")
+        assert len(rotated) == 3
+        assert all(segment.endswith(".gz") for segment in rotated)
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+        with gzip.open(rotated[0], "rt") as f:
+            assert f.readline().count(",") == 5
+        assert logger.stats()["rotations"] > 3
+    return True
+
+
+def test_report_across_segments() -> bool:
+    """The report counts every line in compressed and active segments."""
+    print("\n" + "=" * 40)
+    print("TESTING USAGE REPORT")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=path, batch_size=5, max_bytes=800, backups=0)
+        for i in range(100):
+            logger.log_usage("a,b", "visual_design", "UI Minimalist", "critique", i + 1)
+            logger.log_usage(f"s{i}", "product_strategy", "system", "init", 1000)
+        logger.close()
+        with open(path, "a") as f:
+            f.write("garbage line\n\n")
+
+        data = build_report(path, jobs=1).to_dict()
+        print(f"Segments: {data['segments']}, lines: {data['lines']}")
+        assert data["segments"] == len(list_segments(path)) > 2
+        assert data["lines"] == 200
+        assert data["malformed_lines"] == 1
+        assert data["domains"] == {"product_strategy": 100, "visual_design": 100}
+        assert data["personas"] == {"UI Minimalist": 100, "system": 100}
+        critique = data["reasoning_length_by_step"]["critique"]
+        assert critique["min"] == 1 and critique["max"] == 100
+        assert 49 <= critique["p50"] <= 51
+        assert data["reasoning_length_by_step"]["init"]["p99"] == 1000
+
+        try:
+            cli_main(["usage-report", "--log-file", path, "--jobs", "1"])
+        except SystemExit as exit_:
+            assert exit_.code == 0
+    return True
+
+
+def test_separators_and_encoded_size() -> bool:
+    """Commas and newlines in caller-supplied names survive; rotation counts bytes."""
+    print("\n" + "=" * 40)
+    print("TESTING ESCAPED FIELDS")
+    print("=" * 40)
+
+    persona = "数据工程师, 安全专家" * 4
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        logger = UsageLogger(log_file=path, batch_size=1, max_bytes=1000, compress=False)
+        for i in range(40):
+            logger.log_usage(f"s,{i}\nx", "visual_design", persona, "critique", 7)
+        logger.log_usage("s", "visual_design", "50% Analyst", "critique\r", 3)
+        logger.close()
+
+        segments = list_segments(path)
+        assert len(segments) > 2
+        with open(segments[0], "rb") as f:
+            line_bytes = max(len(line) for line in f)
+        for segment in segments[:-1]:
+            assert 1000 <= os.path.getsize(segment) < 1000 + line_bytes
+
+        data = build_report(path, jobs=1).to_dict()
+        assert data["malformed_lines"] == 0 and data["lines"] == 41
+        assert data["personas"] == {persona: 40, "50% Analyst": 1}
+        assert data["steps"] == {"critique": 40, "critique\r": 1}
+    print(f"✅ {len(segments)} segments of at most {1000 + line_bytes} bytes, names intact")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_rotation_compression_and_pruning(),
+        test_report_across_segments(),
+        test_separators_and_encoded_size(),
+    ]
+
+    if all(results):
+        print("\n🎉 All usage report tests passed!")
+    else:
+        print("\n💥 Some usage report tests failed!")
+        sys.exit(1)